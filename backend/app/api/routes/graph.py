@@ -2,6 +2,7 @@
 Graph Exploration Endpoints
 """
 
+import asyncio
 from fastapi import APIRouter, HTTPException, Query, Header
 from typing import Optional, List
 from pydantic import BaseModel
@@ -12,7 +13,14 @@ ROOT = Path(__file__).resolve().parent.parent.parent.parent
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from core_engine.kg.neo4j_client import get_neo4j_client
+from core_engine.kg.neo4j_client_async import get_async_neo4j_client
+from core_engine.kg.text_search import (
+    CONCEPT_TEXT_INDEX,
+    contains_match,
+    fulltext_match,
+    fulltext_query,
+    is_missing_index_error,
+)
 from core_engine.logging import get_logger
 
 logger = get_logger(__name__)
@@ -25,48 +33,54 @@ async def get_graph_stats(x_workspace_id: Optional[str] = Header(None)):
     workspace_id = x_workspace_id or "default"
     
     try:
-        client = get_neo4j_client(workspace_id=workspace_id)
+        client = get_async_neo4j_client(workspace_id=workspace_id)
+        
+        params = {"workspace_id": workspace_id}
         
         # Total nodes
-        query = """
+        total_nodes_query = """
         MATCH (n)
         WHERE n.workspace_id = $workspace_id
         RETURN count(n) as total
         """
-        result = client.execute_read(query, {"workspace_id": workspace_id})
-        total_nodes = result[0]["total"] if result else 0
         
         # Total relationships
-        query = """
+        total_rels_query = """
         MATCH (a)-[r]->(b)
         WHERE a.workspace_id = $workspace_id AND b.workspace_id = $workspace_id
         RETURN count(r) as total
         """
-        result = client.execute_read(query, {"workspace_id": workspace_id})
-        total_rels = result[0]["total"] if result else 0
         
         # Nodes by type
-        query = """
+        by_type_query = """
         MATCH (n)
         WHERE n.workspace_id = $workspace_id
-        RETURN labels(n)[0] as type, count(*) as count
+        RETURN [l IN labels(n) WHERE l <> 'Entity'][0] as type, count(*) as count
         ORDER BY count DESC
         """
-        result = client.execute_read(query, {"workspace_id": workspace_id})
-        by_type = {r["type"]: r["count"] for r in result}
         
         # Relationships by type
-        query = """
+        by_rel_type_query = """
         MATCH (a)-[r]->(b)
         WHERE a.workspace_id = $workspace_id AND b.workspace_id = $workspace_id
         RETURN type(r) as rel_type, count(*) as count
         ORDER BY count DESC
         LIMIT 10
         """
-        result = client.execute_read(query, {"workspace_id": workspace_id})
-        by_rel_type = {r["rel_type"]: r["count"] for r in result}
         
-        client.close()
+        # Independent queries run concurrently on pooled sessions
+        nodes_result, rels_result, type_result, rel_type_result = await asyncio.gather(
+            client.execute_read(total_nodes_query, params),
+            client.execute_read(total_rels_query, params),
+            client.execute_read(by_type_query, params),
+            client.execute_read(by_rel_type_query, params),
+        )
+        total_nodes = nodes_result[0]["total"] if nodes_result else 0
+        total_rels = rels_result[0]["total"] if rels_result else 0
+        by_type = {r["type"]: r["count"] for r in type_result}
+        by_rel_type = {r["rel_type"]: r["count"] for r in rel_type_result}
+        
+        await client.close()
         
         return {
             "workspace_id": workspace_id,
@@ -90,42 +104,48 @@ async def get_concepts(
     workspace_id = x_workspace_id or "default"
     
     try:
-        client = get_neo4j_client(workspace_id=workspace_id)
-        
-        query = """
-        MATCH (c)
-        WHERE c.workspace_id = $workspace_id
-        """
+        client = get_async_neo4j_client(workspace_id=workspace_id)
         
         params = {"workspace_id": workspace_id, "limit": limit}
         
         if theme:
-            query += """
-              AND (
-                toLower(c.name) CONTAINS toLower($theme)
-                OR toLower(c.description) CONTAINS toLower($theme)
-              )
+            # Full-text index lookup, ranked by relevance
+            params["search"] = fulltext_query([theme])
+            params["terms"] = [theme.lower()]
+            match = fulltext_match(CONCEPT_TEXT_INDEX) if params["search"] else contains_match()
+            order = "score DESC, c.name"
+        else:
+            match = """
+            MATCH (c)
+            WHERE c.workspace_id = $workspace_id
             """
-            params["theme"] = theme
+            order = "c.name"
         
+        query = ""
         if concept_type:
             query += """
-              AND labels(c)[0] = $concept_type
+              AND $concept_type IN labels(c)
             """
             params["concept_type"] = concept_type
         
-        query += """
+        query += f"""
         RETURN c.id as id,
                c.name as name,
-               labels(c)[0] as type,
+               [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                c.description as description,
                c.episode_ids as episode_ids
-        ORDER BY c.name
+        ORDER BY {order}
         LIMIT $limit
         """
         
-        result = client.execute_read(query, params)
-        client.close()
+        try:
+            result = await client.execute_read(match + query, params)
+        except Exception as e:
+            if not (theme and params["search"] and is_missing_index_error(e)):
+                raise
+            logger.warning("fulltext_index_missing", extra={"index": CONCEPT_TEXT_INDEX, "fallback": "contains"})
+            result = await client.execute_read(contains_match() + query, params)
+        await client.close()
         
         return [dict(r) for r in result]
         
@@ -139,45 +159,47 @@ async def get_concept_detail(concept_id: str, x_workspace_id: Optional[str] = He
     workspace_id = x_workspace_id or "default"
     
     try:
-        client = get_neo4j_client(workspace_id=workspace_id)
+        client = get_async_neo4j_client(workspace_id=workspace_id)
         
         # Get concept
-        query = """
-        MATCH (c)
-        WHERE c.id = $concept_id AND c.workspace_id = $workspace_id
+        concept_query = """
+        MATCH (c:Entity {workspace_id: $workspace_id, id: $concept_id})
         RETURN c.id as id,
                c.name as name,
-               labels(c)[0] as type,
+               [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                c.description as description,
                c.episode_ids as episode_ids,
                c.source_paths as source_paths
         LIMIT 1
         """
-        result = client.execute_read(query, {"concept_id": concept_id, "workspace_id": workspace_id})
-        
-        if not result:
-            raise HTTPException(status_code=404, detail="Concept not found")
-        
-        concept = dict(result[0])
         
         # Get relationships
-        query = """
-        MATCH (c)-[r]->(target)
-        WHERE c.id = $concept_id 
-          AND c.workspace_id = $workspace_id
-          AND target.workspace_id = $workspace_id
+        relationships_query = """
+        MATCH (c:Entity {workspace_id: $workspace_id, id: $concept_id})-[r]->(target)
+        WHERE target.workspace_id = $workspace_id
         RETURN type(r) as relationship_type,
                target.id as target_id,
                target.name as target_name,
-               labels(target)[0] as target_type,
+               [l IN labels(target) WHERE l <> 'Entity'][0] as target_type,
                r.description as description
         LIMIT 20
         """
-        result = client.execute_read(query, {"concept_id": concept_id, "workspace_id": workspace_id})
+        
+        params = {"concept_id": concept_id, "workspace_id": workspace_id}
+        concept_result, result = await asyncio.gather(
+            client.execute_read(concept_query, params),
+            client.execute_read(relationships_query, params),
+        )
+        
+        if not concept_result:
+            await client.close()
+            raise HTTPException(status_code=404, detail="Concept not found")
+        
+        concept = dict(concept_result[0])
         
         concept["relationships"] = [dict(r) for r in result]
         
-        client.close()
+        await client.close()
         
         return concept
         
@@ -2,10 +2,14 @@
 Ingestion Endpoints - Upload and process transcripts
 """
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Header
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
 from pydantic import BaseModel
+import asyncio
+import json
 import sys
+import time
 from pathlib import Path
 import uuid
 import shutil
@@ -15,7 +19,6 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from core_engine.logging import get_logger
-from backend.app.services.ingestion_service import process_transcripts_background
 from backend.app.database.job_db import JobDB
 
 logger = get_logger(__name__)
@@ -31,6 +34,7 @@ class ProcessRequest(BaseModel):
     upload_id: str
     workspace_id: Optional[str] = None
     clear_existing: bool = False
+    priority: int = 0  # higher-priority jobs are claimed first
 
 class ProcessResponse(BaseModel):
     job_id: str
@@ -43,6 +47,11 @@ class JobStatusResponse(BaseModel):
     progress: int
     results: Optional[dict] = None
     error: Optional[str] = None
+    resume_point: Optional[dict] = None
+    attempts: int = 1
+    priority: int = 0
+    cancel_requested: bool = False
+    progress_detail: Optional[dict] = None
 
 @router.post("/ingest/upload", response_model=UploadResponse)
 async def upload_transcripts(
@@ -84,37 +93,43 @@ async def upload_transcripts(
 @router.post("/ingest/process", response_model=ProcessResponse)
 async def process_transcripts(
     request: ProcessRequest,
-    background_tasks: BackgroundTasks,
     x_workspace_id: Optional[str] = Header(None)
 ):
-    """Start processing uploaded transcripts (background job)."""
+    """Queue uploaded transcripts for processing (run by the job workers)."""
     workspace_id = request.workspace_id or x_workspace_id or "default"
     job_id = f"job_{uuid.uuid4().hex[:12]}"
     
-    # Create job status in database
+    # Enqueue: a job worker process claims it from the database
     job_db = JobDB()
     job_db.create_job(
         job_id=job_id,
         workspace_id=workspace_id,
         job_type="processing",
-        status="pending"
+        status="pending",
+        params={"upload_id": request.upload_id, "clear_existing": request.clear_existing},
+        priority=request.priority,
     )
     
-    # Start background processing
-    background_tasks.add_task(
-        process_transcripts_background,
-        job_id=job_id,
-        workspace_id=workspace_id,
-        upload_id=request.upload_id,
-        clear_existing=request.clear_existing
-    )
+    logger.info("job_enqueued", extra={
+        "job_id": job_id,
+        "workspace_id": workspace_id,
+        "priority": request.priority
+    })
     
     return ProcessResponse(
         job_id=job_id,
-        status="processing",
+        status="pending",
         upload_id=request.upload_id
     )
 
+@router.post("/ingest/cancel/{job_id}", response_model=JobStatusResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job. A running job stops after its batches in flight."""
+    job_db = JobDB()
+    if job_db.request_cancel(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return await get_job_status(job_id)
+
 @router.get("/ingest/status/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
     """Get processing job status."""
@@ -129,6 +144,54 @@ async def get_job_status(job_id: str):
         status=job["status"],
         progress=job.get("progress", 0),
         results=job.get("results"),
-        error=job.get("error")
+        error=job.get("error"),
+        resume_point=job.get("resume_point"),
+        attempts=job.get("attempts", 1),
+        priority=job.get("priority", 0),
+        cancel_requested=job.get("cancel_requested", False),
+        progress_detail=job.get("progress_detail"),
     )
 
+@router.get("/ingest/progress/{job_id}")
+async def stream_job_progress(job_id: str, poll_interval: float = 0.5):
+    """
+    Server-sent events with a job's progress: per-stage batch/chunk counters,
+    chunks/sec, ETA and cost so far. An event is sent whenever the stored
+    progress changes; the stream ends once the job is completed, failed or cancelled.
+    """
+    job_db = JobDB()
+    if not job_db.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    poll_interval = min(max(poll_interval, 0.2), 5.0)
+    
+    async def generate_events():
+        # One connection for the whole stream instead of one per status request
+        reader = job_db.progress_reader(job_id)
+        last_sent = time.time()
+        try:
+            while True:
+                update = reader.poll()
+                if update:
+                    final = update["status"] in JobDB.FINAL_STATUSES
+                    yield f"event: {'done' if final else 'progress'}\ndata: {json.dumps(update)}\n\n"
+                    last_sent = time.time()
+                    if final:
+                        break
+                elif time.time() - last_sent > 15:
+                    # Keep proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    last_sent = time.time()
+                await asyncio.sleep(poll_interval)
+        finally:
+            reader.close()
+    
+    return StreamingResponse(
+        generate_events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable buffering for nginx
+        }
+    )
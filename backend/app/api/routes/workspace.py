@@ -12,8 +12,10 @@ ROOT = Path(__file__).resolve().parent.parent.parent.parent
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from core_engine.kg.neo4j_client import get_neo4j_client
+from core_engine.kg.neo4j_client_async import get_async_neo4j_client
+from core_engine.ingestion.manifest import IngestionManifest
 from core_engine.logging import get_logger
+from core_engine.embeddings.collection_catalog import notify_collections_changed
 from backend.app.core.workspace import create_workspace_id
 from qdrant_client import QdrantClient
 import os
@@ -30,6 +32,11 @@ class WorkspaceResponse(BaseModel):
     name: Optional[str] = None
     created_at: str
 
+def _reset_manifest(workspace_id: str) -> None:
+    """Forget which transcripts were ingested for a workspace."""
+    transcripts_dir = ROOT / "data" / "workspaces" / workspace_id / "transcripts"
+    IngestionManifest.for_transcripts_dir(transcripts_dir, workspace_id=workspace_id).reset()
+
 @router.post("/workspaces", response_model=WorkspaceResponse)
 async def create_workspace(request: WorkspaceCreate):
     """Create a new workspace."""
@@ -50,7 +57,7 @@ async def create_workspace(request: WorkspaceCreate):
 async def delete_kg(workspace_id: str):
     """Delete Knowledge Graph for workspace (keeps files, sessions, scripts)."""
     try:
-        client = get_neo4j_client(workspace_id=workspace_id)
+        client = get_async_neo4j_client(workspace_id=workspace_id)
         
         # Delete all nodes and relationships with this workspace_id
         query = """
@@ -58,9 +65,12 @@ async def delete_kg(workspace_id: str):
         WHERE n.workspace_id = $workspace_id
         DETACH DELETE n
         """
-        client.execute_write(query, {"workspace_id": workspace_id})
+        await client.execute_write(query, {"workspace_id": workspace_id})
+        
+        await client.close()
         
-        client.close()
+        # Next ingestion must re-process every transcript
+        _reset_manifest(workspace_id)
         
         return {"status": "deleted", "workspace_id": workspace_id, "what": "knowledge_graph"}
     except Exception as e:
@@ -79,6 +89,8 @@ async def delete_embeddings(workspace_id: str):
         # Delete collection if exists
         try:
             client.delete_collection(collection_name)
+            notify_collections_changed()
+            _reset_manifest(workspace_id)
             return {"status": "deleted", "workspace_id": workspace_id, "what": "embeddings"}
         except Exception:
             # Collection doesn't exist
@@ -1,9 +1,14 @@
 """
 Job Database - Track background processing jobs
+
+Also the durable job queue: the API enqueues `pending` rows and worker
+processes claim them under a lease (see backend.app.services.job_worker).
+A job whose worker stops renewing its lease is claimed again by another worker.
 """
 
 import sqlite3
 import json
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -13,6 +18,10 @@ DB_PATH = ROOT / "data" / "jobs.db"
 class JobDB:
     """Job tracking database."""
     
+    FINAL_STATUSES = ("completed", "failed", "cancelled")
+    # Claims of a job before one whose worker keeps dying is given up
+    MAX_ATTEMPTS = 5
+    
     def __init__(self, db_path: Path = DB_PATH):
         self.db_path = db_path
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -20,7 +29,7 @@ class JobDB:
     
     def _init_db(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=30)
         cursor = conn.cursor()
         
         cursor.execute("""
@@ -42,26 +51,76 @@ class JobDB:
             ON jobs(workspace_id)
         """)
         
+        # Columns added after the first release
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(jobs)")}
+        for name, ddl in (
+            ("params", "params TEXT"),  # JSON: arguments needed to re-run the job
+            ("checkpoint", "checkpoint TEXT"),  # JSON: phase and per-stage totals
+            ("attempts", "attempts INTEGER DEFAULT 1"),
+            ("priority", "priority INTEGER DEFAULT 0"),  # higher runs first
+            ("lease_owner", "lease_owner TEXT"),  # worker holding the job
+            ("lease_expires_at", "lease_expires_at REAL"),  # unix time
+            ("cancel_requested", "cancel_requested INTEGER DEFAULT 0"),
+            ("progress_detail", "progress_detail TEXT"),  # JSON: live counters, rate, ETA, cost
+            ("updated_at", "updated_at REAL"),  # unix time of the last status/progress write
+        ):
+            if name not in columns:
+                try:
+                    cursor.execute(f"ALTER TABLE jobs ADD COLUMN {ddl}")
+                except sqlite3.OperationalError as e:
+                    # Another worker process added it first
+                    if "duplicate column" not in str(e):
+                        raise
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jobs_queue 
+            ON jobs(status, priority, created_at)
+        """)
+        
+        # Journal of finished batches, so a restarted job skips them
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_batches (
+                job_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                batch_key TEXT NOT NULL,
+                chunk_ids TEXT,  -- JSON array
+                output TEXT,  -- JSON: what was written for the batch
+                completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (job_id, stage, batch_key)
+            )
+        """)
+        
         conn.commit()
         conn.close()
     
-    def create_job(self, job_id: str, workspace_id: str, job_type: str, status: str = "pending"):
-        """Create a new job."""
-        conn = sqlite3.connect(self.db_path)
+    def create_job(self, job_id: str, workspace_id: str, job_type: str, status: str = "pending",
+                   params: dict = None, priority: int = 0):
+        """Create a new job (a `pending` job is picked up by the job workers)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
         cursor = conn.cursor()
         
         cursor.execute("""
-            INSERT INTO jobs (job_id, workspace_id, type, status, progress)
-            VALUES (?, ?, ?, ?, 0)
-        """, (job_id, workspace_id, job_type, status))
+            INSERT INTO jobs (job_id, workspace_id, type, status, progress, params, priority)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+        """, (job_id, workspace_id, job_type, status, json.dumps(params) if params else None, priority))
         
         conn.commit()
         conn.close()
     
     def update_job(self, job_id: str, status: str = None, progress: int = None, 
-                   results: dict = None, error: str = None):
-        """Update job status/progress."""
-        conn = sqlite3.connect(self.db_path)
+                   results: dict = None, error: str = None, lease_owner: str = None) -> bool:
+        """
+        Update job status/progress.
+
+        Args:
+            lease_owner: If given, only update while this worker still holds the
+                job, so a worker that lost its lease cannot overwrite the result
+                of the worker that reclaimed it
+
+        Returns:
+            True if the job was updated
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
         cursor = conn.cursor()
         
         updates = []
@@ -83,44 +142,385 @@ class JobDB:
             updates.append("error = ?")
             params.append(error)
         
-        if status == "completed" or status == "failed":
+        if updates:
+            updates.append("updated_at = ?")
+            params.append(time.time())
+        
+        if status in self.FINAL_STATUSES:
             updates.append("completed_at = CURRENT_TIMESTAMP")
+            updates.append("lease_owner = NULL")
+            updates.append("lease_expires_at = NULL")
         
+        updated = False
         if updates:
             params.append(job_id)
             query = f"UPDATE jobs SET {', '.join(updates)} WHERE job_id = ?"
+            if lease_owner is not None:
+                query += " AND lease_owner = ?"
+                params.append(lease_owner)
             cursor.execute(query, params)
+            updated = cursor.rowcount == 1
             conn.commit()
         
         conn.close()
+        return updated
     
     def get_job(self, job_id: str) -> dict:
         """Get job by ID."""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=30)
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT job_id, workspace_id, type, status, progress, results, error, 
-                   created_at, completed_at
+                   created_at, completed_at, params, checkpoint, attempts,
+                   priority, lease_owner, cancel_requested, progress_detail, updated_at
             FROM jobs
             WHERE job_id = ?
         """, (job_id,))
         
         result = cursor.fetchone()
+        if not result:
+            conn.close()
+            return None
+        
+        cursor.execute("""
+            SELECT stage, COUNT(*) FROM job_batches WHERE job_id = ? GROUP BY stage
+        """, (job_id,))
+        completed = dict(cursor.fetchall())
         conn.close()
         
-        if not result:
+        job = self._row_to_job(result)
+        job["resume_point"] = self._resume_point(job["checkpoint"], completed)
+        return job
+    
+    def update_progress(self, job_id: str, progress: int, detail: dict):
+        """Store a batch of progress: percentage plus the live counters snapshot."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE jobs SET progress = MAX(COALESCE(progress, 0), ?), progress_detail = ?, updated_at = ?
+            WHERE job_id = ?
+        """, (progress, json.dumps(detail), time.time(), job_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def progress_reader(self, job_id: str) -> "JobProgressReader":
+        """Reader that reports a job's progress only when it changed (one connection)."""
+        return JobProgressReader(self.db_path, job_id)
+    
+    def update_checkpoint(self, job_id: str, **fields):
+        """Merge fields into the job checkpoint (phase, per-stage totals, ...)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        # One transaction so concurrent stage threads do not lose each other's fields
+        cursor.execute("BEGIN IMMEDIATE")
+        row = cursor.execute("SELECT checkpoint FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        checkpoint = json.loads(row[0]) if row and row[0] else {}
+        checkpoint.update(fields)
+        cursor.execute(
+            "UPDATE jobs SET checkpoint = ? WHERE job_id = ?", (json.dumps(checkpoint), job_id)
+        )
+        conn.commit()
+        conn.close()
+    
+    def claim_job(self, worker_id: str, lease_seconds: float, max_per_workspace: int = 1,
+                  job_types: tuple = ("processing",), max_attempts: int = MAX_ATTEMPTS) -> dict:
+        """
+        Claim the next runnable job for a worker.
+
+        Pending jobs and jobs whose lease expired (their worker died) are
+        eligible, highest priority first, then oldest. Workspaces that already
+        have `max_per_workspace` jobs under a live lease are skipped. A job
+        whose lease expired after `max_attempts` claims is marked failed
+        instead of being claimed again, so one that crashes its worker every
+        time does not loop forever.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+            lease_seconds: How long the claim holds without a renewal
+            max_per_workspace: Concurrent jobs allowed per workspace
+            job_types: Job types this worker runs
+            max_attempts: Claims allowed per job (None: no limit)
+
+        Returns:
+            The claimed job (with "reclaimed" set when it had been started
+            before), or None when nothing is runnable
+        """
+        now = time.time()
+        types = ", ".join("?" for _ in job_types)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        # One write transaction: two workers never claim the same job
+        cursor.execute("BEGIN IMMEDIATE")
+        
+        # Cancelled while its worker was gone: nobody is left to acknowledge it
+        cursor.execute("""
+            UPDATE jobs SET status = 'cancelled', completed_at = CURRENT_TIMESTAMP,
+                   lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+            WHERE cancel_requested = 1 AND status = 'processing'
+              AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+        """, (now, now))
+        
+        if max_attempts is not None:
+            cursor.execute("""
+                UPDATE jobs SET status = 'failed', completed_at = CURRENT_TIMESTAMP,
+                       error = 'Gave up after ' || COALESCE(attempts, 1) || ' attempts: its worker stopped each time',
+                       lease_owner = NULL, lease_expires_at = NULL, updated_at = ?
+                WHERE status = 'processing' AND COALESCE(attempts, 1) >= ?
+                  AND (lease_expires_at IS NULL OR lease_expires_at < ?)
+            """, (now, max_attempts, now))
+        
+        active = dict(cursor.execute("""
+            SELECT workspace_id, COUNT(*) FROM jobs
+            WHERE status = 'processing' AND lease_expires_at >= ?
+            GROUP BY workspace_id
+        """, (now,)).fetchall())
+        
+        candidates = cursor.execute(f"""
+            SELECT job_id, workspace_id, status FROM jobs
+            WHERE type IN ({types}) AND cancel_requested = 0
+              AND (status = 'pending'
+                   OR (status = 'processing' AND (lease_expires_at IS NULL OR lease_expires_at < ?)))
+            ORDER BY priority DESC, created_at, rowid
+        """, (*job_types, now)).fetchall()
+        
+        claimed = None
+        for job_id, workspace_id, status in candidates:
+            if active.get(workspace_id, 0) >= max_per_workspace:
+                continue
+            reclaimed = status == "processing"
+            cursor.execute("""
+                UPDATE jobs SET status = 'processing', lease_owner = ?, lease_expires_at = ?,
+                       attempts = COALESCE(attempts, 1) + ?, error = NULL, updated_at = ?
+                WHERE job_id = ?
+            """, (worker_id, now + lease_seconds, 1 if reclaimed else 0, now, job_id))
+            claimed = (job_id, reclaimed)
+            break
+        
+        conn.commit()
+        conn.close()
+        
+        if claimed is None:
             return None
+        job = self.get_job(claimed[0])
+        job["reclaimed"] = claimed[1]
+        return job
+    
+    def renew_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a worker's lease on a job.
+
+        Returns:
+            False if the worker no longer holds the job (lease expired and the
+            job was claimed elsewhere, or it already finished)
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE jobs SET lease_expires_at = ?
+            WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+        """, (time.time() + lease_seconds, job_id, worker_id))
+        renewed = cursor.rowcount == 1
         
+        conn.commit()
+        conn.close()
+        return renewed
+    
+    def release_job(self, job_id: str, worker_id: str):
+        """Drop a worker's lease without finishing the job (worker shutting down)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            UPDATE jobs SET lease_expires_at = 0
+            WHERE job_id = ? AND lease_owner = ? AND status = 'processing'
+        """, (job_id, worker_id))
+        
+        conn.commit()
+        conn.close()
+    
+    def request_cancel(self, job_id: str) -> str:
+        """
+        Cancel a job. A pending job is cancelled at once; a running one is
+        flagged and stopped by its worker.
+
+        Returns:
+            The job status after the request, or None if the job does not exist
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("BEGIN IMMEDIATE")
+        row = cursor.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            conn.close()
+            return None
+        status = row[0]
+        if status == "pending":
+            cursor.execute("""
+                UPDATE jobs SET status = 'cancelled', cancel_requested = 1,
+                       completed_at = CURRENT_TIMESTAMP, updated_at = ?
+                WHERE job_id = ?
+            """, (time.time(), job_id))
+            status = "cancelled"
+        elif status == "processing":
+            cursor.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ?", (time.time(), job_id)
+            )
+        
+        conn.commit()
+        conn.close()
+        return status
+    
+    def is_cancel_requested(self, job_id: str) -> bool:
+        """Whether cancellation was requested for a job."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        row = cursor.execute(
+            "SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        
+        conn.close()
+        return bool(row and row[0])
+    
+    def record_batch(self, job_id: str, stage: str, batch_key: str, chunk_ids: list, output: dict):
+        """Journal a batch whose output has been written."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            INSERT OR REPLACE INTO job_batches (job_id, stage, batch_key, chunk_ids, output)
+            VALUES (?, ?, ?, ?, ?)
+        """, (job_id, stage, batch_key, json.dumps(chunk_ids), json.dumps(output)))
+        
+        conn.commit()
+        conn.close()
+    
+    def get_completed_batches(self, job_id: str, stage: str) -> dict:
+        """Journaled batches of a stage: batch_key -> output."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT batch_key, output FROM job_batches WHERE job_id = ? AND stage = ?
+        """, (job_id, stage))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        return {key: json.loads(output) if output else {} for key, output in rows}
+    
+    def clear_batches(self, job_id: str):
+        """Drop a job's batch journal (job finished, or its input changed)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM job_batches WHERE job_id = ?", (job_id,))
+        
+        conn.commit()
+        conn.close()
+    
+    def journal(self, job_id: str) -> "JobJournal":
+        """Batch journal for one job, in the shape StagedIngestionEngine expects."""
+        return JobJournal(self, job_id)
+    
+    @staticmethod
+    def _row_to_job(row) -> dict:
         return {
-            "job_id": result[0],
-            "workspace_id": result[1],
-            "type": result[2],
-            "status": result[3],
-            "progress": result[4],
-            "results": json.loads(result[5]) if result[5] else None,
-            "error": result[6],
-            "created_at": result[7],
-            "completed_at": result[8]
+            "job_id": row[0],
+            "workspace_id": row[1],
+            "type": row[2],
+            "status": row[3],
+            "progress": row[4],
+            "results": json.loads(row[5]) if row[5] else None,
+            "error": row[6],
+            "created_at": row[7],
+            "completed_at": row[8],
+            "params": json.loads(row[9]) if row[9] else {},
+            "checkpoint": json.loads(row[10]) if row[10] else {},
+            "attempts": row[11] or 1,
+            "priority": row[12] or 0,
+            "lease_owner": row[13],
+            "cancel_requested": bool(row[14]),
+            "progress_detail": json.loads(row[15]) if row[15] else None,
+            "updated_at": row[16],
         }
+    
+    @staticmethod
+    def _resume_point(checkpoint: dict, completed: dict) -> dict:
+        """Where a restarted job would carry on: phase plus finished/total batches per stage."""
+        if not checkpoint and not completed:
+            return None
+        point = {"phase": checkpoint.get("phase")}
+        for stage in ("kg", "embed"):
+            point[stage] = {
+                "completed_batches": completed.get(stage, 0),
+                "total_batches": checkpoint.get(f"{stage}_total"),
+            }
+        return point
 
+
+class JobJournal:
+    """Per-job view of the batch journal used by StagedIngestionEngine.run."""
+    
+    def __init__(self, job_db: JobDB, job_id: str):
+        self.job_db = job_db
+        self.job_id = job_id
+    
+    def completed(self, stage: str) -> dict:
+        """batch_key -> output for batches of `stage` that are already written."""
+        return self.job_db.get_completed_batches(self.job_id, stage)
+    
+    def record(self, stage: str, batch_key: str, chunk_ids: list, output: dict):
+        """Journal a written batch."""
+        self.job_db.record_batch(self.job_id, stage, batch_key, chunk_ids, output)
+    
+    def set_totals(self, totals: dict):
+        """Record total batches per stage for the resume point."""
+        self.job_db.update_checkpoint(
+            self.job_id, **{f"{stage}_total": total for stage, total in totals.items()}
+        )
+
+
+class JobProgressReader:
+    """
+    Polls one job over a single connection and returns it only when its
+    status or progress changed since the previous poll.
+    """
+    
+    def __init__(self, db_path: Path, job_id: str):
+        self.job_id = job_id
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._last_seen = None
+    
+    def poll(self) -> dict:
+        """
+        Returns:
+            The job's status/progress if it changed, otherwise None
+        """
+        row = self.conn.execute("""
+            SELECT status, progress, progress_detail, results, error, updated_at
+            FROM jobs WHERE job_id = ?
+        """, (self.job_id,)).fetchone()
+        if row is None:
+            return None
+        key = (row[0], row[1], row[5])
+        if key == self._last_seen:
+            return None
+        self._last_seen = key
+        return {
+            "job_id": self.job_id,
+            "status": row[0],
+            "progress": row[1],
+            "detail": json.loads(row[2]) if row[2] else None,
+            "results": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+        }
+    
+    def close(self):
+        self.conn.close()
@@ -3,6 +3,7 @@ FastAPI Application - Main Entry Point
 Production-grade REST API for Knowledge Graph System
 """
 
+import asyncio
 import os
 import sys
 from pathlib import Path
@@ -22,6 +23,17 @@ load_dotenv()
 
 from core_engine.logging import get_logger
 from backend.app.core.reasoner_pool import get_reasoner_pool
+from core_engine.kg.driver_registry import get_driver_registry
+from core_engine.kg.neo4j_client import get_neo4j_client
+from core_engine.kg.schema import MIGRATE_ENTITIES_COMMAND, SchemaManager
+from core_engine.utils.adaptive_concurrency import get_concurrency_metrics
+from core_engine.utils.llm_scheduler import get_llm_scheduler
+from backend.app.services.job_worker import (
+    acquire_worker_lock,
+    get_worker_config,
+    start_worker_processes,
+    stop_worker_processes,
+)
 
 logger = get_logger(__name__)
 
@@ -67,28 +79,89 @@ app.include_router(sessions.router, prefix="/api/v1", tags=["sessions"])
 # React frontend handles all page routes (/, /chat, /dashboard, etc.)
 # Backend only serves API endpoints under /api/v1/*
 
+def _entity_schema_status() -> dict:
+    """Whether the graph still has to be migrated to the :Entity label."""
+    client = get_neo4j_client()
+    try:
+        required = SchemaManager(client).needs_entity_migration()
+    finally:
+        client.close()
+    if required:
+        return {"status": "migration_required", "entity_migration_required": True, "command": MIGRATE_ENTITIES_COMMAND}
+    return {"status": "ok", "entity_migration_required": False}
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup."""
     logger.info("app_startup")
     # Reasoner pool will be initialized on first use
+    
+    # Ingestion jobs fail on a graph from before the :Entity label; say so up front
+    try:
+        schema = await asyncio.to_thread(_entity_schema_status)
+        if schema["entity_migration_required"]:
+            logger.error("entity_label_migration_required", extra={"command": MIGRATE_ENTITIES_COMMAND})
+    except Exception as e:
+        logger.warning("entity_schema_check_failed", extra={"error": str(e)})
+    
+    # Ingestion jobs run in separate worker processes; the API only enqueues them.
+    # Jobs a previous process left half-done are reclaimed once their lease expires.
+    # With several API processes only the one holding the worker lock spawns them.
+    app.state.job_workers = None
+    app.state.job_worker_lock = None
+    if get_worker_config()["processes"] > 0:
+        app.state.job_worker_lock = acquire_worker_lock()
+        if app.state.job_worker_lock is None:
+            logger.info("job_workers_started_elsewhere", extra={"pid": os.getpid()})
+        else:
+            try:
+                app.state.job_workers = start_worker_processes()
+            except Exception as e:
+                logger.warning("job_workers_start_failed", extra={"error": str(e)})
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info("app_shutdown")
+    if getattr(app.state, "job_workers", None):
+        stop_worker_processes(*app.state.job_workers)
+    if getattr(app.state, "job_worker_lock", None):
+        app.state.job_worker_lock.close()
     try:
         pool = get_reasoner_pool()
         pool.cleanup_all()
         logger.info("reasoner_pool_cleaned_up_on_shutdown")
     except Exception as e:
         logger.warning("reasoner_pool_cleanup_failed", extra={"error": str(e)})
+    await get_driver_registry().aclose_all()
 
 @app.get("/api/v1/health")
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/api/v1/health/neo4j")
+async def neo4j_pool_health():
+    """Shared Neo4j driver pool metrics."""
+    return get_driver_registry().get_metrics()
+
+@app.get("/api/v1/health/schema")
+async def schema_health():
+    """Knowledge graph schema state; 503 while the :Entity migration is pending."""
+    try:
+        schema = await asyncio.to_thread(_entity_schema_status)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "error": str(e)})
+    return JSONResponse(status_code=503 if schema["entity_migration_required"] else 200, content=schema)
+
+@app.get("/api/v1/health/llm")
+async def llm_concurrency_health():
+    """LLM scheduler queue depth per priority class and adaptive concurrency windows (this process only)."""
+    return {
+        "scheduler": get_llm_scheduler().get_stats(),
+        **get_concurrency_metrics(),
+    }
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Global exception handler."""
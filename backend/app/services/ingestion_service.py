@@ -1,38 +1,80 @@
 """
 Ingestion Service - Background processing
+
+`process_transcripts_background` runs inside a job worker process
+(backend.app.services.job_worker), which claims the job from JobDB.
 """
 
+import hashlib
+import json
+import os
 import sys
+import threading
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parent.parent.parent.parent
 if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
-from core_engine.ingestion.loader import load_transcripts
-from core_engine.chunking import chunk_documents
-from core_engine.kg import extract_kg_from_chunks, get_neo4j_client, initialize_schema, CrossEpisodeLinker
-from core_engine.embeddings.ingest_qdrant import ingest_qdrant
+from core_engine.kg import get_neo4j_client, check_entity_schema, initialize_schema, CrossEpisodeLinker
+from core_engine.ingestion import IngestionManifest, filename_to_episode_id
+from core_engine.pipeline import StagedIngestionEngine, IngestionCancelled, IngestionProgress
 from core_engine.logging import get_logger
 from backend.app.database.job_db import JobDB
 
 logger = get_logger(__name__)
 
+def _input_signature(diff, fingerprint: str) -> str:
+    """
+    Identifies the work a job does: files to process, their content and the settings.
+
+    New, changed and removed files count. Unchanged files are left out: their
+    refreshed manifest entries are saved before ingestion starts, so a resumed
+    job would otherwise never match.
+    """
+    hashes = {str(path): diff.hashes.get(str(path)) for path in diff.to_process}
+    payload = json.dumps(
+        {"fingerprint": fingerprint, "hashes": sorted(hashes.items()), "removed": sorted(diff.removed)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _check_cancelled(cancel_event) -> None:
+    """Stop between steps once the job was cancelled."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise IngestionCancelled("Ingestion cancelled")
+
+
 def process_transcripts_background(
     job_id: str,
     workspace_id: str,
     upload_id: str,
-    clear_existing: bool = False
+    clear_existing: bool = False,
+    resume: bool = False,
+    cancel_event: threading.Event = None,
+    lease_owner: str = None,
 ):
     """
     Background task to process transcripts.
     Updates job status in database as it progresses.
+
+    Finished KG/embedding batches are journaled in JobDB. With `resume`, a job
+    interrupted by a restart skips them and carries on where it stopped.
+    Setting `cancel_event` stops the job after the batches in flight.
+    With `lease_owner`, status changes only apply while that worker still
+    holds the job's lease.
     """
     job_db = JobDB()
     
     try:
+        checkpoint = {}
+        if resume:
+            job = job_db.get_job(job_id)
+            checkpoint = (job or {}).get("checkpoint") or {}
+        
         # Update status: processing
-        job_db.update_job(job_id, status="processing", progress=0)
+        job_db.update_job(job_id, status="processing", progress=0, lease_owner=lease_owner)
         
         # Load transcripts from workspace directory
         transcripts_dir = ROOT / "data" / "workspaces" / workspace_id / "transcripts"
@@ -46,103 +88,220 @@ def process_transcripts_background(
             "transcripts_dir": str(transcripts_dir)
         })
         
-        # Step 1: Load transcripts (10%)
-        job_db.update_job(job_id, progress=10)
-        docs = load_transcripts(transcripts_dir, workspace_id=workspace_id)
-        
-        if not docs:
-            raise ValueError("No transcripts found")
-        
-        # Step 2: Chunk documents (20%)
-        job_db.update_job(job_id, progress=20)
-        chunks = chunk_documents(docs, target_chars=2000, overlap_chars=200)
-        
-        total_chunks = len(chunks)
-        logger.info("chunking_complete", extra={"total_chunks": total_chunks})
+        engine = StagedIngestionEngine(
+            workspace_id=workspace_id,
+            collection=f"{workspace_id}_chunks",
+            model="gpt-4o",
+            kg_batch_size=10,
+            confidence_threshold=0.5,
+        )
         
-        # Step 3: Initialize schema (25%)
-        job_db.update_job(job_id, progress=25)
+        # A graph from before the :Entity label must be migrated first: fail
+        # before the removals below or any batch write touch it
         client = get_neo4j_client(workspace_id=workspace_id)
         try:
-            initialize_schema(client)
+            check_entity_schema(client)
         finally:
             client.close()
         
-        # Step 4: Extract KG (25% → 75%)
-        # Process in batches and update progress
-        batch_size = 10
-        processed = 0
+        # Step 1: Diff transcripts against the workspace manifest (5%)
+        # Only new or changed episodes (or a changed parameter fingerprint) get re-processed
+        job_db.update_job(job_id, progress=5)
+        manifest = IngestionManifest.for_transcripts_dir(transcripts_dir, workspace_id=workspace_id)
+        fingerprint = engine.fingerprint()
         
-        job_db.update_job(job_id, progress=30)
+        # A resumed job already cleared/removed stale data before it stopped;
+        # doing it again would delete the batches it has written since
+        prepared = checkpoint.get("phase") in ("prepared", "ingesting", "linking")
         
-        results = extract_kg_from_chunks(
-            chunks=chunks,
-            workspace_id=workspace_id,
-            model="gpt-4o",
-            batch_size=batch_size,
-            confidence_threshold=0.5,
-            initialize_schema_first=False,
-        )
+        if clear_existing and manifest.entries and not prepared:
+            engine.remove_episodes(list(manifest.entries))
+            manifest.reset()
         
-        # Update progress based on chunks processed
-        processed = total_chunks
-        progress = 30 + int((processed / total_chunks) * 45)  # 30% → 75%
-        job_db.update_job(job_id, progress=progress)
+        diff = manifest.diff(transcripts_dir, fingerprint)
         
-        logger.info("kg_extraction_complete", extra={
-            "concepts": results['written']['concepts'],
-            "relationships": results['written']['relationships']
-        })
+        logger.info("manifest_diff", extra={"job_id": job_id, **diff.summary()})
+        
+        signature = _input_signature(diff, fingerprint)
+        if prepared and checkpoint.get("input") != signature:
+            # Transcripts changed while the job was down: start over
+            logger.info("job_resume_input_changed", extra={"job_id": job_id})
+            job_db.clear_batches(job_id)
+            prepared = False
+        
+        # Remove stale Neo4j nodes and Qdrant points for edited or deleted episodes.
+        # Removed episodes stay in the manifest until they are re-linked (below)
+        if diff.stale_episode_ids and not prepared:
+            engine.remove_episodes(diff.stale_episode_ids)
+        manifest.save()
+        job_db.update_checkpoint(job_id, phase="prepared", input=signature)
         
-        # Step 5: Ingest to Qdrant (75% → 85%)
-        job_db.update_job(job_id, progress=75)
+        # Checked after the removal above, so deleting every transcript still
+        # cleans up the episodes ingested from them
+        if not diff.to_process and not diff.unchanged and not diff.removed:
+            raise ValueError("No transcripts found")
+        
+        if not diff.to_process and not diff.removed:
+            job_db.update_job(
+                job_id,
+                status="completed",
+                progress=100,
+                lease_owner=lease_owner,
+                results={
+                    "concepts": 0,
+                    "relationships": 0,
+                    "quotes": 0,
+                    "embedded_chunks": 0,
+                    "cross_episode_links": 0,
+                    "total_files": 0,
+                    "total_chunks": 0,
+                    "unchanged_files": len(diff.unchanged),
+                }
+            )
+            job_db.update_checkpoint(job_id, phase="completed")
+            logger.info("background_processing_up_to_date", extra={"job_id": job_id})
+            return
         
-        collection_name = f"{workspace_id}_chunks"
-        ingest_qdrant(
-            transcripts_path=transcripts_dir,
-            collection=collection_name,
-            workspace_id=workspace_id
+        # Per-batch counters from the extractor, writer and embedder; stored
+        # (with chunks/sec, ETA and cost) every few seconds instead of per batch
+        def store_progress(snapshot: dict):
+            job_db.update_progress(job_id, progress=30 + int(snapshot["fraction"] * 55), detail=snapshot)
+        
+        progress = IngestionProgress(
+            on_flush=store_progress,
+            flush_interval=float(os.getenv("INGEST_PROGRESS_FLUSH_SECONDS", "2")),
         )
         
-        job_db.update_job(job_id, progress=85)
+        # A job stopped while linking already wrote every batch: link straight away
+        ingested = checkpoint.get("ingested") if prepared and checkpoint.get("phase") == "linking" else None
+        if ingested is not None:
+            logger.info("job_resume_linking", extra={"job_id": job_id})
+        else:
+            # Step 2: Load and chunk new/changed transcripts once (10% → 20%)
+            # The same chunk set feeds both KG extraction and Qdrant embedding
+            _check_cancelled(cancel_event)
+            job_db.update_job(job_id, progress=10)
+            docs, chunks = engine.load_and_chunk(transcripts_dir, paths=diff.to_process)
+            
+            job_db.update_job(job_id, progress=20)
+            total_chunks = len(chunks)
+            logger.info("chunking_complete", extra={"total_chunks": total_chunks})
+            
+            # Step 3: Initialize schema (25%)
+            job_db.update_job(job_id, progress=25)
+            client = get_neo4j_client(workspace_id=workspace_id)
+            try:
+                initialize_schema(client)
+            finally:
+                client.close()
+            
+            # Step 4-5: Extract KG and ingest to Qdrant concurrently (30% → 85%)
+            _check_cancelled(cancel_event)
+            job_db.update_job(job_id, progress=30)
+            
+            job_db.update_checkpoint(job_id, phase="ingesting")
+            progress.set_phase("ingesting")
+            results = engine.run(
+                chunks,
+                journal=job_db.journal(job_id),
+                cancel_event=cancel_event,
+                progress=progress,
+            )
+            
+            logger.info("kg_extraction_complete", extra={
+                "concepts": results['written']['concepts'],
+                "relationships": results['written']['relationships'],
+                "embedded": results['embedded']
+            })
+            
+            # Only concepts in new/changed/removed episodes are re-linked once the
+            # workspace already has ingested episodes; a first ingest links everything
+            ingested = {
+                "written": results["written"],
+                "embedded": results["embedded"],
+                "total_files": len(docs),
+                "total_chunks": total_chunks,
+                "cost_usd": progress.snapshot()["cost_usd"],
+                "link_episode_ids": diff.touched_episode_ids if diff.unchanged else None,
+                "failed_episode_ids": results.get("failed_episode_ids", []),
+            }
+            job_db.update_checkpoint(job_id, phase="linking", ingested=ingested)
         
         # Step 6: Cross-episode analysis (85% → 95%)
         job_db.update_job(job_id, progress=85)
         
+        _check_cancelled(cancel_event)
+        progress.set_phase("linking")
+        
         client = get_neo4j_client(workspace_id=workspace_id)
         try:
             linker = CrossEpisodeLinker(client, workspace_id=workspace_id)
             link_results = linker.create_cross_episode_links(
                 min_episodes=2,
                 min_co_occurrences=2,
-                min_confidence=0.5
+                min_confidence=0.5,
+                episode_ids=ingested["link_episode_ids"],
             )
         finally:
             client.close()
         
         job_db.update_job(job_id, progress=95)
         
+        # Recorded only once the episodes are linked: a job that fails or stops
+        # before this point sees the same files as new/changed/removed next time.
+        # So does a file with a failed extraction batch: its missing chunks are
+        # extracted again on the next run instead of being skipped as unchanged
+        failed_episode_ids = set(ingested.get("failed_episode_ids") or [])
+        for path in diff.to_process:
+            if filename_to_episode_id(path) in failed_episode_ids:
+                continue
+            manifest.record(path, fingerprint, content_hash=diff.hashes.get(str(path)))
+        for episode_id in diff.removed:
+            manifest.forget(episode_id)
+        manifest.save()
+        
         # Step 7: Complete (100%)
-        job_db.update_job(
+        completed = job_db.update_job(
             job_id,
             status="completed",
             progress=100,
+            lease_owner=lease_owner,
             results={
-                "concepts": results['written']['concepts'],
-                "relationships": results['written']['relationships'],
-                "quotes": results['written']['quotes'],
-                "cross_episode_links": link_results.get('created_links', 0),
-                "total_files": len(docs),
-                "total_chunks": total_chunks
+                "concepts": ingested["written"]["concepts"],
+                "relationships": ingested["written"]["relationships"],
+                "quotes": ingested["written"]["quotes"],
+                "embedded_chunks": ingested["embedded"],
+                "cross_episode_links": link_results.get('created', 0),
+                "total_files": ingested["total_files"],
+                "total_chunks": ingested["total_chunks"],
+                "unchanged_files": len(diff.unchanged),
+                "removed_files": len(diff.removed),
+                "failed_files": len(failed_episode_ids),
+                "cost_usd": ingested["cost_usd"],
             }
         )
         
+        if not completed:
+            # Lease lost during the last step: the worker that reclaimed the job owns it now
+            logger.warning("background_processing_superseded", extra={"job_id": job_id})
+            return
+        
+        job_db.update_checkpoint(job_id, phase="completed")
+        job_db.clear_batches(job_id)
+        
         logger.info("background_processing_complete", extra={"job_id": job_id})
         
+    except IngestionCancelled:
+        if job_db.is_cancel_requested(job_id):
+            job_db.update_job(job_id, status="cancelled", lease_owner=lease_owner)
+            logger.info("background_processing_cancelled", extra={"job_id": job_id})
+        else:
+            # The worker lost its lease; the job now belongs to another worker
+            logger.warning("background_processing_abandoned", extra={"job_id": job_id})
+        
     except Exception as e:
         logger.error("background_processing_failed", exc_info=True, extra={
             "job_id": job_id,
             "error": str(e)
         })
-        job_db.update_job(job_id, status="failed", error=str(e))
-
+        job_db.update_job(job_id, status="failed", error=str(e), lease_owner=lease_owner)
@@ -0,0 +1,289 @@
+"""
+Job Worker - Run queued ingestion jobs in dedicated processes
+
+The API only enqueues jobs in JobDB. Worker processes claim them under a
+lease, renew the lease while the job runs and stop the job when it is
+cancelled. A worker that dies stops renewing; once its lease expires another
+worker claims the job and resumes it from its batch journal.
+
+The API spawns JOB_WORKER_PROCESSES workers on startup. With several API
+processes (e.g. `uvicorn --workers N`), only the first to take the
+data/job_workers.lock file spawns them, so the setting is a per-host total.
+Set it to 0 to run them separately instead:
+
+  python -m backend.app.services.job_worker
+  python -m backend.app.services.job_worker --processes 4
+
+Environment:
+  JOB_WORKER_PROCESSES=1      # worker processes started by the API
+  JOB_MAX_PER_WORKSPACE=1     # concurrent jobs per workspace
+  JOB_LEASE_SECONDS=60        # lease length; renewed every third of it
+  JOB_POLL_INTERVAL=2         # seconds between claims when the queue is empty
+  JOB_MAX_ATTEMPTS=5          # claims of a job whose worker keeps dying before it fails
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from core_engine.logging import get_logger
+from backend.app.database.job_db import DB_PATH, JobDB
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# Held by the one API process that spawns the job workers
+WORKER_LOCK_PATH = DB_PATH.parent / "job_workers.lock"
+
+
+def get_worker_config() -> dict:
+    """Worker settings from environment."""
+    return {
+        "processes": int(os.getenv("JOB_WORKER_PROCESSES", "1")),
+        "max_per_workspace": int(os.getenv("JOB_MAX_PER_WORKSPACE", "1")),
+        "lease_seconds": float(os.getenv("JOB_LEASE_SECONDS", "60")),
+        "poll_interval": float(os.getenv("JOB_POLL_INTERVAL", "2")),
+        "max_attempts": int(os.getenv("JOB_MAX_ATTEMPTS", str(JobDB.MAX_ATTEMPTS))),
+    }
+
+
+def _run_processing_job(job: dict, cancel_event: threading.Event):
+    """Handler for "processing" jobs created by /ingest/process."""
+    from backend.app.services.ingestion_service import process_transcripts_background
+
+    params = job.get("params") or {}
+    if not params.get("upload_id"):
+        # Created before jobs stored their parameters
+        JobDB().update_job(
+            job["job_id"], status="failed", error="Job has no parameters to run with",
+            lease_owner=job.get("lease_owner"),
+        )
+        return
+    process_transcripts_background(
+        job_id=job["job_id"],
+        workspace_id=job["workspace_id"],
+        upload_id=params["upload_id"],
+        clear_existing=params.get("clear_existing", False),
+        resume=job.get("reclaimed", False),
+        cancel_event=cancel_event,
+        lease_owner=job.get("lease_owner"),
+    )
+
+
+# job type -> handler(job, cancel_event)
+JOB_HANDLERS = {
+    "processing": _run_processing_job,
+}
+
+
+class JobWorker:
+    """Claims jobs from JobDB and runs them one at a time."""
+
+    def __init__(self, worker_id: str = None, job_db: JobDB = None, lease_seconds: float = None,
+                 poll_interval: float = None, max_per_workspace: int = None,
+                 max_attempts: int = None):
+        """
+        Initialize job worker.
+
+        Args:
+            worker_id: Lease owner name (default: host:pid:random)
+            job_db: Job database (default: JobDB())
+            lease_seconds: Lease length (default: from env)
+            poll_interval: Idle wait between claims (default: from env)
+            max_per_workspace: Concurrent jobs per workspace (default: from env)
+            max_attempts: Claims per job before it is failed (default: from env)
+        """
+        config = get_worker_config()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.job_db = job_db or JobDB()
+        self.lease_seconds = lease_seconds or config["lease_seconds"]
+        self.poll_interval = poll_interval or config["poll_interval"]
+        self.max_per_workspace = max_per_workspace or config["max_per_workspace"]
+        self.max_attempts = max_attempts or config["max_attempts"]
+
+    def run(self, stop_event) -> None:
+        """Claim and run jobs until `stop_event` is set."""
+        logger.info("job_worker_started", extra={"worker_id": self.worker_id})
+        while not stop_event.is_set():
+            try:
+                ran = self.run_once(stop_event)
+            except Exception as e:
+                logger.error("job_worker_error", exc_info=True, extra={
+                    "worker_id": self.worker_id,
+                    "error": str(e)
+                })
+                ran = False
+            if not ran:
+                stop_event.wait(self.poll_interval)
+        logger.info("job_worker_stopped", extra={"worker_id": self.worker_id})
+
+    def run_once(self, stop_event=None) -> bool:
+        """
+        Claim one job and run it.
+
+        Returns:
+            True if a job was run, False if none was runnable
+        """
+        job = self.job_db.claim_job(
+            self.worker_id,
+            lease_seconds=self.lease_seconds,
+            max_per_workspace=self.max_per_workspace,
+            job_types=tuple(JOB_HANDLERS),
+            max_attempts=self.max_attempts,
+        )
+        if job is None:
+            return False
+
+        job_id = job["job_id"]
+        logger.info("job_claimed", extra={
+            "worker_id": self.worker_id,
+            "job_id": job_id,
+            "workspace_id": job["workspace_id"],
+            "priority": job.get("priority", 0),
+            "attempts": job.get("attempts", 1),
+            "reclaimed": job.get("reclaimed", False)
+        })
+
+        cancel_event = threading.Event()
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(job_id, cancel_event, done, stop_event),
+            name=f"lease-{job_id}",
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            JOB_HANDLERS[job["type"]](job, cancel_event)
+        except Exception as e:
+            logger.error("job_handler_failed", exc_info=True, extra={
+                "job_id": job_id,
+                "error": str(e)
+            })
+            self.job_db.update_job(job_id, status="failed", error=str(e), lease_owner=self.worker_id)
+        finally:
+            done.set()
+            heartbeat.join()
+            # Still ours and unfinished (worker stopping): let another worker resume it now
+            self.job_db.release_job(job_id, self.worker_id)
+        return True
+
+    def _heartbeat(self, job_id: str, cancel_event: threading.Event, done: threading.Event,
+                   stop_event=None) -> None:
+        """Renew the lease while the job runs; stop it on cancel, shutdown or a lost lease."""
+        interval = max(self.lease_seconds / 3, 0.1)
+        while not done.wait(interval):
+            if not self.job_db.renew_lease(job_id, self.worker_id, self.lease_seconds):
+                logger.warning("job_lease_lost", extra={"worker_id": self.worker_id, "job_id": job_id})
+                cancel_event.set()
+                return
+            if self.job_db.is_cancel_requested(job_id):
+                logger.info("job_cancel_requested", extra={"job_id": job_id})
+                cancel_event.set()
+            if stop_event is not None and stop_event.is_set():
+                cancel_event.set()
+
+
+def _worker_main(stop_event) -> None:
+    """Entry point of a worker process."""
+    # Stop after the job in flight reaches a batch boundary instead of dying mid-write
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    JobWorker().run(stop_event)
+
+
+def acquire_worker_lock(path: Path = WORKER_LOCK_PATH):
+    """
+    Take the host-wide right to spawn job workers.
+
+    Every API process runs the startup hook; without this each one would
+    start its own JOB_WORKER_PROCESSES. The lock is released when the file is
+    closed or the holding process exits.
+
+    Returns:
+        Open lock file to keep while the workers run, or None if another
+        process holds the lock
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_file = open(path, "a")
+    if not FCNTL_AVAILABLE:
+        logger.warning("job_worker_lock_unavailable", extra={"reason": "no fcntl on this platform"})
+        return lock_file
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def start_worker_processes(count: int = None) -> tuple:
+    """
+    Spawn job worker processes.
+
+    Args:
+        count: Number of processes (default: JOB_WORKER_PROCESSES)
+
+    Returns:
+        (processes, stop_event) for `stop_worker_processes`
+    """
+    count = get_worker_config()["processes"] if count is None else count
+    # spawn: workers must not inherit the parent's drivers, sockets or threads
+    ctx = multiprocessing.get_context("spawn")
+    stop_event = ctx.Event()
+    processes = []
+    for i in range(count):
+        process = ctx.Process(target=_worker_main, args=(stop_event,), name=f"job-worker-{i}", daemon=True)
+        process.start()
+        processes.append(process)
+    logger.info("job_workers_started", extra={"processes": count})
+    return processes, stop_event
+
+
+def stop_worker_processes(processes: list, stop_event, timeout: float = 30.0) -> None:
+    """Ask worker processes to stop, terminating any still running after `timeout`."""
+    stop_event.set()
+    for process in processes:
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+    logger.info("job_workers_stopped", extra={"processes": len(processes)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: JOB_WORKER_PROCESSES)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    count = args.processes if args.processes is not None else max(1, get_worker_config()["processes"])
+    processes, stop_event = start_worker_processes(count)
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    try:
+        while not stop_event.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    stop_worker_processes(processes, stop_event)
+
+
+if __name__ == "__main__":
+    main()
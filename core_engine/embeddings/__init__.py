@@ -3,4 +3,5 @@ Embedding and vector-store helpers for the core engine.
 """
 
 from .ingest_qdrant import ingest_qdrant  # noqa: F401
-
+from .embedding_store import EmbeddingStore, get_embedding_store  # noqa: F401
+from .collection_catalog import CollectionCatalog, notify_collections_changed  # noqa: F401
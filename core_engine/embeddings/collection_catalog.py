@@ -0,0 +1,230 @@
+"""
+Cached Qdrant collection metadata for the query path.
+
+Listing collections before every search costs a network round trip per query
+variation. `CollectionCatalog` resolves the collection list once and answers
+`exists()` from memory. The search API of the installed qdrant-client is also
+resolved once, by `resolve_search_api()`, instead of probing with `hasattr`
+on every call.
+
+The catalog is refreshed when:
+  - a collection is created or deleted in this process
+    (`notify_collections_changed()`, called by `ensure_collection` and the
+    workspace routes)
+  - a collection that was missing is asked for again after `missing_ttl`
+    seconds (ingestion workers create collections in other processes)
+  - a search reports the collection as gone (`invalidate()`)
+
+Chunk collections also get payload indexes on the fields searches filter
+by (`ensure_payload_indexes`), and searches fetch only
+`SEARCH_PAYLOAD_FIELDS` instead of the whole payload (which carries the
+bulky per-turn lists).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core_engine.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Search API paths in order of preference; all but "search" are one round trip for many vectors
+SEARCH_APIS = ("query_batch_points", "search_batch", "search")
+
+# Indexed payload fields of chunk collections (filtered server-side) -> index type
+PAYLOAD_INDEX_FIELDS = {
+    "workspace_id": "keyword",
+    "episode_id": "keyword",
+    "speaker": "keyword",
+    "start_seconds": "float",  # time-range filters
+}
+
+# Payload fields returned by searches; `turns`, `timestamps_in_chunk` and
+# `speakers_in_chunk` stay in the collection but are not sent back
+SEARCH_PAYLOAD_FIELDS = (
+    "text",
+    "workspace_id",
+    "episode_id",
+    "speaker",
+    "timestamp",
+    "source_path",
+    "chunk_index",
+    "start_char",
+    "end_char",
+)
+
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def notify_collections_changed() -> None:
+    """Mark every catalog in this process stale (a collection was created or deleted)."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+
+
+def ensure_payload_indexes(
+    client: Any,
+    collection: str,
+    fields: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """
+    Create the payload indexes a chunk collection is missing.
+
+    Args:
+        client: QdrantClient instance
+        collection: Collection name
+        fields: Payload field -> index type (default: PAYLOAD_INDEX_FIELDS)
+
+    Returns:
+        Fields whose index was created
+    """
+    from qdrant_client import models
+
+    existing = getattr(client.get_collection(collection), "payload_schema", None) or {}
+    created = []
+    for field, schema in (fields or PAYLOAD_INDEX_FIELDS).items():
+        if field in existing:
+            continue
+        client.create_payload_index(
+            collection_name=collection,
+            field_name=field,
+            field_schema=getattr(models.PayloadSchemaType, schema.upper()),
+        )
+        created.append(field)
+    if created:
+        logger.info("payload_indexes_created", extra={"context": {"collection": collection, "fields": created}})
+    return created
+
+
+def resolve_search_api(client: Any) -> str:
+    """
+    Pick the search API of a Qdrant client once.
+
+    Args:
+        client: QdrantClient instance
+
+    Returns:
+        Name of the method to use (see SEARCH_APIS)
+    """
+    for name in SEARCH_APIS:
+        if callable(getattr(client, name, None)):
+            return name
+    raise RuntimeError("Qdrant client has no supported search method (upgrade qdrant-client)")
+
+
+def is_collection_not_found(error: Exception) -> bool:
+    """True if Qdrant reported a missing collection."""
+    status = getattr(error, "status_code", None)
+    message = str(error).lower()
+    return status == 404 or ("collection" in message and ("not found" in message or "doesn't exist" in message))
+
+
+class CollectionCatalog:
+    """Set of existing collection names, refreshed only when it may be stale."""
+
+    def __init__(self, client: Any, missing_ttl: float = 30.0, values_ttl: float = 300.0):
+        """
+        Initialize collection catalog.
+
+        Args:
+            client: QdrantClient instance
+            missing_ttl: Seconds before a missing collection is looked up again
+            values_ttl: Seconds distinct payload values (`payload_values`) are cached
+        """
+        self.client = client
+        self.missing_ttl = missing_ttl
+        self.values_ttl = values_ttl
+        self._values: Dict[Tuple[str, str, Optional[str]], Tuple[float, int, List[str]]] = {}
+        self._lock = threading.Lock()
+        self._names: Optional[Set[str]] = None
+        self._generation = -1
+        self._refreshed_at = 0.0
+
+    def _refresh(self) -> None:
+        generation = _generation
+        names = {c.name for c in self.client.get_collections().collections}
+        self._names = names
+        self._generation = generation
+        self._refreshed_at = time.monotonic()
+        logger.debug("collection_catalog_refreshed", extra={"context": {"collections": len(names)}})
+
+    def exists(self, collection: str) -> bool:
+        """
+        Whether `collection` exists, from the cached list when it is current.
+
+        Args:
+            collection: Collection name
+
+        Returns:
+            True if the collection exists
+        """
+        with self._lock:
+            stale = self._names is None or self._generation != _generation
+            if not stale and collection not in self._names:
+                stale = time.monotonic() - self._refreshed_at >= self.missing_ttl
+            if stale:
+                self._refresh()
+            return collection in self._names
+
+    def names(self) -> Set[str]:
+        """All known collection names (refreshing a stale catalog first)."""
+        with self._lock:
+            if self._names is None or self._generation != _generation:
+                self._refresh()
+            return set(self._names)
+
+    def payload_values(
+        self,
+        collection: str,
+        key: str,
+        workspace_id: Optional[str] = None,
+        limit: int = 10000,
+    ) -> Optional[List[str]]:
+        """
+        Distinct values of an indexed keyword payload field (e.g. every episode_id).
+
+        Args:
+            collection: Collection name
+            key: Payload field (must have a keyword index)
+            workspace_id: Only count points of this workspace
+            limit: Maximum number of values
+
+        Returns:
+            Values, or None if the client has no facet API (qdrant-client < 1.12)
+        """
+        if not callable(getattr(self.client, "facet", None)):
+            return None
+        now = time.monotonic()
+        cache_key = (collection, key, workspace_id)
+        cached = self._values.get(cache_key)
+        if cached and cached[1] == _generation and now - cached[0] < self.values_ttl:
+            return cached[2]
+        facet_filter = None
+        if workspace_id is not None:
+            from qdrant_client import models
+            facet_filter = models.Filter(must=[
+                models.FieldCondition(key="workspace_id", match=models.MatchValue(value=workspace_id))
+            ])
+        # Exact counts: approximate facets may leave out rare values (small episodes)
+        response = self.client.facet(
+            collection_name=collection, key=key, facet_filter=facet_filter, limit=limit, exact=True
+        )
+        values = [str(hit.value) for hit in response.hits]
+        if len(values) >= limit:
+            logger.warning(
+                "payload_values_truncated",
+                extra={"context": {"collection": collection, "key": key, "limit": limit}},
+            )
+        self._values[cache_key] = (now, _generation, values)
+        return values
+
+    def invalidate(self) -> None:
+        """Force the next lookup to list collections again."""
+        with self._lock:
+            self._names = None
+            self._values.clear()
@@ -0,0 +1,302 @@
+"""
+Persistent on-disk embedding store for ingestion.
+
+Vectors are kept in one memory-mapped float32 matrix per (model, dimensions)
+and looked up by the SHA-256 of the exact text sent to the embeddings API.
+The id index (content hash -> row) lives in a small SQLite file that also
+serialises row allocation, so several processes and workspaces can share one
+store. Re-ingests, workspace clones and collection rebuilds read vectors from
+disk instead of calling the API.
+
+Layout:
+  <root>/<model>-<dimensions>/vectors.f32   row-major float32 matrix
+  <root>/<model>-<dimensions>/index.db      content_hash -> row
+
+Environment:
+  EMBEDDING_STORE_ENABLED=true
+  EMBEDDING_STORE_PATH=data/cache/embeddings
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core_engine.logging import get_logger
+
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_STORE_ROOT = ROOT / "data" / "cache" / "embeddings"
+
+_MIN_CAPACITY = 1024
+
+
+def content_hash(text: str) -> bytes:
+    """SHA-256 digest of the text that is embedded."""
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingStore:
+    """Content-addressed float32 vector store backed by a memory-mapped file."""
+
+    def __init__(self, model: str, dimensions: int, root: Path = DEFAULT_STORE_ROOT):
+        """
+        Initialize embedding store.
+
+        Args:
+            model: Embedding model name
+            dimensions: Vector dimensions
+            root: Directory holding one sub-directory per (model, dimensions)
+        """
+        self.model = model
+        self.dimensions = dimensions
+        safe_model = re.sub(r"[^\w.-]", "_", model)
+        self.path = Path(root) / f"{safe_model}-{dimensions}"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.path / "vectors.f32"
+        self.row_bytes = dimensions * 4
+        self.logger = get_logger("core_engine.embeddings.store")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path / "index.db", check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS vectors (
+                hash BLOB PRIMARY KEY,
+                row INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('next_row', 0)")
+        self._conn.commit()
+
+        if not self.vectors_path.exists():
+            self.vectors_path.touch()
+        self._matrix: Optional[np.memmap] = None
+        self._capacity = 0
+        self._remap()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _file_rows(self) -> int:
+        return os.path.getsize(self.vectors_path) // self.row_bytes
+
+    def _remap(self) -> None:
+        """(Re)map the vectors file at its current size."""
+        rows = self._file_rows()
+        if rows == 0:
+            self._matrix = None
+        else:
+            self._matrix = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dimensions)
+            )
+        self._capacity = rows
+
+    def _ensure_capacity(self, rows_needed: int) -> None:
+        """Grow the vectors file geometrically (caller holds the SQLite write lock)."""
+        if rows_needed <= self._capacity:
+            return
+        file_rows = self._file_rows()
+        if rows_needed > file_rows:
+            new_rows = max(rows_needed, file_rows * 2, _MIN_CAPACITY)
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(new_rows * self.row_bytes)
+        self._remap()
+
+    def get_many(self, hashes: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up vectors by content hash.
+
+        Returns:
+            Mapping of found hashes to float32 vectors (copies, safe to keep)
+        """
+        if not hashes:
+            return {}
+        found: Dict[bytes, int] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for i in range(0, len(unique), 500):
+                part = unique[i : i + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT hash, row FROM vectors WHERE hash IN ({placeholders})", part
+                ).fetchall()
+                found.update({h: r for h, r in rows})
+            if found and max(found.values()) >= self._capacity:
+                # Another process grew the file since we mapped it
+                self._remap()
+            result = {h: np.array(self._matrix[r]) for h, r in found.items()}
+        self.hits += len(result)
+        self.misses += len(unique) - len(result)
+        return result
+
+    def put_many(self, items: Sequence[Tuple[bytes, Sequence[float]]]) -> None:
+        """Store vectors for hashes that are not in the store yet."""
+        if not items:
+            return
+        with self._lock:
+            cur = self._conn.cursor()
+            # IMMEDIATE takes the write lock, serialising row allocation across processes
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                hashes = list(dict.fromkeys(h for h, _ in items))
+                existing = set()
+                for i in range(0, len(hashes), 500):
+                    part = hashes[i : i + 500]
+                    placeholders = ",".join("?" * len(part))
+                    existing.update(
+                        h for (h,) in cur.execute(
+                            f"SELECT hash FROM vectors WHERE hash IN ({placeholders})", part
+                        )
+                    )
+                new_items = []
+                seen = set(existing)
+                for h, vec in items:
+                    if h not in seen:
+                        seen.add(h)
+                        new_items.append((h, vec))
+                if not new_items:
+                    cur.execute("COMMIT")
+                    return
+
+                next_row = cur.execute("SELECT value FROM meta WHERE key = 'next_row'").fetchone()[0]
+                self._ensure_capacity(next_row + len(new_items))
+                block = np.asarray([vec for _, vec in new_items], dtype=np.float32)
+                if block.shape[1] != self.dimensions:
+                    raise ValueError(
+                        f"Expected {self.dimensions}-dim vectors, got {block.shape[1]}"
+                    )
+                self._matrix[next_row : next_row + len(new_items)] = block
+                self._matrix.flush()
+
+                cur.executemany(
+                    "INSERT INTO vectors (hash, row) VALUES (?, ?)",
+                    [(h, next_row + i) for i, (h, _) in enumerate(new_items)],
+                )
+                cur.execute(
+                    "UPDATE meta SET value = ? WHERE key = 'next_row'", (next_row + len(new_items),)
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def get_stats(self) -> Dict[str, object]:
+        """Hit/miss counters and store size."""
+        with self._lock:
+            entries = self._conn.execute("SELECT value FROM meta WHERE key = 'next_row'").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "entries": entries,
+            "capacity": self._capacity,
+            "file_bytes": os.path.getsize(self.vectors_path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def _resolve_from_store(
+    texts: List[str], store: EmbeddingStore
+) -> Tuple[List[bytes], List[Optional[List[float]]], Dict[bytes, str]]:
+    """Split texts into store hits and unique misses (hash -> text)."""
+    hashes = [content_hash(t) for t in texts]
+    cached = store.get_many(hashes)
+    vectors = [cached[h].tolist() if h in cached else None for h in hashes]
+    missing: Dict[bytes, str] = {}
+    for h, t in zip(hashes, texts):
+        if h not in cached:
+            missing.setdefault(h, t)
+    return hashes, vectors, missing
+
+
+def _fill_misses(
+    hashes: List[bytes],
+    vectors: List[Optional[List[float]]],
+    missing: Dict[bytes, str],
+    fresh: List[List[float]],
+    store: EmbeddingStore,
+) -> List[List[float]]:
+    by_hash = dict(zip(missing.keys(), fresh))
+    store.put_many(list(by_hash.items()))
+    return [vec if vec is not None else by_hash[h] for h, vec in zip(hashes, vectors)]
+
+
+def embed_with_store(
+    texts: List[str],
+    store: Optional[EmbeddingStore],
+    embed_missing,
+) -> List[List[float]]:
+    """
+    Resolve embeddings from the store, calling `embed_missing` only for misses.
+
+    Args:
+        texts: Exact texts to embed
+        store: Embedding store (None disables lookup)
+        embed_missing: Callable taking a list of texts and returning their vectors
+
+    Returns:
+        Vectors in input order
+    """
+    if store is None:
+        return embed_missing(texts)
+    hashes, vectors, missing = _resolve_from_store(texts, store)
+    if not missing:
+        return vectors
+    fresh = embed_missing(list(missing.values()))
+    return _fill_misses(hashes, vectors, missing, fresh, store)
+
+
+async def embed_with_store_async(
+    texts: List[str],
+    store: Optional[EmbeddingStore],
+    embed_missing,
+) -> List[List[float]]:
+    """
+    Async variant of `embed_with_store`; `embed_missing` is awaited.
+
+    Store reads and writes run in a worker thread: they take the lock the sync
+    embed stage shares and wait on SQLite/memmap I/O, which would otherwise
+    stall every in-flight embedding call on the event loop.
+    """
+    if store is None:
+        return await embed_missing(texts)
+    hashes, vectors, missing = await asyncio.to_thread(_resolve_from_store, texts, store)
+    if not missing:
+        return vectors
+    fresh = await embed_missing(list(missing.values()))
+    return await asyncio.to_thread(_fill_misses, hashes, vectors, missing, fresh, store)
+
+
+_stores: Dict[Tuple[str, int], EmbeddingStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model: str, dimensions: int) -> Optional[EmbeddingStore]:
+    """
+    Get the process-wide store for (model, dimensions), or None when disabled via env.
+    """
+    if os.getenv("EMBEDDING_STORE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    key = (model, dimensions)
+    with _stores_lock:
+        if key not in _stores:
+            root = Path(os.getenv("EMBEDDING_STORE_PATH", str(DEFAULT_STORE_ROOT)))
+            _stores[key] = EmbeddingStore(model, dimensions, root=root)
+        return _stores[key]
@@ -21,7 +21,7 @@ import os
 import hashlib
 from pathlib import Path
 import sys
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from dotenv import load_dotenv
 from openai import OpenAI
@@ -34,6 +34,13 @@ if str(ROOT) not in sys.path:
 
 from core_engine.ingestion.loader import load_transcripts
 from core_engine.chunking import chunk_documents
+from core_engine.embeddings.embedding_store import (
+    EmbeddingStore,
+    embed_with_store,
+    get_embedding_store,
+)
+from core_engine.embeddings.collection_catalog import ensure_payload_indexes, notify_collections_changed
+from core_engine.utils.llm_scheduler import BACKGROUND, schedule_openai_client
 
 
 def load_env() -> None:
@@ -64,6 +71,32 @@ def ensure_collection(
             collection_name=collection,
             vectors_config=models.VectorParams(size=vector_size, distance=distance),
         )
+        notify_collections_changed()
+    # Searches filter by workspace/episode/speaker; older collections get the indexes here
+    ensure_payload_indexes(client, collection)
+
+
+def delete_episode_points(
+    client: QdrantClient,
+    collection: str,
+    episode_ids: List[str],
+    workspace_id: Optional[str] = None,
+) -> None:
+    """Delete every point belonging to the given episodes."""
+    if not episode_ids or not client.collection_exists(collection):
+        return
+    conditions = [
+        models.FieldCondition(key="episode_id", match=models.MatchAny(any=list(episode_ids))),
+    ]
+    if workspace_id:
+        conditions.append(
+            models.FieldCondition(key="workspace_id", match=models.MatchValue(value=workspace_id))
+        )
+    client.delete(
+        collection_name=collection,
+        points_selector=models.FilterSelector(filter=models.Filter(must=conditions)),
+        wait=True,
+    )
 
 
 MAX_CHARS_PER_EMBED = 4000  # ~1k tokens - optimal for embedding throughput
@@ -77,8 +110,18 @@ def trim_text(text: str, max_chars: int = MAX_CHARS_PER_EMBED) -> str:
     return text[:max_chars]
 
 
-def embed_batch(client: OpenAI, model: str, texts: List[str], rate_limiter=None) -> List[List[float]]:
-    """Embed batch with rate limiting and retry."""
+def embed_batch(
+    client: OpenAI,
+    model: str,
+    texts: List[str],
+    rate_limiter=None,
+    store: Optional[EmbeddingStore] = None,
+    on_usage=None,
+) -> List[List[float]]:
+    """
+    Embed batch with rate limiting and retry. Vectors found in `store` skip the API.
+    `on_usage(model, tokens)` is called after every embeddings request.
+    """
     from core_engine.utils.rate_limiter import get_rate_limiter
     
     safe_inputs = [trim_text(t) for t in texts]
@@ -90,20 +133,42 @@ def embed_batch(client: OpenAI, model: str, texts: List[str], rate_limiter=None)
             tokens_per_minute=5_000_000,  # Higher for embeddings
         )
     
-    def make_embedding_call():
-        return client.embeddings.create(model=model, input=safe_inputs)
-    
-    # Use rate limiter with retry logic
-    resp = rate_limiter.retry_with_backoff(
-        make_embedding_call,
-        operation_name=f"Embeddings (batch of {len(texts)} texts)",
-    )
-    
-    # Record token usage
-    if resp.usage:
-        rate_limiter._record_request(tokens=resp.usage.total_tokens or 0)
+    def embed_missing(inputs: List[str]) -> List[List[float]]:
+        def make_embedding_call():
+            return client.embeddings.create(model=model, input=inputs)
+        
+        # Use rate limiter with retry logic
+        resp = rate_limiter.retry_with_backoff(
+            make_embedding_call,
+            operation_name=f"Embeddings (batch of {len(inputs)} texts)",
+        )
+        
+        # Record token usage
+        if resp.usage:
+            rate_limiter._record_request(tokens=resp.usage.total_tokens or 0)
+            if on_usage:
+                on_usage(model, resp.usage.total_tokens or 0)
+        
+        return [d.embedding for d in resp.data]
     
-    return [d.embedding for d in resp.data]
+    return embed_with_store(safe_inputs, store, embed_missing)
+
+
+def timestamp_to_seconds(timestamp: Optional[str]) -> Optional[float]:
+    """Seconds from a transcript timestamp ("HH:MM:SS[.fff]" or "MM:SS[.fff]"), or None."""
+    if not timestamp:
+        return None
+    parts = str(timestamp).strip().strip("[]()").split(":")
+    if len(parts) not in (2, 3):
+        return None
+    try:
+        *whole, seconds = parts
+        total = float(seconds)
+        for multiplier, value in zip((60, 3600), reversed(whole)):
+            total += int(value) * multiplier
+    except ValueError:
+        return None
+    return total if total >= 0 else None
 
 
 def to_points(chunks, vectors: List[List[float]]) -> List[models.PointStruct]:
@@ -130,6 +195,7 @@ def to_points(chunks, vectors: List[List[float]]) -> List[models.PointStruct]:
             "speaker": meta.get("speaker"),
             "speakers_in_chunk": meta.get("speakers_in_chunk"),
             "timestamp": meta.get("timestamp"),
+            "start_seconds": timestamp_to_seconds(meta.get("timestamp")),  # for time-range filters
             "timestamps_in_chunk": meta.get("timestamps_in_chunk"),
             "turns": meta.get("turns"),
             "start_char": start_char,
@@ -145,6 +211,57 @@ def to_points(chunks, vectors: List[List[float]]) -> List[models.PointStruct]:
     return points
 
 
+def get_clients(embed_dim: int, collection: str) -> Tuple[OpenAI, QdrantClient]:
+    """Build OpenAI and Qdrant clients from env and make sure the collection exists."""
+    load_env()
+    openai_api_key = get_env("OPENAI_API_KEY")
+    qdrant_url = get_env("QDRANT_URL", "http://localhost:6333")
+    qdrant_api_key = get_env("QDRANT_API_KEY")
+    qdrant_timeout = int(get_env("QDRANT_TIMEOUT", 60))
+
+    if not openai_api_key:
+        raise RuntimeError("OPENAI_API_KEY is required")
+
+    client = schedule_openai_client(OpenAI(api_key=openai_api_key), BACKGROUND)
+    qdrant = get_qdrant_client(qdrant_url, qdrant_api_key, timeout=qdrant_timeout)
+    ensure_collection(qdrant, collection, vector_size=embed_dim)
+    return client, qdrant
+
+
+def filter_embeddable_chunks(chunks) -> list:
+    """Drop tiny and oversized chunks before embedding."""
+    filtered_chunks = [
+        c for c in chunks
+        if MIN_CHARS_PER_CHUNK <= len(c.page_content) <= MAX_CHARS_PER_EMBED
+    ]
+
+    filtered_count = len(chunks) - len(filtered_chunks)
+    if filtered_count > 0:
+        print(f"Filtered out {filtered_count} chunks (outside {MIN_CHARS_PER_CHUNK}-{MAX_CHARS_PER_EMBED} char range)")
+    return filtered_chunks
+
+
+def upsert_chunk_batch(
+    client: OpenAI,
+    qdrant: QdrantClient,
+    collection: str,
+    embed_model: str,
+    batch,
+    rate_limiter=None,
+    store: Optional[EmbeddingStore] = None,
+    on_usage=None,
+) -> int:
+    """Embed one batch of chunks and upsert it. Returns the number of points written."""
+    vectors = embed_batch(
+        client, embed_model, [c.page_content for c in batch],
+        rate_limiter=rate_limiter, store=store, on_usage=on_usage,
+    )
+    points = to_points(batch, vectors)
+    # Use wait=False for non-blocking async writes
+    qdrant.upsert(collection_name=collection, points=points, wait=False)
+    return len(points)
+
+
 def ingest_qdrant(
     transcripts_path: Path,
     collection: str,
@@ -157,18 +274,7 @@ def ingest_qdrant(
 ) -> None:
     import time
     
-    load_env()
-    openai_api_key = get_env("OPENAI_API_KEY")
-    qdrant_url = get_env("QDRANT_URL", "http://localhost:6333")
-    qdrant_api_key = get_env("QDRANT_API_KEY")
-    qdrant_timeout = int(get_env("QDRANT_TIMEOUT", 60))
-
-    if not openai_api_key:
-        raise RuntimeError("OPENAI_API_KEY is required")
-
-    client = OpenAI(api_key=openai_api_key)
-    qdrant = get_qdrant_client(qdrant_url, qdrant_api_key, timeout=qdrant_timeout)
-    ensure_collection(qdrant, collection, vector_size=embed_dim)
+    client, qdrant = get_clients(embed_dim, collection)
 
     docs = load_transcripts(transcripts_path, workspace_id=workspace_id)
     chunks = chunk_documents(
@@ -178,14 +284,7 @@ def ingest_qdrant(
     )
 
     # Filter chunks: remove tiny and oversized chunks before embedding
-    filtered_chunks = [
-        c for c in chunks
-        if MIN_CHARS_PER_CHUNK <= len(c.page_content) <= MAX_CHARS_PER_EMBED
-    ]
-    
-    filtered_count = len(chunks) - len(filtered_chunks)
-    if filtered_count > 0:
-        print(f"Filtered out {filtered_count} chunks (outside {MIN_CHARS_PER_CHUNK}-{MAX_CHARS_PER_EMBED} char range)")
+    filtered_chunks = filter_embeddable_chunks(chunks)
 
     # Embed and upsert in batches
     total = len(filtered_chunks)
@@ -198,14 +297,15 @@ def ingest_qdrant(
         requests_per_minute=500,
         tokens_per_minute=5_000_000,  # Higher for embeddings
     )
+    # Local vector store: unchanged texts are read from disk, not re-embedded
+    store = get_embedding_store(embed_model, embed_dim)
     
     for i in range(0, total, batch_size):
         batch_start = time.time()
         batch = filtered_chunks[i : i + batch_size]
-        vectors = embed_batch(client, embed_model, [c.page_content for c in batch], rate_limiter=embed_rate_limiter)
-        points = to_points(batch, vectors)
-        # Use wait=False for non-blocking async writes
-        qdrant.upsert(collection_name=collection, points=points, wait=False)
+        upsert_chunk_batch(
+            client, qdrant, collection, embed_model, batch, rate_limiter=embed_rate_limiter, store=store
+        )
         batch_time = time.time() - batch_start
         processed = min(i+batch_size, total)
         elapsed = time.time() - start_time
@@ -22,7 +22,16 @@ if str(ROOT) not in sys.path:
 
 from core_engine.ingestion.loader import load_transcripts
 from core_engine.chunking import chunk_documents
-from core_engine.utils.rate_limiter import get_rate_limiter
+from core_engine.utils.adaptive_concurrency import AdaptiveConcurrency, get_concurrency_controller
+from core_engine.embeddings.ingest_qdrant import timestamp_to_seconds
+from core_engine.embeddings.collection_catalog import ensure_payload_indexes, notify_collections_changed
+from core_engine.utils.llm_scheduler import BACKGROUND, schedule_openai_client
+from core_engine.utils.rate_limiter_async import estimate_tokens, get_async_rate_limiter
+from core_engine.embeddings.embedding_store import (
+    EmbeddingStore,
+    embed_with_store_async,
+    get_embedding_store,
+)
 
 
 def load_env() -> None:
@@ -52,6 +61,9 @@ def ensure_collection(
             collection_name=collection,
             vectors_config=models.VectorParams(size=vector_size, distance=distance),
         )
+        notify_collections_changed()
+    # Searches filter by workspace/episode/speaker; older collections get the indexes here
+    ensure_payload_indexes(client, collection)
 
 
 MAX_CHARS_PER_EMBED = 4000
@@ -71,18 +83,23 @@ async def embed_batch_async(
     texts: List[str],
     rate_limiter=None,
     semaphore: Optional[asyncio.Semaphore] = None,
+    store: Optional[EmbeddingStore] = None,
+    concurrency: Optional[AdaptiveConcurrency] = None,
 ) -> List[List[float]]:
-    """Embed batch with async processing and rate limiting."""
-    from core_engine.utils.rate_limiter import get_rate_limiter
-    
+    """
+    Embed batch with async processing and rate limiting. Vectors found in `store` skip the API.
+    In-flight calls are bounded by `concurrency` (adaptive window) or a fixed `semaphore`.
+    """
     safe_inputs = [trim_text(t) for t in texts]
     
-    # Use semaphore if provided
-    if semaphore:
-        async with semaphore:
-            return await _do_embed_batch(client, model, safe_inputs, rate_limiter)
-    else:
-        return await _do_embed_batch(client, model, safe_inputs, rate_limiter)
+    async def embed_missing(inputs: List[str]) -> List[List[float]]:
+        # Use semaphore if provided
+        if semaphore:
+            async with semaphore:
+                return await _do_embed_batch(client, model, inputs, rate_limiter, concurrency)
+        return await _do_embed_batch(client, model, inputs, rate_limiter, concurrency)
+    
+    return await embed_with_store_async(safe_inputs, store, embed_missing)
 
 
 async def _do_embed_batch(
@@ -90,48 +107,32 @@ async def _do_embed_batch(
     model: str,
     inputs: List[str],
     rate_limiter,
+    concurrency: Optional[AdaptiveConcurrency] = None,
 ) -> List[List[float]]:
-    """Internal async embedding call with retry."""
+    """Internal async embedding call with rate limiting and retry."""
     if rate_limiter is None:
-        rate_limiter = get_rate_limiter(
+        rate_limiter = get_async_rate_limiter(
             requests_per_minute=500,
             tokens_per_minute=5_000_000,
         )
     
-    max_retries = 5
-    last_exception = None
-    
-    for attempt in range(max_retries + 1):
-        try:
-            # Wait for rate limits (run blocking call in executor)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, rate_limiter._wait_for_rate_limit)
-            
-            # Make async API call
-            resp = await client.embeddings.create(model=model, input=inputs)
-            
-            # Record token usage (thread-safe)
-            if resp.usage:
-                rate_limiter._record_request(tokens=resp.usage.total_tokens or 0)
-            
-            return [d.embedding for d in resp.data]
-            
-        except Exception as e:
-            last_exception = e
-            
-            is_rate_limit = (
-                hasattr(e, 'status_code') and e.status_code == 429
-            ) or "rate limit" in str(e).lower()
-            
-            if attempt < max_retries:
-                delay = max(60.0, 2.0 ** attempt) if is_rate_limit else min(2.0 ** attempt, 120.0)
-                await asyncio.sleep(delay)
-            else:
-                raise
+    # Input tokens are charged up front and corrected from resp.usage
+    async def create():
+        if concurrency is None:
+            return await client.embeddings.create(model=model, input=inputs)
+        # A 429 raised inside the slot shrinks the window before the retry;
+        # the rate-limit headers of a success shrink it before the quota runs out
+        async with concurrency.slot() as slot:
+            raw = await client.embeddings.with_raw_response.create(model=model, input=inputs)
+            slot.observe_headers(raw.headers)
+        return raw.parse()
     
-    if last_exception:
-        raise last_exception
-    raise RuntimeError("Failed to create embeddings")
+    resp = await rate_limiter.retry_with_backoff(
+        create,
+        estimated_tokens=estimate_tokens(inputs),
+        operation_name=f"Embeddings (batch of {len(inputs)} texts)",
+    )
+    return [d.embedding for d in resp.data]
 
 
 def to_points(chunks, vectors: List[List[float]]) -> List[models.PointStruct]:
@@ -156,6 +157,7 @@ def to_points(chunks, vectors: List[List[float]]) -> List[models.PointStruct]:
             "speaker": meta.get("speaker"),
             "speakers_in_chunk": meta.get("speakers_in_chunk"),
             "timestamp": meta.get("timestamp"),
+            "start_seconds": timestamp_to_seconds(meta.get("timestamp")),  # for time-range filters
             "timestamps_in_chunk": meta.get("timestamps_in_chunk"),
             "turns": meta.get("turns"),
             "start_char": start_char,
@@ -194,7 +196,7 @@ async def ingest_qdrant_async(
     if not openai_api_key:
         raise RuntimeError("OPENAI_API_KEY is required")
 
-    client = AsyncOpenAI(api_key=openai_api_key)
+    client = schedule_openai_client(AsyncOpenAI(api_key=openai_api_key), BACKGROUND)
     qdrant = get_qdrant_client(qdrant_url, qdrant_api_key, timeout=qdrant_timeout)
     ensure_collection(qdrant, collection, vector_size=embed_dim)
 
@@ -215,12 +217,14 @@ async def ingest_qdrant_async(
     if filtered_count > 0:
         print(f"Filtered out {filtered_count} chunks (outside {MIN_CHARS_PER_CHUNK}-{MAX_CHARS_PER_EMBED} char range)")
 
-    # Create rate limiter and semaphore
-    rate_limiter = get_rate_limiter(
+    # Create rate limiter and adaptive concurrency window (max_concurrent is its ceiling)
+    rate_limiter = get_async_rate_limiter(
         requests_per_minute=500,
         tokens_per_minute=5_000_000,
     )
-    semaphore = asyncio.Semaphore(max_concurrent)
+    concurrency = get_concurrency_controller("embeddings", max_window=max_concurrent)
+    # Local vector store: unchanged texts are read from disk, not re-embedded
+    store = get_embedding_store(embed_model, embed_dim)
 
     # Process in batches concurrently
     total = len(filtered_chunks)
@@ -246,7 +250,8 @@ async def ingest_qdrant_async(
                 embed_model,
                 [c.page_content for c in batch],
                 rate_limiter=rate_limiter,
-                semaphore=semaphore,
+                concurrency=concurrency,
+                store=store,
             )
             points = to_points(batch, vectors)
             qdrant.upsert(collection_name=collection, points=points, wait=False)
@@ -259,7 +264,7 @@ async def ingest_qdrant_async(
             progress_pct = (completed_batches * 100) // total_batches
             
             print(f"✅ Embedded {completed_batches * batch_size}/{total} chunks ({progress_pct}%) | "
-                  f"Rate: {rate:.1f} chunks/s | ETA: {eta/60:.1f} min", flush=True)
+                  f"Rate: {rate:.1f} chunks/s | Window: {concurrency.limit} | ETA: {eta/60:.1f} min", flush=True)
             
             return len(batch)
         except Exception as e:
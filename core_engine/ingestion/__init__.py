@@ -6,6 +6,12 @@ from .loader import (
     load_with_langchain,
     load_transcripts,
 )
+from .manifest import (
+    IngestionManifest,
+    ManifestDiff,
+    file_content_hash,
+    params_fingerprint,
+)
 
 __all__ = [
     "discover_transcripts",
@@ -14,5 +20,9 @@ __all__ = [
     "build_metadata",
     "load_with_langchain",
     "load_transcripts",
+    "IngestionManifest",
+    "ManifestDiff",
+    "file_content_hash",
+    "params_fingerprint",
 ]
 
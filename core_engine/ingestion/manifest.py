@@ -0,0 +1,207 @@
+"""
+Per-workspace ingestion manifest for incremental re-ingestion.
+
+Records, for every ingested transcript, its content hash and a fingerprint of
+the chunking/extraction parameters used. A later job diffs the transcripts
+directory against the manifest and only processes new or changed episodes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core_engine.ingestion.loader import build_metadata, discover_transcripts, filename_to_episode_id
+from core_engine.logging import get_logger
+
+
+MANIFEST_FILENAME = "ingestion_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_content_hash(path: Path) -> str:
+    """SHA-256 of the raw file bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def params_fingerprint(params: Dict[str, Any]) -> str:
+    """Stable short hash of the parameters that shape chunks and extractions."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class ManifestDiff:
+    """Result of comparing a transcripts directory with the manifest."""
+    new: List[Path] = field(default_factory=list)
+    changed: List[Path] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)  # episode_ids no longer on disk
+    hashes: Dict[str, str] = field(default_factory=dict)  # source_path -> content hash
+
+    @property
+    def to_process(self) -> List[Path]:
+        return self.new + self.changed
+
+    @property
+    def stale_episode_ids(self) -> List[str]:
+        """Episodes whose previously written data must be removed."""
+        return [filename_to_episode_id(p) for p in self.changed] + list(self.removed)
+
+    @property
+    def touched_episode_ids(self) -> List[str]:
+        """Every episode added, edited or removed since the last ingest."""
+        return [filename_to_episode_id(p) for p in self.new] + self.stale_episode_ids
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "new": len(self.new),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "removed": len(self.removed),
+        }
+
+
+class IngestionManifest:
+    """JSON manifest of ingested transcripts, stored in the workspace directory."""
+
+    def __init__(self, path: Path, workspace_id: Optional[str] = None):
+        """
+        Initialize manifest.
+
+        Args:
+            path: Manifest file path
+            workspace_id: Workspace identifier for logging
+        """
+        self.path = Path(path)
+        self.workspace_id = workspace_id or "default"
+        self.logger = get_logger("core_engine.ingestion.manifest", workspace_id=self.workspace_id)
+        self.entries: Dict[str, Dict[str, Any]] = {}  # episode_id -> entry
+        self._load()
+
+    @classmethod
+    def for_transcripts_dir(cls, transcripts_dir: Path, workspace_id: Optional[str] = None) -> "IngestionManifest":
+        """Manifest stored next to a workspace's transcripts directory."""
+        return cls(Path(transcripts_dir).parent / MANIFEST_FILENAME, workspace_id=workspace_id)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("episodes", {})
+        except Exception as e:
+            # A corrupt manifest just means a full re-ingest
+            self.logger.warning(
+                "manifest_load_failed",
+                extra={"context": {"path": str(self.path), "error": str(e)}},
+            )
+            self.entries = {}
+
+    def save(self) -> None:
+        """Write manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({"version": MANIFEST_VERSION, "episodes": self.entries}, indent=2),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        """Forget every entry (forces a full re-ingest on the next job)."""
+        self.entries = {}
+        if self.path.exists():
+            self.path.unlink()
+
+    def diff(
+        self,
+        transcripts_dir: Path,
+        fingerprint: str,
+        glob: str = "**/*.txt",
+        min_bytes: int = 10,
+    ) -> ManifestDiff:
+        """
+        Compare the transcripts on disk with the manifest.
+
+        A file whose size and mtime match its entry is trusted without rehashing.
+        Otherwise its content hash decides whether it changed. Any entry recorded
+        with a different parameter fingerprint counts as changed.
+
+        Args:
+            transcripts_dir: Workspace transcripts directory
+            fingerprint: Current parameter fingerprint
+            glob: Discovery glob
+            min_bytes: Minimum file size
+
+        Returns:
+            ManifestDiff
+        """
+        result = ManifestDiff()
+        paths = discover_transcripts(
+            transcripts_dir, glob=glob, min_bytes=min_bytes, workspace_id=self.workspace_id
+        )
+        seen = set()
+
+        for path in paths:
+            meta = build_metadata(path, self.workspace_id)
+            episode_id = meta["episode_id"]
+            seen.add(episode_id)
+            entry = self.entries.get(episode_id)
+
+            if entry is None:
+                result.hashes[str(path)] = file_content_hash(path)
+                result.new.append(path)
+                continue
+
+            if (
+                entry.get("fingerprint") == fingerprint
+                and entry.get("file_size") == meta["file_size"]
+                and entry.get("modified_time") == meta["modified_time"]
+            ):
+                result.unchanged.append(path)
+                continue
+
+            content_hash = file_content_hash(path)
+            result.hashes[str(path)] = content_hash
+            if entry.get("fingerprint") == fingerprint and entry.get("content_hash") == content_hash:
+                # Touched but identical - refresh stat fields only
+                entry["file_size"] = meta["file_size"]
+                entry["modified_time"] = meta["modified_time"]
+                result.unchanged.append(path)
+            else:
+                result.changed.append(path)
+
+        result.removed = [ep for ep in self.entries if ep not in seen]
+
+        self.logger.info(
+            "manifest_diff_complete",
+            extra={"context": result.summary()},
+        )
+        return result
+
+    def record(self, path: Path, fingerprint: str, content_hash: Optional[str] = None) -> None:
+        """Record a transcript as ingested with the given fingerprint."""
+        meta = build_metadata(path, self.workspace_id)
+        self.entries[meta["episode_id"]] = {
+            "source_path": meta["source_path"],
+            "content_hash": content_hash or file_content_hash(path),
+            "file_size": meta["file_size"],
+            "modified_time": meta["modified_time"],
+            "fingerprint": fingerprint,
+            "ingested_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def forget(self, episode_id: str) -> None:
+        """Remove an episode from the manifest."""
+        self.entries.pop(episode_id, None)
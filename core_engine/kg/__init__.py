@@ -6,13 +6,18 @@ and storage in Neo4j with full provenance tracking.
 """
 
 from core_engine.kg.neo4j_client import Neo4jClient, get_neo4j_client
+from core_engine.kg.neo4j_client_async import AsyncNeo4jClient, get_async_neo4j_client
+from core_engine.kg.driver_registry import DriverRegistry, get_driver_registry
 from core_engine.kg.schema import (
     SchemaManager,
+    EntityMigrationRequired,
+    check_entity_schema,
     initialize_schema,
     NodeLabels,
     RelationshipTypes,
 )
 from core_engine.kg.extractor import KGExtractor, extract_from_chunks
+from core_engine.kg.extraction_cache import ExtractionCache, get_extraction_cache
 from core_engine.kg.normalizer import EntityNormalizer, normalize_extraction
 from core_engine.kg.writer import KGWriter, write_extraction
 from core_engine.kg.pipeline import KGExtractionPipeline, extract_kg_from_chunks
@@ -26,12 +31,20 @@ from core_engine.kg.cross_episode import (
 __all__ = [
     "Neo4jClient",
     "get_neo4j_client",
+    "AsyncNeo4jClient",
+    "get_async_neo4j_client",
+    "DriverRegistry",
+    "get_driver_registry",
     "SchemaManager",
+    "EntityMigrationRequired",
+    "check_entity_schema",
     "initialize_schema",
     "NodeLabels",
     "RelationshipTypes",
     "KGExtractor",
     "extract_from_chunks",
+    "ExtractionCache",
+    "get_extraction_cache",
     "EntityNormalizer",
     "normalize_extraction",
     "KGWriter",
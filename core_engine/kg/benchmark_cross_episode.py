@@ -0,0 +1,170 @@
+"""
+Benchmark concept co-occurrence: pairwise Cypher vs sparse matrix product.
+
+Two modes:
+  Synthetic (no database): generates concept -> episode membership and times
+  a pure-Python replica of the pairwise Cypher comparison against the sparse
+  and inverted-index backends of `compute_co_occurrences`.
+
+  Live (--workspace): runs `find_co_occurring_concepts_cypher` and
+  `find_co_occurring_concepts` against Neo4j and checks they return the same pairs.
+
+Usage:
+  python -m core_engine.kg.benchmark_cross_episode --concepts 5000 --episodes 300
+  python -m core_engine.kg.benchmark_cross_episode --workspace default
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Ensure repo root on sys.path when run as a script
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from core_engine.kg.co_occurrence import SCIPY_AVAILABLE, compute_co_occurrences
+
+
+def synthetic_membership(
+    concepts: int, episodes: int, mean_episodes: float, seed: int = 7
+) -> Dict[str, List[str]]:
+    """Concept -> episodes with a heavy tail (a few concepts recur in many episodes)."""
+    rng = random.Random(seed)
+    episode_ids = [f"ep_{i:05d}" for i in range(episodes)]
+    membership = {}
+    for i in range(concepts):
+        k = min(episodes, max(1, int(rng.paretovariate(1.5) * mean_episodes / 3)))
+        membership[f"concept_{i:06d}"] = rng.sample(episode_ids, k)
+    return membership
+
+
+def pairwise_reference(
+    membership: Dict[str, List[str]], min_episodes: int, min_co_occurrences: int
+) -> List[Tuple[str, str, List[str]]]:
+    """Python replica of the former Cypher: every pair, list-membership intersection."""
+    eligible = sorted(
+        (cid, eps) for cid, eps in membership.items() if len(set(eps)) >= min_episodes
+    )
+    results = []
+    for i, (a_id, a_eps) in enumerate(eligible):
+        for b_id, b_eps in eligible[i + 1 :]:
+            shared = [ep for ep in a_eps if ep in b_eps]
+            if len(shared) >= min_co_occurrences:
+                results.append((a_id, b_id, shared))
+    return results
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _pair_keys(pairs) -> set:
+    return {(a, b, len(shared)) for a, b, shared in pairs}
+
+
+def run_synthetic(args: argparse.Namespace) -> None:
+    membership = synthetic_membership(args.concepts, args.episodes, args.mean_episodes)
+    print(
+        f"Synthetic workspace: {args.concepts} concepts, {args.episodes} episodes, "
+        f"{sum(len(v) for v in membership.values())} memberships"
+    )
+
+    rows = []
+    baseline = None
+    if args.concepts <= args.max_pairwise:
+        baseline, seconds = _timed(
+            pairwise_reference, membership, args.min_episodes, args.min_co_occurrences
+        )
+        rows.append(("pairwise (Cypher replica)", seconds, len(baseline)))
+    else:
+        print(f"Skipping pairwise reference (> {args.max_pairwise} concepts)")
+
+    backends = [("inverted index", False)]
+    if SCIPY_AVAILABLE:
+        backends.insert(0, ("sparse matrix (scipy)", True))
+    for name, use_scipy in backends:
+        pairs, seconds = _timed(
+            compute_co_occurrences,
+            membership,
+            min_episodes=args.min_episodes,
+            min_co_occurrences=args.min_co_occurrences,
+            use_scipy=use_scipy,
+        )
+        rows.append((name, seconds, len(pairs)))
+        if baseline is not None and _pair_keys(pairs) != _pair_keys(baseline):
+            print(f"WARNING: {name} result differs from pairwise reference")
+
+    _print_rows(rows)
+
+
+def run_live(args: argparse.Namespace) -> None:
+    from core_engine.kg.cross_episode import CrossEpisodeLinker
+    from core_engine.kg.neo4j_client import get_neo4j_client
+
+    client = get_neo4j_client(workspace_id=args.workspace)
+    try:
+        linker = CrossEpisodeLinker(client, workspace_id=args.workspace)
+        legacy, legacy_seconds = _timed(
+            linker.find_co_occurring_concepts_cypher,
+            min_episodes=args.min_episodes,
+            min_co_occurrences=args.min_co_occurrences,
+        )
+        current, current_seconds = _timed(
+            linker.find_co_occurring_concepts,
+            min_episodes=args.min_episodes,
+            min_co_occurrences=args.min_co_occurrences,
+        )
+    finally:
+        client.close()
+
+    _print_rows([
+        ("Cypher pairwise query", legacy_seconds, len(legacy)),
+        ("sparse co-occurrence", current_seconds, len(current)),
+    ])
+
+    def counts(items):
+        return {(c["source_id"], c["target_id"]): c["co_occurrence_count"] for c in items}
+
+    # Both are capped at the top 1000 pairs; ties at the cut-off may differ
+    legacy_counts, current_counts = counts(legacy), counts(current)
+    mismatched = [k for k in legacy_counts.keys() & current_counts.keys() if legacy_counts[k] != current_counts[k]]
+    print(f"Common pairs: {len(legacy_counts.keys() & current_counts.keys())}, count mismatches: {len(mismatched)}")
+
+
+def _print_rows(rows) -> None:
+    print(f"{'method':<28}{'seconds':>10}{'pairs':>10}")
+    fastest = min(seconds for _, seconds, _ in rows) or 1e-9
+    for name, seconds, pairs in rows:
+        print(f"{name:<28}{seconds:>10.3f}{pairs:>10}   x{seconds / fastest:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspace", help="Benchmark against this Neo4j workspace")
+    parser.add_argument("--concepts", type=int, default=5000)
+    parser.add_argument("--episodes", type=int, default=300)
+    parser.add_argument("--mean-episodes", type=float, default=3.0)
+    parser.add_argument("--min-episodes", type=int, default=2)
+    parser.add_argument("--min-co-occurrences", type=int, default=2)
+    parser.add_argument(
+        "--max-pairwise", type=int, default=8000,
+        help="Skip the O(N^2) reference above this many concepts",
+    )
+    args = parser.parse_args()
+
+    if args.workspace:
+        run_live(args)
+    else:
+        run_synthetic(args)
+
+
+if __name__ == "__main__":
+    main()
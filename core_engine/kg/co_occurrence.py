@@ -0,0 +1,156 @@
+"""
+Concept co-occurrence computed outside the database.
+
+Concept -> episode membership is pulled once and turned into a sparse
+concept x episode incidence matrix X. Shared-episode counts for every pair of
+concepts are then the off-diagonal entries of X @ X.T, which costs time
+proportional to the actual overlaps instead of N^2 pairwise list comparisons.
+
+scipy (a backend requirement) does the sparse product; the inverted-index
+fallback (episode -> concepts) produces the same counts in pure Python for
+development environments without it.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    np = None
+    sparse = None
+    SCIPY_AVAILABLE = False
+
+
+# (source_id, target_id, shared_episode_ids), source_id < target_id
+CoOccurrence = Tuple[str, str, List[str]]
+
+
+def _eligible(
+    concept_episodes: Dict[str, Sequence[str]], min_episodes: int
+) -> Tuple[List[str], List[List[str]]]:
+    """Concepts (sorted by id) that appear in at least `min_episodes` distinct episodes."""
+    ids = []
+    episodes = []
+    for concept_id in sorted(concept_episodes):
+        eps = sorted(set(e for e in concept_episodes[concept_id] if e))
+        if len(eps) >= min_episodes:
+            ids.append(concept_id)
+            episodes.append(eps)
+    return ids, episodes
+
+
+def _pair_counts_sparse(
+    episodes: List[List[str]], min_co_occurrences: int, focus: Optional[List[int]] = None
+) -> List[Tuple[int, int, int]]:
+    """Pair counts from one sparse product (i < j)."""
+    episode_index: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, eps in enumerate(episodes):
+        for ep in eps:
+            rows.append(i)
+            cols.append(episode_index.setdefault(ep, len(episode_index)))
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+        shape=(len(episodes), len(episode_index)),
+    )
+    if focus is None:
+        counts = sparse.triu(incidence @ incidence.T, k=1).tocoo()
+        keep = counts.data >= min_co_occurrences
+        return list(zip(counts.row[keep].tolist(), counts.col[keep].tolist(), counts.data[keep].tolist()))
+
+    # Only rows of focus concepts: F @ X.T is |focus| x N
+    focus_arr = np.asarray(focus, dtype=np.int64)
+    counts = (incidence[focus_arr] @ incidence.T).tocoo()
+    rows = focus_arr[counts.row]
+    keep = (counts.data >= min_co_occurrences) & (rows != counts.col)
+    pairs = {}
+    for i, j, n in zip(rows[keep].tolist(), counts.col[keep].tolist(), counts.data[keep].tolist()):
+        # A pair of two focus concepts shows up from both rows; keep it once
+        pairs[(min(i, j), max(i, j))] = n
+    return [(i, j, n) for (i, j), n in pairs.items()]
+
+
+def _pair_counts_python(
+    episodes: List[List[str]], min_co_occurrences: int, focus: Optional[List[int]] = None
+) -> List[Tuple[int, int, int]]:
+    """Pair counts from an inverted episode index (i < j)."""
+    by_episode: Dict[str, List[int]] = {}
+    for i, eps in enumerate(episodes):
+        for ep in eps:
+            by_episode.setdefault(ep, []).append(i)
+    counter: Counter = Counter()
+    if focus is None:
+        for members in by_episode.values():
+            counter.update(combinations(members, 2))
+    else:
+        focus_set = set(focus)
+        for i in focus:
+            for ep in episodes[i]:
+                counter.update(
+                    (min(i, j), max(i, j)) for j in by_episode[ep]
+                    # Pairs of two focus concepts are counted from the lower index only
+                    if j != i and (j not in focus_set or i < j)
+                )
+    return [(i, j, n) for (i, j), n in counter.items() if n >= min_co_occurrences]
+
+
+def compute_co_occurrences(
+    concept_episodes: Dict[str, Sequence[str]],
+    min_episodes: int = 2,
+    min_co_occurrences: int = 2,
+    limit: Optional[int] = None,
+    use_scipy: Optional[bool] = None,
+    focus: Optional[Iterable[str]] = None,
+) -> List[CoOccurrence]:
+    """
+    Find concept pairs that share episodes.
+
+    Args:
+        concept_episodes: Mapping of concept id -> episode ids it appears in
+        min_episodes: Minimum episodes each concept must appear in
+        min_co_occurrences: Minimum shared episodes per pair
+        limit: Keep only the top pairs by shared-episode count
+        use_scipy: Force (True) or disable (False) the sparse backend (default: when installed)
+        focus: Only return pairs involving at least one of these concept ids
+
+    Returns:
+        (source_id, target_id, shared_episode_ids) tuples, most shared first
+    """
+    ids, episodes = _eligible(concept_episodes, min_episodes)
+    if len(ids) < 2:
+        return []
+
+    focus_idx = None
+    if focus is not None:
+        focus_ids = set(focus)
+        focus_idx = [i for i, cid in enumerate(ids) if cid in focus_ids]
+        if not focus_idx:
+            return []
+
+    if use_scipy is None:
+        use_scipy = SCIPY_AVAILABLE
+    if use_scipy:
+        pairs = _pair_counts_sparse(episodes, min_co_occurrences, focus_idx)
+    else:
+        pairs = _pair_counts_python(episodes, min_co_occurrences, focus_idx)
+
+    # Same order as the former Cypher: count desc, then ids for a stable result
+    pairs.sort(key=lambda p: (-p[2], ids[p[0]], ids[p[1]]))
+    if limit is not None:
+        pairs = pairs[:limit]
+
+    episode_sets = {}
+    results = []
+    for i, j, _ in pairs:
+        if i not in episode_sets:
+            episode_sets[i] = set(episodes[i])
+        shared = [ep for ep in episodes[j] if ep in episode_sets[i]]
+        results.append((ids[i], ids[j], shared))
+    return results
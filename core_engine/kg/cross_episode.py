@@ -6,9 +6,11 @@ and creates CROSS_EPISODE relationships to identify recurring themes.
 
 from __future__ import annotations
 
+import time
 from typing import List, Dict, Any, Optional, Tuple
+from core_engine.kg.co_occurrence import compute_co_occurrences
 from core_engine.kg.neo4j_client import Neo4jClient
-from core_engine.kg.schema import RelationshipTypes
+from core_engine.kg.schema import NodeLabels, RelationshipTypes
 from core_engine.logging import get_logger
 
 
@@ -48,15 +50,12 @@ class CrossEpisodeLinker:
         )
 
         # Query to find concepts with multiple episode_ids
-        # We check all concept-like labels
+        # All concept-like labels share :Entity
         query = """
-        MATCH (c)
+        MATCH (c:Entity)
         WHERE c.workspace_id = $workspace_id
           AND c.episode_ids IS NOT NULL
           AND size(c.episode_ids) >= $min_episodes
-          AND (c:Concept OR c:Practice OR c:CognitiveState OR c:BehavioralPattern 
-               OR c:Principle OR c:Outcome OR c:Causality OR c:Person 
-               OR c:Place OR c:Organization OR c:Event)
         RETURN c.id as id,
                c.name as name,
                c.type as type,
@@ -120,7 +119,7 @@ class CrossEpisodeLinker:
         # Query to find relationships with multiple episode_ids
         # Note: Relationships don't have workspace_id, but nodes do
         query = """
-        MATCH (a)-[r]->(b)
+        MATCH (a:Entity)-[r]->(b:Entity)
         WHERE a.workspace_id = $workspace_id
           AND b.workspace_id = $workspace_id
           AND r.episode_ids IS NOT NULL
@@ -175,15 +174,105 @@ class CrossEpisodeLinker:
 
         return relationships
 
+    def _load_concept_episodes(
+        self,
+        min_episodes: int,
+        concept_ids: Optional[List[str]] = None,
+        episode_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Pull concept -> episode membership for the workspace in one read.
+
+        Args:
+            min_episodes: Minimum episodes per concept
+            concept_ids: Only these concepts (default: all)
+            episode_ids: Only concepts appearing in any of these episodes (default: all)
+
+        Returns:
+            Mapping of concept id -> {"name", "type", "episode_ids"}
+        """
+        query = """
+        MATCH (c:Entity)
+        WHERE c.workspace_id = $workspace_id
+          AND c.episode_ids IS NOT NULL
+          AND size(c.episode_ids) >= $min_episodes
+          AND ($concept_ids IS NULL OR c.id IN $concept_ids)
+          AND ($episode_ids IS NULL OR any(ep IN c.episode_ids WHERE ep IN $episode_ids))
+        RETURN c.id as id,
+               c.name as name,
+               c.type as type,
+               c.episode_ids as episode_ids
+        """
+        results = self.client.execute_read(
+            query,
+            {
+                "workspace_id": self.workspace_id,
+                "min_episodes": min_episodes,
+                "concept_ids": concept_ids,
+                "episode_ids": episode_ids,
+            },
+        )
+
+        concepts: Dict[str, Dict[str, Any]] = {}
+        for record in results:
+            entry = concepts.setdefault(
+                record["id"],
+                {"name": record["name"], "type": record["type"], "episode_ids": []},
+            )
+            entry["episode_ids"].extend(record["episode_ids"])
+        return concepts
+
+    def find_touched_concepts(self, episode_ids: List[str]) -> List[str]:
+        """
+        Concepts whose co-occurrences may change when the given episodes are
+        added, edited or removed: concepts appearing in those episodes, plus
+        endpoints of CROSS_EPISODE links that cite them.
+
+        Args:
+            episode_ids: New, changed or removed episode ids
+
+        Returns:
+            Concept ids
+        """
+        if not episode_ids:
+            return []
+        query = f"""
+        MATCH (c:{NodeLabels.ENTITY})
+        WHERE c.workspace_id = $workspace_id
+          AND c.episode_ids IS NOT NULL
+          AND any(ep IN c.episode_ids WHERE ep IN $episode_ids)
+        RETURN c.id as id
+        UNION
+        MATCH (a)-[r:{RelationshipTypes.CROSS_EPISODE}]-()
+        WHERE a.workspace_id = $workspace_id
+          AND any(ep IN r.episode_ids WHERE ep IN $episode_ids)
+        RETURN a.id as id
+        """
+        results = self.client.execute_read(
+            query, {"workspace_id": self.workspace_id, "episode_ids": list(episode_ids)}
+        )
+        return [record["id"] for record in results]
+
     def find_co_occurring_concepts(
-        self, min_episodes: int = 2, min_co_occurrences: int = 2
+        self,
+        min_episodes: int = 2,
+        min_co_occurrences: int = 2,
+        limit: Optional[int] = 1000,
+        concept_ids: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find concepts that co-occur in the same episodes.
 
+        Concept/episode membership is read once and the shared-episode counts
+        are computed in memory with a sparse matrix product. With `concept_ids`
+        only those concepts and the concepts sharing an episode with them are
+        read, and only pairs involving them are returned.
+
         Args:
             min_episodes: Minimum episodes each concept must appear in
             min_co_occurrences: Minimum episodes where concepts co-occur
+            limit: Maximum number of pairs, most shared first (None for all)
+            concept_ids: Restrict to pairs involving these concepts
 
         Returns:
             List of co-occurrence dictionaries
@@ -198,9 +287,89 @@ class CrossEpisodeLinker:
             },
         )
 
+        start = time.perf_counter()
+        if concept_ids is None:
+            concepts = self._load_concept_episodes(min_episodes)
+        else:
+            focus = self._load_concept_episodes(min_episodes, concept_ids=list(concept_ids))
+            neighbourhood = sorted({ep for c in focus.values() for ep in c["episode_ids"]})
+            concepts = (
+                self._load_concept_episodes(min_episodes, episode_ids=neighbourhood)
+                if neighbourhood else {}
+            )
+        load_seconds = time.perf_counter() - start
+
+        pairs = compute_co_occurrences(
+            {cid: c["episode_ids"] for cid, c in concepts.items()},
+            min_episodes=min_episodes,
+            min_co_occurrences=min_co_occurrences,
+            limit=limit,
+            focus=concept_ids,
+        )
+
+        co_occurrences = []
+        for source_id, target_id, shared in pairs:
+            source = concepts[source_id]
+            target = concepts[target_id]
+            co_occurrences.append(
+                {
+                    "source_id": source_id,
+                    "source_name": source["name"],
+                    "source_type": source["type"],
+                    "target_id": target_id,
+                    "target_name": target["name"],
+                    "target_type": target["type"],
+                    "shared_episode_ids": shared,
+                    "co_occurrence_count": len(shared),
+                    "source_episode_count": len(source["episode_ids"]),
+                    "target_episode_count": len(target["episode_ids"]),
+                }
+            )
+
+        self.logger.info(
+            "co_occurring_concepts_found",
+            extra={
+                "context": {
+                    "count": len(co_occurrences),
+                    "concepts": len(concepts),
+                    "load_seconds": round(load_seconds, 3),
+                    "compute_seconds": round(time.perf_counter() - start - load_seconds, 3),
+                }
+            },
+        )
+
+        return co_occurrences
+
+    def find_co_occurring_concepts_cypher(
+        self, min_episodes: int = 2, min_co_occurrences: int = 2
+    ) -> List[Dict[str, Any]]:
+        """
+        Find co-occurring concepts with a pairwise Cypher comparison.
+
+        Reference implementation kept for benchmarking; it compares every pair
+        of concepts in the database and does not scale past a few thousand
+        concepts. Use `find_co_occurring_concepts` instead.
+
+        Args:
+            min_episodes: Minimum episodes each concept must appear in
+            min_co_occurrences: Minimum episodes where concepts co-occur
+
+        Returns:
+            List of co-occurrence dictionaries
+        """
+        self.logger.info(
+            "finding_co_occurring_concepts_cypher",
+            extra={
+                "context": {
+                    "min_episodes": min_episodes,
+                    "min_co_occurrences": min_co_occurrences,
+                }
+            },
+        )
+
         # Find concepts that appear together in multiple episodes
         query = """
-        MATCH (a), (b)
+        MATCH (a:Entity), (b:Entity)
         WHERE a.workspace_id = $workspace_id
           AND b.workspace_id = $workspace_id
           AND a.id < b.id  // Avoid duplicates and self-loops
@@ -208,12 +377,6 @@ class CrossEpisodeLinker:
           AND b.episode_ids IS NOT NULL
           AND size(a.episode_ids) >= $min_episodes
           AND size(b.episode_ids) >= $min_episodes
-          AND (a:Concept OR a:Practice OR a:CognitiveState OR a:BehavioralPattern 
-               OR a:Principle OR a:Outcome OR a:Causality OR a:Person 
-               OR a:Place OR a:Organization OR a:Event)
-          AND (b:Concept OR b:Practice OR b:CognitiveState OR b:BehavioralPattern 
-               OR b:Principle OR b:Outcome OR b:Causality OR b:Person 
-               OR b:Place OR b:Organization OR b:Event)
         WITH a, b, 
              [ep_id IN a.episode_ids WHERE ep_id IN b.episode_ids] as shared_episodes
         WHERE size(shared_episodes) >= $min_co_occurrences
@@ -269,17 +432,31 @@ class CrossEpisodeLinker:
         min_episodes: int = 2,
         min_co_occurrences: int = 2,
         min_confidence: float = 0.5,
+        batch_size: int = 500,
+        episode_ids: Optional[List[str]] = None,
+        max_links: Optional[int] = 1000,
     ) -> Dict[str, int]:
         """
         Create CROSS_EPISODE relationships between co-occurring concepts.
 
+        The workspace keeps the `max_links` most-shared qualifying pairs, and
+        links outside that set are deleted. With `episode_ids` the update is
+        incremental: only pairs involving concepts touched by those episodes
+        are recomputed and ranked against the existing links of untouched
+        pairs, whose counts cannot have changed. Both modes leave the same
+        links. When capped-out pairs could move back into the top
+        `max_links`, the incremental update falls back to a full relink.
+
         Args:
             min_episodes: Minimum episodes each concept must appear in
             min_co_occurrences: Minimum episodes where concepts co-occur
             min_confidence: Minimum confidence threshold
+            batch_size: Relationships per UNWIND write
+            episode_ids: New, changed or removed episodes (default: relink the whole workspace)
+            max_links: Maximum CROSS_EPISODE links per workspace (None for no cap)
 
         Returns:
-            Dictionary with counts of created relationships
+            Dictionary with counts of created, skipped and removed relationships
         """
         self.logger.info(
             "creating_cross_episode_links",
@@ -288,28 +465,35 @@ class CrossEpisodeLinker:
                     "min_episodes": min_episodes,
                     "min_co_occurrences": min_co_occurrences,
                     "min_confidence": min_confidence,
+                    "incremental": episode_ids is not None,
                 }
             },
         )
 
-        # Find co-occurring concepts
+        touched: Optional[List[str]] = None
+        if episode_ids is not None:
+            touched = self.find_touched_concepts(episode_ids)
+            if not touched:
+                self.logger.info("no_touched_concepts")
+                return {"created": 0, "skipped": 0, "removed": 0}
+
+        # Find co-occurring concepts; incremental runs rank every touched pair below
         co_occurrences = self.find_co_occurring_concepts(
-            min_episodes=min_episodes, min_co_occurrences=min_co_occurrences
+            min_episodes=min_episodes,
+            min_co_occurrences=min_co_occurrences,
+            limit=None if touched is not None else max_links,
+            concept_ids=touched,
         )
 
         if not co_occurrences:
             self.logger.info("no_co_occurrences_found")
-            return {"created": 0, "skipped": 0}
 
         # Create CROSS_EPISODE relationships
-        queries = []
+        rows = []
         created = 0
         skipped = 0
 
         for co_occ in co_occurrences:
-            source_id = co_occ["source_id"]
-            target_id = co_occ["target_id"]
-            shared_episodes = co_occ["shared_episode_ids"]
             co_occurrence_count = co_occ["co_occurrence_count"]
 
             # Calculate confidence based on co-occurrence frequency
@@ -320,65 +504,148 @@ class CrossEpisodeLinker:
                 skipped += 1
                 continue
 
-            # Create CROSS_EPISODE relationship
-            query = f"""
-            MATCH (a {{id: $source_id, workspace_id: $workspace_id}})
-            MATCH (b {{id: $target_id, workspace_id: $workspace_id}})
-            MERGE (a)-[r:{RelationshipTypes.CROSS_EPISODE}]->(b)
-            ON CREATE SET
-                r.episode_ids = $shared_episode_ids,
-                r.co_occurrence_count = $co_occurrence_count,
-                r.confidence = $confidence,
-                r.description = $description,
-                r.workspace_id = $workspace_id,
-                r.created_at = datetime()
-            ON MATCH SET
-                r.episode_ids = CASE 
-                    WHEN $shared_episode_ids IS NOT NULL THEN 
-                        [ep IN r.episode_ids WHERE ep IN $shared_episode_ids] + 
-                        [ep IN $shared_episode_ids WHERE NOT ep IN r.episode_ids]
-                    ELSE r.episode_ids 
-                END,
-                r.co_occurrence_count = $co_occurrence_count,
-                r.confidence = $confidence,
-                r.workspace_id = COALESCE(r.workspace_id, $workspace_id),
-                r.updated_at = datetime()
-            RETURN r
-            """
-
-            description = (
-                f"Co-occurs in {co_occurrence_count} episode(s): "
-                f"{co_occ['source_name']} and {co_occ['target_name']}"
+            rows.append(
+                {
+                    "source_id": co_occ["source_id"],
+                    "target_id": co_occ["target_id"],
+                    "shared_episode_ids": co_occ["shared_episode_ids"],
+                    "co_occurrence_count": co_occurrence_count,
+                    "confidence": confidence,
+                    "description": (
+                        f"Co-occurs in {co_occurrence_count} episode(s): "
+                        f"{co_occ['source_name']} and {co_occ['target_name']}"
+                    ),
+                }
             )
 
-            queries.append(
-                (
-                    query,
-                    {
-                        "source_id": source_id,
-                        "target_id": target_id,
-                        "workspace_id": self.workspace_id,
-                        "shared_episode_ids": shared_episodes,
-                        "co_occurrence_count": co_occurrence_count,
-                        "confidence": confidence,
-                        "description": description,
-                    },
-                )
-            )
+        existing = self._load_links()
+        if touched is None:
+            keep = {(row["source_id"], row["target_id"]) for row in rows}
+        else:
+            touched_set = set(touched)
+            untouched = [
+                (count, pair, None) for pair, count in existing.items()
+                if pair[0] not in touched_set and pair[1] not in touched_set
+            ]
+            ranked = untouched + [
+                (row["co_occurrence_count"], (row["source_id"], row["target_id"]), row) for row in rows
+            ]
+            # Same order as compute_co_occurrences: count desc, then ids
+            ranked.sort(key=lambda item: (-item[0], item[1]))
+            if max_links is not None:
+                # A full previous top set hides pairs ranked after its last link; if fewer
+                # than max_links pairs now rank ahead of that link, they may qualify again
+                boundary = max(((-count, pair) for pair, count in existing.items()), default=None)
+                if len(existing) >= max_links and sum(
+                    1 for count, pair, _ in ranked if (-count, pair) <= boundary
+                ) < max_links:
+                    self.logger.info(
+                        "cross_episode_cap_refill",
+                        extra={"context": {"ranked": len(ranked), "max_links": max_links}},
+                    )
+                    return self.create_cross_episode_links(
+                        min_episodes=min_episodes,
+                        min_co_occurrences=min_co_occurrences,
+                        min_confidence=min_confidence,
+                        batch_size=batch_size,
+                        max_links=max_links,
+                    )
+                ranked = ranked[:max_links]
+            rows = [row for _, _, row in ranked if row is not None]
+            keep = {pair for _, pair, _ in ranked}
 
-        # Execute in batches
-        batch_size = 100
-        for i in range(0, len(queries), batch_size):
-            batch = queries[i : i + batch_size]
-            self.client.execute_write_batch(batch)
-            created += len(batch)
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (a:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: row.source_id}})
+        MATCH (b:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: row.target_id}})
+        MERGE (a)-[r:{RelationshipTypes.CROSS_EPISODE}]->(b)
+        ON CREATE SET
+            r.episode_ids = row.shared_episode_ids,
+            r.co_occurrence_count = row.co_occurrence_count,
+            r.confidence = row.confidence,
+            r.description = row.description,
+            r.workspace_id = $workspace_id,
+            r.created_at = datetime()
+        ON MATCH SET
+            r.episode_ids = 
+                [ep IN r.episode_ids WHERE ep IN row.shared_episode_ids] + 
+                [ep IN row.shared_episode_ids WHERE NOT ep IN r.episode_ids],
+            r.co_occurrence_count = row.co_occurrence_count,
+            r.confidence = row.confidence,
+            r.workspace_id = COALESCE(r.workspace_id, $workspace_id),
+            r.updated_at = datetime()
+        RETURN count(r) as written
+        """
+
+        # Execute in UNWIND batches
+        for i in range(0, len(rows), batch_size):
+            result = self.client.execute_write(
+                query, {"rows": rows[i : i + batch_size], "workspace_id": self.workspace_id}
+            )
+            created += result[0]["written"] if result else 0
 
+        removed = self._delete_links([pair for pair in existing if pair not in keep], batch_size)
         self.logger.info(
-            "cross_episode_links_created",
-            extra={"context": {"created": created, "skipped": skipped}},
+            "cross_episode_links_updated" if touched is not None else "cross_episode_links_created",
+            extra={
+                "context": {
+                    "touched_concepts": len(touched) if touched is not None else None,
+                    "created": created,
+                    "skipped": skipped,
+                    "removed": removed,
+                }
+            },
         )
+        return {"created": created, "skipped": skipped, "removed": removed}
 
-        return {"created": created, "skipped": skipped}
+    def _load_links(self) -> Dict[Tuple[str, str], int]:
+        """
+        Existing CROSS_EPISODE links of the workspace.
+
+        Returns:
+            Mapping of (source_id, target_id) with source_id < target_id -> co-occurrence count
+        """
+        query = f"""
+        MATCH (a:{NodeLabels.ENTITY})-[r:{RelationshipTypes.CROSS_EPISODE}]->(b:{NodeLabels.ENTITY})
+        WHERE a.workspace_id = $workspace_id AND b.workspace_id = $workspace_id
+        RETURN a.id as source_id, b.id as target_id, r.co_occurrence_count as count
+        """
+        links: Dict[Tuple[str, str], int] = {}
+        for record in self.client.execute_read(query, {"workspace_id": self.workspace_id}):
+            pair = tuple(sorted((record["source_id"], record["target_id"])))
+            links[pair] = max(links.get(pair, 0), record["count"] or 0)
+        return links
+
+    def _delete_links(self, pairs: List[Tuple[str, str]], batch_size: int = 500) -> int:
+        """
+        Delete the CROSS_EPISODE links between the given concept pairs.
+
+        Args:
+            pairs: (source_id, target_id) pairs, looked up through the :Entity key
+            batch_size: Pairs per UNWIND statement
+
+        Returns:
+            Number of deleted relationships
+        """
+        query = f"""
+        UNWIND $pairs AS pair
+        MATCH (a:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: pair[0]}})
+              -[r:{RelationshipTypes.CROSS_EPISODE}]-
+              (b:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: pair[1]}})
+        DELETE r
+        RETURN count(r) as removed
+        """
+        removed = 0
+        for i in range(0, len(pairs), batch_size):
+            result = self.client.execute_write(
+                query,
+                {
+                    "pairs": [list(pair) for pair in pairs[i : i + batch_size]],
+                    "workspace_id": self.workspace_id,
+                },
+            )
+            removed += result[0]["removed"] if result else 0
+        return removed
 
     def get_recurring_themes(
         self, min_episodes: int = 3, top_n: int = 20
@@ -449,7 +716,7 @@ class CrossEpisodeLinker:
 
         # Count total unique episodes
         query = """
-        MATCH (c)
+        MATCH (c:Entity)
         WHERE c.workspace_id = $workspace_id
           AND c.episode_ids IS NOT NULL
         WITH c.episode_ids as episodes
@@ -523,6 +790,7 @@ def create_cross_episode_links(
     min_co_occurrences: int = 2,
     min_confidence: float = 0.5,
     workspace_id: Optional[str] = None,
+    episode_ids: Optional[List[str]] = None,
 ) -> Dict[str, int]:
     """
     Create CROSS_EPISODE relationships (convenience function).
@@ -533,6 +801,7 @@ def create_cross_episode_links(
         min_co_occurrences: Minimum co-occurrences required
         min_confidence: Minimum confidence threshold
         workspace_id: Workspace identifier
+        episode_ids: Only re-link concepts touched by these episodes
 
     Returns:
         Dictionary with creation statistics
@@ -542,5 +811,6 @@ def create_cross_episode_links(
         min_episodes=min_episodes,
         min_co_occurrences=min_co_occurrences,
         min_confidence=min_confidence,
+        episode_ids=episode_ids,
     )
 
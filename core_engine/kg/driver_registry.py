@@ -0,0 +1,464 @@
+"""
+Process-wide Neo4j driver registry.
+
+A neo4j `Driver` owns a connection pool and is meant to live for the whole
+process. The registry keeps one driver per (uri, database, user) and hands it
+to every `Neo4jClient` (and one async driver per event loop to every
+`AsyncNeo4jClient`), so API handlers, reasoners, script generation and
+ingestion borrow pooled sessions instead of opening and verifying a new
+connection per request.
+
+Async drivers are bound to the loop that created them, so they are keyed by
+the loop object itself (weakly, so a finished loop is not kept alive). Drivers
+of loops that have since closed are dropped on the next async lookup, and
+`aclose_all` closes the running loop's drivers on shutdown.
+
+Environment:
+  NEO4J_MAX_POOL_SIZE=50
+  NEO4J_MAX_CONNECTION_LIFETIME=3600           # seconds
+  NEO4J_CONNECTION_ACQUISITION_TIMEOUT=30      # seconds
+  NEO4J_CONNECTION_TIMEOUT=15                  # seconds
+  NEO4J_KEEP_ALIVE=true
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from neo4j import AsyncDriver, AsyncGraphDatabase, AsyncSession, GraphDatabase, Driver, Session
+from neo4j.exceptions import ServiceUnavailable, SessionExpired
+
+from core_engine.logging import get_logger
+
+
+DriverKey = Tuple[str, str, str]  # (uri, database, user)
+
+# Errors that may mean the driver as a whole lost the server (not just one query or connection)
+DRIVER_FAILURES = (ServiceUnavailable, SessionExpired)
+
+
+def get_pool_config() -> Dict[str, Any]:
+    """Driver pool settings from environment."""
+    return {
+        "max_connection_pool_size": int(os.getenv("NEO4J_MAX_POOL_SIZE", "50")),
+        "max_connection_lifetime": float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600")),
+        "connection_acquisition_timeout": float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "30")),
+        "connection_timeout": float(os.getenv("NEO4J_CONNECTION_TIMEOUT", "15")),
+        "keep_alive": os.getenv("NEO4J_KEEP_ALIVE", "true").lower() in ("1", "true", "yes"),
+    }
+
+
+class _DriverEntry:
+    """A shared driver plus its usage counters."""
+
+    def __init__(self, driver: Any):
+        self.driver = driver
+        self.created_at = time.time()
+        self.sessions_opened = 0
+        self.sessions_in_use = 0
+        self.peak_sessions_in_use = 0
+        self.session_errors = 0
+
+
+class DriverRegistry:
+    """One pooled neo4j Driver per (uri, database, user), shared by the process."""
+
+    def __init__(self, pool_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize driver registry.
+
+        Args:
+            pool_config: Driver keyword arguments (default: from env)
+        """
+        self.pool_config = pool_config or get_pool_config()
+        self.logger = get_logger("core_engine.kg.driver_registry")
+        self._lock = threading.Lock()
+        self._entries: Dict[DriverKey, _DriverEntry] = {}
+        # key -> lock held while that key's first driver connects
+        self._creation_locks: Dict[DriverKey, threading.Lock] = {}
+        # event loop -> {key: entry}; weak so ids of dead loops are never reused as keys
+        self._async_entries: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._async_locks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._reconnects: Dict[DriverKey, int] = {}
+        self._pid = os.getpid()
+
+    def get_driver(self, uri: str, user: str, password: str, database: str) -> Driver:
+        """
+        Get the shared driver, creating and verifying it on first use.
+
+        Args:
+            uri: Neo4j connection URI
+            user: Username
+            password: Password
+            database: Database name
+
+        Returns:
+            Shared neo4j Driver
+        """
+        key = (uri, database, user)
+        with self._lock:
+            self._check_fork()
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry.driver
+            creation_lock = self._creation_locks.setdefault(key, threading.Lock())
+
+        # Connect without the registry lock, so lookups of other drivers and
+        # session bookkeeping never wait on a slow server; concurrent first
+        # requests for this key wait for one connection attempt
+        with creation_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return entry.driver
+
+            start = time.perf_counter()
+            driver = GraphDatabase.driver(uri, auth=(user, password), **self.pool_config)
+            try:
+                driver.verify_connectivity()
+            except Exception as e:
+                driver.close()
+                self.logger.error(
+                    "neo4j_connection_failed",
+                    exc_info=True,
+                    extra={"context": {"error": str(e), "uri": uri}},
+                )
+                raise
+
+            with self._lock:
+                entry = self._entries.setdefault(key, _DriverEntry(driver))
+        if entry.driver is not driver:
+            # The registry was reset (fork) while connecting and another caller won
+            driver.close()
+            return entry.driver
+
+        self.logger.info(
+            "neo4j_driver_created",
+            extra={
+                "context": {
+                    "uri": uri,
+                    "database": database,
+                    "connect_ms": round((time.perf_counter() - start) * 1000, 1),
+                    **self.pool_config,
+                }
+            },
+        )
+        return driver
+
+    def _check_fork(self) -> None:
+        """Forked child: inherited sockets belong to the parent, start fresh (lock held)."""
+        if os.getpid() != self._pid:
+            self._entries.clear()
+            self._creation_locks.clear()
+            self._async_entries.clear()
+            self._async_locks.clear()
+            self._pid = os.getpid()
+
+    def _drop_closed_loops(self) -> int:
+        """
+        Forget async drivers whose event loop has closed (lock held).
+
+        Their close() coroutine can no longer run, and the driver may hold a
+        reference back to its loop, which would keep the weak key alive forever.
+        Dropping them releases loop, driver and sockets together.
+        """
+        closed = [loop for loop in list(self._async_entries.keys()) if loop.is_closed()]
+        dropped = 0
+        for loop in closed:
+            dropped += len(self._async_entries.pop(loop, {}))
+            self._async_locks.pop(loop, None)
+        return dropped
+
+    def _async_items(self) -> List[Tuple[asyncio.AbstractEventLoop, DriverKey, _DriverEntry]]:
+        """(loop, key, entry) for every async driver (lock held)."""
+        return [
+            (loop, key, entry)
+            for loop, entries in list(self._async_entries.items())
+            for key, entry in entries.items()
+        ]
+
+    def _acquired(self, entry: Optional[_DriverEntry]) -> None:
+        if entry is not None:
+            with self._lock:
+                entry.sessions_opened += 1
+                entry.sessions_in_use += 1
+                entry.peak_sessions_in_use = max(entry.peak_sessions_in_use, entry.sessions_in_use)
+
+    def _released(self, entry: Optional[_DriverEntry], failed: bool) -> None:
+        if entry is not None:
+            with self._lock:
+                entry.sessions_in_use -= 1
+                if failed:
+                    entry.session_errors += 1
+
+    @contextmanager
+    def session(self, driver: Driver, database: str) -> Iterator[Session]:
+        """
+        Borrow a session from a registry driver, tracking pool usage.
+
+        Args:
+            driver: Driver returned by `get_driver`
+            database: Database name
+        """
+        entry = self._entry_for(driver)
+        self._acquired(entry)
+        failed = False
+        try:
+            with driver.session(database=database) as session:
+                yield session
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._released(entry, failed)
+
+    async def get_async_driver(
+        self, uri: str, user: str, password: str, database: str
+    ) -> AsyncDriver:
+        """
+        Get the shared async driver for the running event loop, creating and
+        verifying it on first use.
+
+        Args:
+            uri: Neo4j connection URI
+            user: Username
+            password: Password
+            database: Database name
+
+        Returns:
+            Shared neo4j AsyncDriver
+        """
+        loop = asyncio.get_running_loop()
+        key = (uri, database, user)
+        with self._lock:
+            self._check_fork()
+            entry = self._async_entries.get(loop, {}).get(key)
+            if entry is not None:
+                return entry.driver
+            dropped = self._drop_closed_loops()
+            creation_lock = self._async_locks.setdefault(loop, {}).setdefault(key, asyncio.Lock())
+        if dropped:
+            self.logger.info("neo4j_async_drivers_dropped", extra={"context": {"count": dropped}})
+
+        # Concurrent first requests wait for one connection attempt
+        async with creation_lock:
+            with self._lock:
+                entry = self._async_entries.get(loop, {}).get(key)
+                if entry is not None:
+                    return entry.driver
+
+            start = time.perf_counter()
+            driver = AsyncGraphDatabase.driver(uri, auth=(user, password), **self.pool_config)
+            try:
+                await driver.verify_connectivity()
+            except Exception as e:
+                await driver.close()
+                self.logger.error(
+                    "neo4j_connection_failed",
+                    exc_info=True,
+                    extra={"context": {"error": str(e), "uri": uri, "async": True}},
+                )
+                raise
+
+            with self._lock:
+                self._async_entries.setdefault(loop, {})[key] = _DriverEntry(driver)
+
+        self.logger.info(
+            "neo4j_async_driver_created",
+            extra={
+                "context": {
+                    "uri": uri,
+                    "database": database,
+                    "connect_ms": round((time.perf_counter() - start) * 1000, 1),
+                    **self.pool_config,
+                }
+            },
+        )
+        return driver
+
+    @asynccontextmanager
+    async def async_session(self, driver: AsyncDriver, database: str) -> AsyncIterator[AsyncSession]:
+        """
+        Borrow an async session from a registry driver, tracking pool usage.
+
+        Args:
+            driver: Driver returned by `get_async_driver`
+            database: Database name
+        """
+        entry = self._entry_for(driver)
+        self._acquired(entry)
+        failed = False
+        try:
+            async with driver.session(database=database) as session:
+                yield session
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._released(entry, failed)
+
+    def recover(self, driver: Driver, error: Exception) -> bool:
+        """
+        Rebuild a shared driver only if `error` shows the driver itself is broken.
+
+        The driver already replaces dead pooled connections, and a slow query
+        timing out says nothing about the pool. So only ServiceUnavailable /
+        SessionExpired count, and only when the driver can no longer verify
+        connectivity. Everything else leaves the driver, and every session
+        borrowing it, alone.
+
+        Args:
+            driver: Driver the failed query ran on
+            error: Exception raised by the query
+
+        Returns:
+            True if the driver was invalidated
+        """
+        if not isinstance(error, DRIVER_FAILURES):
+            return False
+        try:
+            driver.verify_connectivity()
+            return False
+        except Exception:
+            self.invalidate(driver)
+            return True
+
+    async def arecover(self, driver: AsyncDriver, error: Exception) -> bool:
+        """Async counterpart of `recover` for async drivers."""
+        if not isinstance(error, DRIVER_FAILURES):
+            return False
+        try:
+            await driver.verify_connectivity()
+            return False
+        except Exception:
+            await self.ainvalidate(driver)
+            return True
+
+    def invalidate(self, driver: Driver) -> None:
+        """
+        Drop a driver that failed `recover` so the next `get_driver` rebuilds it.
+        A no-op if another caller already replaced it.
+        """
+        with self._lock:
+            key = next((k for k, e in self._entries.items() if e.driver is driver), None)
+            if key is None:
+                return
+            del self._entries[key]
+            self._reconnects[key] = self._reconnects.get(key, 0) + 1
+        try:
+            driver.close()
+        except Exception:
+            pass
+        self.logger.warning(
+            "neo4j_driver_invalidated",
+            extra={"context": {"uri": key[0], "database": key[1]}},
+        )
+
+    async def ainvalidate(self, driver: AsyncDriver) -> None:
+        """Async counterpart of `invalidate` for async drivers."""
+        with self._lock:
+            found = next(((l, k) for l, k, e in self._async_items() if e.driver is driver), None)
+            if found is None:
+                return
+            loop, key = found
+            del self._async_entries[loop][key]
+            self._reconnects[key] = self._reconnects.get(key, 0) + 1
+        try:
+            await driver.close()
+        except Exception:
+            pass
+        self.logger.warning(
+            "neo4j_driver_invalidated",
+            extra={"context": {"uri": key[0], "database": key[1], "async": True}},
+        )
+
+    def _entry_for(self, driver: Any) -> Optional[_DriverEntry]:
+        with self._lock:
+            async_entries = [e for _, _, e in self._async_items()]
+            for entry in list(self._entries.values()) + async_entries:
+                if entry.driver is driver:
+                    return entry
+        return None
+
+    @staticmethod
+    def _pool_connections(driver: Driver) -> Optional[Dict[str, int]]:
+        """Best-effort open/in-use connection counts from the driver's pool internals."""
+        try:
+            pool = driver._pool  # not public API; absent or different across driver versions
+            connections = pool.connections
+            total = sum(len(conns) for conns in connections.values())
+            in_use = sum(pool.in_use_connection_count(address) for address in connections)
+            return {"open": total, "in_use": in_use, "idle": total - in_use}
+        except Exception:
+            return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-driver pool metrics."""
+        with self._lock:
+            entries = [(k, e, False) for k, e in self._entries.items()]
+            entries += [(k, e, True) for _, k, e in self._async_items()]
+            reconnects = dict(self._reconnects)
+        drivers = []
+        for (uri, database, user), entry, is_async in entries:
+            drivers.append({
+                "uri": uri,
+                "database": database,
+                "async": is_async,
+                "age_s": round(time.time() - entry.created_at, 1),
+                "sessions_opened": entry.sessions_opened,
+                "sessions_in_use": entry.sessions_in_use,
+                "peak_sessions_in_use": entry.peak_sessions_in_use,
+                "session_errors": entry.session_errors,
+                "reconnects": reconnects.get((uri, database, user), 0),
+                "connections": self._pool_connections(entry.driver),
+            })
+        return {
+            "pool_config": self.pool_config,
+            "drivers": drivers,
+        }
+
+    def close_all(self) -> None:
+        """Close every driver (process shutdown)."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            try:
+                entry.driver.close()
+            except Exception:
+                pass
+        self.logger.info("neo4j_drivers_closed", extra={"context": {"count": len(entries)}})
+
+    async def aclose_all(self) -> None:
+        """Close every sync driver and the async drivers of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entries = list(self._async_entries.pop(loop, {}).values())
+            self._async_locks.pop(loop, None)
+            self._drop_closed_loops()
+        for entry in entries:
+            try:
+                await entry.driver.close()
+            except Exception:
+                pass
+        self.close_all()
+
+
+_registry: Optional[DriverRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_driver_registry() -> DriverRegistry:
+    """Get the process-wide driver registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DriverRegistry()
+    return _registry
@@ -0,0 +1,384 @@
+"""
+Persistent cache of LLM extraction results.
+
+Validated extraction output (concepts, relationships, quotes) is stored in a
+SQLite file, one entry per chunk. The key hashes the chunk exactly as the
+prompt renders it (text plus source file name, episode, speaker, timestamp and offsets),
+the extraction prompt template hash and the model name, so a metadata change
+is a miss. The LLM tags every item with the chunk it came from
+(`split_extraction`), which makes entries independent of batch boundaries:
+a batch only sends its uncached chunks to the LLM. Re-runs after a crash,
+writer-only schema changes and re-ingests into a fresh workspace read results
+from disk instead of paying for the LLM call again.
+
+The file is shared by every job worker process. A cache error (e.g. the
+database stays locked) is logged and treated as a miss or a skipped write,
+never as a failed extraction.
+
+Environment:
+  EXTRACTION_CACHE_ENABLED=true
+  EXTRACTION_CACHE_PATH=data/cache/extraction_cache.db
+  EXTRACTION_CACHE_MAX_MB=512
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from core_engine.kg.prompts import extraction_prompt_hash, render_chunk
+from core_engine.logging import get_logger
+
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE_PATH = ROOT / "data" / "cache" / "extraction_cache.db"
+
+EXTRACTION_KEYS = ("concepts", "relationships", "quotes")
+
+
+def chunk_text_hash(chunk: Document) -> str:
+    """SHA-256 of a chunk's text."""
+    return hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+
+
+def extraction_cache_key(chunk: Document, model: str) -> str:
+    """Cache key for one chunk: everything the prompt shows of it, the prompt version and the model."""
+    parts = [model, extraction_prompt_hash(), render_chunk(chunk)]
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def split_extraction(data: Dict[str, Any], num_chunks: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Split a batch's extraction output into one result per chunk using the
+    `chunk` number each item carries.
+
+    Args:
+        data: Validated extraction output for a prompt of `num_chunks` chunks
+        num_chunks: Number of chunks in the prompt
+
+    Each result is self-contained: a concept that a chunk's relationships or
+    quotes refer to, but that was listed under another chunk, is copied into
+    that chunk's result. A cached chunk reused in a different batch then never
+    writes relationships or quotes whose concept is missing.
+
+    Returns:
+        Per-chunk results in prompt order (without `chunk` fields), or None if
+        any item has no valid chunk number
+    """
+    parts: List[Dict[str, Any]] = [{key: [] for key in EXTRACTION_KEYS} for _ in range(num_chunks)]
+    for key in EXTRACTION_KEYS:
+        for item in data.get(key, []):
+            number = item.get("chunk")
+            if isinstance(number, bool) or not isinstance(number, int) or not 1 <= number <= num_chunks:
+                return None
+            parts[number - 1][key].append({k: v for k, v in item.items() if k != "chunk"})
+
+    concepts_by_id: Dict[Any, Dict[str, Any]] = {}
+    for part in parts:
+        for concept in part["concepts"]:
+            concepts_by_id.setdefault(concept.get("id"), concept)
+    for part in parts:
+        listed = {concept.get("id") for concept in part["concepts"]}
+        for concept_id in _referenced_concepts(part):
+            if concept_id not in listed and concept_id in concepts_by_id:
+                part["concepts"].append(concepts_by_id[concept_id])
+                listed.add(concept_id)
+    return parts
+
+
+def _referenced_concepts(part: Dict[str, Any]) -> List[Any]:
+    """Concept ids used by a result's relationships and quotes, in order."""
+    ids = []
+    for rel in part.get("relationships", []):
+        ids.extend((rel.get("source_id"), rel.get("target_id")))
+    for quote in part.get("quotes", []):
+        ids.extend(quote.get("related_concepts") or [])
+    return ids
+
+
+def merge_extractions(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine per-chunk results into one batch result.
+    A concept id seen in several chunks is kept once (first occurrence).
+    """
+    merged: Dict[str, Any] = {key: [] for key in EXTRACTION_KEYS}
+    seen_concepts = set()
+    for part in parts:
+        for concept in part.get("concepts", []):
+            if concept.get("id") in seen_concepts:
+                continue
+            seen_concepts.add(concept.get("id"))
+            merged["concepts"].append(concept)
+        merged["relationships"].extend(part.get("relationships", []))
+        merged["quotes"].extend(part.get("quotes", []))
+    return merged
+
+
+def strip_chunk_numbers(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the `chunk` field the prompt asks for from every extracted item."""
+    for key in EXTRACTION_KEYS:
+        data[key] = [{k: v for k, v in item.items() if k != "chunk"} for item in data.get(key, [])]
+    return data
+
+
+class ExtractionCache:
+    """SQLite-backed, size-bounded LRU cache for extraction output."""
+
+    def __init__(self, db_path: Path = DEFAULT_CACHE_PATH, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize extraction cache.
+
+        Args:
+            db_path: SQLite file path
+            max_bytes: Maximum total payload size before least-recently-used entries are evicted
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.logger = get_logger("core_engine.kg.extraction_cache")
+
+        self._lock = threading.Lock()
+        # Shared by every job worker process: wait for their writes instead of failing
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._init_db()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extraction_cache"
+        ).fetchone()[0]
+
+    def _init_db(self) -> None:
+        """Initialize database schema."""
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                payload TEXT NOT NULL,  -- JSON
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_extraction_cache_access
+            ON extraction_cache(last_access)
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a fresh copy of the cached extraction, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up several chunk entries at once.
+
+        Args:
+            keys: Cache keys (see `extraction_cache_key`)
+
+        Returns:
+            Dictionary of key -> fresh copy of the cached extraction, for hits only
+        """
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        placeholders = ",".join("?" * len(unique))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, payload FROM extraction_cache WHERE key IN ({placeholders})", unique
+            ).fetchall()
+            self.hits += len(rows)
+            self.misses += len(unique) - len(rows)
+            if rows:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE extraction_cache SET last_access = ? WHERE key = ?",
+                    [(now, key) for key, _ in rows],
+                )
+                self._conn.commit()
+        return {key: json.loads(payload) for key, payload in rows}
+
+    def put(self, key: str, data: Dict[str, Any], model: str) -> None:
+        """Store an extraction result and evict old entries if over budget."""
+        self.put_many({key: data}, model)
+
+    def put_many(self, entries: Dict[str, Dict[str, Any]], model: str) -> None:
+        """
+        Store several chunk entries in one transaction and evict old entries if over budget.
+
+        Args:
+            entries: Dictionary of key -> extraction result
+            model: Model that produced the results
+        """
+        if not entries:
+            return
+        now = time.time()
+        prompt_hash = extraction_prompt_hash()
+        rows = []
+        for key, data in entries.items():
+            payload = json.dumps(data, ensure_ascii=False)
+            rows.append((key, model, prompt_hash, payload, len(payload.encode("utf-8")), now, now))
+        with self._lock:
+            cur = self._conn.cursor()
+            # IMMEDIATE takes the write lock: the size check below sees every
+            # process's entries, so the cap holds for the shared file as a whole
+            cur.execute("BEGIN IMMEDIATE")
+            try:
+                cur.executemany(
+                    """
+                    INSERT OR REPLACE INTO extraction_cache
+                        (key, model, prompt_hash, payload, size, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+                self._total_bytes = cur.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM extraction_cache"
+                ).fetchone()[0]
+                if self._total_bytes > self.max_bytes:
+                    self._evict(cur, target_bytes=int(self.max_bytes * 0.9))
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def lookup_batch(self, chunks: List[Document], model: str) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+        """
+        Look up every chunk of an extraction batch.
+
+        Args:
+            chunks: Batch chunks
+            model: Extraction model
+
+        Returns:
+            Tuple of (per-chunk keys in batch order, key -> cached result for hits)
+        """
+        keys = [extraction_cache_key(chunk, model) for chunk in chunks]
+        try:
+            return keys, self.get_many(keys)
+        except sqlite3.Error as e:
+            self.logger.warning(
+                "extraction_cache_lookup_failed",
+                extra={"context": {"chunks": len(keys), "error": str(e)}},
+            )
+            return keys, {}
+
+    def finish_batch(
+        self,
+        keys: List[str],
+        cached: Dict[str, Dict[str, Any]],
+        data: Dict[str, Any],
+        model: str,
+    ) -> Dict[str, Any]:
+        """
+        Cache the LLM output for a batch's uncached chunks and assemble the batch result.
+
+        Args:
+            keys: Per-chunk keys from `lookup_batch`
+            cached: Cached results from `lookup_batch`
+            data: Validated output of the prompt built from the uncached chunks, in batch order
+            model: Extraction model
+
+        Returns:
+            Extraction result for the whole batch, in chunk order
+        """
+        pending = [key for key in keys if key not in cached]
+        fresh = split_extraction(data, len(pending))
+        if fresh is None:
+            # Items without a usable chunk number cannot be stored per chunk
+            self.logger.warning(
+                "extraction_cache_unattributed",
+                extra={"context": {"chunks": len(pending)}},
+            )
+            data = strip_chunk_numbers(data)
+            return merge_extractions([cached[key] for key in keys if key in cached] + [data])
+        results = dict(zip(pending, fresh))
+        try:
+            self.put_many(results, model)
+        except sqlite3.Error as e:
+            # The LLM output is still used; only caching it is skipped
+            self.logger.warning(
+                "extraction_cache_write_failed",
+                extra={"context": {"chunks": len(results), "error": str(e)}},
+            )
+        results.update(cached)
+        return merge_extractions([results[key] for key in dict.fromkeys(keys)])
+
+    def _evict(self, cur: sqlite3.Cursor, target_bytes: int) -> None:
+        """Delete least-recently-used entries until under target (lock and write transaction held)."""
+        rows = cur.execute(
+            "SELECT key, size FROM extraction_cache ORDER BY last_access ASC"
+        ).fetchall()
+        to_delete = []
+        remaining = self._total_bytes
+        for key, size in rows:
+            if remaining <= target_bytes:
+                break
+            to_delete.append((key,))
+            remaining -= size
+        cur.executemany("DELETE FROM extraction_cache WHERE key = ?", to_delete)
+        self._total_bytes = remaining
+        self.evictions += len(to_delete)
+        self.logger.info(
+            "extraction_cache_evicted",
+            extra={"context": {"entries": len(to_delete), "total_bytes": remaining}},
+        )
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM extraction_cache")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries, self._total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extraction_cache"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "total_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Get the process-wide extraction cache (None when disabled via env).
+    """
+    global _cache
+    if os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = Path(os.getenv("EXTRACTION_CACHE_PATH", str(DEFAULT_CACHE_PATH)))
+            max_mb = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+            _cache = ExtractionCache(db_path=path, max_bytes=max_mb * 1024 * 1024)
+        return _cache
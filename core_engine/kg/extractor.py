@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from dotenv import load_dotenv
 
 try:
@@ -18,11 +18,22 @@ except ImportError:
 from langchain_core.documents import Document
 
 from core_engine.logging import get_logger
-from core_engine.kg.prompts import build_extraction_prompt
+from core_engine.kg.prompts import build_extraction_prompt, EXTRACTION_SYSTEM_PROMPT
+from core_engine.kg.extraction_cache import (
+    ExtractionCache,
+    get_extraction_cache,
+    merge_extractions,
+    strip_chunk_numbers,
+)
 from core_engine.kg.schemas import EXTRACTION_SCHEMA, validate_extraction_output
+from core_engine.utils.llm_scheduler import BACKGROUND, schedule_openai_client
 from core_engine.utils.rate_limiter import RateLimiter, get_rate_limiter
 
 
+# Called after every LLM batch with its chunk, extraction and token counts
+BatchCallback = Callable[[Dict[str, Any]], None]
+
+
 def load_env() -> None:
     """Load environment variables."""
     try:
@@ -51,6 +62,8 @@ class KGExtractor:
         confidence_threshold: float = 0.5,
         workspace_id: Optional[str] = None,
         rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ExtractionCache] = None,
+        use_cache: bool = True,
     ):
         """
         Initialize KG extractor.
@@ -61,6 +74,9 @@ class KGExtractor:
             batch_size: Number of chunks to process per LLM call
             confidence_threshold: Minimum confidence to include extraction
             workspace_id: Workspace identifier for logging
+            rate_limiter: Optional rate limiter
+            cache: Optional extraction result cache (default: process-wide cache)
+            use_cache: Whether to read/write cached extraction results
         """
         self.model = model
         self.temperature = temperature
@@ -68,29 +84,41 @@ class KGExtractor:
         self.confidence_threshold = confidence_threshold
         self.workspace_id = workspace_id or "default"
         self.logger = get_logger("core_engine.kg.extractor", workspace_id=self.workspace_id)
-        self.client = get_openai_client()
+        # Background class: yields LLM capacity to interactive queries
+        self.client = schedule_openai_client(get_openai_client(), BACKGROUND)
         
         # Rate limiter (default: 500 RPM, 1M TPM for GPT-4o)
         self.rate_limiter = rate_limiter or get_rate_limiter(
             requests_per_minute=500,
             tokens_per_minute=1_000_000,
         )
+        
+        # Persistent extraction cache (skips LLM calls for already-seen chunks)
+        self.cache = cache if cache is not None else (get_extraction_cache() if use_cache else None)
+
+        # Running token usage of this extractor
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0, "cached_batches": 0}
 
     def extract_from_chunks(
-        self, chunks: List[Document]
+        self, chunks: List[Document], on_batch: Optional[BatchCallback] = None
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Extract knowledge from chunks.
 
         Args:
             chunks: List of document chunks
+            on_batch: Optional callback with per-batch counts ("chunks", "concepts",
+                "relationships", "quotes", "input_tokens", "output_tokens", "cached", "failed")
 
         Returns:
-            Dictionary with "concepts", "relationships", "quotes" arrays
+            Dictionary with "concepts", "relationships", "quotes" arrays and
+            "failed_batches" (batch number, chunk count and episode ids of each
+            batch whose extraction failed)
         """
         all_concepts: List[Dict[str, Any]] = []
         all_relationships: List[Dict[str, Any]] = []
         all_quotes: List[Dict[str, Any]] = []
+        failed_batches: List[Dict[str, Any]] = []
 
         total_chunks = len(chunks)
         self.logger.info(
@@ -120,6 +148,8 @@ class KGExtractor:
                 },
             )
 
+            usage_before = dict(self.usage)
+            batch_counts = {"concepts": 0, "relationships": 0, "quotes": 0, "failed": False}
             try:
                 result = self._extract_batch(batch)
                 
@@ -140,6 +170,9 @@ class KGExtractor:
                 all_concepts.extend(concepts)
                 all_relationships.extend(relationships)
                 all_quotes.extend(quotes)
+                batch_counts.update(
+                    concepts=len(concepts), relationships=len(relationships), quotes=len(quotes)
+                )
 
                 self.logger.info(
                     "extraction_batch_complete",
@@ -164,8 +197,22 @@ class KGExtractor:
                         }
                     },
                 )
+                batch_counts["failed"] = True
+                failed_batches.append({
+                    "batch": batch_num,
+                    "chunks": len(batch),
+                    "episode_ids": sorted({str(c.metadata.get("episode_id")) for c in batch}),
+                })
                 # Continue with next batch
-                continue
+
+            if on_batch:
+                on_batch({
+                    "chunks": len(batch),
+                    **batch_counts,
+                    "input_tokens": self.usage["input_tokens"] - usage_before["input_tokens"],
+                    "output_tokens": self.usage["output_tokens"] - usage_before["output_tokens"],
+                    "cached": self.usage["cached_batches"] > usage_before["cached_batches"],
+                })
 
         self.logger.info(
             "extraction_complete",
@@ -174,6 +221,8 @@ class KGExtractor:
                     "total_concepts": len(all_concepts),
                     "total_relationships": len(all_relationships),
                     "total_quotes": len(all_quotes),
+                    "failed_batches": len(failed_batches),
+                    "cache": self.cache.get_stats() if self.cache else None,
                 }
             },
         )
@@ -182,6 +231,7 @@ class KGExtractor:
             "concepts": all_concepts,
             "relationships": all_relationships,
             "quotes": all_quotes,
+            "failed_batches": failed_batches,
         }
 
     def _extract_batch(self, chunks: List[Document]) -> Dict[str, List[Dict[str, Any]]]:
@@ -194,7 +244,16 @@ class KGExtractor:
         Returns:
             Dictionary with extracted concepts, relationships, quotes
         """
-        prompt = build_extraction_prompt(chunks)
+        # Cached chunks are reused; only the others go to the LLM
+        pending = chunks
+        if self.cache:
+            cache_keys, cached = self.cache.lookup_batch(chunks, self.model)
+            pending = [chunk for chunk, key in zip(chunks, cache_keys) if key not in cached]
+            if not pending:
+                self.usage["cached_batches"] += 1
+                return self._enrich_with_metadata(merge_extractions([cached[k] for k in cache_keys]), chunks)
+
+        prompt = build_extraction_prompt(pending)
 
         # Call OpenAI with structured output (with rate limiting and retry)
         def make_api_call():
@@ -203,7 +262,7 @@ class KGExtractor:
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are a knowledge extraction expert. Extract structured knowledge from podcast transcripts. Return ONLY valid JSON, no explanatory text.",
+                        "content": EXTRACTION_SYSTEM_PROMPT,
                     },
                     {"role": "user", "content": prompt},
                 ],
@@ -214,7 +273,7 @@ class KGExtractor:
         # Use rate limiter with retry logic
         response = self.rate_limiter.retry_with_backoff(
             make_api_call,
-            operation_name=f"KG extraction (batch of {len(chunks)} chunks)",
+            operation_name=f"KG extraction (batch of {len(pending)} chunks)",
             on_retry=lambda attempt, error: self.logger.warning(
                 f"Retry attempt {attempt} for KG extraction",
                 extra={"error": str(error)}
@@ -222,7 +281,10 @@ class KGExtractor:
         )
         
         # Record token usage for rate limiting
+        self.usage["calls"] += 1
         if response.usage:
+            self.usage["input_tokens"] += response.usage.prompt_tokens or 0
+            self.usage["output_tokens"] += response.usage.completion_tokens or 0
             total_tokens = (response.usage.prompt_tokens or 0) + (response.usage.completion_tokens or 0)
             self.rate_limiter._record_request(tokens=total_tokens)
 
@@ -245,6 +307,11 @@ class KGExtractor:
         if not is_valid:
             raise ValueError(f"Invalid extraction output: {error_msg}")
 
+        if self.cache:
+            data = self.cache.finish_batch(cache_keys, cached, data, self.model)
+        else:
+            data = strip_chunk_numbers(data)
+
         # Enrich with chunk metadata
         enriched = self._enrich_with_metadata(data, chunks)
 
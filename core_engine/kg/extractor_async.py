@@ -8,7 +8,7 @@ from __future__ import annotations
 import json
 import os
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 try:
@@ -19,9 +19,35 @@ except ImportError:
 from langchain_core.documents import Document
 
 from core_engine.logging import get_logger
-from core_engine.kg.prompts import build_extraction_prompt
+from core_engine.kg.prompts import build_extraction_prompt, EXTRACTION_SYSTEM_PROMPT
+from core_engine.kg.extraction_cache import (
+    ExtractionCache,
+    get_extraction_cache,
+    merge_extractions,
+    strip_chunk_numbers,
+)
 from core_engine.kg.schemas import EXTRACTION_SCHEMA, validate_extraction_output
-from core_engine.utils.rate_limiter import RateLimiter, get_rate_limiter
+from core_engine.utils.adaptive_concurrency import (
+    AdaptiveConcurrency,
+    get_concurrency_controller,
+    is_rate_limit_error,
+)
+from core_engine.utils.llm_scheduler import BACKGROUND, schedule_openai_client
+from core_engine.utils.rate_limiter_async import (
+    AsyncRateLimiter,
+    estimate_tokens,
+    _is_retryable,
+    get_async_rate_limiter,
+    retry_after_seconds,
+    usage_tokens,
+)
+
+# Output tokens charged up front per extraction call, corrected from the response usage
+EXPECTED_COMPLETION_TOKENS = 2000
+
+
+class InvalidExtractionError(ValueError):
+    """The LLM answered with empty, malformed or invalid JSON; worth asking again."""
 
 
 def load_env() -> None:
@@ -52,7 +78,10 @@ class AsyncKGExtractor:
         confidence_threshold: float = 0.5,
         workspace_id: Optional[str] = None,
         max_concurrent: int = 20,  # Number of concurrent API calls
-        rate_limiter: Optional[RateLimiter] = None,
+        rate_limiter: Optional[AsyncRateLimiter] = None,
+        concurrency: Optional[AdaptiveConcurrency] = None,
+        cache: Optional[ExtractionCache] = None,
+        use_cache: bool = True,
     ):
         """
         Initialize async KG extractor.
@@ -63,8 +92,11 @@ class AsyncKGExtractor:
             batch_size: Number of chunks to process per LLM call
             confidence_threshold: Minimum confidence to include extraction
             workspace_id: Workspace identifier
-            max_concurrent: Maximum concurrent API calls
+            max_concurrent: Maximum concurrent API calls (upper bound of the adaptive window)
             rate_limiter: Optional rate limiter (shared across tasks)
+            concurrency: Optional adaptive concurrency controller (default: "kg_extraction")
+            cache: Optional extraction result cache (default: process-wide cache)
+            use_cache: Whether to read/write cached extraction results
         """
         self.model = model
         self.temperature = temperature
@@ -73,18 +105,24 @@ class AsyncKGExtractor:
         self.workspace_id = workspace_id or "default"
         self.max_concurrent = max_concurrent
         self.logger = get_logger("core_engine.kg.extractor_async", workspace_id=self.workspace_id)
-        self.client = get_async_openai_client()
+        # Background class: yields LLM capacity to interactive queries
+        self.client = schedule_openai_client(get_async_openai_client(), BACKGROUND)
         
-        # Shared rate limiter (thread-safe for async)
+        # Shared RPM/TPM token buckets (asyncio-native, never blocks the loop)
         # Note: Actual TPM limit for gpt-4o is often 30,000 (not 1M)
         # Adjust based on your OpenAI tier
-        self.rate_limiter = rate_limiter or get_rate_limiter(
+        self.rate_limiter = rate_limiter or get_async_rate_limiter(
             requests_per_minute=500,
             tokens_per_minute=30_000,  # Conservative: actual limit may be 30k
         )
         
-        # Semaphore to limit concurrent API calls
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        # Adaptive limit on concurrent API calls (shared by extractors in the process)
+        self.concurrency = concurrency or get_concurrency_controller(
+            "kg_extraction", max_window=max_concurrent
+        )
+        
+        # Persistent extraction cache (skips LLM calls for already-seen chunks)
+        self.cache = cache if cache is not None else (get_extraction_cache() if use_cache else None)
 
     async def extract_from_chunks(
         self, chunks: List[Document]
@@ -180,25 +218,10 @@ class AsyncKGExtractor:
                 )
                 continue
 
-            concepts, relationships, quotes = result
-
-            # Filter by confidence
-            filtered_concepts = [
-                c for c in concepts
-                if c.get("confidence", 0) >= self.confidence_threshold
-            ]
-            filtered_relationships = [
-                r for r in relationships
-                if r.get("confidence", 0) >= self.confidence_threshold
-            ]
-            filtered_quotes = [
-                q for q in quotes
-                if q.get("confidence", 0) >= self.confidence_threshold
-            ]
-
-            all_concepts.extend(filtered_concepts)
-            all_relationships.extend(filtered_relationships)
-            all_quotes.extend(filtered_quotes)
+            filtered = self._filter_by_confidence(result)
+            all_concepts.extend(filtered["concepts"])
+            all_relationships.extend(filtered["relationships"])
+            all_quotes.extend(filtered["quotes"])
 
         self.logger.info(
             "async_extraction_complete",
@@ -207,6 +230,7 @@ class AsyncKGExtractor:
                     "total_concepts": len(all_concepts),
                     "total_relationships": len(all_relationships),
                     "total_quotes": len(all_quotes),
+                    "cache": self.cache.get_stats() if self.cache else None,
                 }
             },
         )
@@ -217,6 +241,108 @@ class AsyncKGExtractor:
             "quotes": all_quotes,
         }
 
+    async def stream_from_chunks(
+        self,
+        chunks: List[Document],
+        num_workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[int, Dict[str, List[Dict[str, Any]]]]]:
+        """
+        Extract knowledge batch by batch, yielding each result as soon as it completes.
+
+        A fixed pool of worker tasks pulls batches from a bounded queue and puts
+        results on a second bounded queue, so at most `queue_size` finished
+        batches wait for the consumer. A slow consumer pauses the workers
+        instead of letting results pile up in memory.
+
+        Args:
+            chunks: List of document chunks
+            num_workers: Worker tasks (default: max_concurrent)
+            queue_size: Bound of the work and result queues (default: 2 x workers)
+
+        Yields:
+            (batch_num, extraction) in completion order; extraction has
+            confidence-filtered "concepts", "relationships", "quotes"
+            (empty for a failed batch)
+        """
+        total_chunks = len(chunks)
+        total_batches = (total_chunks + self.batch_size - 1) // self.batch_size
+        if total_batches == 0:
+            return
+        num_workers = max(1, min(num_workers or self.max_concurrent, total_batches))
+        queue_size = queue_size or num_workers * 2
+
+        self.logger.info(
+            "async_streaming_extraction_start",
+            extra={
+                "context": {
+                    "total_chunks": total_chunks,
+                    "total_batches": total_batches,
+                    "workers": num_workers,
+                    "queue_size": queue_size,
+                }
+            },
+        )
+
+        work: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        results: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+        async def produce() -> None:
+            for i in range(0, total_chunks, self.batch_size):
+                await work.put((i // self.batch_size + 1, chunks[i : i + self.batch_size]))
+            for _ in range(num_workers):
+                await work.put(None)
+
+        async def worker() -> None:
+            while True:
+                item = await work.get()
+                if item is None:
+                    return
+                batch_num, batch = item
+                try:
+                    result = await self._extract_batch_async(batch_num, batch, total_batches)
+                    extraction = self._filter_by_confidence(result)
+                except Exception as e:
+                    self.logger.error(
+                        "extraction_batch_failed",
+                        exc_info=True,
+                        extra={"context": {"batch": batch_num, "error": str(e)}},
+                    )
+                    extraction = {"concepts": [], "relationships": [], "quotes": []}
+                await results.put((batch_num, extraction))
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(worker()) for _ in range(num_workers)]
+        try:
+            for _ in range(total_batches):
+                yield await results.get()
+        finally:
+            # Consumer stopped early or failed: stop the pool
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _filter_by_confidence(
+        self,
+        result: tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]],
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Drop extractions below the confidence threshold."""
+        concepts, relationships, quotes = result
+        return {
+            "concepts": [
+                c for c in concepts
+                if c.get("confidence", 0) >= self.confidence_threshold
+            ],
+            "relationships": [
+                r for r in relationships
+                if r.get("confidence", 0) >= self.confidence_threshold
+            ],
+            "quotes": [
+                q for q in quotes
+                if q.get("confidence", 0) >= self.confidence_threshold
+            ],
+        }
+
     async def _extract_batch_async(
         self,
         batch_num: int,
@@ -234,97 +360,110 @@ class AsyncKGExtractor:
         Returns:
             Tuple of (concepts, relationships, quotes)
         """
-        # Acquire semaphore (limit concurrent calls)
-        async with self.semaphore:
-            # Wait for rate limits (thread-safe, blocking call in async context is OK)
-            # We run this in executor to avoid blocking event loop
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, self.rate_limiter._wait_for_rate_limit)
+        # Cached chunks are reused; only the others go to the LLM
+        pending = chunks
+        if self.cache:
+            cache_keys, cached = self.cache.lookup_batch(chunks, self.model)
+            pending = [chunk for chunk, key in zip(chunks, cache_keys) if key not in cached]
+            if not pending:
+                enriched = self._enrich_with_metadata(merge_extractions([cached[k] for k in cache_keys]), chunks)
+                return (
+                    enriched.get("concepts", []),
+                    enriched.get("relationships", []),
+                    enriched.get("quotes", []),
+                )
 
-            prompt = build_extraction_prompt(chunks)
+        prompt = build_extraction_prompt(pending)
+        estimated = estimate_tokens(
+            (EXTRACTION_SYSTEM_PROMPT, prompt), completion_tokens=EXPECTED_COMPLETION_TOKENS
+        )
 
-            # Retry logic with exponential backoff
-            max_retries = 5
-            last_exception = None
+        # Retry logic with exponential backoff
+        max_retries = 5
+        last_exception = None
 
-            for attempt in range(max_retries + 1):
-                try:
-                    # Make async API call
-                    response = await self.client.chat.completions.create(
+        for attempt in range(max_retries + 1):
+            # Charge the estimate up front; corrected once the usage is known
+            reservation = await self.rate_limiter.acquire(estimated)
+            try:
+                # In-flight window adapts to 429s, latency and rate-limit headers (AIMD)
+                async with self.concurrency.slot() as slot:
+                    raw = await self.client.chat.completions.with_raw_response.create(
                         model=self.model,
                         messages=[
                             {
                                 "role": "system",
-                                "content": "You are a knowledge extraction expert. Extract structured knowledge from podcast transcripts. Return ONLY valid JSON, no explanatory text.",
+                                "content": EXTRACTION_SYSTEM_PROMPT,
                             },
                             {"role": "user", "content": prompt},
                         ],
                         temperature=self.temperature,
                         response_format={"type": "json_object"},
                     )
+                    slot.observe_headers(raw.headers)
+                response = raw.parse()
+
+                reservation.settle(usage_tokens(response))
 
-                    # Record token usage (thread-safe)
-                    if response.usage:
-                        total_tokens = (
-                            (response.usage.prompt_tokens or 0) +
-                            (response.usage.completion_tokens or 0)
-                        )
-                        self.rate_limiter._record_request(tokens=total_tokens)
-
-                    # Parse response
-                    content = response.choices[0].message.content
-                    if not content:
-                        raise ValueError("Empty response from LLM")
-
-                    try:
-                        data = json.loads(content)
-                    except json.JSONDecodeError as e:
-                        self.logger.error(
-                            "json_parse_error",
-                            extra={"context": {"error": str(e), "content_preview": content[:200]}},
-                        )
-                        raise ValueError(f"Invalid JSON response: {e}")
-
-                    # Validate output
-                    is_valid, error_msg = validate_extraction_output(data)
-                    if not is_valid:
-                        raise ValueError(f"Invalid extraction output: {error_msg}")
-
-                    # Enrich with metadata
-                    enriched = self._enrich_with_metadata(data, chunks)
-
-                    return (
-                        enriched.get("concepts", []),
-                        enriched.get("relationships", []),
-                        enriched.get("quotes", []),
+                # Parse response
+                content = response.choices[0].message.content
+                if not content:
+                    raise InvalidExtractionError("Empty response from LLM")
+
+                try:
+                    data = json.loads(content)
+                except json.JSONDecodeError as e:
+                    self.logger.error(
+                        "json_parse_error",
+                        extra={"context": {"error": str(e), "content_preview": content[:200]}},
                     )
+                    raise InvalidExtractionError(f"Invalid JSON response: {e}")
 
-                except Exception as e:
-                    last_exception = e
-                    
-                    # Check if rate limit error
-                    is_rate_limit = (
-                        hasattr(e, 'status_code') and e.status_code == 429
-                    ) or "rate limit" in str(e).lower()
-
-                    if attempt < max_retries:
-                        # Calculate delay
-                        if is_rate_limit:
-                            delay = max(60.0, 2.0 ** attempt)  # At least 60s for rate limits
-                        else:
-                            delay = min(2.0 ** attempt, 120.0)  # Exponential backoff
-
-                        self.logger.warning(
-                            f"Retry attempt {attempt + 1}/{max_retries} for batch {batch_num}",
-                            extra={"error": str(e), "delay": delay}
-                        )
-                        await asyncio.sleep(delay)
-                    else:
-                        self.logger.error(
-                            f"Failed batch {batch_num} after {max_retries} retries",
-                            extra={"error": str(e)}
-                        )
-                        raise
+                # Validate output
+                is_valid, error_msg = validate_extraction_output(data)
+                if not is_valid:
+                    raise InvalidExtractionError(f"Invalid extraction output: {error_msg}")
+
+                if self.cache:
+                    data = self.cache.finish_batch(cache_keys, cached, data, self.model)
+                else:
+                    data = strip_chunk_numbers(data)
+
+                # Enrich with metadata
+                enriched = self._enrich_with_metadata(data, chunks)
+
+                return (
+                    enriched.get("concepts", []),
+                    enriched.get("relationships", []),
+                    enriched.get("quotes", []),
+                )
+
+            except Exception as e:
+                last_exception = e
+                # Failed requests generate nothing; settled calls keep their usage
+                reservation.settle(0)
+
+                # Bad answers and transient API errors are retried; anything else
+                # (a bad request, or a bug) fails the batch at once
+                retryable = isinstance(e, InvalidExtractionError) or _is_retryable(e)
+                if retryable and attempt < max_retries:
+                    # Exponential backoff; on a 429 the concurrency window has already
+                    # shrunk, so wait what the server asks for instead of a flat minute
+                    delay = min(2.0 ** attempt, 120.0)
+                    if is_rate_limit_error(e):
+                        delay = max(delay, retry_after_seconds(e) or 1.0)
+
+                    self.logger.warning(
+                        f"Retry attempt {attempt + 1}/{max_retries} for batch {batch_num}",
+                        extra={"error": str(e), "delay": delay}
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    self.logger.error(
+                        f"Failed batch {batch_num} after {attempt} retries",
+                        extra={"error": str(e)}
+                    )
+                    raise
 
         # Should never reach here
         if last_exception:
@@ -0,0 +1,65 @@
+"""
+Migrate an existing graph to the shared :Entity label.
+
+Adds :Entity to every concept-like node (Concept, Practice, Person, ...),
+drops the old per-label id constraints and creates the (workspace_id, id)
+uniqueness constraint on :Entity (or a plain index on it if the constraint
+cannot be created). Idempotent. `initialize_schema` (and so every ingestion
+job) refuses to run while the old constraints exist; run this once first.
+
+Nodes that share a (workspace_id, id), typically the same id under different
+labels, would collapse into one key. They are checked first; if any exist the
+graph is left unchanged and they are listed so they can be merged first.
+
+Usage:
+  python -m core_engine.kg.migrate_entities
+  python -m core_engine.kg.migrate_entities --batch-size 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure repo root on sys.path when run as a script
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from core_engine.kg.neo4j_client import get_neo4j_client
+from core_engine.kg.schema import SchemaManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000, help="Nodes labelled per transaction")
+    parser.add_argument("--max-duplicates", type=int, default=20, help="Duplicate keys to print")
+    args = parser.parse_args()
+
+    client = get_neo4j_client()
+    try:
+        stats = SchemaManager(client).migrate_entity_label(batch_size=args.batch_size)
+    finally:
+        client.close()
+
+    duplicates = stats["duplicates"]
+    if stats["aborted"]:
+        conflicts = sum(1 for row in duplicates if row["type_conflict"])
+        print(
+            f"{len(duplicates)} (workspace_id, id) keys are used by more than one node "
+            f"({conflicts} with different types):"
+        )
+        for row in duplicates[: args.max_duplicates]:
+            print(f"  {row['workspace_id']} / {row['id']}: {row['nodes']} nodes {row['labels']}")
+        print("Nothing was changed. Merge or re-key them and re-run.")
+        sys.exit(1)
+
+    for label, count in stats["labelled"].items():
+        print(f"{label:<20}{count:>10} labelled")
+    print(f"{'total':<20}{stats['labelled_total']:>10} labelled")
+    print(f"\n:Entity (workspace_id, id) {stats['entity_key']} in place.")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,18 @@ Handles connection, schema initialization, and basic utilities.
 from __future__ import annotations
 
 import os
-from typing import Optional, Dict, Any, List
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, List
 from dotenv import load_dotenv
 
 try:
-    from neo4j import GraphDatabase, Driver, Session
+    from neo4j import Driver, Session
 except ImportError:
     raise ImportError(
         "neo4j package not installed. Install with: pip install neo4j"
     )
 
+from core_engine.kg.driver_registry import get_driver_registry
 from core_engine.logging import get_logger
 
 
@@ -41,7 +43,12 @@ def get_neo4j_config() -> Dict[str, Optional[str]]:
 
 
 class Neo4jClient:
-    """Neo4j client wrapper for knowledge graph operations."""
+    """
+    Neo4j client wrapper for knowledge graph operations.
+
+    Clients are cheap: the underlying driver and its connection pool come from
+    the process-wide `DriverRegistry`, and `close()` only releases the client.
+    """
 
     def __init__(
         self,
@@ -73,36 +80,27 @@ class Neo4jClient:
         self._connect()
 
     def _connect(self) -> None:
-        """Establish connection to Neo4j."""
-        try:
-            self._driver = GraphDatabase.driver(
-                self.uri,
-                auth=(self.user, self.password),
-            )
-            # Verify connection
-            self._driver.verify_connectivity()
-            self.logger.info(
-                "neo4j_connected",
-                extra={
-                    "context": {
-                        "uri": self.uri,
-                        "database": self.database,
-                    }
-                },
-            )
-        except Exception as e:
-            self.logger.error(
-                "neo4j_connection_failed",
-                exc_info=True,
-                extra={"context": {"error": str(e), "uri": self.uri}},
-            )
-            raise
+        """Borrow the shared driver for this uri/database from the registry."""
+        self._driver = get_driver_registry().get_driver(
+            self.uri, self.user, self.password, self.database
+        )
 
-    def close(self) -> None:
-        """Close Neo4j connection."""
+    def _reconnect(self, error: Exception) -> None:
+        """Replace the shared driver if `error` shows it is broken; otherwise keep it."""
         if self._driver:
-            self._driver.close()
-            self.logger.info("neo4j_connection_closed")
+            get_driver_registry().recover(self._driver, error)
+        self._connect()
+
+    @property
+    def driver(self) -> Driver:
+        """Shared neo4j driver."""
+        if not self._driver:
+            raise RuntimeError("Neo4j driver not initialized")
+        return self._driver
+
+    def close(self) -> None:
+        """Release this client (the shared driver stays open for other clients)."""
+        self._driver = None
 
     def __enter__(self):
         """Context manager entry."""
@@ -112,11 +110,14 @@ class Neo4jClient:
         """Context manager exit."""
         self.close()
 
-    def get_session(self) -> Session:
-        """Get a Neo4j session."""
-        if not self._driver:
-            raise RuntimeError("Neo4j driver not initialized")
-        return self._driver.session(database=self.database)
+    @contextmanager
+    def get_session(self) -> Iterator[Session]:
+        """Borrow a pooled Neo4j session."""
+        # Re-borrow on every session so long-lived clients pick up a driver
+        # rebuilt after another client's connection failure (a dict lookup)
+        self._connect()
+        with get_driver_registry().session(self._driver, self.database) as session:
+            yield session
 
     def execute_read(self, query: str, parameters: Optional[Dict[str, Any]] = None, max_retries: int = 3) -> List[Dict[str, Any]]:
         """
@@ -150,13 +151,7 @@ class Neo4jClient:
                                 }
                             },
                         )
-                        # Reconnect
-                        try:
-                            if self._driver:
-                                self._driver.close()
-                        except Exception:
-                            pass
-                        self._connect()
+                        self._reconnect(e)
                         continue
                 # If not a connection error or last attempt, raise
                 raise
@@ -198,13 +193,7 @@ class Neo4jClient:
                                 }
                             },
                         )
-                        # Reconnect
-                        try:
-                            if self._driver:
-                                self._driver.close()
-                        except Exception:
-                            pass
-                        self._connect()
+                        self._reconnect(e)
                         continue
                 # If not a connection error or last attempt, raise
                 raise
@@ -264,7 +253,7 @@ def get_neo4j_client(
     database: Optional[str] = None,
 ) -> Neo4jClient:
     """
-    Get a Neo4j client instance.
+    Get a Neo4j client instance backed by the shared driver pool.
 
     Args:
         workspace_id: Workspace identifier
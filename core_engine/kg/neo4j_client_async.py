@@ -0,0 +1,218 @@
+"""
+Async Neo4j client for use from async code (FastAPI routes, async pipelines).
+Same surface as `Neo4jClient`, built on the driver's async API and the shared
+driver registry.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from neo4j import AsyncDriver, AsyncSession
+
+from core_engine.kg.driver_registry import get_driver_registry
+from core_engine.kg.neo4j_client import get_neo4j_config
+from core_engine.logging import get_logger
+
+
+# Error substrings that trigger a reconnect and retry (same as Neo4jClient)
+_RETRYABLE = ("timeout", "connection", "routing", "unavailable")
+
+
+class AsyncNeo4jClient:
+    """Async Neo4j client wrapper for knowledge graph operations."""
+
+    def __init__(
+        self,
+        uri: Optional[str] = None,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        database: Optional[str] = None,
+        workspace_id: Optional[str] = None,
+    ):
+        """
+        Initialize async Neo4j client. The driver is borrowed lazily on first use.
+
+        Args:
+            uri: Neo4j connection URI (default: from env)
+            user: Username (default: from env)
+            password: Password (default: from env)
+            database: Database name (default: from env)
+            workspace_id: Workspace identifier for logging
+        """
+        config = get_neo4j_config()
+        self.uri = uri or config["uri"]
+        self.user = user or config["user"]
+        self.password = password or config["password"]
+        self.database = database or config["database"]
+        self.workspace_id = workspace_id or "default"
+        self.logger = get_logger("core_engine.kg", workspace_id=self.workspace_id)
+
+        self._driver: Optional[AsyncDriver] = None
+
+    async def _connect(self) -> AsyncDriver:
+        """Borrow the shared async driver for this uri/database and event loop."""
+        self._driver = await get_driver_registry().get_async_driver(
+            self.uri, self.user, self.password, self.database
+        )
+        return self._driver
+
+    async def _reconnect(self, error: Exception) -> None:
+        """Replace the shared driver if `error` shows it is broken; otherwise keep it."""
+        if self._driver:
+            await get_driver_registry().arecover(self._driver, error)
+        await self._connect()
+
+    async def close(self) -> None:
+        """Release this client (the shared driver stays open for other clients)."""
+        self._driver = None
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self._connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncIterator[AsyncSession]:
+        """Borrow a pooled async Neo4j session."""
+        driver = await self._connect()
+        async with get_driver_registry().async_session(driver, self.database) as session:
+            yield session
+
+    async def _run_with_retry(
+        self, query: str, parameters: Optional[Dict[str, Any]], max_retries: int
+    ) -> List[Dict[str, Any]]:
+        for attempt in range(max_retries):
+            try:
+                async with self.get_session() as session:
+                    result = await session.run(query, parameters or {})
+                    return [record.data() async for record in result]
+            except Exception as e:
+                error_str = str(e).lower()
+                # Check if it's a connection/timeout error
+                if any(keyword in error_str for keyword in _RETRYABLE):
+                    if attempt < max_retries - 1:
+                        self.logger.warning(
+                            "neo4j_connection_retry",
+                            extra={
+                                "context": {
+                                    "attempt": attempt + 1,
+                                    "max_retries": max_retries,
+                                    "error": str(e),
+                                }
+                            },
+                        )
+                        await self._reconnect(e)
+                        continue
+                # If not a connection error or last attempt, raise
+                raise
+        raise RuntimeError("Failed to execute query after retries")
+
+    async def execute_read(
+        self, query: str, parameters: Optional[Dict[str, Any]] = None, max_retries: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute a read query with retry on connection timeout.
+
+        Args:
+            query: Cypher query
+            parameters: Query parameters
+            max_retries: Maximum retry attempts on connection failure
+
+        Returns:
+            List of result records
+        """
+        return await self._run_with_retry(query, parameters, max_retries)
+
+    async def execute_write(
+        self, query: str, parameters: Optional[Dict[str, Any]] = None, max_retries: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute a write query with retry on connection timeout.
+
+        Args:
+            query: Cypher query
+            parameters: Query parameters
+            max_retries: Maximum retry attempts on connection failure
+
+        Returns:
+            List of result records
+        """
+        return await self._run_with_retry(query, parameters, max_retries)
+
+    async def execute_write_batch(
+        self, queries: List[tuple[str, Optional[Dict[str, Any]]]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Execute multiple write queries in a transaction.
+
+        Args:
+            queries: List of (query, parameters) tuples
+
+        Returns:
+            List of result lists (one per query)
+        """
+        results = []
+        async with self.get_session() as session:
+            async with await session.begin_transaction() as tx:
+                for query, parameters in queries:
+                    result = await tx.run(query, parameters or {})
+                    results.append([record.data() async for record in result])
+                await tx.commit()
+        self.logger.info(
+            "neo4j_batch_write_complete",
+            extra={"context": {"queries": len(queries)}},
+        )
+        return results
+
+    async def test_connection(self) -> bool:
+        """
+        Test Neo4j connection.
+
+        Returns:
+            True if connection successful
+        """
+        try:
+            result = await self.execute_read("RETURN 1 as test")
+            return len(result) > 0 and result[0].get("test") == 1
+        except Exception as e:
+            self.logger.error(
+                "neo4j_connection_test_failed",
+                exc_info=True,
+                extra={"context": {"error": str(e)}},
+            )
+            return False
+
+
+def get_async_neo4j_client(
+    workspace_id: Optional[str] = None,
+    uri: Optional[str] = None,
+    user: Optional[str] = None,
+    password: Optional[str] = None,
+    database: Optional[str] = None,
+) -> AsyncNeo4jClient:
+    """
+    Get an async Neo4j client instance backed by the shared driver pool.
+
+    Args:
+        workspace_id: Workspace identifier
+        uri: Neo4j URI (optional, uses env if not provided)
+        user: Username (optional, uses env if not provided)
+        password: Password (optional, uses env if not provided)
+        database: Database name (optional, uses env if not provided)
+
+    Returns:
+        AsyncNeo4jClient instance
+    """
+    return AsyncNeo4jClient(
+        uri=uri,
+        user=user,
+        password=password,
+        database=database,
+        workspace_id=workspace_id,
+    )
@@ -6,11 +6,16 @@ Normalizes concept names and links to existing nodes in Neo4j.
 from __future__ import annotations
 
 import re
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Iterable
 from core_engine.kg.neo4j_client import Neo4jClient
+from core_engine.kg.schema import ENTITY_LABELS, NodeLabels
 from core_engine.logging import get_logger
 
 
+# Extraction type -> Neo4j label (unknown types are written as Concept)
+CONCEPT_LABELS = ENTITY_LABELS
+
+
 def normalize_concept_id(name: str) -> str:
     """
     Normalize concept name to ID.
@@ -52,21 +57,150 @@ def normalize_concept_name(name: str) -> str:
 class EntityNormalizer:
     """Normalize and deduplicate entities."""
 
-    def __init__(self, client: Neo4jClient, workspace_id: Optional[str] = None):
+    def __init__(
+        self,
+        client: Neo4jClient,
+        workspace_id: Optional[str] = None,
+        preload_max_ids: int = 100_000,
+        lookup_batch_size: int = 1000,
+    ):
         """
         Initialize normalizer.
 
         Args:
             client: Neo4j client
             workspace_id: Workspace identifier
+            preload_max_ids: Load every existing id of the workspace into memory
+                when it has at most this many concept nodes (0 disables preloading)
+            lookup_batch_size: Ids per UNWIND lookup query when not preloaded
         """
         self.client = client
         self.workspace_id = workspace_id or "default"
+        self.preload_max_ids = preload_max_ids
+        self.lookup_batch_size = lookup_batch_size
         self.logger = get_logger(
             "core_engine.kg.normalizer",
             workspace_id=self.workspace_id,
         )
-        self._cache: Dict[str, Optional[str]] = {}  # Cache normalized_id -> existing_id
+        self._cache: Dict[str, Optional[str]] = {}  # Cache "<label|any>:<id>" -> existing_id
+        # label -> ids, populated once per instance when the workspace is small enough
+        self._ids_by_label: Optional[Dict[str, Set[str]]] = None
+        self._preload_checked = False
+
+    @staticmethod
+    def _label_for(concept_type: str) -> str:
+        return concept_type if concept_type in CONCEPT_LABELS else "Concept"
+
+    def preload(self) -> bool:
+        """
+        Load every concept id of the workspace into memory if it is small enough.
+
+        Returns:
+            True if ids are preloaded
+        """
+        if self._preload_checked:
+            return self._ids_by_label is not None
+        self._preload_checked = True
+        if self.preload_max_ids <= 0:
+            return False
+
+        count_result = self.client.execute_read(
+            f"""
+            MATCH (c:{NodeLabels.ENTITY})
+            WHERE c.workspace_id = $workspace_id
+            RETURN count(c) as count
+            """,
+            {"workspace_id": self.workspace_id},
+        )
+        count = count_result[0]["count"] if count_result else 0
+        if count > self.preload_max_ids:
+            self.logger.info(
+                "normalizer_preload_skipped",
+                extra={"context": {"nodes": count, "preload_max_ids": self.preload_max_ids}},
+            )
+            return False
+
+        rows = self.client.execute_read(
+            f"""
+            MATCH (c:{NodeLabels.ENTITY})
+            WHERE c.workspace_id = $workspace_id
+            RETURN c.id as id, labels(c) as labels
+            """,
+            {"workspace_id": self.workspace_id},
+        )
+        ids_by_label: Dict[str, Set[str]] = {label: set() for label in CONCEPT_LABELS}
+        for row in rows:
+            for label in row["labels"]:
+                if label in ids_by_label:
+                    ids_by_label[label].add(row["id"])
+        self._ids_by_label = ids_by_label
+        self.logger.info(
+            "normalizer_preload_complete",
+            extra={"context": {"nodes": len(rows)}},
+        )
+        return True
+
+    def resolve_ids(self, ids: Iterable[str]) -> None:
+        """
+        Resolve which ids already exist, filling the cache in as few queries as possible.
+
+        Uses the preloaded id sets when available, otherwise one UNWIND query per
+        `lookup_batch_size` ids that are not cached yet.
+
+        Args:
+            ids: Normalized concept ids
+        """
+        if self.preload():
+            return
+
+        pending = [
+            i for i in dict.fromkeys(ids)
+            if i and f"any:{i}" not in self._cache
+        ]
+        for start in range(0, len(pending), self.lookup_batch_size):
+            batch = pending[start : start + self.lookup_batch_size]
+            rows = self.client.execute_read(
+                f"""
+                UNWIND $ids AS id
+                MATCH (c:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: id}})
+                RETURN c.id as id, labels(c) as labels
+                """,
+                {"ids": batch, "workspace_id": self.workspace_id},
+            )
+            found: Dict[str, Set[str]] = {}
+            for row in rows:
+                found.setdefault(row["id"], set()).update(row["labels"])
+            for concept_id in batch:
+                labels = found.get(concept_id, set())
+                self._cache[f"any:{concept_id}"] = concept_id if labels else None
+                for label in CONCEPT_LABELS:
+                    self._cache[f"{label}:{concept_id}"] = concept_id if label in labels else None
+
+        self.logger.debug(
+            "normalizer_ids_resolved",
+            extra={"context": {"looked_up": len(pending)}},
+        )
+
+    def _lookup(self, label: Optional[str], concept_id: str) -> Optional[str]:
+        """Answer an existence check from the preload or cache; raises KeyError if unknown."""
+        if self._ids_by_label is not None:
+            if label is None:
+                exists = any(concept_id in ids for ids in self._ids_by_label.values())
+            else:
+                exists = concept_id in self._ids_by_label.get(label, ())
+            return concept_id if exists else None
+        return self._cache[f"{label or 'any'}:{concept_id}"]
+
+    def _remember(self, concepts: List[Dict[str, Any]]) -> None:
+        """Record ids about to be written so later batches of this job see them."""
+        for concept in concepts:
+            label = self._label_for(concept.get("type", "Concept"))
+            concept_id = concept["id"]
+            if self._ids_by_label is not None:
+                self._ids_by_label[label].add(concept_id)
+            else:
+                self._cache[f"{label}:{concept_id}"] = concept_id
+                self._cache[f"any:{concept_id}"] = concept_id
 
     def normalize_concept(self, concept: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -145,28 +279,12 @@ class EntityNormalizer:
         Returns:
             Existing concept ID if found, None otherwise
         """
-        # Check cache first
-        cache_key = f"{concept_type}:{normalized_id}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-        
-        # Query Neo4j
-        # Map concept type to Neo4j label
-        label_map = {
-            "Concept": "Concept",
-            "Practice": "Practice",
-            "CognitiveState": "CognitiveState",
-            "BehavioralPattern": "BehavioralPattern",
-            "Principle": "Principle",
-            "Outcome": "Outcome",
-            "Causality": "Causality",
-            "Person": "Person",
-            "Place": "Place",
-            "Organization": "Organization",
-            "Event": "Event",
-        }
-        label = label_map.get(concept_type, "Concept")
-        
+        label = self._label_for(concept_type)
+        try:
+            return self._lookup(label, normalized_id)
+        except KeyError:
+            pass
+
         query = f"""
         MATCH (c:{label})
         WHERE c.id = $id AND c.workspace_id = $workspace_id
@@ -180,7 +298,7 @@ class EntityNormalizer:
         )
         
         existing_id = result[0]["id"] if result else None
-        self._cache[cache_key] = existing_id
+        self._cache[f"{label}:{normalized_id}"] = existing_id
         
         return existing_id
     
@@ -195,19 +313,13 @@ class EntityNormalizer:
         Returns:
             Existing concept ID if found, None otherwise
         """
-        # Check cache first
-        cache_key = f"any:{concept_id}"
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        try:
+            return self._lookup(None, concept_id)
+        except KeyError:
+            pass
         
-        # Query Neo4j - check all concept labels
-        query = """
-        MATCH (c)
-        WHERE c.id = $id 
-          AND c.workspace_id = $workspace_id
-          AND (c:Concept OR c:Practice OR c:CognitiveState OR c:BehavioralPattern 
-               OR c:Principle OR c:Outcome OR c:Causality OR c:Person 
-               OR c:Place OR c:Organization OR c:Event)
+        query = f"""
+        MATCH (c:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: $id}})
         RETURN c.id as id
         LIMIT 1
         """
@@ -218,7 +330,7 @@ class EntityNormalizer:
         )
         
         existing_id = result[0]["id"] if result else None
-        self._cache[cache_key] = existing_id
+        self._cache[f"any:{concept_id}"] = existing_id
         return existing_id
 
     def normalize_extraction(
@@ -233,10 +345,17 @@ class EntityNormalizer:
         Returns:
             Normalized extraction result
         """
+        concepts = extraction.get("concepts", [])
+        relationships = extraction.get("relationships", [])
+
+        # Resolve every candidate id (concepts and relationship endpoints) up front
+        self.resolve_ids(
+            [normalize_concept_id(c.get("name", "")) for c in concepts]
+            + [normalize_concept_id(r.get(k, "")) for r in relationships for k in ("source_id", "target_id")]
+        )
+
         # Normalize concepts first
-        normalized_concepts = [
-            self.normalize_concept(c) for c in extraction.get("concepts", [])
-        ]
+        normalized_concepts = [self.normalize_concept(c) for c in concepts]
         
         # Build a map from normalized_id -> actual_id (in case concepts were linked)
         # This ensures relationships reference the correct concept IDs
@@ -252,7 +371,7 @@ class EntityNormalizer:
         
         # Normalize relationships and update IDs to match actual concept IDs
         normalized_relationships = []
-        for r in extraction.get("relationships", []):
+        for r in relationships:
             normalized_rel = self.normalize_relationship(r)
             # Update source_id and target_id to use actual concept IDs
             source_id = normalized_rel.get("source_id", "")
@@ -277,6 +396,8 @@ class EntityNormalizer:
             
             normalized_relationships.append(normalized_rel)
         
+        self._remember(normalized_concepts)
+
         # Quotes don't need normalization (just pass through)
         normalized_quotes = extraction.get("quotes", [])
         
@@ -11,7 +11,7 @@ from langchain_core.documents import Document
 
 from core_engine.kg.neo4j_client import get_neo4j_client
 from core_engine.kg.schema import initialize_schema
-from core_engine.kg.extractor import KGExtractor
+from core_engine.kg.extractor import BatchCallback, KGExtractor
 from core_engine.kg.normalizer import EntityNormalizer
 from core_engine.kg.writer import KGWriter
 from core_engine.logging import get_logger
@@ -76,15 +76,17 @@ class KGExtractionPipeline:
         initialize_schema(self.client)
         self.logger.info("pipeline_initialized")
 
-    def process_chunks(self, chunks: List[Document]) -> dict:
+    def process_chunks(self, chunks: List[Document], on_batch: Optional[BatchCallback] = None) -> dict:
         """
         Process chunks through the complete pipeline.
 
         Args:
             chunks: List of document chunks
+            on_batch: Optional callback with the counts of each extraction batch
 
         Returns:
-            Dictionary with extraction statistics
+            Dictionary with extraction statistics; "failed_batches" lists the
+            extraction batches that failed (their chunks are not in the graph)
         """
         self.logger.info(
             "pipeline_start",
@@ -93,7 +95,7 @@ class KGExtractionPipeline:
 
         # Step 1: Extract
         self.logger.info("step_extract")
-        extraction = self.extractor.extract_from_chunks(chunks)
+        extraction = self.extractor.extract_from_chunks(chunks, on_batch=on_batch)
 
         # Step 2: Normalize
         self.logger.info("step_normalize")
@@ -121,6 +123,7 @@ class KGExtractionPipeline:
                 "quotes": len(extraction.get("quotes", [])),
             },
             "written": counts,
+            "failed_batches": extraction.get("failed_batches", []),
         }
 
     def close(self) -> None:
@@ -4,7 +4,10 @@ Async KG extraction pipeline with concurrent processing.
 
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import time
+from contextlib import aclosing
+from typing import Callable, List, Optional
 from pathlib import Path
 from langchain_core.documents import Document
 
@@ -14,7 +17,7 @@ from core_engine.kg.extractor_async import AsyncKGExtractor
 from core_engine.kg.normalizer import EntityNormalizer
 from core_engine.kg.writer import KGWriter
 from core_engine.logging import get_logger
-from core_engine.utils.rate_limiter import get_rate_limiter
+from core_engine.utils.rate_limiter_async import get_async_rate_limiter
 
 
 class AsyncKGExtractionPipeline:
@@ -27,6 +30,8 @@ class AsyncKGExtractionPipeline:
         batch_size: int = 10,  # Increased default
         confidence_threshold: float = 0.5,
         max_concurrent: int = 20,  # Concurrent API calls
+        streaming: bool = False,
+        queue_size: Optional[int] = None,
         neo4j_uri: Optional[str] = None,
         neo4j_user: Optional[str] = None,
         neo4j_password: Optional[str] = None,
@@ -40,11 +45,15 @@ class AsyncKGExtractionPipeline:
             batch_size: Chunks per LLM call
             confidence_threshold: Minimum confidence score
             max_concurrent: Maximum concurrent API calls
+            streaming: Normalize and write each batch as soon as it is extracted
+            queue_size: Finished batches allowed to wait for the writer (streaming only)
             neo4j_uri: Neo4j URI (optional)
             neo4j_user: Neo4j username (optional)
             neo4j_password: Neo4j password (optional)
         """
         self.workspace_id = workspace_id or "default"
+        self.streaming = streaming
+        self.queue_size = queue_size
         self.logger = get_logger("core_engine.kg.pipeline_async", workspace_id=self.workspace_id)
         
         # Initialize components
@@ -56,7 +65,7 @@ class AsyncKGExtractionPipeline:
         )
         
         # Shared rate limiter
-        rate_limiter = get_rate_limiter(
+        rate_limiter = get_async_rate_limiter(
             requests_per_minute=500,
             tokens_per_minute=1_000_000,
         )
@@ -96,6 +105,9 @@ class AsyncKGExtractionPipeline:
         Returns:
             Dictionary with extraction statistics
         """
+        if self.streaming:
+            return await self.process_chunks_streaming(chunks)
+
         self.logger.info(
             "async_pipeline_start",
             extra={"context": {"chunks": len(chunks)}},
@@ -120,6 +132,7 @@ class AsyncKGExtractionPipeline:
                     "concepts": counts.get("concepts", 0),
                     "relationships": counts.get("relationships", 0),
                     "quotes": counts.get("quotes", 0),
+                    "concurrency": self.extractor.concurrency.get_stats(),
                 }
             },
         )
@@ -133,6 +146,76 @@ class AsyncKGExtractionPipeline:
             "written": counts,
         }
 
+    async def process_chunks_streaming(
+        self,
+        chunks: List[Document],
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> dict:
+        """
+        Process chunks batch by batch: each extracted batch is normalized and
+        written before the next one is taken, so memory stays flat and results
+        are queryable while extraction is still running.
+
+        Args:
+            chunks: List of document chunks
+            on_progress: Optional callback(batches_done, total_batches)
+
+        Returns:
+            Dictionary with extraction statistics
+        """
+        total_batches = (len(chunks) + self.extractor.batch_size - 1) // self.extractor.batch_size
+        self.logger.info(
+            "async_pipeline_streaming_start",
+            extra={"context": {"chunks": len(chunks), "batches": total_batches}},
+        )
+
+        extracted = {"concepts": 0, "relationships": 0, "quotes": 0}
+        written = {"concepts": 0, "relationships": 0, "quotes": 0}
+        done = 0
+        start = time.perf_counter()
+
+        # aclosing: a failed write stops the extraction workers right away
+        stream = self.extractor.stream_from_chunks(chunks, queue_size=self.queue_size)
+        async with aclosing(stream):
+            async for batch_num, extraction in stream:
+                for key in extracted:
+                    extracted[key] += len(extraction.get(key, []))
+                if any(extraction.values()):
+                    # Neo4j writes are blocking; keep the event loop free for the workers
+                    counts = await asyncio.to_thread(self._normalize_and_write, extraction)
+                    for key in written:
+                        written[key] += counts.get(key, 0)
+                done += 1
+                if on_progress:
+                    on_progress(done, total_batches)
+                self.logger.info(
+                    "async_pipeline_batch_written",
+                    extra={
+                        "context": {
+                            "batch": batch_num,
+                            "done": done,
+                            "total": total_batches,
+                            "elapsed_s": round(time.perf_counter() - start, 1),
+                            "concurrency_window": self.extractor.concurrency.limit,
+                        }
+                    },
+                )
+
+        self.logger.info(
+            "async_pipeline_complete",
+            extra={"context": {**written, "streaming": True, "concurrency": self.extractor.concurrency.get_stats()}},
+        )
+
+        return {
+            "extracted": extracted,
+            "written": written,
+        }
+
+    def _normalize_and_write(self, extraction: dict) -> dict:
+        """Normalize one batch against the graph and write it."""
+        normalized = self.normalizer.normalize_extraction(extraction)
+        return self.writer.write_extraction(normalized)
+
     def close(self) -> None:
         """Close Neo4j connection."""
         self.client.close()
@@ -146,6 +229,7 @@ async def extract_kg_from_chunks_async(
     max_concurrent: int = 20,
     confidence_threshold: float = 0.5,
     initialize_schema_first: bool = True,
+    streaming: bool = False,
 ) -> dict:
     """
     Extract KG from chunks using async concurrent processing (convenience function).
@@ -158,6 +242,7 @@ async def extract_kg_from_chunks_async(
         max_concurrent: Maximum concurrent API calls
         confidence_threshold: Minimum confidence score
         initialize_schema_first: Whether to initialize schema before processing
+        streaming: Write each batch as soon as it is extracted (bounded memory)
 
     Returns:
         Dictionary with extraction statistics
@@ -168,6 +253,7 @@ async def extract_kg_from_chunks_async(
         batch_size=batch_size,
         max_concurrent=max_concurrent,
         confidence_threshold=confidence_threshold,
+        streaming=streaming,
     )
 
     try:
@@ -5,10 +5,51 @@ Production-grade, domain-agnostic extraction for diverse content types.
 
 from __future__ import annotations
 
+import hashlib
+import inspect
+from functools import lru_cache
+from pathlib import PurePath
 from typing import List
 from langchain_core.documents import Document
 
 
+EXTRACTION_SYSTEM_PROMPT = (
+    "You are a knowledge extraction expert. Extract structured knowledge from podcast "
+    "transcripts. Return ONLY valid JSON, no explanatory text."
+)
+
+
+def render_chunk(chunk: Document) -> str:
+    """
+    Render one chunk (metadata header and text) as it appears in the prompt.
+
+    The source is shown by file name only: the absolute path includes the
+    workspace directory, and the rendering is also the extraction cache key.
+
+    Args:
+        chunk: Document chunk
+
+    Returns:
+        Chunk block without its "=== Chunk N ===" heading
+    """
+    metadata = chunk.metadata
+    text = chunk.page_content
+
+    source_path = metadata.get('source_path')
+    source = PurePath(str(source_path)).name if source_path else 'unknown'
+
+    chunk_info = f"Source: {source}\n"
+    chunk_info += f"Episode: {metadata.get('episode_id', 'unknown')}\n"
+    if metadata.get('speaker'):
+        chunk_info += f"Speaker: {metadata.get('speaker')}\n"
+    if metadata.get('timestamp'):
+        chunk_info += f"Timestamp: {metadata.get('timestamp')}\n"
+    chunk_info += f"Start char: {metadata.get('start_char', 'N/A')}\n"
+    chunk_info += f"End char: {metadata.get('end_char', 'N/A')}\n"
+    chunk_info += f"\nText:\n{text}\n"
+    return chunk_info
+
+
 def build_extraction_prompt(chunks: List[Document]) -> str:
     """
     Build comprehensive extraction prompt for LLM.
@@ -23,21 +64,7 @@ def build_extraction_prompt(chunks: List[Document]) -> str:
     # Combine chunk texts with metadata
     chunk_texts = []
     for i, chunk in enumerate(chunks):
-        metadata = chunk.metadata
-        text = chunk.page_content
-        
-        chunk_info = f"=== Chunk {i+1} ===\n"
-        chunk_info += f"Source: {metadata.get('source_path', 'unknown')}\n"
-        chunk_info += f"Episode: {metadata.get('episode_id', 'unknown')}\n"
-        if metadata.get('speaker'):
-            chunk_info += f"Speaker: {metadata.get('speaker')}\n"
-        if metadata.get('timestamp'):
-            chunk_info += f"Timestamp: {metadata.get('timestamp')}\n"
-        chunk_info += f"Start char: {metadata.get('start_char', 'N/A')}\n"
-        chunk_info += f"End char: {metadata.get('end_char', 'N/A')}\n"
-        chunk_info += f"\nText:\n{text}\n"
-        
-        chunk_texts.append(chunk_info)
+        chunk_texts.append(f"=== Chunk {i+1} ===\n" + render_chunk(chunk))
     
     combined_text = "\n\n".join(chunk_texts)
     
@@ -323,6 +350,8 @@ Extract as Practices when speakers mention:
 
 Return a JSON object with three arrays: "concepts", "relationships", "quotes".
 
+Every concept, relationship and quote carries "chunk": the number N of the "=== Chunk N ===" section it was extracted from (the section of its text span). A concept mentioned in several chunks is listed once per chunk, each time with that chunk's number and text span. Every concept a relationship or quote refers to must be listed under the same chunk as that relationship or quote.
+
 ### For each concept:
 ```json
 {{
@@ -333,7 +362,8 @@ Return a JSON object with three arrays: "concepts", "relationships", "quotes".
   "text_span": "Exact text where concept is mentioned",
   "start_char": 1234,
   "end_char": 1250,
-  "confidence": 0.8
+  "confidence": 0.8,
+  "chunk": 1
 }}
 ```
 
@@ -347,7 +377,8 @@ Return a JSON object with three arrays: "concepts", "relationships", "quotes".
   "text_span": "Text describing the relationship",
   "start_char": 1234,
   "end_char": 1250,
-  "confidence": 0.8
+  "confidence": 0.8,
+  "chunk": 1
 }}
 ```
 
@@ -360,7 +391,8 @@ Return a JSON object with three arrays: "concepts", "relationships", "quotes".
   "speaker": "Speaker name if mentioned",
   "timestamp": "Timestamp if available",
   "related_concepts": ["concept_id1", "concept_id2"],
-  "confidence": 0.8
+  "confidence": 0.8,
+  "chunk": 1
 }}
 ```
 
@@ -453,3 +485,17 @@ def build_single_chunk_prompt(chunk: Document) -> str:
         Formatted prompt string
     """
     return build_extraction_prompt([chunk])
+
+
+@lru_cache(maxsize=1)
+def extraction_prompt_hash() -> str:
+    """
+    Hash of the extraction prompt template and system prompt.
+    Any edit to either changes the hash, invalidating cached extraction results.
+    """
+    source = (
+        inspect.getsource(render_chunk)
+        + inspect.getsource(build_extraction_prompt)
+        + EXTRACTION_SYSTEM_PROMPT
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
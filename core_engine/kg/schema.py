@@ -5,8 +5,10 @@ Defines node labels, relationship types, properties, indexes, and constraints.
 
 from __future__ import annotations
 
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Optional
 from core_engine.kg.neo4j_client import Neo4jClient
+from core_engine.kg.text_search import CONCEPT_TEXT_INDEX, QUOTE_TEXT_INDEX
 from core_engine.logging import get_logger
 
 
@@ -26,6 +28,50 @@ class NodeLabels:
     PRINCIPLE = "Principle"
     OUTCOME = "Outcome"
     CAUSALITY = "Causality"
+    ENTITY = "Entity"  # shared by every concept-like node
+
+
+# Concept-like labels; nodes with any of them also carry NodeLabels.ENTITY
+ENTITY_LABELS = (
+    NodeLabels.CONCEPT,
+    NodeLabels.PRACTICE,
+    NodeLabels.COGNITIVE_STATE,
+    NodeLabels.BEHAVIORAL_PATTERN,
+    NodeLabels.PRINCIPLE,
+    NodeLabels.OUTCOME,
+    NodeLabels.CAUSALITY,
+    NodeLabels.PERSON,
+    NodeLabels.PLACE,
+    NodeLabels.ORGANIZATION,
+    NodeLabels.EVENT,
+)
+
+# Per-label id constraints from before the :Entity label. They are global
+# (not per workspace) and are replaced by the (workspace_id, id) key on :Entity.
+LEGACY_ENTITY_CONSTRAINTS = (
+    "concept_id",
+    "person_id",
+    "place_id",
+    "org_id",
+    "event_id",
+    "practice_id",
+    "cognitive_state_id",
+    "behavioral_pattern_id",
+    "principle_id",
+    "outcome_id",
+    "causality_id",
+)
+
+ENTITY_KEY_CONSTRAINT = (
+    "CREATE CONSTRAINT entity_key IF NOT EXISTS "
+    "FOR (n:Entity) REQUIRE (n.workspace_id, n.id) IS UNIQUE"
+)
+
+# Fallback when the constraint cannot be created: keeps :Entity key lookups index seeks
+ENTITY_KEY_INDEX = (
+    "CREATE INDEX entity_key_idx IF NOT EXISTS "
+    "FOR (n:Entity) ON (n.workspace_id, n.id)"
+)
 
 
 # Relationship Types
@@ -46,6 +92,13 @@ class RelationshipTypes:
     CROSS_EPISODE = "CROSS_EPISODE"
 
 
+MIGRATE_ENTITIES_COMMAND = "python -m core_engine.kg.migrate_entities"
+
+
+class EntityMigrationRequired(RuntimeError):
+    """The graph predates the :Entity label and must be migrated before it is written to."""
+
+
 class SchemaManager:
     """Manages Neo4j schema: indexes, constraints, and structure."""
 
@@ -64,21 +117,12 @@ class SchemaManager:
 
     def create_constraints(self) -> None:
         """Create unique constraints on nodes."""
+        # Concept-like nodes: one node per (workspace_id, id), whatever its label
+        self.create_entity_key()
+
         constraints = [
-            # Concept constraints (using CREATE OR REPLACE for compatibility)
-            "CREATE CONSTRAINT concept_id IF NOT EXISTS FOR (c:Concept) REQUIRE c.id IS UNIQUE",
-            "CREATE CONSTRAINT person_id IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE",
-            "CREATE CONSTRAINT place_id IF NOT EXISTS FOR (p:Place) REQUIRE p.id IS UNIQUE",
-            "CREATE CONSTRAINT org_id IF NOT EXISTS FOR (o:Organization) REQUIRE o.id IS UNIQUE",
-            "CREATE CONSTRAINT event_id IF NOT EXISTS FOR (e:Event) REQUIRE e.id IS UNIQUE",
             "CREATE CONSTRAINT quote_id IF NOT EXISTS FOR (q:Quote) REQUIRE q.id IS UNIQUE",
             "CREATE CONSTRAINT episode_id IF NOT EXISTS FOR (e:Episode) REQUIRE e.id IS UNIQUE",
-            "CREATE CONSTRAINT practice_id IF NOT EXISTS FOR (p:Practice) REQUIRE p.id IS UNIQUE",
-            "CREATE CONSTRAINT cognitive_state_id IF NOT EXISTS FOR (c:CognitiveState) REQUIRE c.id IS UNIQUE",
-            "CREATE CONSTRAINT behavioral_pattern_id IF NOT EXISTS FOR (b:BehavioralPattern) REQUIRE b.id IS UNIQUE",
-            "CREATE CONSTRAINT principle_id IF NOT EXISTS FOR (p:Principle) REQUIRE p.id IS UNIQUE",
-            "CREATE CONSTRAINT outcome_id IF NOT EXISTS FOR (o:Outcome) REQUIRE o.id IS UNIQUE",
-            "CREATE CONSTRAINT causality_id IF NOT EXISTS FOR (c:Causality) REQUIRE c.id IS UNIQUE",
         ]
 
         for constraint in constraints:
@@ -96,6 +140,45 @@ class SchemaManager:
                         extra={"context": {"constraint": constraint, "error": str(e)}},
                     )
 
+    def create_entity_key(self) -> Optional[str]:
+        """
+        Create the (workspace_id, id) uniqueness constraint on :Entity, falling
+        back to a plain composite index when the constraint cannot be created.
+
+        Returns:
+            "constraint", "index", or None if neither could be created
+        """
+        try:
+            self.client.execute_write(ENTITY_KEY_CONSTRAINT)
+            self.logger.info(
+                "constraint_created",
+                extra={"context": {"constraint": ENTITY_KEY_CONSTRAINT}},
+            )
+            return "constraint"
+        except Exception as e:
+            if "already exists" in str(e).lower():
+                return "constraint"
+            self.logger.warning(
+                "constraint_creation_failed",
+                extra={
+                    "context": {
+                        "constraint": ENTITY_KEY_CONSTRAINT,
+                        "error": str(e),
+                        "fallback": "index",
+                    }
+                },
+            )
+        try:
+            self.client.execute_write(ENTITY_KEY_INDEX)
+        except Exception as e:
+            self.logger.warning(
+                "index_creation_failed",
+                extra={"context": {"index": ENTITY_KEY_INDEX, "error": str(e)}},
+            )
+            return None
+        self.logger.info("index_created", extra={"context": {"index": ENTITY_KEY_INDEX}})
+        return "index"
+
     def create_indexes(self) -> None:
         """Create indexes for performance."""
         indexes = [
@@ -121,6 +204,13 @@ class SchemaManager:
             "CREATE INDEX rel_episode IF NOT EXISTS FOR ()-[r:CAUSES|INFLUENCES|OPTIMIZES|ENABLES|REDUCES|LEADS_TO|REQUIRES|RELATES_TO|IS_PART_OF]-() ON (r.episode_id)",
         ]
 
+        # Composite (workspace_id, id) indexes: workspace-scoped lookups by id
+        for label in ENTITY_LABELS + (NodeLabels.QUOTE, NodeLabels.EPISODE):
+            name = re.sub(r"(?<!^)(?=[A-Z])", "_", label).lower()
+            indexes.append(
+                f"CREATE INDEX {name}_workspace_id IF NOT EXISTS FOR (n:{label}) ON (n.workspace_id, n.id)"
+            )
+
         for index in indexes:
             try:
                 self.client.execute_write(index)
@@ -136,13 +226,145 @@ class SchemaManager:
                         extra={"context": {"index": index, "error": str(e)}},
                     )
 
+    def create_fulltext_indexes(self) -> None:
+        """Create full-text indexes used by keyword and theme search."""
+        labels = "|".join(ENTITY_LABELS)
+        indexes = [
+            f"CREATE FULLTEXT INDEX {CONCEPT_TEXT_INDEX} IF NOT EXISTS FOR (n:{labels}) ON EACH [n.name, n.description]",
+            f"CREATE FULLTEXT INDEX {QUOTE_TEXT_INDEX} IF NOT EXISTS FOR (q:Quote) ON EACH [q.text]",
+        ]
+
+        for index in indexes:
+            try:
+                self.client.execute_write(index)
+                self.logger.info(
+                    "fulltext_index_created",
+                    extra={"context": {"index": index}},
+                )
+            except Exception as e:
+                if "already exists" not in str(e).lower():
+                    self.logger.warning(
+                        "fulltext_index_creation_failed",
+                        extra={"context": {"index": index, "error": str(e)}},
+                    )
+
     def initialize_schema(self) -> None:
-        """Initialize complete schema: constraints and indexes."""
+        """
+        Initialize complete schema: constraints and indexes.
+
+        A graph written before the :Entity label is not migrated here (the
+        migration touches every node of every workspace): EntityMigrationRequired
+        is raised before anything is written.
+        """
         self.logger.info("initializing_schema")
+        check_entity_schema(self.client)
         self.create_constraints()
         self.create_indexes()
+        self.create_fulltext_indexes()
         self.logger.info("schema_initialization_complete")
 
+    def needs_entity_migration(self) -> bool:
+        """True if the old per-label id constraints are still present."""
+        result = self.client.execute_read(
+            "SHOW CONSTRAINTS YIELD name WHERE name IN $names RETURN count(*) as count",
+            {"names": list(LEGACY_ENTITY_CONSTRAINTS)},
+        )
+        return bool(result and result[0]["count"])
+
+    def migrate_entity_label(self, batch_size: int = 10000) -> Dict[str, Any]:
+        """
+        Bring a graph written before the :Entity label up to date.
+
+        Adds :Entity to every concept-like node, drops the old per-label id
+        constraints and creates the (workspace_id, id) key on :Entity. Safe to
+        run repeatedly.
+
+        Nodes sharing a (workspace_id, id) would collapse into one key, so they
+        are checked first: if there are any, nothing is changed and they are
+        reported (with `type_conflict` set when the nodes have different
+        labels) for manual merging.
+
+        Args:
+            batch_size: Nodes labelled per write transaction
+
+        Returns:
+            Dictionary with labelled counts, duplicate keys, whether the
+            migration was aborted and how the key is enforced
+        """
+        duplicates = self.client.execute_read(
+            f"""
+            MATCH (n)
+            WHERE any(l IN labels(n) WHERE l IN $labels)
+              AND n.workspace_id IS NOT NULL AND n.id IS NOT NULL
+            WITH n.workspace_id as workspace_id, n.id as id, count(n) as nodes,
+                 collect(DISTINCT [l IN labels(n) WHERE l <> '{NodeLabels.ENTITY}'][0]) as labels
+            WHERE nodes > 1
+            RETURN workspace_id, id, nodes, labels, size(labels) > 1 as type_conflict
+            ORDER BY workspace_id, id
+            """,
+            {"labels": list(ENTITY_LABELS)},
+        )
+        if duplicates:
+            self.logger.warning(
+                "entity_label_migration_aborted",
+                extra={
+                    "context": {
+                        "duplicates": len(duplicates),
+                        "type_conflicts": sum(1 for d in duplicates if d["type_conflict"]),
+                        "sample": duplicates[:10],
+                    }
+                },
+            )
+            return {
+                "labelled": {},
+                "labelled_total": 0,
+                "duplicates": duplicates,
+                "aborted": True,
+                "entity_key": None,
+            }
+
+        labelled: Dict[str, int] = {}
+        for label in ENTITY_LABELS:
+            total = 0
+            while True:
+                result = self.client.execute_write(
+                    f"""
+                    MATCH (n:{label})
+                    WHERE NOT n:{NodeLabels.ENTITY}
+                    WITH n LIMIT $batch_size
+                    SET n:{NodeLabels.ENTITY}
+                    RETURN count(n) as count
+                    """,
+                    {"batch_size": batch_size},
+                )
+                count = result[0]["count"] if result else 0
+                total += count
+                if count < batch_size:
+                    break
+            labelled[label] = total
+
+        for name in LEGACY_ENTITY_CONSTRAINTS:
+            self.client.execute_write(f"DROP CONSTRAINT {name} IF EXISTS")
+        entity_key = self.create_entity_key()
+
+        stats = {
+            "labelled": labelled,
+            "labelled_total": sum(labelled.values()),
+            "duplicates": [],
+            "aborted": False,
+            "entity_key": entity_key,
+        }
+        self.logger.info(
+            "entity_label_migration_complete",
+            extra={
+                "context": {
+                    "labelled_total": stats["labelled_total"],
+                    "entity_key": entity_key,
+                }
+            },
+        )
+        return stats
+
     def clear_graph(self, workspace_id: Optional[str] = None) -> None:
         """
         Clear all nodes and relationships (use with caution!).
@@ -225,6 +447,26 @@ class SchemaManager:
         return stats
 
 
+def check_entity_schema(client: Neo4jClient) -> None:
+    """
+    Refuse to work on a graph written before the :Entity label.
+
+    Writes MERGE on :Entity and would clash with the old per-label id
+    constraints; reads MATCH on :Entity and would find nothing.
+
+    Args:
+        client: Neo4j client instance
+
+    Raises:
+        EntityMigrationRequired: If the old per-label id constraints are still present
+    """
+    if SchemaManager(client).needs_entity_migration():
+        raise EntityMigrationRequired(
+            "The knowledge graph predates the :Entity label. "
+            f"Run `{MIGRATE_ENTITIES_COMMAND}` before ingesting."
+        )
+
+
 def initialize_schema(client: Neo4jClient) -> None:
     """
     Initialize Neo4j schema (constraints and indexes).
@@ -51,6 +51,7 @@ EXTRACTION_SCHEMA: Dict[str, Any] = {
                         "maximum": 1,
                         "description": "Confidence score (0-1)",
                     },
+                    "chunk": {"type": "integer", "description": "Number of the chunk it was extracted from"},
                 },
                 "required": ["id", "name", "type", "text_span", "confidence"],
             },
@@ -98,6 +99,7 @@ EXTRACTION_SCHEMA: Dict[str, Any] = {
                         "minimum": 0,
                         "maximum": 1,
                     },
+                    "chunk": {"type": "integer", "description": "Number of the chunk it was extracted from"},
                 },
                 "required": ["source_id", "target_id", "type", "confidence"],
             },
@@ -131,6 +133,7 @@ EXTRACTION_SCHEMA: Dict[str, Any] = {
                         "minimum": 0,
                         "maximum": 1,
                     },
+                    "chunk": {"type": "integer", "description": "Number of the chunk it was extracted from"},
                 },
                 "required": ["text", "confidence"],
             },
@@ -0,0 +1,89 @@
+"""
+Full-text search helpers for graph lookups.
+
+Concept and quote text is served by Neo4j full-text (Lucene) indexes created in
+`core_engine.kg.schema`, so keyword lookups are index seeks ranked by a
+relevance score instead of `toLower(...) CONTAINS` scans over every node of a
+workspace. The CONTAINS form is kept as a fallback for databases where the
+schema has not been initialized yet.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable, List, Sequence
+
+
+# Full-text index names (created by SchemaManager.create_fulltext_indexes)
+CONCEPT_TEXT_INDEX = "concept_text"
+QUOTE_TEXT_INDEX = "quote_text"
+
+
+def _tokens(term: str) -> List[str]:
+    # Word characters only: nothing left to escape for the Lucene query parser
+    return re.findall(r"\w+", term.lower())
+
+
+def fulltext_query(terms: Iterable[str]) -> str:
+    """
+    Build a Lucene query matching any of the terms.
+
+    Single words match exactly (boosted) or as a prefix, which keeps the
+    partial-word behaviour of the former CONTAINS filters. Multi-word terms
+    match as a boosted phrase or as all of their words.
+
+    Args:
+        terms: Keywords or phrases
+
+    Returns:
+        Lucene query string ("" when no searchable words remain)
+    """
+    clauses = []
+    for term in terms:
+        words = _tokens(term)
+        if not words:
+            continue
+        if len(words) == 1:
+            clauses.append(f"{words[0]}^2 OR {words[0]}*")
+        else:
+            clauses.append(
+                f"\"{' '.join(words)}\"^2 OR (" + " AND ".join(f"{w}*" for w in words) + ")"
+            )
+    return " OR ".join(f"({c})" for c in dict.fromkeys(clauses))
+
+
+def fulltext_match(index: str, var: str = "c") -> str:
+    """
+    Cypher clause yielding `var` and `score` from a full-text index, scoped to
+    `$workspace_id`. Expects the Lucene query in `$search`.
+    """
+    return f"""
+        CALL db.index.fulltext.queryNodes('{index}', $search) YIELD node AS {var}, score
+        WITH {var}, score
+        WHERE {var}.workspace_id = $workspace_id
+    """
+
+
+def contains_match(
+    var: str = "c", fields: Sequence[str] = ("name", "description"), label: str = ""
+) -> str:
+    """
+    Fallback for `fulltext_match` when the index is missing: a CONTAINS scan
+    over `$terms` (lowercase) yielding the same `var` and `score` columns.
+    Like `fulltext_match` it ends in an open WHERE, so callers can append
+    `AND ...` conditions to either form.
+    """
+    node = f"({var}:{label})" if label else f"({var})"
+    checks = " OR ".join(f"toLower({var}.{field}) CONTAINS term" for field in fields)
+    return f"""
+        MATCH {node}
+        WITH {var}, 1.0 AS score
+        WHERE {var}.workspace_id = $workspace_id
+          AND ANY(term IN $terms WHERE {checks})
+    """
+
+
+def is_missing_index_error(error: Exception) -> bool:
+    """True if a query failed because a full-text index does not exist (yet)."""
+    message = str(error).lower()
+    return "no such fulltext" in message or "fulltext schema index" in message
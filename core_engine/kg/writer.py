@@ -5,6 +5,8 @@ Handles batch writes of concepts, relationships, and quotes.
 
 from __future__ import annotations
 
+import time
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from core_engine.kg.neo4j_client import Neo4jClient
 from core_engine.kg.schema import NodeLabels, RelationshipTypes
@@ -14,17 +16,33 @@ from core_engine.logging import get_logger
 class KGWriter:
     """Write extracted knowledge to Neo4j."""
 
-    def __init__(self, client: Neo4jClient, workspace_id: Optional[str] = None):
+    def __init__(
+        self,
+        client: Neo4jClient,
+        workspace_id: Optional[str] = None,
+        bulk: bool = True,
+        bulk_batch_size: int = 500,
+        bulk_batch_sizes: Optional[Dict[str, int]] = None,
+    ):
         """
         Initialize KG writer.
 
         Args:
             client: Neo4j client
             workspace_id: Workspace identifier
+            bulk: Group rows by label/type and send each group as one UNWIND statement
+            bulk_batch_size: Rows per UNWIND statement in bulk mode
+            bulk_batch_sizes: Per-entity overrides keyed by "concepts", "relationships",
+                "quotes" or "quote_links"
         """
         self.client = client
         self.workspace_id = workspace_id or "default"
+        self.bulk = bulk
+        self.bulk_batch_size = bulk_batch_size
+        self.bulk_batch_sizes = bulk_batch_sizes or {}
         self.logger = get_logger("core_engine.kg.writer", workspace_id=self.workspace_id)
+        # entity -> {"rows": n, "seconds": t, "rows_per_sec": r}, refreshed per write_extraction
+        self.write_stats: Dict[str, Dict[str, float]] = {}
 
     def write_extraction(
         self, extraction: Dict[str, List[Dict[str, Any]]]
@@ -41,6 +59,7 @@ class KGWriter:
         concepts = extraction.get("concepts", [])
         relationships = extraction.get("relationships", [])
         quotes = extraction.get("quotes", [])
+        self.write_stats = {}
 
         self.logger.info(
             "write_extraction_start",
@@ -69,6 +88,7 @@ class KGWriter:
                     "concepts_written": concept_count,
                     "relationships_written": relationship_count,
                     "quotes_written": quote_count,
+                    "write_stats": self.write_stats,
                 }
             },
         )
@@ -92,6 +112,9 @@ class KGWriter:
         if not concepts:
             return 0
 
+        if self.bulk:
+            return self._write_concepts_bulk(concepts)
+
         # Group by type for batch writes
         queries = []
         
@@ -124,11 +147,11 @@ class KGWriter:
             }
             
             # Build MERGE query
-            # MERGE on id only (unique constraint), then set workspace_id
+            # MERGE on the (workspace_id, id) entity key; the type label is set on create
             query = f"""
-            MERGE (c:{label} {{id: $id}})
+            MERGE (c:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: $id}})
             ON CREATE SET
-                c.workspace_id = $workspace_id,
+                c:{label},
                 c.name = $name,
                 c.type = $type,
                 c.description = $description,
@@ -142,7 +165,6 @@ class KGWriter:
                 c.confidences = [$confidence],
                 c.created_at = datetime()
             ON MATCH SET
-                c.workspace_id = COALESCE(c.workspace_id, $workspace_id),
                 c.name = $name,
                 c.description = COALESCE(c.description, $description),
                 c.source_paths = CASE 
@@ -168,7 +190,7 @@ class KGWriter:
                 c.text_spans = c.text_spans + $text_span,
                 c.confidences = c.confidences + $confidence,
                 c.updated_at = datetime()
-            RETURN c.id as id
+            RETURN c.id as id, c:{label} as same_label, c.type as existing_type
             """
             
             queries.append((query, props))
@@ -176,12 +198,19 @@ class KGWriter:
         # Execute in batches
         batch_size = 100
         written = 0
+        conflicts: List[Dict[str, Any]] = []
         
         for i in range(0, len(queries), batch_size):
             batch = queries[i : i + batch_size]
-            self.client.execute_write_batch(batch)
+            for (_, params), records in zip(batch, self.client.execute_write_batch(batch)):
+                conflicts.extend(
+                    {"id": r["id"], "existing": r["existing_type"], "incoming": params["type"]}
+                    for r in records
+                    if not r.get("same_label", True)
+                )
             written += len(batch)
 
+        self._report_type_conflicts(conflicts)
         return written
 
     def write_relationships(self, relationships: List[Dict[str, Any]]) -> int:
@@ -197,6 +226,9 @@ class KGWriter:
         if not relationships:
             return 0
 
+        if self.bulk:
+            return self._write_relationships_bulk(relationships)
+
         queries = []
         
         for rel in relationships:
@@ -207,9 +239,6 @@ class KGWriter:
             if not source_id or not target_id:
                 continue
             
-            # Use label-agnostic MATCH (match by id and workspace_id regardless of label)
-            # This works even if nodes have multiple labels
-            
             props = {
                 "source_id": source_id,
                 "target_id": target_id,
@@ -231,13 +260,10 @@ class KGWriter:
                 if v is not None or k in ("timestamp", "speaker")
             }
             
-            # Use label-agnostic MATCH - match any node with the id and workspace_id
-            # This works for Concept, Practice, Outcome, etc.
+            # Label-agnostic MATCH on the :Entity key (Concept, Practice, Outcome, etc.)
             query = f"""
-            MATCH (source)
-            WHERE source.id = $source_id AND source.workspace_id = $workspace_id
-            MATCH (target)
-            WHERE target.id = $target_id AND target.workspace_id = $workspace_id
+            MATCH (source:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: $source_id}})
+            MATCH (target:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: $target_id}})
             MERGE (source)-[r:{rel_type}]->(target)
             ON CREATE SET
                 r.description = $description,
@@ -346,6 +372,9 @@ class KGWriter:
         if not quotes:
             return 0
 
+        if self.bulk:
+            return self._write_quotes_bulk(quotes)
+
         queries = []
         
         for quote in quotes:
@@ -401,7 +430,7 @@ class KGWriter:
             for concept_id in related_concepts:
                 link_query = f"""
                 MATCH (q:{NodeLabels.QUOTE} {{id: $quote_id, workspace_id: $workspace_id}})
-                MATCH (c:Concept {{id: $concept_id, workspace_id: $workspace_id}})
+                MATCH (c:{NodeLabels.ENTITY} {{id: $concept_id, workspace_id: $workspace_id}})
                 MERGE (q)-[:{RelationshipTypes.ABOUT}]->(c)
                 """
                 queries.append((link_query, {"quote_id": quote_id, "concept_id": concept_id, "workspace_id": self.workspace_id}))
@@ -426,6 +455,444 @@ class KGWriter:
 
         return len(quotes)  # Return quote count, not query count
 
+    # ------------------------------------------------------------------
+    # Bulk (UNWIND) write path
+    # ------------------------------------------------------------------
+
+    def _run_bulk(
+        self,
+        entity: str,
+        query: str,
+        rows: List[Dict[str, Any]],
+        failed_rows: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute an UNWIND $rows statement in slices of the entity's batch size.
+        Records throughput for `entity` in `write_stats`.
+
+        Args:
+            entity: Stats key, e.g. "concepts:Concept" or "relationships:CAUSES"
+            query: Cypher reading rows from $rows
+            rows: Row parameters
+            failed_rows: If given, a failing slice is logged and its rows are
+                appended here instead of aborting the remaining slices
+
+        Returns:
+            Concatenated result records
+        """
+        batch_size = max(1, self.bulk_batch_sizes.get(entity.split(":")[0], self.bulk_batch_size))
+        records: List[Dict[str, Any]] = []
+        failed_before = len(failed_rows) if failed_rows is not None else 0
+        start = time.perf_counter()
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i : i + batch_size]
+            try:
+                records.extend(
+                    self.client.execute_write(
+                        query, {"rows": batch, "workspace_id": self.workspace_id}
+                    )
+                )
+            except Exception as e:
+                if failed_rows is None:
+                    raise
+                self.logger.error(
+                    "bulk_write_slice_failed",
+                    exc_info=True,
+                    extra={
+                        "context": {
+                            "entity": entity,
+                            "offset": i,
+                            "rows": len(batch),
+                            "error": str(e),
+                        }
+                    },
+                )
+                failed_rows.extend(batch)
+        elapsed = time.perf_counter() - start
+
+        stats = self.write_stats.setdefault(
+            entity, {"rows": 0, "failed_rows": 0, "seconds": 0.0, "rows_per_sec": 0.0}
+        )
+        stats["rows"] += len(rows)
+        if failed_rows is not None:
+            stats["failed_rows"] += len(failed_rows) - failed_before
+        stats["seconds"] += elapsed
+        stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] > 0 else 0.0
+        self.logger.info(
+            "bulk_write_complete",
+            extra={
+                "context": {
+                    "entity": entity,
+                    "rows": len(rows),
+                    "seconds": round(elapsed, 3),
+                    "rows_per_sec": round(len(rows) / elapsed, 1) if elapsed > 0 else None,
+                }
+            },
+        )
+        return records
+
+    def _write_concepts_bulk(self, concepts: List[Dict[str, Any]]) -> int:
+        """Write concepts with one UNWIND statement per label."""
+        rows_by_label: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for concept in concepts:
+            concept_type = concept.get("type", "Concept")
+            rows_by_label[self._get_node_label(concept_type)].append({
+                "id": concept.get("id"),
+                "name": concept.get("name"),
+                "type": concept_type,
+                "description": concept.get("description", ""),
+                "source_path": concept.get("source_path") or "",
+                "episode_id": concept.get("episode_id") or "",
+                "speaker": concept.get("speaker"),
+                "timestamp": concept.get("timestamp"),
+                "start_char": concept.get("start_char") or 0,
+                "end_char": concept.get("end_char") or 0,
+                "text_span": concept.get("text_span", ""),
+                "confidence": concept.get("confidence", 1.0),
+            })
+
+        written = 0
+        conflicts: List[Dict[str, Any]] = []
+        for label, rows in rows_by_label.items():
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (c:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: row.id}})
+            ON CREATE SET
+                c:{label},
+                c.name = row.name,
+                c.type = row.type,
+                c.description = row.description,
+                c.source_paths = [row.source_path],
+                c.episode_ids = [row.episode_id],
+                c.speakers = CASE WHEN row.speaker IS NOT NULL THEN [row.speaker] ELSE [] END,
+                c.timestamps = CASE WHEN row.timestamp IS NOT NULL THEN [row.timestamp] ELSE [] END,
+                c.start_chars = [row.start_char],
+                c.end_chars = [row.end_char],
+                c.text_spans = [row.text_span],
+                c.confidences = [row.confidence],
+                c.created_at = datetime()
+            ON MATCH SET
+                c.name = row.name,
+                c.description = COALESCE(c.description, row.description),
+                c.source_paths = CASE
+                    WHEN row.source_path IN c.source_paths THEN c.source_paths
+                    ELSE c.source_paths + row.source_path
+                END,
+                c.episode_ids = CASE
+                    WHEN row.episode_id IN c.episode_ids THEN c.episode_ids
+                    ELSE c.episode_ids + row.episode_id
+                END,
+                c.speakers = CASE
+                    WHEN row.speaker IS NOT NULL AND NOT row.speaker IN c.speakers
+                    THEN c.speakers + row.speaker
+                    ELSE c.speakers
+                END,
+                c.timestamps = CASE
+                    WHEN row.timestamp IS NOT NULL AND NOT row.timestamp IN c.timestamps
+                    THEN c.timestamps + row.timestamp
+                    ELSE c.timestamps
+                END,
+                c.start_chars = c.start_chars + row.start_char,
+                c.end_chars = c.end_chars + row.end_char,
+                c.text_spans = c.text_spans + row.text_span,
+                c.confidences = c.confidences + row.confidence,
+                c.updated_at = datetime()
+            RETURN count(c) as written,
+                   collect(CASE WHEN NOT c:{label}
+                           THEN {{id: row.id, existing: c.type, incoming: row.type}} END) as type_conflicts
+            """
+            records = self._run_bulk(f"concepts:{label}", query, rows)
+            written += sum(r.get("written", 0) for r in records)
+            conflicts.extend(c for r in records for c in r.get("type_conflicts") or [])
+
+        self._report_type_conflicts(conflicts)
+        return written
+
+    def _report_type_conflicts(self, conflicts: List[Dict[str, Any]]) -> None:
+        """
+        Warn about concepts whose id already belongs to a node of another type.
+
+        The :Entity key is (workspace_id, id) regardless of label, so such a
+        concept is merged into the existing node, which keeps its first type.
+        """
+        if not conflicts:
+            return
+        self.logger.warning(
+            "entity_type_conflicts",
+            extra={
+                "context": {
+                    "count": len(conflicts),
+                    "sample": conflicts[:10],
+                }
+            },
+        )
+
+    def _write_relationships_bulk(self, relationships: List[Dict[str, Any]]) -> int:
+        """Write relationships with one UNWIND statement per relationship type."""
+        rows_by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for idx, rel in enumerate(relationships):
+            source_id = rel.get("source_id")
+            target_id = rel.get("target_id")
+            if not source_id or not target_id:
+                continue
+            rows_by_type[rel.get("type", "RELATES_TO")].append({
+                "idx": idx,
+                "source_id": source_id,
+                "target_id": target_id,
+                "description": rel.get("description", ""),
+                "source_path": rel.get("source_path") or "",
+                "episode_id": rel.get("episode_id") or "",
+                "speaker": rel.get("speaker"),
+                "timestamp": rel.get("timestamp"),
+                "start_char": rel.get("start_char") or 0,
+                "end_char": rel.get("end_char") or 0,
+                "text_span": rel.get("text_span", ""),
+                "confidence": rel.get("confidence", 1.0),
+            })
+
+        written_idx = set()
+        failed_rows: List[Dict[str, Any]] = []
+        total = 0
+        for rel_type, rows in rows_by_type.items():
+            total += len(rows)
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (source:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: row.source_id}})
+            MATCH (target:{NodeLabels.ENTITY} {{workspace_id: $workspace_id, id: row.target_id}})
+            MERGE (source)-[r:{rel_type}]->(target)
+            ON CREATE SET
+                r.description = row.description,
+                r.source_paths = [row.source_path],
+                r.episode_ids = [row.episode_id],
+                r.speakers = CASE WHEN row.speaker IS NOT NULL THEN [row.speaker] ELSE [] END,
+                r.timestamps = CASE WHEN row.timestamp IS NOT NULL THEN [row.timestamp] ELSE [] END,
+                r.start_chars = [row.start_char],
+                r.end_chars = [row.end_char],
+                r.text_spans = [row.text_span],
+                r.confidences = [row.confidence],
+                r.created_at = datetime()
+            ON MATCH SET
+                r.description = COALESCE(r.description, row.description),
+                r.source_paths = CASE
+                    WHEN row.source_path IN r.source_paths THEN r.source_paths
+                    ELSE r.source_paths + row.source_path
+                END,
+                r.episode_ids = CASE
+                    WHEN row.episode_id IN r.episode_ids THEN r.episode_ids
+                    ELSE r.episode_ids + row.episode_id
+                END,
+                r.confidences = r.confidences + row.confidence,
+                r.updated_at = datetime()
+            RETURN DISTINCT row.idx as idx
+            """
+            # A failing slice only loses its own rows; the type's other slices still run
+            records = self._run_bulk(f"relationships:{rel_type}", query, rows, failed_rows=failed_rows)
+            written_idx.update(r["idx"] for r in records)
+
+        # Rows of failed slices vs. rows whose source/target concept was not found
+        failed_idx = {row["idx"] for row in failed_rows}
+        unmatched_details = [
+            {
+                "source_id": row["source_id"],
+                "target_id": row["target_id"],
+                "type": rel_type,
+            }
+            for rel_type, rows in rows_by_type.items()
+            for row in rows
+            if row["idx"] not in written_idx and row["idx"] not in failed_idx
+        ]
+        written = len(written_idx)
+
+        if unmatched_details:
+            self.logger.warning(
+                "relationship_write_failures",
+                extra={
+                    "context": {
+                        "failed_count": len(unmatched_details),
+                        "sample_failures": unmatched_details[:10],
+                    }
+                },
+            )
+        if failed_idx or unmatched_details:
+            self.logger.warning(
+                "relationships_write_partial",
+                extra={
+                    "context": {
+                        "written": written,
+                        "failed": len(failed_idx),
+                        "unmatched": len(unmatched_details),
+                        "total": total,
+                    }
+                },
+            )
+
+        return written
+
+    def _write_quotes_bulk(self, quotes: List[Dict[str, Any]]) -> int:
+        """Write quotes, then ABOUT and SAID links, each as UNWIND statements."""
+        quote_rows: List[Dict[str, Any]] = []
+        about_rows: List[Dict[str, Any]] = []
+        said_rows: List[Dict[str, Any]] = []
+
+        for quote in quotes:
+            quote_id = f"quote_{quote.get('episode_id', 'unknown')}_{quote.get('start_char', 0)}"
+            speaker = quote.get("speaker")
+            quote_rows.append({
+                "id": quote_id,
+                "text": quote.get("text", ""),
+                "speaker": speaker,
+                "timestamp": quote.get("timestamp"),
+                "source_path": quote.get("source_path") or "",
+                "episode_id": quote.get("episode_id") or "",
+                "start_char": quote.get("start_char") or 0,
+                "end_char": quote.get("end_char") or 0,
+                "confidence": quote.get("confidence", 1.0),
+            })
+            for concept_id in quote.get("related_concepts", []):
+                about_rows.append({"quote_id": quote_id, "concept_id": concept_id})
+            if speaker:
+                said_rows.append({"quote_id": quote_id, "speaker": speaker})
+
+        self._run_bulk(
+            "quotes",
+            f"""
+            UNWIND $rows AS row
+            MERGE (q:{NodeLabels.QUOTE} {{id: row.id}})
+            ON CREATE SET
+                q.workspace_id = $workspace_id,
+                q.text = row.text,
+                q.speaker = row.speaker,
+                q.timestamp = row.timestamp,
+                q.source_path = row.source_path,
+                q.episode_id = row.episode_id,
+                q.start_char = row.start_char,
+                q.end_char = row.end_char,
+                q.confidence = row.confidence,
+                q.created_at = datetime()
+            ON MATCH SET
+                q.workspace_id = COALESCE(q.workspace_id, $workspace_id),
+                q.text = row.text,
+                q.updated_at = datetime()
+            RETURN count(q) as written
+            """,
+            quote_rows,
+        )
+
+        if about_rows:
+            self._run_bulk(
+                "quote_links:ABOUT",
+                f"""
+                UNWIND $rows AS row
+                MATCH (q:{NodeLabels.QUOTE} {{id: row.quote_id, workspace_id: $workspace_id}})
+                MATCH (c:{NodeLabels.ENTITY} {{id: row.concept_id, workspace_id: $workspace_id}})
+                MERGE (q)-[:{RelationshipTypes.ABOUT}]->(c)
+                """,
+                about_rows,
+            )
+
+        if said_rows:
+            self._run_bulk(
+                "quote_links:SAID",
+                f"""
+                UNWIND $rows AS row
+                MATCH (q:{NodeLabels.QUOTE} {{id: row.quote_id, workspace_id: $workspace_id}})
+                MATCH (p:{NodeLabels.PERSON} {{name: row.speaker, workspace_id: $workspace_id}})
+                MERGE (p)-[:{RelationshipTypes.SAID}]->(q)
+                """,
+                said_rows,
+            )
+
+        return len(quotes)
+
+    def remove_episodes(self, episode_ids: List[str]) -> Dict[str, int]:
+        """
+        Remove everything previously written for the given episodes.
+
+        Quotes from those episodes are deleted. Concepts and relationships
+        that only came from those episodes are deleted. Ones shared with
+        other episodes just lose the stale episode ids.
+
+        Args:
+            episode_ids: Episodes to remove
+
+        Returns:
+            Dictionary with counts of deleted/updated entities
+        """
+        if not episode_ids:
+            return {"quotes_deleted": 0, "nodes_deleted": 0, "nodes_updated": 0, "relationships_deleted": 0}
+
+        params = {"workspace_id": self.workspace_id, "episode_ids": list(episode_ids)}
+
+        quotes = self.client.execute_write(
+            f"""
+            MATCH (q:{NodeLabels.QUOTE})
+            WHERE q.workspace_id = $workspace_id AND q.episode_id IN $episode_ids
+            DETACH DELETE q
+            RETURN count(*) as count
+            """,
+            params,
+        )
+
+        # Relationships first, so node trimming below sees a consistent graph.
+        # A relationship from an episode joins concepts written from that
+        # episode, so only those nodes' relationships are expanded.
+        rels = self.client.execute_write(
+            f"""
+            MATCH (a:{NodeLabels.ENTITY})
+            WHERE a.workspace_id = $workspace_id
+              AND any(ep IN a.episode_ids WHERE ep IN $episode_ids)
+            MATCH (a)-[r]-()
+            WHERE type(r) <> '{RelationshipTypes.CROSS_EPISODE}'
+              AND any(ep IN r.episode_ids WHERE ep IN $episode_ids)
+            WITH DISTINCT r
+            WITH r, [ep IN r.episode_ids WHERE NOT ep IN $episode_ids] as remaining
+            SET r.episode_ids = remaining
+            WITH r, remaining
+            WHERE size(remaining) = 0
+            DELETE r
+            RETURN count(*) as count
+            """,
+            params,
+        )
+
+        nodes_deleted = self.client.execute_write(
+            f"""
+            MATCH (c:{NodeLabels.ENTITY})
+            WHERE c.workspace_id = $workspace_id
+              AND c.episode_ids IS NOT NULL
+              AND size(c.episode_ids) > 0
+              AND all(ep IN c.episode_ids WHERE ep IN $episode_ids)
+            DETACH DELETE c
+            RETURN count(*) as count
+            """,
+            params,
+        )
+
+        nodes_updated = self.client.execute_write(
+            f"""
+            MATCH (c:{NodeLabels.ENTITY})
+            WHERE c.workspace_id = $workspace_id
+              AND c.episode_ids IS NOT NULL
+              AND any(ep IN c.episode_ids WHERE ep IN $episode_ids)
+            SET c.episode_ids = [ep IN c.episode_ids WHERE NOT ep IN $episode_ids],
+                c.updated_at = datetime()
+            RETURN count(c) as count
+            """,
+            params,
+        )
+
+        counts = {
+            "quotes_deleted": quotes[0]["count"] if quotes else 0,
+            "nodes_deleted": nodes_deleted[0]["count"] if nodes_deleted else 0,
+            "nodes_updated": nodes_updated[0]["count"] if nodes_updated else 0,
+            "relationships_deleted": rels[0]["count"] if rels else 0,
+        }
+        self.logger.info(
+            "episodes_removed",
+            extra={"context": {"episodes": len(episode_ids), **counts}},
+        )
+        return counts
+
     def _get_node_label(self, concept_type: str) -> str:
         """Map concept type to Neo4j label."""
         label_map = {
@@ -8,6 +8,7 @@ from core_engine.metrics.cost_tracker import (
     APICall,
     get_cost_tracker,
     reset_cost_tracker,
+    calculate_cost,
     PRICING,
 )
 
@@ -25,6 +26,7 @@ __all__ = [
     "APICall",
     "get_cost_tracker",
     "reset_cost_tracker",
+    "calculate_cost",
     "PRICING",
     "PerformanceTracker",
     "PerformanceSummary",
@@ -30,6 +30,14 @@ PRICING = {
 }
 
 
+def calculate_cost(model: str, input_tokens: int, output_tokens: int = 0) -> float:
+    """Cost in USD of a call from its token counts (unknown models priced as gpt-4o)."""
+    pricing = PRICING.get(model, PRICING["gpt-4o"])
+    input_cost = (input_tokens / 1_000_000) * pricing["input"]
+    output_cost = (output_tokens / 1_000_000) * pricing["output"]
+    return input_cost + output_cost
+
+
 @dataclass
 class APICall:
     """Single API call record."""
@@ -145,15 +153,7 @@ class CostTracker:
     
     def _calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
         """Calculate cost for API call."""
-        if model not in PRICING:
-            # Default to gpt-4o pricing if unknown
-            pricing = PRICING["gpt-4o"]
-        else:
-            pricing = PRICING[model]
-        
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        return input_cost + output_cost
+        return calculate_cost(model, input_tokens, output_tokens)
     
     def get_summary(self) -> CostSummary:
         """Get summary of all tracked calls."""
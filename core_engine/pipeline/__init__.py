@@ -0,0 +1,19 @@
+"""
+End-to-end ingestion orchestration across the KG and vector stores.
+"""
+
+from core_engine.pipeline.engine import (
+    StagedIngestionEngine,
+    StageError,
+    IngestionCancelled,
+    run_staged_ingestion,
+)
+from core_engine.pipeline.progress import IngestionProgress
+
+__all__ = [
+    "StagedIngestionEngine",
+    "StageError",
+    "IngestionCancelled",
+    "run_staged_ingestion",
+    "IngestionProgress",
+]
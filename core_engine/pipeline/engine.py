@@ -0,0 +1,534 @@
+"""
+Staged ingestion engine.
+
+Loads and chunks transcripts once, then fans the same chunk set out to two
+stages that run concurrently:
+  - KG stage: extract -> normalize -> write (Neo4j)
+  - Embedding stage: embed -> upsert (Qdrant)
+
+Each stage is fed through a bounded queue so a slow stage applies
+backpressure to the producer instead of buffering the whole workspace.
+
+With a journal, every written item is recorded under a content key, and a
+re-run of the same job skips items that were already written (restart or
+crash halfway through a long ingest). A cancel event stops the stages after
+their current item; everything written so far stays journaled.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from core_engine.ingestion.loader import discover_transcripts, load_with_langchain
+from core_engine.ingestion.manifest import params_fingerprint
+from core_engine.chunking import chunk_documents
+from core_engine.kg.extraction_cache import chunk_text_hash
+from core_engine.kg.neo4j_client import get_neo4j_client
+from core_engine.kg.pipeline import KGExtractionPipeline
+from core_engine.kg.prompts import extraction_prompt_hash
+from core_engine.kg.writer import KGWriter
+from core_engine.embeddings.embedding_store import get_embedding_store
+from core_engine.embeddings.ingest_qdrant import (
+    get_clients,
+    delete_episode_points,
+    filter_embeddable_chunks,
+    upsert_chunk_batch,
+)
+from core_engine.pipeline.progress import IngestionProgress
+from core_engine.utils.rate_limiter import get_rate_limiter
+from core_engine.logging import get_logger
+
+
+# Sentinel marking the end of a stage queue
+_DONE = object()
+
+ProgressCallback = Callable[[str, int, int], None]
+
+# (batch_key, chunks) as passed through the stage queues
+StageItem = Tuple[str, List[Document]]
+
+
+class StageError(RuntimeError):
+    """Raised when one of the ingestion stages fails."""
+
+
+class IngestionCancelled(RuntimeError):
+    """Raised when a run is stopped through its cancel event."""
+
+
+class StagedIngestionEngine:
+    """Single-pass ingestion: one chunk set shared by the KG and embedding stages."""
+
+    def __init__(
+        self,
+        workspace_id: Optional[str] = None,
+        collection: Optional[str] = None,
+        model: str = "gpt-4o",
+        kg_batch_size: int = 10,
+        kg_batches_per_item: int = 5,
+        confidence_threshold: float = 0.5,
+        embed_model: str = "text-embedding-3-large",
+        embed_dim: int = 3072,
+        embed_batch_size: int = 50,
+        target_chars: int = 2000,
+        overlap_chars: int = 200,
+        queue_size: int = 4,
+    ):
+        """
+        Initialize staged ingestion engine.
+
+        Args:
+            workspace_id: Workspace identifier
+            collection: Qdrant collection (default: "<workspace_id>_chunks")
+            model: OpenAI model used for KG extraction
+            kg_batch_size: Chunks per LLM call
+            kg_batches_per_item: LLM batches handed to the KG stage per queue item
+            confidence_threshold: Minimum confidence score for extractions
+            embed_model: Embedding model name
+            embed_dim: Embedding dimensions
+            embed_batch_size: Chunks per embeddings request
+            target_chars: Chunk target size
+            overlap_chars: Chunk overlap size
+            queue_size: Maximum pending items per stage queue
+        """
+        self.workspace_id = workspace_id or "default"
+        self.collection = collection or f"{self.workspace_id}_chunks"
+        self.model = model
+        self.kg_batch_size = kg_batch_size
+        self.kg_batches_per_item = kg_batches_per_item
+        self.confidence_threshold = confidence_threshold
+        self.embed_model = embed_model
+        self.embed_dim = embed_dim
+        self.embed_batch_size = embed_batch_size
+        self.target_chars = target_chars
+        self.overlap_chars = overlap_chars
+        self.queue_size = queue_size
+        self.logger = get_logger("core_engine.pipeline.engine", workspace_id=self.workspace_id)
+
+        self._stop = threading.Event()
+        self._errors: List[Tuple[str, BaseException]] = []
+        self._journal: Optional[Any] = None
+        self._cancel: Optional[threading.Event] = None
+        self._progress: Optional[IngestionProgress] = None
+
+    def fingerprint(self) -> str:
+        """Fingerprint of every setting that changes the chunks or what is extracted from them."""
+        return params_fingerprint({
+            "target_chars": self.target_chars,
+            "overlap_chars": self.overlap_chars,
+            "model": self.model,
+            "kg_batch_size": self.kg_batch_size,
+            "confidence_threshold": self.confidence_threshold,
+            "extraction_prompt": extraction_prompt_hash(),
+            "embed_model": self.embed_model,
+            "embed_dim": self.embed_dim,
+        })
+
+    def load_and_chunk(
+        self,
+        transcripts_dir: Path,
+        paths: Optional[List[Path]] = None,
+    ) -> Tuple[List[Document], List[Document]]:
+        """
+        Load and chunk transcripts exactly once.
+
+        Args:
+            transcripts_dir: Workspace transcripts directory
+            paths: Optional subset of files to load (default: discover everything)
+
+        Returns:
+            Tuple of (documents, chunks)
+        """
+        if paths is None:
+            paths = discover_transcripts(transcripts_dir, workspace_id=self.workspace_id)
+        docs = load_with_langchain(paths, workspace_id=self.workspace_id)
+        chunks = chunk_documents(
+            docs,
+            target_chars=self.target_chars,
+            overlap_chars=self.overlap_chars,
+        )
+        self.logger.info(
+            "staged_chunking_complete",
+            extra={"context": {"documents": len(docs), "chunks": len(chunks)}},
+        )
+        return docs, chunks
+
+    def remove_episodes(self, episode_ids: List[str]) -> Dict[str, int]:
+        """
+        Remove stale Neo4j data and Qdrant points for the given episodes.
+
+        Args:
+            episode_ids: Episodes being re-ingested or deleted
+
+        Returns:
+            KG removal counts
+        """
+        if not episode_ids:
+            return {}
+        client = get_neo4j_client(workspace_id=self.workspace_id)
+        try:
+            counts = KGWriter(client, workspace_id=self.workspace_id).remove_episodes(episode_ids)
+        finally:
+            client.close()
+        _, qdrant = get_clients(self.embed_dim, self.collection)
+        delete_episode_points(qdrant, self.collection, episode_ids, workspace_id=self.workspace_id)
+        return counts
+
+    def run(
+        self,
+        chunks: List[Document],
+        on_progress: Optional[ProgressCallback] = None,
+        journal: Optional[Any] = None,
+        cancel_event: Optional[threading.Event] = None,
+        progress: Optional[IngestionProgress] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run the KG and embedding stages concurrently over one chunk set.
+
+        Args:
+            chunks: Chunks produced by `chunk_documents`
+            on_progress: Optional callback (stage, done, total) called after each item
+            journal: Optional batch journal with `completed(stage) -> {key: output}`,
+                `record(stage, key, chunk_ids, output)` and `set_totals({stage: total})`.
+                Items already in it are skipped and their recorded output counted.
+            cancel_event: Optional event; once set, the stages stop after their
+                current item and IngestionCancelled is raised
+            progress: Optional tracker fed with per-batch counts and token usage
+                of the extract, write and embed stages
+
+        Returns:
+            Dictionary with "extracted", "written" (KG counts) and "embedded"
+            totals, plus "failed_batches" and "failed_episode_ids" for LLM
+            extraction batches that failed (their chunks are not in the graph)
+        """
+        self._stop.clear()
+        self._errors = []
+        self._journal = journal
+        self._cancel = cancel_event
+        self._progress = progress
+
+        embeddable = filter_embeddable_chunks(chunks)
+        kg_items = self._keyed("kg", self._split(chunks, self.kg_batch_size * self.kg_batches_per_item))
+        embed_items = self._keyed("embed", self._split(embeddable, self.embed_batch_size))
+
+        kg_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        kg_result: Dict[str, Any] = {
+            "extracted": {"concepts": 0, "relationships": 0, "quotes": 0},
+            "written": {"concepts": 0, "relationships": 0, "quotes": 0},
+            "failed_batches": [],
+        }
+        embed_result = {"embedded": 0}
+
+        kg_total, embed_total = len(kg_items), len(embed_items)
+        skipped = {"kg": 0, "embed": 0}
+        if journal is not None:
+            journal.set_totals({"kg": kg_total, "embed": embed_total})
+            kg_done = journal.completed("kg")
+            embed_done = journal.completed("embed")
+            for key, _ in kg_items:
+                if key in kg_done:
+                    self._add_kg_stats(kg_result, kg_done[key])
+            for key, _ in embed_items:
+                if key in embed_done:
+                    embed_result["embedded"] += embed_done[key].get("embedded", 0)
+            kg_items = [item for item in kg_items if item[0] not in kg_done]
+            embed_items = [item for item in embed_items if item[0] not in embed_done]
+            skipped = {"kg": kg_total - len(kg_items), "embed": embed_total - len(embed_items)}
+            if skipped["kg"] or skipped["embed"]:
+                self.logger.info(
+                    "staged_ingestion_resume",
+                    extra={"context": {"skipped_items": skipped, "totals": {"kg": kg_total, "embed": embed_total}}},
+                )
+
+        if progress is not None:
+            kg_skipped = len(chunks) - sum(len(batch) for _, batch in kg_items)
+            embed_skipped = len(embeddable) - sum(len(batch) for _, batch in embed_items)
+            progress.set_total("extract", len(chunks), skipped=kg_skipped)
+            progress.set_total("write", len(chunks), skipped=kg_skipped)
+            progress.set_total("embed", len(embeddable), skipped=embed_skipped)
+
+        self.logger.info(
+            "staged_ingestion_start",
+            extra={
+                "context": {
+                    "chunks": len(chunks),
+                    "kg_items": len(kg_items),
+                    "embed_items": len(embed_items),
+                    "skipped_items": skipped,
+                    "queue_size": self.queue_size,
+                }
+            },
+        )
+        start_time = time.time()
+
+        threads = [
+            threading.Thread(
+                target=self._guard,
+                args=("produce", self._produce, [(kg_queue, kg_items), (embed_queue, embed_items)]),
+                name="ingest-producer",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._guard,
+                args=("kg", self._kg_stage, kg_queue, kg_total, skipped["kg"], kg_result, on_progress),
+                name="ingest-kg",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._guard,
+                args=("embed", self._embed_stage, embed_queue, embed_total, skipped["embed"], embed_result, on_progress),
+                name="ingest-embed",
+                daemon=True,
+            ),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        if self._errors:
+            stage, error = self._errors[0]
+            raise StageError(f"Ingestion stage '{stage}' failed: {error}") from error
+        if self._stopping():
+            self.logger.info(
+                "staged_ingestion_cancelled",
+                extra={"context": {"written": kg_result["written"], "embedded": embed_result["embedded"]}},
+            )
+            raise IngestionCancelled("Ingestion cancelled")
+
+        elapsed = time.time() - start_time
+        self.logger.info(
+            "staged_ingestion_complete",
+            extra={
+                "context": {
+                    "elapsed_s": round(elapsed, 2),
+                    "written": kg_result["written"],
+                    "embedded": embed_result["embedded"],
+                }
+            },
+        )
+
+        failed_episode_ids = sorted({ep for b in kg_result["failed_batches"] for ep in b["episode_ids"]})
+        if failed_episode_ids:
+            self.logger.warning(
+                "staged_ingestion_failed_batches",
+                extra={"context": {
+                    "failed_batches": len(kg_result["failed_batches"]),
+                    "episode_ids": failed_episode_ids,
+                }},
+            )
+
+        return {
+            "extracted": kg_result["extracted"],
+            "written": kg_result["written"],
+            "embedded": embed_result["embedded"],
+            "failed_batches": kg_result["failed_batches"],
+            "failed_episode_ids": failed_episode_ids,
+        }
+
+    def _guard(self, stage: str, target: Callable, *args) -> None:
+        """Run a stage, recording its error and signalling the others to stop."""
+        try:
+            target(*args)
+        except BaseException as e:  # noqa: BLE001
+            self.logger.error(
+                "staged_ingestion_stage_failed",
+                exc_info=True,
+                extra={"context": {"stage": stage, "error": str(e)}},
+            )
+            self._errors.append((stage, e))
+            self._stop.set()
+
+    def _stopping(self) -> bool:
+        """True once a stage failed or the run was cancelled."""
+        return self._stop.is_set() or (self._cancel is not None and self._cancel.is_set())
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Blocking put that gives up once the engine is stopping."""
+        while not self._stopping():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        """Blocking get that returns the sentinel once the engine is stopping."""
+        while not self._stopping():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _produce(self, feeds: List[Tuple[queue.Queue, List[StageItem]]]) -> None:
+        """Interleave items into each stage queue so neither stage starves."""
+        longest = max((len(items) for _, items in feeds), default=0)
+        for i in range(longest):
+            for q, items in feeds:
+                if i < len(items) and not self._put(q, items[i]):
+                    return
+        for q, _ in feeds:
+            if not self._put(q, _DONE):
+                return
+
+    def _kg_stage(
+        self,
+        q: queue.Queue,
+        total: int,
+        done: int,
+        result: Dict[str, Any],
+        on_progress: Optional[ProgressCallback],
+    ) -> None:
+        """Consume chunk windows and run extract -> normalize -> write on each."""
+        pipeline = KGExtractionPipeline(
+            workspace_id=self.workspace_id,
+            model=self.model,
+            batch_size=self.kg_batch_size,
+            confidence_threshold=self.confidence_threshold,
+        )
+        try:
+            while True:
+                item = self._get(q)
+                if item is _DONE:
+                    break
+                batch_key, batch = item
+                stats = pipeline.process_chunks(batch, on_batch=self._on_extract_batch)
+                self._add_kg_stats(result, stats)
+                result["failed_batches"].extend(stats.get("failed_batches", []))
+                if self._progress is not None:
+                    self._progress.add("write", len(batch), **stats.get("written", {}))
+                # A window with a failed extraction batch is not journaled:
+                # a resumed or reclaimed job extracts it again
+                if not stats.get("failed_batches"):
+                    self._record("kg", batch_key, batch, {
+                        "extracted": stats.get("extracted", {}),
+                        "written": stats.get("written", {}),
+                    })
+                done += 1
+                if on_progress:
+                    on_progress("kg", done, total)
+        finally:
+            pipeline.close()
+
+    def _embed_stage(
+        self,
+        q: queue.Queue,
+        total: int,
+        done: int,
+        result: Dict[str, Any],
+        on_progress: Optional[ProgressCallback],
+    ) -> None:
+        """Consume chunk batches, embed them and upsert to Qdrant."""
+        client, qdrant = get_clients(self.embed_dim, self.collection)
+        rate_limiter = get_rate_limiter(
+            requests_per_minute=500,
+            tokens_per_minute=5_000_000,
+        )
+        store = get_embedding_store(self.embed_model, self.embed_dim)
+        while True:
+            item = self._get(q)
+            if item is _DONE:
+                break
+            batch_key, batch = item
+            embedded = upsert_chunk_batch(
+                client, qdrant, self.collection, self.embed_model, batch,
+                rate_limiter=rate_limiter, store=store,
+                on_usage=self._progress.add_usage if self._progress is not None else None,
+            )
+            result["embedded"] += embedded
+            if self._progress is not None:
+                self._progress.add("embed", len(batch), embedded=embedded)
+            self._record("embed", batch_key, batch, {"embedded": embedded})
+            done += 1
+            if on_progress:
+                on_progress("embed", done, total)
+
+    def _on_extract_batch(self, info: Dict[str, Any]) -> None:
+        """Feed one LLM extraction batch to the progress tracker."""
+        if self._progress is None:
+            return
+        if info.get("input_tokens") or info.get("output_tokens"):
+            self._progress.add_usage(self.model, info["input_tokens"], info["output_tokens"])
+        self._progress.add(
+            "extract",
+            info["chunks"],
+            concepts=info.get("concepts", 0),
+            relationships=info.get("relationships", 0),
+            quotes=info.get("quotes", 0),
+            cached_batches=int(info.get("cached", False)),
+            failed_batches=int(info.get("failed", False)),
+        )
+
+    @staticmethod
+    def _split(chunks: List[Document], size: int) -> List[List[Document]]:
+        size = max(1, size)
+        return [chunks[i : i + size] for i in range(0, len(chunks), size)]
+
+    def _keyed(self, stage: str, items: List[List[Document]]) -> List[StageItem]:
+        """Attach a content key to each item: same chunks and settings -> same key."""
+        fingerprint = self.fingerprint()
+        keyed = []
+        for batch in items:
+            digest = hashlib.sha256(f"{stage}|{fingerprint}".encode("utf-8"))
+            for chunk in batch:
+                digest.update(f"{chunk.metadata.get('episode_id')}|{chunk_text_hash(chunk)}".encode("utf-8"))
+            keyed.append((digest.hexdigest(), batch))
+        return keyed
+
+    @staticmethod
+    def _add_kg_stats(result: Dict[str, Any], stats: Dict[str, Any]) -> None:
+        for section in ("extracted", "written"):
+            for key in result[section]:
+                result[section][key] += stats.get(section, {}).get(key, 0)
+
+    def _record(self, stage: str, batch_key: str, batch: List[Document], output: Dict[str, Any]) -> None:
+        """Journal a written item (no-op without a journal)."""
+        if self._journal is None:
+            return
+        chunk_ids = [
+            f"{c.metadata.get('episode_id')}:{c.metadata.get('chunk_index')}" for c in batch
+        ]
+        self._journal.record(stage, batch_key, chunk_ids, output)
+
+
+def run_staged_ingestion(
+    transcripts_dir: Path,
+    workspace_id: Optional[str] = None,
+    collection: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    **engine_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Load, chunk and ingest a transcripts directory in a single pass (convenience function).
+
+    Args:
+        transcripts_dir: Directory with transcript files
+        workspace_id: Workspace identifier
+        collection: Qdrant collection name
+        on_progress: Optional callback (stage, done, total)
+        **engine_kwargs: Extra StagedIngestionEngine settings
+
+    Returns:
+        Engine results plus "total_files" and "total_chunks"
+    """
+    engine = StagedIngestionEngine(
+        workspace_id=workspace_id,
+        collection=collection,
+        **engine_kwargs,
+    )
+    docs, chunks = engine.load_and_chunk(transcripts_dir)
+    results = engine.run(chunks, on_progress=on_progress)
+    results["total_files"] = len(docs)
+    results["total_chunks"] = len(chunks)
+    return results
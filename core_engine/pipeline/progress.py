@@ -0,0 +1,181 @@
+"""
+Live progress of a staged ingestion run.
+
+The extractor, writer and embedder report every batch they finish (chunks,
+counts, token usage). `IngestionProgress` aggregates those counters across the
+stage threads and derives throughput (chunks/sec), an ETA and the API cost so
+far. Snapshots are handed to `on_flush` at most every `flush_interval`
+seconds, so a job stores its progress in batches instead of on every call.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from core_engine.metrics.cost_tracker import calculate_cost
+
+
+# Stages reported by StagedIngestionEngine and how much of the overall
+# percentage each is worth (LLM extraction dominates wall-clock time)
+STAGE_WEIGHTS = {"extract": 0.6, "write": 0.2, "embed": 0.2}
+
+FlushCallback = Callable[[Dict[str, Any]], None]
+
+
+class IngestionProgress:
+    """Thread-safe per-stage counters with throughput, ETA and cost."""
+
+    def __init__(self, on_flush: Optional[FlushCallback] = None, flush_interval: float = 2.0):
+        """
+        Initialize progress tracker.
+
+        Args:
+            on_flush: Called with `snapshot()` when a batch of updates is due
+            flush_interval: Minimum seconds between two `on_flush` calls
+        """
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.phase: Optional[str] = None
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._stages: Dict[str, Dict[str, Any]] = {
+            stage: self._new_stage() for stage in STAGE_WEIGHTS
+        }
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._cost = 0.0
+
+    @staticmethod
+    def _new_stage() -> Dict[str, Any]:
+        return {
+            "batches_done": 0,
+            "chunks_done": 0,
+            "chunks_total": 0,
+            "chunks_skipped": 0,  # already done by an earlier attempt
+            "counters": {},
+            "started_at": None,
+            "last_at": None,
+        }
+
+    def set_phase(self, phase: str) -> None:
+        """Record the job phase and flush immediately."""
+        with self._lock:
+            self.phase = phase
+        self.flush(force=True)
+
+    def set_total(self, stage: str, chunks: int, skipped: int = 0) -> None:
+        """
+        Set the chunk total of a stage.
+
+        Args:
+            stage: Stage name
+            chunks: Chunks the stage handles in total
+            skipped: Chunks already done (journaled) that will not run again
+        """
+        with self._lock:
+            s = self._stages.setdefault(stage, self._new_stage())
+            s["chunks_total"] = chunks
+            s["chunks_skipped"] = skipped
+            s["started_at"] = time.time()  # throughput is measured from here
+
+    def add(self, stage: str, chunks: int, **counters: int) -> None:
+        """
+        Record one finished batch of a stage.
+
+        Args:
+            stage: Stage name ("extract", "write", "embed")
+            chunks: Chunks in the batch
+            **counters: Extra counts to add (concepts, quotes, embedded, ...)
+        """
+        now = time.time()
+        with self._lock:
+            s = self._stages.setdefault(stage, self._new_stage())
+            if s["started_at"] is None:
+                s["started_at"] = now
+            s["batches_done"] += 1
+            s["chunks_done"] += chunks
+            s["last_at"] = now
+            for key, value in counters.items():
+                s["counters"][key] = s["counters"].get(key, 0) + (value or 0)
+        self.flush()
+
+    def add_usage(self, model: str, input_tokens: int, output_tokens: int = 0) -> None:
+        """Record token usage of one API call and its cost."""
+        with self._lock:
+            usage = self._usage.setdefault(model, {"calls": 0, "input_tokens": 0, "output_tokens": 0})
+            usage["calls"] += 1
+            usage["input_tokens"] += input_tokens or 0
+            usage["output_tokens"] += output_tokens or 0
+            self._cost += calculate_cost(model, input_tokens or 0, output_tokens or 0)
+
+    def fraction(self) -> float:
+        """Overall completion in [0, 1], weighted by stage."""
+        with self._lock:
+            return self._fraction()
+
+    def _fraction(self) -> float:
+        done = 0.0
+        for stage, weight in STAGE_WEIGHTS.items():
+            s = self._stages[stage]
+            total = s["chunks_total"]
+            finished = s["chunks_done"] + s["chunks_skipped"]
+            done += weight * (min(finished / total, 1.0) if total else 1.0)
+        return done
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters plus chunks/sec, ETA and cost."""
+        now = time.time()
+        with self._lock:
+            stages = {}
+            eta = 0.0
+            for stage, s in self._stages.items():
+                elapsed = (s["last_at"] - s["started_at"]) if s["last_at"] else 0.0
+                # Throughput of this attempt only: skipped chunks took no time
+                rate = s["chunks_done"] / elapsed if elapsed > 0 else None
+                remaining = max(s["chunks_total"] - s["chunks_skipped"] - s["chunks_done"], 0)
+                stage_eta = remaining / rate if rate else None
+                if remaining and stage_eta is None:
+                    eta = None
+                elif eta is not None and stage_eta is not None:
+                    # Stages run concurrently: the slowest one finishes last
+                    eta = max(eta, stage_eta)
+                stages[stage] = {
+                    "batches_done": s["batches_done"],
+                    "chunks_done": s["chunks_done"] + s["chunks_skipped"],
+                    "chunks_total": s["chunks_total"],
+                    "chunks_per_sec": round(rate, 2) if rate else None,
+                    "eta_s": round(stage_eta, 1) if stage_eta is not None else None,
+                    **s["counters"],
+                }
+            extract_rate = stages["extract"]["chunks_per_sec"]
+            return {
+                "phase": self.phase,
+                "fraction": round(self._fraction(), 4),
+                "elapsed_s": round(now - self.started_at, 1),
+                "chunks_per_sec": extract_rate,
+                "eta_s": round(eta, 1) if eta is not None else None,
+                "cost_usd": round(self._cost, 4),
+                "usage": {model: dict(u) for model, u in self._usage.items()},
+                "stages": stages,
+                "updated_at": now,
+            }
+
+    def flush(self, force: bool = False) -> None:
+        """Hand a snapshot to `on_flush` if the flush interval has passed (or `force`)."""
+        if self.on_flush is None:
+            return
+        # A stage thread never waits for another thread's flush to finish
+        if not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.time()
+            if not force and now - self._last_flush < self.flush_interval:
+                return
+            self._last_flush = now
+            self.on_flush(self.snapshot())
+        finally:
+            self._flush_lock.release()
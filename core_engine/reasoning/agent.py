@@ -34,6 +34,8 @@ from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 from core_engine.logging import get_logger
+from core_engine.reasoning.hybrid_retriever import entity_filter_tokens, matches_entity_tokens
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 from core_engine.reasoning.style_config import STYLE_INSTRUCTIONS, DEFAULT_STYLE
 from core_engine.reasoning.tone_config import TONE_INSTRUCTIONS, DEFAULT_TONE
 
@@ -157,7 +159,8 @@ class PodcastAgent:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found")
-            self.openai_client = OpenAI(api_key=api_key)
+            # Interactive class: admitted ahead of background ingestion calls
+            self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
         except Exception as e:
             self.logger.error(f"OpenAI init failed: {e}")
             self.openai_client = None
@@ -796,10 +799,10 @@ Respond with JSON:
             if node_type.lower() == "all":
                 # Get all types with counts
                 cypher = """
-                MATCH (c)
+                MATCH (c:Entity)
                 WHERE c.workspace_id = $workspace_id
                   AND (c:Concept OR c:Practice OR c:Person OR c:Principle OR c:Outcome OR c:CognitiveState OR c:BehavioralPattern)
-                WITH labels(c)[0] as type, collect(c.name)[..$limit] as names, count(*) as total
+                WITH [l IN labels(c) WHERE l <> 'Entity'][0] as type, collect(c.name)[..$limit] as names, count(*) as total
                 RETURN type, names, total
                 ORDER BY total DESC
                 """
@@ -1192,7 +1195,7 @@ Provide a clear, well-formatted answer:"""
         if self.neo4j_client:
             try:
                 cypher = """
-                MATCH (c)
+                MATCH (c:Entity)
                 WHERE c.workspace_id = $workspace_id
                   AND (c:Concept OR c:Practice OR c:Person OR c:Principle OR c:Outcome 
                        OR c:CognitiveState OR c:BehavioralPattern)
@@ -1340,16 +1343,30 @@ Provide a clear, well-formatted answer:"""
         kg_results = []
         
         def _rag_search():
-            """RAG search function for parallel execution."""
+            """
+            RAG search function for parallel execution.
+            Returns (results, entity filters the vector search applied or None, error).
+            """
             if self.hybrid_retriever:
                 try:
-                    results = self.hybrid_retriever.retrieve(resolved_query, use_vector=True, use_graph=False)
+                    # Multi-entity queries: restrict the vector search itself to the
+                    # mentioned episodes/speakers so top-k is filled with matching chunks
+                    filters = None
+                    if mentioned_entities and len(mentioned_entities) > 1:
+                        filters = self.hybrid_retriever.resolve_entity_filters(mentioned_entities)
+                    results = self.hybrid_retriever.retrieve(
+                        resolved_query, use_vector=True, use_graph=False, filters=filters
+                    )
+                    if filters is not None and not results:
+                        self.logger.warning(f"No RAG results within entity filters {filters}; retrying unfiltered")
+                        results = self.hybrid_retriever.retrieve(resolved_query, use_vector=True, use_graph=False)
+                        filters = None
                     self.logger.info(f"RAG returned {len(results)} results")
-                    return results, None
+                    return results, filters, None
                 except Exception as e:
                     self.logger.error(f"RAG search failed: {e}")
-                    return [], e
-            return [], None
+                    return [], None, e
+            return [], None, None
         
         def _kg_search():
             """KG search function for parallel execution."""
@@ -1369,7 +1386,7 @@ Provide a clear, well-formatted answer:"""
             kg_future = executor.submit(_kg_search)
             
             # Wait for both to complete
-            rag_result, rag_error = rag_future.result()
+            rag_result, applied_filters, rag_error = rag_future.result()
             kg_result, kg_error = kg_future.result()
             
             rag_results = rag_result
@@ -1392,36 +1409,24 @@ Provide a clear, well-formatted answer:"""
             coverage_info = self._validate_entity_coverage(mentioned_entities, rag_results, kg_results)
             self.logger.info(f"Entity coverage: {coverage_info}")
             
-            # Filter RAG results to ONLY include mentioned entities (strict filtering)
-            filtered_rag = []
-            for r in rag_results:
-                metadata = r.get("metadata", {})
-                episode_id = (metadata.get("episode_id") or "").lower()
-                speaker = (metadata.get("speaker") or "").lower()
-                text = (r.get("text") or "").lower()
-                
-                # Check if this result is from one of the mentioned entities
-                is_from_mentioned = False
-                for entity in mentioned_entities:
-                    entity_parts = entity.split()
-                    # Check episode_id (e.g., "002_JERROD_CARMICHAEL")
-                    if any(part in episode_id for part in entity_parts):
-                        is_from_mentioned = True
-                        break
-                    # Check speaker
-                    if any(part in speaker for part in entity_parts):
-                        is_from_mentioned = True
-                        break
+            # Filter RAG results to ONLY include mentioned entities (strict filtering).
+            # Already done inside the vector search when its entity filters applied;
+            # otherwise matched the same way (whole words of episode id / speaker)
+            if applied_filters is None:
+                tokens = entity_filter_tokens(mentioned_entities)
+                # e.g. "jerrod" -> episode "002_JERROD_CARMICHAEL" or speaker "Jerrod Carmichael"
+                filtered_rag = [
+                    r for r in rag_results
+                    if matches_entity_tokens(r.get("metadata", {}).get("episode_id"), tokens)
+                    or matches_entity_tokens(r.get("metadata", {}).get("speaker"), tokens)
+                ]
                 
-                if is_from_mentioned:
-                    filtered_rag.append(r)
-            
-            # Use filtered results (only if we have some)
-            if filtered_rag:
-                self.logger.info(f"Filtered RAG results: {len(rag_results)} → {len(filtered_rag)} (only mentioned entities)")
-                rag_results = filtered_rag
-            else:
-                self.logger.warning(f"No RAG results match mentioned entities: {mentioned_entities}")
+                # Use filtered results (only if we have some)
+                if filtered_rag:
+                    self.logger.info(f"Filtered RAG results: {len(rag_results)} → {len(filtered_rag)} (only mentioned entities)")
+                    rag_results = filtered_rag
+                else:
+                    self.logger.warning(f"No RAG results match mentioned entities: {mentioned_entities}")
             
             if not coverage_info["all_covered"]:
                 missing = coverage_info["missing"]
@@ -1513,7 +1518,7 @@ Provide a clear, well-formatted answer:"""
         WHERE related.workspace_id = $workspace_id
         WITH DISTINCT c, collect(DISTINCT {rel: type(r), target: related.name})[..5] as relationships
         RETURN c.name as concept, 
-               labels(c)[0] as type,
+               [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                c.description as description,
                relationships,
                CASE 
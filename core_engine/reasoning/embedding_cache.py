@@ -7,160 +7,264 @@ Uses LRU (Least Recently Used) eviction policy.
 Features:
 - Exact match caching: Identical queries return cached embeddings
 - TTL (Time To Live): Embeddings expire after configurable time
-- Memory-efficient: Uses LRU eviction for memory management
+- Compact memory tier: vectors live in one preallocated float32 (or float16)
+  NumPy arena instead of Python float lists (~12 KB vs ~100 KB per entry)
+- Thread-safe: get/set may be called from executor threads
+- Optional shared disk tier (off by default): an EmbeddingStore
+  (memory-mapped float32 file + SQLite index) that every worker process reads
+  and writes, so embeddings survive restarts and are computed once per
+  deployment rather than once per worker
+
+Environment:
+  EMBEDDING_CACHE_DTYPE=float32             # or float16 (memory tier only)
+  EMBEDDING_CACHE_DISK=false                # true enables the shared disk tier
+  EMBEDDING_CACHE_DISK_PATH=data/cache/query_embeddings
 """
 
-from typing import Optional, Dict, Any, List
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Sequence
 from collections import OrderedDict
 import time
 import hashlib
+
+import numpy as np
+
+from core_engine.embeddings.embedding_store import EmbeddingStore
 from core_engine.logging import get_logger
 
 logger = get_logger(__name__)
 
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_DISK_PATH = ROOT / "data" / "cache" / "query_embeddings"
+
+DEFAULT_EMBED_MODEL = "text-embedding-3-large"
+DEFAULT_EMBED_DIM = 3072
+
 
 class EmbeddingCache:
     """
     LRU cache for OpenAI embeddings.
-    
+
     Avoids redundant API calls by caching embeddings for identical queries.
+    The memory tier is per process; the optional disk tier is shared.
     """
-    
+
     def __init__(
         self,
         max_size: int = 1000,
         ttl_seconds: int = 3600,  # 1 hour default
+        model: str = DEFAULT_EMBED_MODEL,
+        dimensions: int = DEFAULT_EMBED_DIM,
+        dtype: str = "float32",
+        disk_path: Optional[Path] = None,
     ):
         """
         Initialize embedding cache.
-        
+
         Args:
-            max_size: Maximum number of cached embeddings
-            ttl_seconds: Time-to-live for cached entries (seconds)
+            max_size: Maximum number of cached embeddings (in memory)
+            ttl_seconds: Time-to-live for in-memory entries (seconds)
+            model: Embedding model the vectors come from (disk tier namespace)
+            dimensions: Expected vector dimensions (arena width)
+            dtype: "float32" or "float16" for the in-memory arena
+            disk_path: Directory of the shared disk tier (None disables it)
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.model = model
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported embedding cache dtype: {dtype}")
+        self.disk_path = Path(disk_path) if disk_path else None
+
+        self._lock = threading.Lock()
+        # key -> (arena row, timestamp); order = recency
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
         self._hits = 0
+        self._disk_hits = 0
         self._misses = 0
-        
+        self._resize(dimensions)
+
         logger.info(
             "embedding_cache_initialized",
-            extra={"context": {"max_size": max_size, "ttl_seconds": ttl_seconds}}
+            extra={"context": {
+                "max_size": max_size,
+                "ttl_seconds": ttl_seconds,
+                "dtype": self.dtype.name,
+                "arena_bytes": self._arena.nbytes,
+                "disk_tier": str(self.disk_path) if self.disk_path else None,
+            }}
         )
-    
+
+    def _resize(self, dimensions: int) -> None:
+        """(Re)allocate the arena and disk tier for `dimensions` (caller holds the lock)."""
+        self.dimensions = dimensions
+        self._arena = np.zeros((self.max_size, dimensions), dtype=self.dtype)
+        self._free = list(range(self.max_size - 1, -1, -1))
+        self._cache.clear()
+        self._disk: Optional[EmbeddingStore] = None
+        if self.disk_path is not None:
+            try:
+                self._disk = EmbeddingStore(self.model, dimensions, root=self.disk_path)
+            except Exception as e:
+                logger.warning("embedding_cache_disk_unavailable", extra={"context": {"error": str(e)}})
+
     def _get_cache_key(self, text: str) -> str:
         """Generate cache key from text."""
         # Normalize text: lowercase, strip whitespace
         normalized = text.lower().strip()
         # Hash for consistent key length
         return hashlib.sha256(normalized.encode()).hexdigest()[:32]
-    
+
+    def _store(self, key: str, vector: np.ndarray) -> None:
+        """Put a vector into the arena, evicting the LRU entry if full (caller holds the lock)."""
+        if key in self._cache:
+            row = self._cache.pop(key)[0]
+        else:
+            if not self._free:
+                oldest_key, (oldest_row, _) = self._cache.popitem(last=False)
+                self._free.append(oldest_row)
+                logger.debug(
+                    "embedding_cache_eviction",
+                    extra={"context": {"evicted_key": oldest_key[:8]}}
+                )
+            row = self._free.pop()
+        self._arena[row] = vector
+        self._cache[key] = (row, time.time())
+
     def get(self, text: str) -> Optional[List[float]]:
         """
         Get cached embedding for text.
-        
+
         Args:
             text: Query text
-            
+
         Returns:
             Cached embedding or None if not found/expired
         """
         key = self._get_cache_key(text)
-        
-        if key not in self._cache:
-            self._misses += 1
-            return None
-        
-        entry = self._cache[key]
-        
-        # Check TTL
-        if time.time() - entry["timestamp"] > self.ttl_seconds:
-            # Expired - remove and return None
-            del self._cache[key]
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                row, timestamp = entry
+                if time.time() - timestamp <= self.ttl_seconds:
+                    # Move to end (most recently used)
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return self._arena[row].astype(np.float32).tolist()
+                # Expired - free the row
+                del self._cache[key]
+                self._free.append(row)
+            disk = self._disk
+
+        # Shared tier (other workers / earlier runs); content-addressed, so no TTL
+        if disk is not None:
+            found = disk.get_many([bytes.fromhex(key)])
+            if found:
+                vector = next(iter(found.values()))
+                with self._lock:
+                    if self._disk is disk:
+                        self._store(key, vector)
+                    self._disk_hits += 1
+                return vector.tolist()
+
+        with self._lock:
             self._misses += 1
-            return None
-        
-        # Move to end (most recently used)
-        self._cache.move_to_end(key)
-        self._hits += 1
-        
-        logger.debug(
-            "embedding_cache_hit",
-            extra={"context": {"key": key[:8], "hits": self._hits}}
-        )
-        
-        return entry["embedding"]
-    
-    def set(self, text: str, embedding: List[float]) -> None:
+        return None
+
+    def set(self, text: str, embedding: Sequence[float]) -> None:
         """
         Cache embedding for text.
-        
+
         Args:
             text: Query text
             embedding: Embedding vector
         """
         key = self._get_cache_key(text)
-        
-        # Evict oldest if at capacity
-        while len(self._cache) >= self.max_size:
-            oldest_key = next(iter(self._cache))
-            del self._cache[oldest_key]
-            logger.debug(
-                "embedding_cache_eviction",
-                extra={"context": {"evicted_key": oldest_key[:8]}}
-            )
-        
-        # Store with timestamp
-        self._cache[key] = {
-            "embedding": embedding,
-            "timestamp": time.time(),
-            "text_preview": text[:50],
-        }
-        
-        # Move to end
-        self._cache.move_to_end(key)
-    
+        vector = np.asarray(embedding, dtype=np.float32)
+
+        with self._lock:
+            if vector.shape != (self.dimensions,):
+                # A different embedding model: start over at its width
+                logger.warning(
+                    "embedding_cache_dimensions_changed",
+                    extra={"context": {"from": self.dimensions, "to": int(vector.shape[-1])}}
+                )
+                self._resize(int(vector.shape[-1]))
+            self._store(key, vector)
+            disk = self._disk
+
+        if disk is not None:
+            try:
+                disk.put_many([(bytes.fromhex(key), vector)])
+            except Exception as e:
+                logger.warning("embedding_cache_disk_write_failed", extra={"context": {"error": str(e)}})
+
     def clear(self) -> None:
-        """Clear all cached embeddings."""
-        self._cache.clear()
-        self._hits = 0
-        self._misses = 0
+        """Clear all in-memory embeddings (the shared disk tier is kept)."""
+        with self._lock:
+            self._cache.clear()
+            self._free = list(range(self.max_size - 1, -1, -1))
+            self._hits = 0
+            self._disk_hits = 0
+            self._misses = 0
         logger.info("embedding_cache_cleared")
-    
+
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        total = self._hits + self._misses
-        hit_rate = self._hits / total if total > 0 else 0.0
-        
-        return {
-            "size": len(self._cache),
-            "max_size": self.max_size,
-            "hits": self._hits,
-            "misses": self._misses,
-            "hit_rate": hit_rate,
-            "ttl_seconds": self.ttl_seconds,
-        }
+        with self._lock:
+            hits = self._hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / total if total > 0 else 0.0,
+                "ttl_seconds": self.ttl_seconds,
+                "dtype": self.dtype.name,
+                "arena_bytes": self._arena.nbytes,
+                "disk": self._disk.get_stats() if self._disk is not None else None,
+            }
 
 
-# Global cache instance (singleton)
-_embedding_cache: Optional[EmbeddingCache] = None
+# Global cache instances (one per embedding model)
+_embedding_caches: Dict[str, EmbeddingCache] = {}
+_embedding_caches_lock = threading.Lock()
 
 
-def get_embedding_cache(max_size: int = 1000, ttl_seconds: int = 3600) -> EmbeddingCache:
+def get_embedding_cache(
+    max_size: int = 1000,
+    ttl_seconds: int = 3600,
+    model: Optional[str] = None,
+) -> EmbeddingCache:
     """
-    Get or create global embedding cache instance.
-    
+    Get or create the process-wide embedding cache for a model.
+
     Args:
         max_size: Maximum cache size
         ttl_seconds: Time-to-live for entries
-        
+        model: Embedding model (default: EMBED_MODEL or text-embedding-3-large)
+
     Returns:
         EmbeddingCache instance
     """
-    global _embedding_cache
-    
-    if _embedding_cache is None:
-        _embedding_cache = EmbeddingCache(max_size=max_size, ttl_seconds=ttl_seconds)
-    
-    return _embedding_cache
+    model = model or os.getenv("EMBED_MODEL", DEFAULT_EMBED_MODEL)
+    with _embedding_caches_lock:
+        cache = _embedding_caches.get(model)
+        if cache is None:
+            disk_enabled = os.getenv("EMBEDDING_CACHE_DISK", "false").lower() in ("1", "true", "yes")
+            cache = EmbeddingCache(
+                max_size=max_size,
+                ttl_seconds=ttl_seconds,
+                model=model,
+                dimensions=int(os.getenv("EMBED_DIM", str(DEFAULT_EMBED_DIM))),
+                dtype=os.getenv("EMBEDDING_CACHE_DTYPE", "float32"),
+                disk_path=Path(os.getenv("EMBEDDING_CACHE_DISK_PATH", str(DEFAULT_DISK_PATH))) if disk_enabled else None,
+            )
+            _embedding_caches[model] = cache
+        return cache
@@ -4,8 +4,10 @@ Hybrid retriever combining vector search (Qdrant) and graph traversal (Neo4j).
 
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterable, Optional, Set
 import os
+import re
 from dotenv import load_dotenv
 
 try:
@@ -15,10 +17,49 @@ except ImportError:
     QdrantClient = None
     OpenAI = None
 
+from core_engine.embeddings.collection_catalog import (
+    SEARCH_PAYLOAD_FIELDS,
+    CollectionCatalog,
+    is_collection_not_found,
+    resolve_search_api,
+)
 from core_engine.kg.neo4j_client import Neo4jClient
+from core_engine.kg.text_search import (
+    CONCEPT_TEXT_INDEX,
+    contains_match,
+    fulltext_match,
+    fulltext_query,
+    is_missing_index_error,
+)
 from core_engine.logging import get_logger
 from core_engine.reasoning.embedding_cache import get_embedding_cache
 from core_engine.reasoning.query_expander import QueryExpander
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
+
+
+# Words too common to pick out an episode or speaker by themselves
+FILTER_STOP_WORDS = frozenset({
+    "the", "and", "for", "with", "from", "about", "into", "over", "show",
+    "podcast", "episode", "part", "interview", "what", "who", "how", "why",
+})
+
+
+def _name_tokens(value: str) -> Set[str]:
+    """Lowercase words of a name or id, split on '_', '-', spaces and punctuation."""
+    return {t for t in re.split(r"[^0-9a-z]+", value.lower()) if t}
+
+
+def entity_filter_tokens(entities: Iterable[str]) -> Set[str]:
+    """Words of the mentioned entities that can pick out an episode or speaker."""
+    return {
+        t for e in entities for t in _name_tokens(e)
+        if len(t) >= 3 and t not in FILTER_STOP_WORDS
+    }
+
+
+def matches_entity_tokens(value: Optional[str], tokens: Set[str]) -> bool:
+    """True if an episode id or speaker has one of `tokens` as a whole word."""
+    return bool(value) and bool(tokens & _name_tokens(value))
 
 
 def load_env() -> None:
@@ -29,6 +70,24 @@ def load_env() -> None:
         pass
 
 
+@dataclass
+class RetrievalFilters:
+    """
+    Structured restrictions applied inside the vector search.
+
+    A hit must come from one of `episode_ids` OR be spoken by one of
+    `speakers` (when either is given), and start within
+    [start_seconds, end_seconds] (when given).
+    """
+    episode_ids: List[str] = field(default_factory=list)
+    speakers: List[str] = field(default_factory=list)
+    start_seconds: Optional[float] = None
+    end_seconds: Optional[float] = None
+
+    def is_empty(self) -> bool:
+        return not (self.episode_ids or self.speakers) and self.start_seconds is None and self.end_seconds is None
+
+
 class HybridRetriever:
     """Hybrid retriever combining vector and graph search."""
 
@@ -43,6 +102,7 @@ class HybridRetriever:
         vector_weight: float = 0.5,
         graph_weight: float = 0.5,
         top_k: int = 10,
+        payload_fields: Optional[List[str]] = None,
     ):
         """
         Initialize hybrid retriever.
@@ -57,12 +117,14 @@ class HybridRetriever:
             vector_weight: Weight for vector results (0-1)
             graph_weight: Weight for graph results (0-1)
             top_k: Number of results to return
+            payload_fields: Payload fields vector searches return (default: SEARCH_PAYLOAD_FIELDS)
         """
         self.neo4j_client = neo4j_client
         self.workspace_id = workspace_id or "default"
         self.vector_weight = vector_weight
         self.graph_weight = graph_weight
         self.top_k = top_k
+        self.payload_fields = list(payload_fields or SEARCH_PAYLOAD_FIELDS)
         
         self.logger = get_logger(
             "core_engine.reasoning.hybrid_retriever",
@@ -84,7 +146,13 @@ class HybridRetriever:
                     api_key=qdrant_api_key,
                 )
                 self.qdrant_collection = qdrant_collection
-                self.logger.info("qdrant_client_initialized")
+                # Resolved once: collection list (cached) and the client's search API
+                self.collections = CollectionCatalog(self.qdrant_client)
+                self.search_api = resolve_search_api(self.qdrant_client)
+                self.logger.info(
+                    "qdrant_client_initialized",
+                    extra={"context": {"search_api": self.search_api}},
+                )
             except Exception as e:
                 self.logger.warning(
                     "qdrant_client_init_failed",
@@ -98,10 +166,10 @@ class HybridRetriever:
             self.openai_client = None
             self.logger.warning("openai_client_not_available")
         else:
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
             self.embed_model = embed_model
-        # Initialize embedding cache
-        self.embedding_cache = get_embedding_cache()
+        # Initialize embedding cache (per model; disk tier shared across workers)
+        self.embedding_cache = get_embedding_cache(model=embed_model)
         
         # Initialize Query Expander (lazy loaded or initialized here)
         self.query_expander = QueryExpander(
@@ -115,6 +183,9 @@ class HybridRetriever:
         use_vector: bool = True,
         use_graph: bool = True,
         query_type: str = None,  # NEW: Allow passing query type for adaptive weights
+        payload_fields: Optional[List[str]] = None,
+        filters: Optional[RetrievalFilters] = None,
+        with_vectors: bool = False,
     ) -> List[Dict[str, Any]]:
         """
         Retrieve results using hybrid approach.
@@ -124,6 +195,11 @@ class HybridRetriever:
             use_vector: Whether to use vector search
             use_graph: Whether to use graph search
             query_type: Optional query type for adaptive weights (entity_centric, multi_hop, etc.)
+            payload_fields: Payload fields to fetch for vector results (default: self.payload_fields)
+            filters: Episode/speaker/time restrictions, applied by Qdrant so the
+                vector results are a full top-k of matching chunks
+            with_vectors: Attach each vector hit's stored embedding as `vector`
+                (lets MMR reranking skip re-embedding the results)
 
         Returns:
             List of retrieved results with scores
@@ -148,29 +224,35 @@ class HybridRetriever:
         vector_results = []
         graph_results = []
         
-        # Vector search - Run for ALL variations to maximize recall
+        # Vector search - Run for ALL variations to maximize recall, as one
+        # embeddings request and one Qdrant batch query
         if use_vector and self.qdrant_client and self.openai_client:
+            # Apply expansion weight penalty (original=1.0, variations=0.9)
+            # This ensures exact matches to original query are ranked higher
+            weights = [vector_weight if v == query else vector_weight * 0.9 for v in variations]
+            try:
+                batch_results = self._vector_search_batch(
+                    variations,
+                    weights=weights,
+                    payload_fields=payload_fields,
+                    filters=filters,
+                    with_vectors=with_vectors,
+                )
+            except Exception as e:
+                self.logger.warning(
+                    "vector_search_failed",
+                    extra={"context": {"error": str(e), "variations": len(variations)}},
+                )
+                batch_results = []
+            
+            # Deduplicate results across variations
             seen_texts = set()
-            for variation in variations:
-                try:
-                    # Apply expansion weight penalty (original=1.0, variations=0.9)
-                    # This ensures exact matches to original query are ranked higher
-                    var_weight = vector_weight if variation == query else vector_weight * 0.9
-                    
-                    results = self._vector_search(variation, weight=var_weight)
-                    
-                    # Deduplicate results across variations
-                    for res in results:
-                        text_key = res.get("text", "")[:50].lower()
-                        if text_key not in seen_texts:
-                            seen_texts.add(text_key)
-                            vector_results.append(res)
-                            
-                except Exception as e:
-                    self.logger.warning(
-                        "vector_search_failed",
-                        extra={"context": {"error": str(e), "variation": variation}},
-                    )
+            for results in batch_results:
+                for res in results:
+                    text_key = res.get("text", "")[:50].lower()
+                    if text_key not in seen_texts:
+                        seen_texts.add(text_key)
+                        vector_results.append(res)
         
         # Graph search - Run ONLY for original query (precision + performance)
         # Graph already handles aliases/fuzzy matching better
@@ -281,116 +363,251 @@ class HybridRetriever:
         Returns:
             List of vector search results
         """
-        weight = weight if weight is not None else self.vector_weight
+        return self._vector_search_batch([query], weights=[weight])[0]
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed queries, sending every cache miss in a single embeddings request.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            One embedding per query, in order
+        """
+        embeddings = [self.embedding_cache.get(q) for q in queries]
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing:
+            response = self.openai_client.embeddings.create(
+                model=self.embed_model,
+                input=[queries[i] for i in missing],
+            )
+            for i, item in zip(missing, response.data):
+                embeddings[i] = item.embedding
+                self.embedding_cache.set(queries[i], item.embedding)
+        return embeddings
+
+    def _vector_search_batch(
+        self,
+        queries: List[str],
+        weights: Optional[List[Optional[float]]] = None,
+        payload_fields: Optional[List[str]] = None,
+        filters: Optional[RetrievalFilters] = None,
+        with_vectors: bool = False,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search using vector similarity for several queries in one round trip.
+
+        Args:
+            queries: Search queries (e.g. a query and its expansions)
+            weights: Weight per query (default: self.vector_weight)
+            payload_fields: Payload fields to fetch (default: self.payload_fields)
+            filters: Episode/speaker/time restrictions
+            with_vectors: Attach stored embeddings to the results
+
+        Returns:
+            One list of vector search results per query, in order
+        """
+        weights = [
+            w if w is not None else self.vector_weight
+            for w in (weights or [None] * len(queries))
+        ]
         try:
-            # Check if collection exists
-            collections = self.qdrant_client.get_collections().collections
-            collection_names = [c.name for c in collections]
-            if self.qdrant_collection not in collection_names:
+            # Collection list is cached; no round trip unless it may be stale
+            if not self.collections.exists(self.qdrant_collection):
                 self.logger.warning(
                     "qdrant_collection_not_found",
-                    extra={"context": {
-                        "collection": self.qdrant_collection,
-                        "available": collection_names
-                    }}
+                    extra={"context": {"collection": self.qdrant_collection}},
                 )
-                return []
+                return [[] for _ in queries]
             
-            # Create embedding (with caching)
-            query_embedding = self.embedding_cache.get(query)
+            # Create embeddings (with caching, one API call for all misses)
+            query_embeddings = self._embed_queries(queries)
             
-            if query_embedding is None:
-                # Cache miss - generate embedding
-                response = self.openai_client.embeddings.create(
-                    model=self.embed_model,
-                    input=[query],
-                )
-                query_embedding = response.data[0].embedding
-                self.embedding_cache.set(query, query_embedding)
-            
-            # Search Qdrant - use query_points or query_batch depending on version
+            # Search Qdrant. Errors (including a rejected workspace filter) are
+            # raised: searching without the filter would leak other workspaces
             try:
-                # Try query_points first (newer API)
-                if hasattr(self.qdrant_client, 'query_points'):
-                    from qdrant_client.models import Filter, FieldCondition, MatchValue
-                    try:
-                        # Try with workspace filter
-                        query_filter = Filter(
-                            must=[
-                                FieldCondition(
-                                    key="workspace_id",
-                                    match=MatchValue(value=self.workspace_id)
-                                )
-                            ]
-                        )
-                        response = self.qdrant_client.query_points(
-                            collection_name=self.qdrant_collection,
-                            query=query_embedding,
-                            limit=self.top_k * 2,
-                            query_filter=query_filter,
-                        )
-                        points = response.points
-                    except Exception:
-                        # Fallback without filter
-                        response = self.qdrant_client.query_points(
-                            collection_name=self.qdrant_collection,
-                            query=query_embedding,
-                            limit=self.top_k * 2,
-                        )
-                        points = response.points
-                elif hasattr(self.qdrant_client, 'query_batch'):
-                    # Alternative API
-                    response = self.qdrant_client.query_batch(
-                        collection_name=self.qdrant_collection,
-                        queries=[query_embedding],
-                        limit=self.top_k * 2,
-                    )
-                    points = response[0].points if response else []
-                else:
-                    # Fallback: try direct search method (older API)
-                    points = self.qdrant_client.search(
-                        collection_name=self.qdrant_collection,
-                        query_vector=query_embedding,
-                        limit=self.top_k * 2,
-                    )
-            except Exception as e:
-                self.logger.error(
-                    "qdrant_search_method_error",
-                    extra={"context": {"error": str(e), "available_methods": [m for m in dir(self.qdrant_client) if not m.startswith('_')][:10]}}
+                points_per_query = self._search_points(
+                    query_embeddings, payload_fields, filters, with_vectors=with_vectors
                 )
-                return []
-            
-            vector_results = []
-            for point in points:
-                # Handle different point formats
-                if hasattr(point, 'payload'):
-                    payload = point.payload
-                    score = getattr(point, 'score', 0.0)
-                elif isinstance(point, dict):
-                    payload = point.get('payload', {})
-                    score = point.get('score', 0.0)
-                else:
-                    continue
-                    
-                # Add explanation
-                payload["match_reason"] = "Semantic similarity match (Vector Search)"
-                
-                vector_results.append({
-                    "text": payload.get("text", ""),
-                    "source": "vector",
-                    "score": score * weight,
-                    "metadata": payload,
-                })
+            except Exception as e:
+                if not is_collection_not_found(e):
+                    raise
+                # Deleted since the catalog was refreshed
+                self.collections.invalidate()
+                return [[] for _ in queries]
             
-            return vector_results
+            return [
+                self._points_to_results(points, weight)
+                for points, weight in zip(points_per_query, weights)
+            ]
         except Exception as e:
             self.logger.error(
                 "vector_search_error",
                 exc_info=True,
-                extra={"context": {"error": str(e), "query": query[:50]}}
+                extra={"context": {
+                    "error": str(e),
+                    "query": queries[0][:50] if queries else "",
+                    "search_api": self.search_api,
+                }}
             )
             raise
 
+    def _build_filter(self, filters: Optional[RetrievalFilters] = None):
+        """Qdrant filter for this workspace plus any episode/speaker/time restrictions."""
+        from qdrant_client import models
+        must = [
+            models.FieldCondition(
+                key="workspace_id",
+                match=models.MatchValue(value=self.workspace_id)
+            )
+        ]
+        should = []
+        if filters is not None:
+            if filters.episode_ids:
+                should.append(models.FieldCondition(key="episode_id", match=models.MatchAny(any=list(filters.episode_ids))))
+            if filters.speakers:
+                should.append(models.FieldCondition(key="speaker", match=models.MatchAny(any=list(filters.speakers))))
+            if filters.start_seconds is not None or filters.end_seconds is not None:
+                must.append(
+                    models.FieldCondition(
+                        key="start_seconds",
+                        range=models.Range(gte=filters.start_seconds, lte=filters.end_seconds),
+                    )
+                )
+        # A non-empty `should` requires at least one of its conditions
+        return models.Filter(must=must, should=should or None)
+
+    def resolve_entity_filters(self, entities: Iterable[str]) -> Optional[RetrievalFilters]:
+        """
+        Map mentioned names to the episode ids and speakers stored in Qdrant.
+
+        A value matches an entity when one of its words (split on '_', '-' and
+        spaces, case-insensitive) is a word of the entity, e.g. "jerrod" ->
+        "002_JERROD_CARMICHAEL". Stop words and words shorter than 3 characters
+        are ignored: "The Daily Stoic" does not match every "THE_..." episode.
+
+        Args:
+            entities: Mentioned entity names
+
+        Returns:
+            Filters for the matching episodes/speakers, or None if nothing matched
+            or the values cannot be listed (client without facet support)
+        """
+        parts = entity_filter_tokens(entities)
+        if not parts or not self.qdrant_client:
+            return None
+        try:
+            episodes = self.collections.payload_values(self.qdrant_collection, "episode_id", self.workspace_id)
+            speakers = self.collections.payload_values(self.qdrant_collection, "speaker", self.workspace_id)
+        except Exception as e:
+            self.logger.warning("payload_values_failed", extra={"context": {"error": str(e)}})
+            return None
+        if episodes is None or speakers is None:
+            return None
+        filters = RetrievalFilters(
+            episode_ids=[v for v in episodes if matches_entity_tokens(v, parts)],
+            speakers=[v for v in speakers if matches_entity_tokens(v, parts)],
+        )
+        return None if filters.is_empty() else filters
+
+    def _search_points(
+        self,
+        query_embeddings: List[List[float]],
+        payload_fields: Optional[List[str]] = None,
+        filters: Optional[RetrievalFilters] = None,
+        with_vectors: bool = False,
+    ) -> List[list]:
+        """
+        Search Qdrant for several vectors through the API pinned at startup.
+
+        Args:
+            query_embeddings: Query vectors
+            payload_fields: Payload fields to fetch (default: self.payload_fields)
+            filters: Episode/speaker/time restrictions
+            with_vectors: Return the stored vectors with the points
+
+        Returns:
+            One list of scored points per vector, in order
+        """
+        from qdrant_client import models
+        query_filter = self._build_filter(filters)
+        limit = self.top_k * 2
+        # Only the fields callers read: skips the bulky per-turn payload lists
+        with_payload = list(payload_fields or self.payload_fields)
+        if self.search_api == "query_batch_points":
+            responses = self.qdrant_client.query_batch_points(
+                collection_name=self.qdrant_collection,
+                requests=[
+                    models.QueryRequest(
+                        query=embedding,
+                        filter=query_filter,
+                        limit=limit,
+                        with_payload=with_payload,
+                        with_vector=with_vectors,
+                    )
+                    for embedding in query_embeddings
+                ],
+            )
+            return [response.points for response in responses]
+        if self.search_api == "search_batch":
+            # Older clients: same single round trip through the legacy batch endpoint
+            return self.qdrant_client.search_batch(
+                collection_name=self.qdrant_collection,
+                requests=[
+                    models.SearchRequest(
+                        vector=embedding,
+                        filter=query_filter,
+                        limit=limit,
+                        with_payload=with_payload,
+                        with_vector=with_vectors,
+                    )
+                    for embedding in query_embeddings
+                ],
+            )
+        return [
+            self.qdrant_client.search(
+                collection_name=self.qdrant_collection,
+                query_vector=embedding,
+                query_filter=query_filter,
+                limit=limit,
+                with_payload=with_payload,
+                with_vectors=with_vectors,
+            )
+            for embedding in query_embeddings
+        ]
+
+    def _points_to_results(self, points: list, weight: float) -> List[Dict[str, Any]]:
+        """Convert Qdrant points to weighted vector results."""
+        vector_results = []
+        for point in points:
+            # Handle different point formats
+            if hasattr(point, 'payload'):
+                payload = point.payload
+                score = getattr(point, 'score', 0.0)
+                vector = getattr(point, 'vector', None)
+            elif isinstance(point, dict):
+                payload = point.get('payload', {})
+                score = point.get('score', 0.0)
+                vector = point.get('vector')
+            else:
+                continue
+                
+            # Add explanation
+            payload["match_reason"] = "Semantic similarity match (Vector Search)"
+            
+            result = {
+                "text": payload.get("text", ""),
+                "source": "vector",
+                "score": score * weight,
+                "metadata": payload,
+            }
+            if isinstance(vector, list):  # unnamed dense vector (only when requested)
+                result["vector"] = vector
+            vector_results.append(result)
+        
+        return vector_results
+
     def _graph_search(self, query: str, weight: float = None) -> List[Dict[str, Any]]:
         """
         Search using graph traversal with relationships.
@@ -422,19 +639,17 @@ class HybridRetriever:
                 )
                 return []
         
-        # Search for concepts matching keywords, including their relationships
-        cypher = """
-        MATCH (c)
-        WHERE c.workspace_id = $workspace_id
-          AND (
-            ANY(keyword IN $keywords WHERE toLower(c.name) CONTAINS keyword)
-            OR ANY(keyword IN $keywords WHERE toLower(c.description) CONTAINS keyword)
-          )
+        # Search for concepts matching keywords (full-text index, ranked by
+        # relevance), then expand the top hits with their relationships
+        expand = """
+        WITH c, score
+        ORDER BY score DESC
+        LIMIT $limit
         OPTIONAL MATCH (c)-[r]->(related)
         WHERE related.workspace_id = $workspace_id
         OPTIONAL MATCH (related_to)-[r2]->(c)
         WHERE related_to.workspace_id = $workspace_id
-        WITH c, 
+        WITH c, score,
              collect(DISTINCT {rel: type(r), target: related.name, desc: r.description})[0..5] as out_rels,
              collect(DISTINCT {rel: type(r2), source: related_to.name, desc: r2.description})[0..5] as in_rels
         RETURN 
@@ -443,19 +658,33 @@ class HybridRetriever:
             c.description as description,
             c.episode_ids as episode_ids,
             c.id as id,
+            score,
             out_rels as relationships_out,
             in_rels as relationships_in
-        LIMIT $limit
+        ORDER BY score DESC
         """
-        
-        results = self.neo4j_client.execute_read(
-            cypher,
-            {
-                "workspace_id": self.workspace_id,
-                "keywords": keywords[:5],  # Use top 5 keywords
-                "limit": self.top_k * 2,
-            },
-        )
+        params = {
+            "workspace_id": self.workspace_id,
+            "search": fulltext_query(keywords[:5]),  # Use top 5 keywords
+            "terms": keywords[:5],
+            "limit": self.top_k * 2,
+        }
+        use_fulltext = bool(params["search"])
+        try:
+            results = self.neo4j_client.execute_read(
+                (fulltext_match(CONCEPT_TEXT_INDEX) if use_fulltext else contains_match()) + expand,
+                params,
+            )
+        except Exception as e:
+            if not (use_fulltext and is_missing_index_error(e)):
+                raise
+            self.logger.warning(
+                "fulltext_index_missing",
+                extra={"context": {"index": CONCEPT_TEXT_INDEX, "fallback": "contains"}},
+            )
+            use_fulltext = False
+            results = self.neo4j_client.execute_read(contains_match() + expand, params)
+        max_text_score = max((r.get("score") or 0.0 for r in results), default=0.0)
         
         graph_results = []
         for result in results:
@@ -463,13 +692,17 @@ class HybridRetriever:
             name_lower = result.get("name", "").lower()
             desc_lower = result.get("description", "").lower()
             
-            # Higher score for exact matches, lower for partial
             score = 0.0
-            for keyword in keywords:
-                if keyword in name_lower:
-                    score += 1.0
-                elif keyword in desc_lower:
-                    score += 0.5
+            if use_fulltext and max_text_score > 0:
+                # Index relevance normalised to the best hit (0..2, as a strong name match)
+                score = 2.0 * (result.get("score") or 0.0) / max_text_score
+            else:
+                # Higher score for exact matches, lower for partial
+                for keyword in keywords:
+                    if keyword in name_lower:
+                        score += 1.0
+                    elif keyword in desc_lower:
+                        score += 0.5
             
             # Boost score if has relationships (more connected = more relevant)
             rel_count = len(result.get("relationships_out", [])) + len(result.get("relationships_in", []))
@@ -502,6 +735,7 @@ class HybridRetriever:
                         "description": result.get("description"),
                         "episode_ids": result.get("episode_ids", []),
                         "id": result.get("id"),
+                        "text_score": result.get("score"),
                         "relationships_out": result.get("relationships_out", []),
                         "relationships_in": result.get("relationships_in", []),
                         "match_reason": match_reason,  # Add explanation
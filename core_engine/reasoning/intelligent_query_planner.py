@@ -13,6 +13,7 @@ import json
 import re
 from openai import OpenAI
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 from core_engine.reasoning.langgraph_state import QueryPlan
 
 
@@ -44,7 +45,7 @@ class IntelligentQueryPlanner:
     ]
     
     def __init__(self, openai_client: OpenAI):
-        self.llm = openai_client
+        self.llm = schedule_openai_client(openai_client, INTERACTIVE)
         self.logger = get_logger(__name__)
     
     def plan(
@@ -31,6 +31,7 @@ import json
 from dotenv import load_dotenv
 
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 
 load_dotenv()
 
@@ -259,7 +260,7 @@ You can ask me things like:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found")
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
             self.logger.info("intent_classifier_initialized", extra={"model": model})
         except Exception as e:
             self.logger.error("intent_classifier_init_failed", extra={"error": str(e)})
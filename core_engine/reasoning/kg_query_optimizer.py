@@ -17,6 +17,7 @@ from dotenv import load_dotenv
 
 from core_engine.kg.neo4j_client import Neo4jClient
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 from openai import OpenAI
 
 load_dotenv()
@@ -59,7 +60,7 @@ class KGQueryOptimizer:
                 from openai import OpenAI
                 api_key = os.getenv("OPENAI_API_KEY")
                 if api_key:
-                    self.openai_client = OpenAI(api_key=api_key)
+                    self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
                 else:
                     self.openai_client = None
                     logger.warning("OpenAI API key not found - entity linking will be limited")
@@ -169,7 +170,7 @@ class KGQueryOptimizer:
         WHERE related.workspace_id = $workspace_id
         WITH DISTINCT c, collect(DISTINCT {rel: type(r), target: related.name})[..5] as relationships
         RETURN c.name as concept, 
-               labels(c)[0] as type,
+               [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                c.description as description,
                relationships,
                CASE 
@@ -226,7 +227,7 @@ class KGQueryOptimizer:
         WHERE related.workspace_id = $workspace_id
         WITH DISTINCT c, collect(DISTINCT {rel: type(r), target: related.name})[..5] as relationships
         RETURN c.name as concept, 
-               labels(c)[0] as type,
+               [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                c.description as description,
                relationships,
                CASE 
@@ -290,9 +291,9 @@ class KGQueryOptimizer:
             ORDER BY path_length ASC
             RETURN DISTINCT
               start.name as source_concept,
-              labels(start)[0] as source_type,
+              [l IN labels(start) WHERE l <> 'Entity'][0] as source_type,
               end.name as target_concept,
-              labels(end)[0] as target_type,
+              [l IN labels(end) WHERE l <> 'Entity'][0] as target_type,
               [rel IN relationships(path) | type(rel)] as relationships,
               path_length,
               CASE
@@ -317,9 +318,9 @@ class KGQueryOptimizer:
             ORDER BY path_length ASC
             RETURN DISTINCT
               start.name as source_concept,
-              labels(start)[0] as source_type,
+              [l IN labels(start) WHERE l <> 'Entity'][0] as source_type,
               end.name as target_concept,
-              labels(end)[0] as target_type,
+              [l IN labels(end) WHERE l <> 'Entity'][0] as target_type,
               [rel IN relationships(path) | type(rel)] as relationships,
               path_length,
               CASE
@@ -378,7 +379,7 @@ class KGQueryOptimizer:
             WHERE related.workspace_id = $workspace_id
             WITH DISTINCT c, collect(DISTINCT {rel: type(r), target: related.name})[..5] as relationships
             RETURN c.name as concept,
-                   labels(c)[0] as type,
+                   [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                    c.description as description,
                    c.episode_ids as episode_ids,
                    size(c.episode_ids) as episode_count,
@@ -404,7 +405,7 @@ class KGQueryOptimizer:
             WHERE related.workspace_id = $workspace_id
             WITH DISTINCT c, collect(DISTINCT {rel: type(r), target: related.name})[..5] as relationships
             RETURN c.name as concept,
-                   labels(c)[0] as type,
+                   [l IN labels(c) WHERE l <> 'Entity'][0] as type,
                    c.description as description,
                    c.episode_ids as episode_ids,
                    size(c.episode_ids) as episode_count,
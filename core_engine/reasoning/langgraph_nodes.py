@@ -4,6 +4,7 @@ LangGraph Nodes - Wrapping Existing Components
 These nodes wrap existing components (HybridRetriever, PodcastAgent) to work
 within the LangGraph workflow. This ensures we don't break existing functionality.
 """
+import os
 import re
 from typing import Dict, Any
 from core_engine.reasoning.langgraph_state import RetrievalState, QueryPlan
@@ -169,9 +170,12 @@ def retrieve_rag_node(state: RetrievalState) -> RetrievalState:
         # Use sub-queries if query was decomposed, otherwise use original
         queries_to_retrieve = plan.sub_queries if plan.needs_decomposition and plan.sub_queries else [query]
         
+        # MMR reranking reuses the stored vectors instead of re-embedding every hit
+        with_vectors = os.getenv("RERANKING_STRATEGY", "rrf_mmr").lower() != "rrf"
+        
         rag_results = []
         for q in queries_to_retrieve:
-            results = retriever.retrieve(q, use_vector=True, use_graph=False)
+            results = retriever.retrieve(q, use_vector=True, use_graph=False, with_vectors=with_vectors)
             rag_results.extend(results)
         
         # Query expansion if needed (use QueryExpander for intelligent expansion)
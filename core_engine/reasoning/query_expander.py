@@ -14,6 +14,7 @@ from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -57,12 +58,12 @@ class QueryExpander:
         
         # Initialize OpenAI client if not provided
         if openai_client:
-            self.openai_client = openai_client
+            self.openai_client = schedule_openai_client(openai_client, INTERACTIVE)
         else:
             if OPENAI_AVAILABLE and use_llm:
                 api_key = os.getenv("OPENAI_API_KEY")
                 if api_key:
-                    self.openai_client = OpenAI(api_key=api_key)
+                    self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
                 else:
                     self.openai_client = None
                     logger.warning("OpenAI API key not found - using pattern-based expansion")
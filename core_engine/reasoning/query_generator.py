@@ -8,6 +8,7 @@ from __future__ import annotations
 from typing import Optional, Dict, Any, List
 from core_engine.kg.neo4j_client import Neo4jClient
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 
 
 class QueryGenerator:
@@ -119,7 +120,7 @@ class QueryGenerator:
             from dotenv import load_dotenv
             load_dotenv()
             
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = schedule_openai_client(OpenAI(api_key=os.getenv("OPENAI_API_KEY")), INTERACTIVE)
             
             # Build conversation history text - include more messages to capture numbered lists
             # For assistant messages, include full content (they might have numbered lists)
@@ -452,11 +453,8 @@ Resolved Question:"""
         # Pattern: "What concepts are mentioned?" or "List concepts"
         if "concept" in question_lower and ("mention" in question_lower or "list" in question_lower or "what" in question_lower):
             return f"""
-            MATCH (c)
+            MATCH (c:Entity)
             WHERE c.workspace_id = $workspace_id
-              AND (c:Concept OR c:Practice OR c:CognitiveState OR c:BehavioralPattern 
-                   OR c:Principle OR c:Outcome OR c:Causality OR c:Person 
-                   OR c:Place OR c:Organization OR c:Event)
             RETURN c.name as concept, c.type as type, c.description as description
             ORDER BY c.name
             LIMIT 50
@@ -491,7 +489,7 @@ Resolved Question:"""
         if not keywords:
             # If no keywords, return general concept list
             return f"""
-            MATCH (c)
+            MATCH (c:Entity)
             WHERE c.workspace_id = $workspace_id
               AND (c:Concept OR c:Practice OR c:Person)
             RETURN c.name as concept, c.type as type, c.episode_ids as episode_ids
@@ -13,6 +13,7 @@ from dotenv import load_dotenv
 
 from core_engine.kg.neo4j_client import Neo4jClient
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 
 load_dotenv()
 
@@ -110,7 +111,7 @@ class IntelligentQueryGenerator:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found in environment")
-            self.openai_client = OpenAI(api_key=api_key)
+            self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
             self.logger.info("openai_client_initialized", extra={"model": model})
         except Exception as e:
             self.logger.error("openai_init_failed", extra={"error": str(e)})
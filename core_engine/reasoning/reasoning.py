@@ -37,6 +37,7 @@ from core_engine.reasoning.agent_tools import KGTools
 from core_engine.reasoning.query_templates import QueryTemplates
 from core_engine.reasoning.agent import PodcastAgent  # The brain of the system
 from core_engine.logging import get_logger
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 
 
 class KGReasoner:
@@ -1071,12 +1072,12 @@ Respond warmly and naturally to greetings. Keep it brief and inviting."""
             if explore_concepts or explore_all:
                 # Query for concepts - get more results for better overview
                 concepts_query = """
-                MATCH (c)
+                MATCH (c:Entity)
                 WHERE c.workspace_id = $workspace_id
                   AND (c:Concept OR c:Practice OR c:CognitiveState OR c:BehavioralPattern 
                        OR c:Principle OR c:Outcome OR c:Person)
-                RETURN DISTINCT c.name as name, labels(c)[0] as type
-                ORDER BY type(c), c.name
+                RETURN DISTINCT c.name as name, [l IN labels(c) WHERE l <> 'Entity'][0] as type
+                ORDER BY type, c.name
                 LIMIT 100
                 """
                 
@@ -1369,7 +1370,7 @@ Provide your answer:"""
             import os
             from dotenv import load_dotenv
             load_dotenv()
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            client = schedule_openai_client(OpenAI(api_key=os.getenv("OPENAI_API_KEY")), INTERACTIVE)
             # Use the model from initialization (defaults to gpt-4o for better reasoning)
             response = client.chat.completions.create(
                 model=self.model,  # Use configured model (gpt-4o for better reasoning)
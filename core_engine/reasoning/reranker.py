@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Optional, Literal
 from collections import defaultdict
 import numpy as np
 from core_engine.logging import get_logger
+from core_engine.reasoning.embedding_cache import get_embedding_cache
+from core_engine.utils.llm_scheduler import INTERACTIVE, schedule_openai_client
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -53,6 +55,8 @@ class Reranker:
         self.lambda_param = lambda_param
         self.openai_client = openai_client
         self.embed_model = embed_model
+        # Shared with HybridRetriever: the query was usually embedded for the search
+        self.embedding_cache = get_embedding_cache(model=embed_model)
         self.logger = get_logger(__name__)
         
         # Validate strategy
@@ -67,7 +71,7 @@ class Reranker:
                 from openai import OpenAI
                 api_key = os.getenv("OPENAI_API_KEY")
                 if api_key:
-                    self.openai_client = OpenAI(api_key=api_key)
+                    self.openai_client = schedule_openai_client(OpenAI(api_key=api_key), INTERACTIVE)
                     self.logger.info("openai_client_initialized_for_mmr")
                 else:
                     self.logger.warning("openai_client_not_available_for_mmr")
@@ -96,17 +100,20 @@ class Reranker:
         
         # Route to appropriate strategy
         if self.strategy == "rrf":
-            return self._rerank_rrf(rag_results, kg_results, query)
+            reranked = self._rerank_rrf(rag_results, kg_results, query)
         elif self.strategy == "mmr":
-            return self._rerank_mmr(rag_results, kg_results, query)
+            reranked = self._rerank_mmr(rag_results, kg_results, query)
         elif self.strategy == "rrf_mmr":
             # Hybrid: RRF first, then MMR
             rrf_results = self._rerank_rrf(rag_results, kg_results, query)
-            return self._rerank_mmr_on_results(rrf_results, query)
+            reranked = self._rerank_mmr_on_results(rrf_results, query)
         else:
             # Fallback to RRF
             self.logger.warning(f"Unknown strategy '{self.strategy}', using RRF")
-            return self._rerank_rrf(rag_results, kg_results, query)
+            reranked = self._rerank_rrf(rag_results, kg_results, query)
+        
+        # Search vectors were only needed for MMR; keep them out of responses
+        return [self._without_vector(r) if "vector" in r else r for r in reranked]
     
     def _rerank_rrf(
         self,
@@ -194,72 +201,22 @@ class Reranker:
         if not all_results:
             return []
         
-        # Get query embedding
+        # Query + result vectors (search vectors reused, the rest in one API call)
         try:
-            query_embedding = self._get_embedding(query)
+            query_embedding, result_embeddings = self._get_mmr_embeddings(query, all_results)
         except Exception as e:
-            self.logger.error(f"mmr_query_embedding_failed: {e}, fallback_to_rrf")
+            self.logger.error(f"mmr_embedding_failed: {e}, fallback_to_rrf")
             return self._rerank_rrf(rag_results, kg_results, query)
         
-        # Get embeddings for all results
-        result_embeddings = {}
-        for idx, result in enumerate(all_results):
-            try:
-                text = self._get_result_text(result)
-                result_embeddings[idx] = self._get_embedding(text)
-            except Exception as e:
-                self.logger.warning(f"mmr_result_embedding_failed_for_idx_{idx}: {e}")
-                # Use zero vector as fallback
-                result_embeddings[idx] = np.zeros(3072)  # text-embedding-3-large dimension
-        
-        # MMR selection
-        selected = []
-        remaining = list(range(len(all_results)))
-        
-        # Select first result (highest relevance)
-        if remaining:
-            first_idx = max(
-                remaining,
-                key=lambda i: self._cosine_similarity(query_embedding, result_embeddings[i])
-            )
-            selected.append(first_idx)
-            remaining.remove(first_idx)
-        
-        # Select remaining results using MMR
-        while remaining and len(selected) < len(all_results):
-            best_idx = None
-            best_score = float('-inf')
-            
-            for idx in remaining:
-                # Relevance score
-                relevance = self._cosine_similarity(query_embedding, result_embeddings[idx])
-                
-                # Diversity penalty (max similarity to already selected)
-                max_similarity = 0.0
-                if selected:
-                    max_similarity = max(
-                        self._cosine_similarity(result_embeddings[idx], result_embeddings[sel_idx])
-                        for sel_idx in selected
-                    )
-                
-                # MMR score
-                mmr_score = self.lambda_param * relevance - (1 - self.lambda_param) * max_similarity
-                
-                if mmr_score > best_score:
-                    best_score = mmr_score
-                    best_idx = idx
-            
-            if best_idx is not None:
-                selected.append(best_idx)
-                remaining.remove(best_idx)
+        selected, scores = self._mmr_select(query_embedding, result_embeddings)
         
         # Build reranked list in MMR order
         reranked = []
         seen_texts = set()
         
-        for idx in selected:
+        for idx, score in zip(selected, scores):
             result = all_results[idx].copy()
-            result["mmr_score"] = best_score if idx == selected[-1] else None
+            result["mmr_score"] = score
             
             # Deduplicate
             text_key = self._get_text_key(result)
@@ -287,69 +244,23 @@ class Reranker:
         query: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Apply MMR to already RRF-ranked results (hybrid approach)."""
-        if not query or not self.openai_client:
+        if not query or not self.openai_client or len(rrf_results) <= 1:
             # If MMR can't be applied, return RRF results
             return rrf_results
         
-        if len(rrf_results) <= 1:
-            return rrf_results
-        
         # Apply MMR to top N results (to keep it fast)
         top_n = min(20, len(rrf_results))
         top_results = rrf_results[:top_n]
         remaining_results = rrf_results[top_n:]
         
-        # Get query embedding
+        # Query + result vectors (search vectors reused, the rest in one API call)
         try:
-            query_embedding = self._get_embedding(query)
+            query_embedding, result_embeddings = self._get_mmr_embeddings(query, top_results)
         except Exception as e:
-            self.logger.warning(f"hybrid_mmr_query_embedding_failed: {e}, using_rrf_only")
+            self.logger.warning(f"hybrid_mmr_embedding_failed: {e}, using_rrf_only")
             return rrf_results
         
-        # Get embeddings for top results
-        result_embeddings = {}
-        for idx, result in enumerate(top_results):
-            try:
-                text = self._get_result_text(result)
-                result_embeddings[idx] = self._get_embedding(text)
-            except Exception as e:
-                self.logger.warning(f"hybrid_mmr_result_embedding_failed_for_idx_{idx}: {e}")
-                result_embeddings[idx] = np.zeros(3072)
-        
-        # MMR selection on top results
-        selected = []
-        remaining = list(range(len(top_results)))
-        
-        # First result (highest RRF score)
-        if remaining:
-            first_idx = max(
-                remaining,
-                key=lambda i: self._cosine_similarity(query_embedding, result_embeddings[i])
-            )
-            selected.append(first_idx)
-            remaining.remove(first_idx)
-        
-        # Select remaining using MMR
-        while remaining:
-            best_idx = None
-            best_score = float('-inf')
-            
-            for idx in remaining:
-                relevance = self._cosine_similarity(query_embedding, result_embeddings[idx])
-                max_similarity = max(
-                    self._cosine_similarity(result_embeddings[idx], result_embeddings[sel_idx])
-                    for sel_idx in selected
-                ) if selected else 0.0
-                
-                mmr_score = self.lambda_param * relevance - (1 - self.lambda_param) * max_similarity
-                
-                if mmr_score > best_score:
-                    best_score = mmr_score
-                    best_idx = idx
-            
-            if best_idx is not None:
-                selected.append(best_idx)
-                remaining.remove(best_idx)
+        selected, _ = self._mmr_select(query_embedding, result_embeddings)
         
         # Build final list: MMR-reranked top results + remaining RRF results
         reranked = []
@@ -383,27 +294,103 @@ class Reranker:
         
         return reranked
     
-    def _get_embedding(self, text: str) -> np.ndarray:
-        """Get embedding for text using OpenAI."""
+    def _get_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in one OpenAI request; returns a len(texts) x d float32 matrix."""
         if not self.openai_client:
             raise RuntimeError("OpenAI client not available")
         
         response = self.openai_client.embeddings.create(
             model=self.embed_model,
-            input=text[:8000]  # Limit text length
+            input=[text[:8000] for text in texts],  # Limit text length
         )
-        return np.array(response.data[0].embedding)
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
+    
+    def _get_mmr_embeddings(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+    ) -> tuple:
+        """
+        Query vector and one vector per result.
+        
+        Results that carry the vector returned by the search (`vector`, from
+        `HybridRetriever.retrieve(with_vectors=True)`) reuse it. The query
+        vector comes from the embedding cache when the search already embedded
+        it; otherwise it is embedded together with the other results in a
+        single request.
+        
+        Returns:
+            (query_vector of shape (d,), result matrix of shape (len(results), d))
+        """
+        vectors: List[Optional[np.ndarray]] = []
+        for result in results:
+            vector = result.get("vector")
+            vectors.append(np.asarray(vector, dtype=np.float32) if vector is not None else None)
+        
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        texts = [self._get_result_text(results[i]) for i in missing]
+        cached = self.embedding_cache.get(query)
+        if cached is None:
+            embedded = self._get_embeddings([query] + texts)
+            query_embedding, embedded = embedded[0], embedded[1:]
+            self.embedding_cache.set(query, query_embedding)
+        else:
+            query_embedding = np.asarray(cached, dtype=np.float32)
+            embedded = self._get_embeddings(texts) if texts else []
+        for i, vector in zip(missing, embedded):
+            vectors[i] = vector
+        
+        # Stored vectors from another embedding model cannot be compared to the query
+        stale = [i for i, v in enumerate(vectors) if v.shape != query_embedding.shape]
+        if stale:
+            for i, vector in zip(stale, self._get_embeddings([self._get_result_text(results[i]) for i in stale])):
+                vectors[i] = vector
+        return query_embedding, np.vstack(vectors)
     
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors."""
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+    def _mmr_select(self, query_embedding: np.ndarray, result_embeddings: np.ndarray) -> tuple:
+        """
+        Greedy MMR over a k x d matrix with NumPy.
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        Rows are L2-normalised once, so relevance is one matrix-vector product
+        and pairwise similarity one k x k product. Each step updates the running
+        max similarity to the selected set instead of recomputing it.
         
-        return dot_product / (norm1 * norm2)
+        Returns:
+            (selected indices in MMR order, MMR score of each selection)
+        """
+        def normalise(m: np.ndarray) -> np.ndarray:
+            norms = np.linalg.norm(m, axis=-1, keepdims=True)
+            return np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+        
+        docs = normalise(result_embeddings.astype(np.float32, copy=False))
+        relevance = docs @ normalise(query_embedding.astype(np.float32, copy=False))
+        similarity = docs @ docs.T
+        
+        k = len(docs)
+        max_similarity = np.full(k, -np.inf, dtype=np.float32)
+        available = np.ones(k, dtype=bool)
+        selected: List[int] = []
+        scores: List[float] = []
+        for step in range(k):
+            if step == 0:
+                # First pick: highest relevance (no selected set to be diverse from)
+                mmr = relevance.copy()
+            else:
+                mmr = self.lambda_param * relevance - (1 - self.lambda_param) * max_similarity
+            mmr[~available] = -np.inf
+            best = int(np.argmax(mmr))
+            selected.append(best)
+            scores.append(float(mmr[best]))
+            available[best] = False
+            np.maximum(max_similarity, similarity[best], out=max_similarity)
+        return selected, scores
+    
+    @staticmethod
+    def _without_vector(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a result without the search vector (kept out of responses)."""
+        result = result.copy()
+        result.pop("vector", None)
+        return result
     
     def _get_result_text(self, result: Dict[str, Any]) -> str:
         """Extract text from result for embedding."""
@@ -4,6 +4,14 @@ Theme Extractor - Extract themes, concepts, and quotes related to a topic.
 
 from typing import List, Dict, Any, Optional
 from core_engine.kg.neo4j_client import get_neo4j_client
+from core_engine.kg.text_search import (
+    CONCEPT_TEXT_INDEX,
+    QUOTE_TEXT_INDEX,
+    contains_match,
+    fulltext_match,
+    fulltext_query,
+    is_missing_index_error,
+)
 from core_engine.logging import get_logger
 
 logger = get_logger(__name__)
@@ -70,14 +78,7 @@ class ThemeExtractor:
         max_concepts: int = 50
     ) -> List[Dict[str, Any]]:
         """Extract concepts related to theme."""
-        query = """
-        MATCH (c)
-        WHERE c.workspace_id = $workspace_id
-          AND (
-            toLower(c.name) CONTAINS toLower($theme)
-            OR toLower(c.description) CONTAINS toLower($theme)
-          )
-        """
+        query = ""
         
         if episodes:
             query += """
@@ -92,14 +93,14 @@ class ThemeExtractor:
                c.description as description,
                c.episode_ids as episode_ids,
                c.source_paths as source_paths,
-               size(c.episode_ids) as episode_count
-        ORDER BY episode_count DESC, c.name
+               size(c.episode_ids) as episode_count,
+               score as relevance
+        ORDER BY relevance DESC, episode_count DESC, c.name
         LIMIT $max_concepts
         """
         
         params = {
             "workspace_id": self.workspace_id,
-            "theme": theme,
             "max_concepts": max_concepts
         }
         
@@ -107,12 +108,41 @@ class ThemeExtractor:
             params["episodes"] = episodes
         
         try:
-            results = self.client.execute_read(query, params)
+            results = self._text_search(CONCEPT_TEXT_INDEX, theme, query, params)
             return [dict(r) for r in results]
         except Exception as e:
             logger.error("extract_concepts_failed", exc_info=True, extra={"error": str(e)})
             return []
     
+    def _text_search(
+        self,
+        index: str,
+        theme: str,
+        query: str,
+        params: Dict[str, Any],
+        var: str = "c",
+    ) -> List[Dict[str, Any]]:
+        """
+        Run `query` over the nodes of a full-text index matching the theme.
+
+        `query` continues the WHERE clause on `var` and can use `score`. Falls
+        back to a CONTAINS scan when the index has not been created yet.
+        """
+        params = {**params, "search": fulltext_query([theme]), "terms": [theme.lower()]}
+        if index == QUOTE_TEXT_INDEX:
+            fallback = contains_match(var, fields=("text",), label="Quote")
+        else:
+            fallback = contains_match(var)
+        if not params["search"]:
+            return self.client.execute_read(fallback + query, params)
+        try:
+            return self.client.execute_read(fulltext_match(index, var) + query, params)
+        except Exception as e:
+            if not is_missing_index_error(e):
+                raise
+            logger.warning("fulltext_index_missing", extra={"index": index, "fallback": "contains"})
+            return self.client.execute_read(fallback + query, params)
+    
     def _extract_theme_quotes(
         self,
         theme: str,
@@ -123,11 +153,7 @@ class ThemeExtractor:
         quotes = []
         
         # Strategy 1: Find quotes directly by text match
-        query1 = """
-        MATCH (q:Quote)
-        WHERE q.workspace_id = $workspace_id
-          AND toLower(q.text) CONTAINS toLower($theme)
-        """
+        query1 = ""
         
         if episodes:
             query1 += " AND q.episode_id IN $episodes"
@@ -141,20 +167,21 @@ class ThemeExtractor:
                q.source_path as source_path,
                q.start_char as start_char,
                q.end_char as end_char,
-               'direct_match' as source
+               'direct_match' as source,
+               score as relevance
+        ORDER BY relevance DESC
         LIMIT $max_quotes
         """
         
         params1 = {
             "workspace_id": self.workspace_id,
-            "theme": theme,
             "max_quotes": max_quotes
         }
         if episodes:
             params1["episodes"] = episodes
         
         try:
-            results1 = self.client.execute_read(query1, params1)
+            results1 = self._text_search(QUOTE_TEXT_INDEX, theme, query1, params1, var="q")
             quotes.extend([dict(r) for r in results1])
             logger.info("found_quotes_direct", extra={"count": len(quotes)})
         except Exception as e:
@@ -162,20 +189,17 @@ class ThemeExtractor:
         
         # Strategy 2: Find quotes via concept relationships (ABOUT relationship)
         concept_query = """
-        MATCH (c)
-        WHERE c.workspace_id = $workspace_id
-          AND (
-            toLower(c.name) CONTAINS toLower($theme)
-            OR toLower(c.description) CONTAINS toLower($theme)
-          )
         RETURN c.id as concept_id, c.name as concept_name
+        ORDER BY score DESC
         LIMIT 20
         """
         
         try:
-            concept_results = self.client.execute_read(
+            concept_results = self._text_search(
+                CONCEPT_TEXT_INDEX,
+                theme,
                 concept_query,
-                {"workspace_id": self.workspace_id, "theme": theme}
+                {"workspace_id": self.workspace_id},
             )
             concept_ids = [r["concept_id"] for r in concept_results]
             
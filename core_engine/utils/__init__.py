@@ -7,10 +7,40 @@ from core_engine.utils.rate_limiter import (
     with_retry,
     get_rate_limiter,
 )
+from core_engine.utils.rate_limiter_async import (
+    AsyncRateLimiter,
+    estimate_tokens,
+    get_async_rate_limiter,
+)
+from core_engine.utils.adaptive_concurrency import (
+    AdaptiveConcurrency,
+    get_concurrency_controller,
+    get_concurrency_metrics,
+)
+from core_engine.utils.llm_scheduler import (
+    INTERACTIVE,
+    BACKGROUND,
+    LLMScheduler,
+    SharedSlots,
+    get_llm_scheduler,
+    schedule_openai_client,
+)
 
 __all__ = [
     "RateLimiter",
     "with_retry",
     "get_rate_limiter",
+    "AsyncRateLimiter",
+    "estimate_tokens",
+    "get_async_rate_limiter",
+    "AdaptiveConcurrency",
+    "get_concurrency_controller",
+    "get_concurrency_metrics",
+    "INTERACTIVE",
+    "BACKGROUND",
+    "LLMScheduler",
+    "SharedSlots",
+    "get_llm_scheduler",
+    "schedule_openai_client",
 ]
 
@@ -0,0 +1,286 @@
+"""
+AIMD concurrency control for async OpenAI calls.
+
+A fixed `max_concurrent` is either too high (429 storms, then every task
+backs off at once) or too low (quota left unused). `AdaptiveConcurrency`
+keeps a window of allowed in-flight requests instead:
+
+  - additive increase: +1 per window's worth of healthy responses, while the
+    window is actually in use and latency stays near its baseline
+  - multiplicative decrease: x0.5 on a 429 / rate-limit error, x0.9 when
+    latency climbs or rate-limit headers show the quota running out
+
+Decreases are applied at most once per cooldown, so one burst of 429s from
+the same window halves it once rather than collapsing it to the minimum.
+Controllers are registered by name, so the learned window carries over from
+one pipeline run to the next, and their window is exposed through
+`get_concurrency_metrics()`. A controller is meant to be used from one event
+loop at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import re
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Mapping, Optional
+
+from core_engine.logging import get_logger
+
+logger = get_logger("core_engine.utils.adaptive_concurrency")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for 429 / rate-limit / quota errors."""
+    message = str(error).lower()
+    return (
+        getattr(error, "status_code", None) == 429
+        or "rate limit" in message
+        or "rate_limit" in message
+    )
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """Seconds from an `x-ratelimit-reset-*` value such as "1s", "6m0s" or "250ms"."""
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", str(value or ""))
+    if not parts:
+        return None
+    units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class Slot:
+    """An admitted request; lets the caller report response headers."""
+
+    def __init__(self, controller: "AdaptiveConcurrency"):
+        self.controller = controller
+        self.started_at = time.monotonic()
+        self.headers: Optional[Mapping[str, str]] = None
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Record the `x-ratelimit-*` (limit, remaining, reset) headers of the response."""
+        self.headers = headers
+
+
+class AdaptiveConcurrency:
+    """AIMD window of in-flight requests with FIFO waiting."""
+
+    def __init__(
+        self,
+        name: str = "default",
+        max_window: int = 20,
+        min_window: int = 1,
+        initial_window: Optional[int] = None,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        headroom_fraction: float = 0.1,
+    ):
+        """
+        Initialize adaptive concurrency controller.
+
+        Args:
+            name: Name used in logs and metrics
+            max_window: Upper bound on in-flight requests
+            min_window: Lower bound on in-flight requests
+            initial_window: Starting window (default: half of max_window)
+            decrease_factor: Window multiplier on a rate-limit response
+            latency_tolerance: Latency above baseline * tolerance counts as overload
+            headroom_fraction: Remaining-quota fraction (from headers) below which
+                the window stops growing and shrinks gently
+        """
+        self.name = name
+        self.max_window = max(1, max_window)
+        self.min_window = max(1, min(min_window, self.max_window))
+        start = initial_window if initial_window is not None else self.max_window // 2
+        self.window = float(min(max(start, self.min_window), self.max_window))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.headroom_fraction = headroom_fraction
+
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._latency_ewma: Optional[float] = None
+        self._latency_baseline: Optional[float] = None
+        self._error_ewma = 0.0
+        self._last_decrease = 0.0
+
+        self.stats = {"completed": 0, "rate_limited": 0, "errors": 0, "decreases": 0, "peak_window": self.window}
+
+    @property
+    def limit(self) -> int:
+        """Current integer in-flight limit."""
+        return max(self.min_window, int(self.window))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[Slot]:
+        """
+        Hold one in-flight slot around an API call. Rate-limit exceptions
+        raised inside shrink the window; successful calls feed latency.
+        """
+        await self._acquire()
+        slot = Slot(self)
+        try:
+            yield slot
+        except BaseException as e:
+            if isinstance(e, Exception):
+                self._on_error(e)
+            raise
+        else:
+            self._on_success(time.monotonic() - slot.started_at, slot.headers)
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    async def _acquire(self) -> None:
+        if not self._waiters and self.in_flight < self.limit:
+            self.in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut  # resolved by _wake once a slot is ours
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Woken and cancelled at the same time: hand the slot on
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            if fut in self._waiters:
+                self._waiters.remove(fut)
+
+    def _wake(self) -> None:
+        """Admit waiters in arrival order while the window has room."""
+        while self._waiters and self.in_flight < self.limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_flight += 1
+                fut.set_result(None)
+
+    def _on_success(self, latency: float, headers: Optional[Mapping[str, str]]) -> None:
+        self.stats["completed"] += 1
+        self._error_ewma *= 0.9
+        self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+        if self._latency_baseline is None or self._latency_ewma < self._latency_baseline:
+            self._latency_baseline = self._latency_ewma
+        else:
+            # Let the baseline drift up slowly so a permanently slower API is not "overload" forever
+            self._latency_baseline *= 1.001
+
+        if self._low_headroom(headers):
+            self._decrease(0.9, "quota_headroom")
+        elif self._latency_ewma > self._latency_baseline * self.latency_tolerance:
+            self._decrease(0.9, "latency")
+        elif self._error_ewma < 0.2 and self.in_flight >= self.limit - 1:
+            # Grow only while the window is the bottleneck
+            self.window = min(self.max_window, self.window + 1.0 / self.window)
+            self.stats["peak_window"] = max(self.stats["peak_window"], self.window)
+            self._wake()
+
+    def _on_error(self, error: Exception) -> None:
+        if is_rate_limit_error(error):
+            self.stats["rate_limited"] += 1
+            self._decrease(self.decrease_factor, "rate_limited")
+        else:
+            self.stats["errors"] += 1
+            self._error_ewma = 0.9 * self._error_ewma + 0.1
+
+    def _low_headroom(self, headers: Optional[Mapping[str, str]]) -> bool:
+        if not headers:
+            return False
+        for kind in ("requests", "tokens"):
+            remaining = _header_float(headers, f"x-ratelimit-remaining-{kind}")
+            limit = _header_float(headers, f"x-ratelimit-limit-{kind}")
+            if remaining is not None and limit and remaining / limit < self.headroom_fraction:
+                return True
+        # Fewer requests left than one full window would send before the quota resets
+        remaining = _header_float(headers, "x-ratelimit-remaining-requests")
+        reset = parse_reset_seconds(headers.get("x-ratelimit-reset-requests"))
+        return (
+            remaining is not None
+            and reset is not None
+            and remaining < self.limit
+            and reset > (self._latency_ewma or 0.0)
+        )
+
+    def _decrease(self, factor: float, reason: str) -> None:
+        now = time.monotonic()
+        # Responses already in flight when we backed off carry stale news
+        cooldown = max(self._latency_ewma or 0.0, 1.0)
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        previous = self.window
+        self.window = max(float(self.min_window), self.window * factor)
+        self.stats["decreases"] += 1
+        logger.info(
+            "concurrency_window_decreased",
+            extra={
+                "context": {
+                    "name": self.name,
+                    "reason": reason,
+                    "from": round(previous, 2),
+                    "to": round(self.window, 2),
+                    "in_flight": self.in_flight,
+                }
+            },
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current window, in-flight/waiting counts, latency and counters."""
+        return {
+            "name": self.name,
+            "window": round(self.window, 2),
+            "limit": self.limit,
+            "min_window": self.min_window,
+            "max_window": self.max_window,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "latency_ewma_s": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+            "latency_baseline_s": round(self._latency_baseline, 3) if self._latency_baseline is not None else None,
+            **{k: round(v, 2) if isinstance(v, float) else v for k, v in self.stats.items()},
+        }
+
+
+_controllers: Dict[str, AdaptiveConcurrency] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_concurrency_controller(name: str, max_window: int = 20, **kwargs: Any) -> AdaptiveConcurrency:
+    """
+    Get the process-wide controller for `name`.
+
+    Args:
+        name: Controller name (e.g. "kg_extraction", "embeddings")
+        max_window: Upper bound on in-flight requests
+        **kwargs: Extra AdaptiveConcurrency settings (used on creation)
+
+    Returns:
+        AdaptiveConcurrency instance
+    """
+    with _controllers_lock:
+        controller = _controllers.get(name)
+        if controller is None:
+            controller = AdaptiveConcurrency(name=name, max_window=max_window, **kwargs)
+            _controllers[name] = controller
+        else:
+            controller.max_window = max(controller.min_window, max_window)
+            controller.window = min(controller.window, controller.max_window)
+        return controller
+
+
+def get_concurrency_metrics() -> Dict[str, Any]:
+    """Window and counters of every registered controller."""
+    with _controllers_lock:
+        controllers = list(_controllers.values())
+    return {"controllers": [c.get_stats() for c in controllers]}
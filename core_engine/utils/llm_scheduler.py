@@ -0,0 +1,587 @@
+"""
+Priority classes for shared LLM capacity.
+
+Query-time calls (intent classification, expansion, planning, synthesis) and
+ingestion-time extraction go to the same OpenAI account. `LLMScheduler` caps
+the calls in flight and splits that capacity between two classes:
+
+  - interactive: may use every slot and is always admitted first
+  - background: may use all but `interactive_reserve` slots, so a chat
+    request never queues behind a full ingestion window
+
+Waiters are served strictly by class, then in arrival order. Both threads
+(sync OpenAI clients) and asyncio tasks (AsyncOpenAI) can wait on the same
+scheduler. `schedule_openai_client` patches a client so every
+`chat.completions.create` / `embeddings.create` call takes a slot of its
+class; per-class in-flight, queue depth and wait times are exposed through
+`get_stats()`.
+
+Ingestion jobs run in worker processes, apart from the API process that
+serves queries, so the limits are enforced across processes as well: each
+admitted call also takes a row in a small SQLite slot table (`SharedSlots`)
+shared by every process on the host. Background calls are refused there
+while the background cap is reached or an interactive call is waiting in any
+process. Rows carry a lease and the owner's pid, so a crashed process does
+not hold capacity for long.
+
+Environment:
+  LLM_MAX_IN_FLIGHT=16          # concurrent OpenAI calls across processes
+  LLM_INTERACTIVE_RESERVE=4     # slots background work may never take
+  LLM_SHARED_SLOTS=data/llm_slots.db  # slot table; "off" limits each process alone
+  LLM_SLOT_LEASE_SECONDS=900    # a slot older than this is considered abandoned
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import functools
+import inspect
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+from core_engine.logging import get_logger
+
+logger = get_logger("core_engine.utils.llm_scheduler")
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Admission order: earlier classes are always served first
+PRIORITY_CLASSES = (INTERACTIVE, BACKGROUND)
+
+DEFAULT_SLOTS_PATH = Path(__file__).resolve().parents[2] / "data" / "llm_slots.db"
+
+# Backoff while polling the shared table for a slot
+SHARED_POLL_MIN_S = 0.05
+SHARED_POLL_MAX_S = 0.5
+
+
+class SharedSlots:
+    """
+    Cross-process slot table: the in-flight cap and interactive reserve hold
+    for every process using the same SQLite file.
+
+    A slot is a `running` row; a call that found no room keeps a `waiting`
+    row (refreshed on every poll) so other processes can see interactive
+    demand. Waiting is done by polling with backoff.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_in_flight: int,
+        interactive_reserve: int,
+        lease_seconds: float = 900.0,
+        waiting_ttl: float = 5.0,
+    ):
+        """
+        Initialize shared slot table.
+
+        Args:
+            path: SQLite file shared by the processes
+            max_in_flight: Concurrent calls allowed across all processes
+            interactive_reserve: Slots only interactive calls may use
+            lease_seconds: Age after which a running slot is reclaimed
+            waiting_ttl: Age after which a waiting row no longer counts
+        """
+        self.path = Path(path)
+        self.max_in_flight = max_in_flight
+        self.background_limit = max_in_flight - interactive_reserve
+        self.lease_seconds = lease_seconds
+        self.waiting_ttl = waiting_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_slots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    owner TEXT NOT NULL,        -- host:pid
+                    priority TEXT NOT NULL,
+                    state TEXT NOT NULL,        -- running | waiting
+                    expires_at REAL NOT NULL    -- unix time
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @staticmethod
+    def _owner() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def try_take(self, priority: str, row_id: Optional[int] = None) -> Tuple[bool, int]:
+        """
+        Take a slot if `priority` has room across all processes.
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND
+            row_id: This call's waiting row from a previous attempt
+
+        Returns:
+            (granted, row_id); keep polling with the same row_id until granted
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM llm_slots WHERE expires_at < ?", (now,))
+            granted = self._has_room(conn, priority, row_id)
+            if not granted and self._drop_dead_owners(conn):
+                granted = self._has_room(conn, priority, row_id)
+            state, expires_at = ("running", now + self.lease_seconds) if granted else ("waiting", now + self.waiting_ttl)
+            if row_id is not None:
+                cursor = conn.execute(
+                    "UPDATE llm_slots SET state = ?, expires_at = ? WHERE id = ?", (state, expires_at, row_id)
+                )
+                if cursor.rowcount == 0:
+                    row_id = None  # expired while we slept
+            if row_id is None:
+                cursor = conn.execute(
+                    "INSERT INTO llm_slots (owner, priority, state, expires_at) VALUES (?, ?, ?, ?)",
+                    (self._owner(), priority, state, expires_at),
+                )
+                row_id = cursor.lastrowid
+            conn.execute("COMMIT")
+            return granted, row_id
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _has_room(self, conn: sqlite3.Connection, priority: str, row_id: Optional[int]) -> bool:
+        running, background, interactive_waiting = conn.execute("""
+            SELECT COALESCE(SUM(state = 'running'), 0),
+                   COALESCE(SUM(state = 'running' AND priority = ?), 0),
+                   COALESCE(SUM(state = 'waiting' AND priority = ? AND id IS NOT ?), 0)
+            FROM llm_slots
+        """, (BACKGROUND, INTERACTIVE, row_id)).fetchone()
+        if running >= self.max_in_flight:
+            return False
+        if priority == BACKGROUND:
+            return background < self.background_limit and not interactive_waiting
+        return True
+
+    @staticmethod
+    def _drop_dead_owners(conn: sqlite3.Connection) -> bool:
+        """Delete rows of processes on this host that no longer exist."""
+        prefix = f"{socket.gethostname()}:"
+        dead = []
+        for (owner,) in conn.execute("SELECT DISTINCT owner FROM llm_slots"):
+            if not owner.startswith(prefix):
+                continue
+            try:
+                os.kill(int(owner[len(prefix):]), 0)
+            except ProcessLookupError:
+                dead.append(owner)
+            except (OSError, ValueError):
+                pass
+        for owner in dead:
+            conn.execute("DELETE FROM llm_slots WHERE owner = ?", (owner,))
+        return bool(dead)
+
+    def give_back(self, row_id: int) -> None:
+        """Release a running slot or drop a waiting row."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM llm_slots WHERE id = ?", (row_id,))
+        finally:
+            conn.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Running slots per class and waiting calls across processes."""
+        conn = self._connect()
+        try:
+            rows = conn.execute("""
+                SELECT priority, state, COUNT(*) FROM llm_slots
+                WHERE expires_at >= ? GROUP BY priority, state
+            """, (time.time(),)).fetchall()
+        finally:
+            conn.close()
+        counts = {f"{state}_{priority}": count for priority, state, count in rows}
+        return {
+            "in_flight": sum(c for k, c in counts.items() if k.startswith("running_")),
+            **{f"{cls}_in_flight": counts.get(f"running_{cls}", 0) for cls in PRIORITY_CLASSES},
+            **{f"{cls}_waiting": counts.get(f"waiting_{cls}", 0) for cls in PRIORITY_CLASSES},
+        }
+
+
+class _Waiter:
+    """A queued request, woken from whichever thread releases a slot."""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.queued_at = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event: Optional[threading.Event] = None if loop else threading.Event()
+
+    def grant(self) -> None:
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class LLMScheduler:
+    """Caps in-flight LLM calls and admits interactive calls before background ones."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        interactive_reserve: int = 4,
+        shared: Optional[SharedSlots] = None,
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            max_in_flight: Concurrent calls allowed across all classes
+            interactive_reserve: Slots only interactive calls may use
+            shared: Slot table enforcing the same limits across processes
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.interactive_reserve = min(max(0, interactive_reserve), self.max_in_flight - 1)
+        self.shared = shared
+        self.limits = {
+            INTERACTIVE: self.max_in_flight,
+            BACKGROUND: self.max_in_flight - self.interactive_reserve,
+        }
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {cls: collections.deque() for cls in PRIORITY_CLASSES}
+        self._stats: Dict[str, Dict[str, Any]] = {
+            cls: {"in_flight": 0, "admitted": 0, "waited": 0, "wait_s_total": 0.0, "wait_s_max": 0.0,
+                  "shared_waited": 0}
+            for cls in PRIORITY_CLASSES
+        }
+
+    def _check_class(self, priority: str) -> None:
+        if priority not in self.limits:
+            raise ValueError(f"Unknown priority class: {priority} (expected one of {PRIORITY_CLASSES})")
+
+    def _has_room(self, priority: str) -> bool:
+        return self._in_flight < self.max_in_flight and self._stats[priority]["in_flight"] < self.limits[priority]
+
+    def _queued_ahead(self, priority: str) -> bool:
+        """Whether a request of `priority` or higher is already waiting."""
+        for cls in PRIORITY_CLASSES:
+            if self._queues[cls]:
+                return True
+            if cls == priority:
+                return False
+        return False
+
+    def _take(self, priority: str, waited_s: Optional[float] = None) -> None:
+        self._in_flight += 1
+        stats = self._stats[priority]
+        stats["in_flight"] += 1
+        stats["admitted"] += 1
+        if waited_s is not None:
+            stats["waited"] += 1
+            stats["wait_s_total"] += waited_s
+            stats["wait_s_max"] = max(stats["wait_s_max"], waited_s)
+
+    def _try_take(self, priority: str) -> bool:
+        if not self._queued_ahead(priority) and self._has_room(priority):
+            self._take(priority)
+            return True
+        return False
+
+    def _dispatch(self) -> None:
+        """Grant free slots to queued waiters, highest class first."""
+        now = time.monotonic()
+        for cls in PRIORITY_CLASSES:
+            queue = self._queues[cls]
+            while queue and self._has_room(cls):
+                waiter = queue.popleft()
+                self._take(cls, waited_s=now - waiter.queued_at)
+                waiter.grant()
+            if queue and self._in_flight >= self.max_in_flight:
+                # No slot left for anyone: lower classes must not be scanned ahead
+                return
+
+    def acquire(self, priority: str = INTERACTIVE) -> Optional[int]:
+        """
+        Block the calling thread until a slot of `priority` is free and take it.
+
+        Returns:
+            Shared slot ticket to pass to `release` (None without shared slots)
+        """
+        self._check_class(priority)
+        with self._lock:
+            waiter = None
+            if not self._try_take(priority):
+                waiter = _Waiter()
+                self._queues[priority].append(waiter)
+        if waiter is not None:
+            waiter.event.wait()
+        try:
+            return self._take_shared(priority)
+        except BaseException:
+            self.release(priority)
+            raise
+
+    async def acquire_async(self, priority: str = BACKGROUND) -> Optional[int]:
+        """
+        Wait (without blocking the event loop) until a slot of `priority` is free and take it.
+
+        Returns:
+            Shared slot ticket to pass to `release` (None without shared slots)
+        """
+        self._check_class(priority)
+        with self._lock:
+            waiter = None
+            if not self._try_take(priority):
+                waiter = _Waiter(asyncio.get_running_loop())
+                self._queues[priority].append(waiter)
+        if waiter is not None:
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                with self._lock:
+                    if waiter.granted:
+                        # Granted while being cancelled: hand the slot on
+                        self._release_locked(priority)
+                    else:
+                        self._queues[priority].remove(waiter)
+                raise
+        try:
+            return await self._take_shared_async(priority)
+        except BaseException:
+            self.release(priority)
+            raise
+
+    def _take_shared(self, priority: str) -> Optional[int]:
+        """Poll the shared table until it grants a slot; returns its row id."""
+        if self.shared is None:
+            return None
+        row_id = None
+        delay = SHARED_POLL_MIN_S
+        try:
+            while True:
+                granted, row_id = self.shared.try_take(priority, row_id)
+                if granted:
+                    return row_id
+                self._count_shared_wait(priority)
+                time.sleep(delay)
+                delay = min(delay * 2, SHARED_POLL_MAX_S)
+        except sqlite3.Error as e:
+            self._shared_failed(priority, e)
+            self._give_back_quietly(row_id)
+            return None
+        except BaseException:
+            self._give_back_quietly(row_id)
+            raise
+
+    async def _take_shared_async(self, priority: str) -> Optional[int]:
+        """`_take_shared` for the event loop: table access runs in a thread."""
+        if self.shared is None:
+            return None
+        row_id = None
+        delay = SHARED_POLL_MIN_S
+        try:
+            while True:
+                attempt = asyncio.ensure_future(asyncio.to_thread(self.shared.try_take, priority, row_id))
+                try:
+                    granted, row_id = await asyncio.shield(attempt)
+                except asyncio.CancelledError:
+                    # The attempt still finishes in its thread: drop whatever row it leaves
+                    attempt.add_done_callback(self._give_back_attempt)
+                    raise
+                if granted:
+                    return row_id
+                self._count_shared_wait(priority)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, SHARED_POLL_MAX_S)
+        except sqlite3.Error as e:
+            self._shared_failed(priority, e)
+            self._give_back_quietly(row_id)
+            return None
+        except BaseException:
+            self._give_back_quietly(row_id)
+            raise
+
+    def _count_shared_wait(self, priority: str) -> None:
+        with self._lock:
+            self._stats[priority]["shared_waited"] += 1
+
+    def _shared_failed(self, priority: str, error: Exception) -> None:
+        # Fail open: a broken slot table must not stop LLM calls
+        logger.warning(
+            "llm_shared_slot_failed",
+            extra={"context": {"priority": priority, "error": str(error)}},
+        )
+
+    def _give_back_attempt(self, attempt: "asyncio.Future") -> None:
+        if not attempt.cancelled() and attempt.exception() is None:
+            self._give_back_quietly(attempt.result()[1])
+
+    def _give_back_quietly(self, row_id: Optional[int]) -> None:
+        if row_id is None or self.shared is None:
+            return
+        try:
+            self.shared.give_back(row_id)
+        except sqlite3.Error as e:
+            # The row's lease expires on its own
+            logger.warning("llm_shared_slot_release_failed", extra={"context": {"error": str(e)}})
+
+    def release(self, priority: str, ticket: Optional[int] = None) -> None:
+        """Give back a slot taken with `acquire` / `acquire_async`."""
+        self._give_back_quietly(ticket)
+        with self._lock:
+            self._release_locked(priority)
+
+    def _release_locked(self, priority: str) -> None:
+        self._in_flight -= 1
+        self._stats[priority]["in_flight"] -= 1
+        self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: str = INTERACTIVE) -> Iterator[None]:
+        """Hold one slot of `priority` around a blocking call."""
+        ticket = self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority, ticket)
+
+    @asynccontextmanager
+    async def slot_async(self, priority: str = BACKGROUND) -> AsyncIterator[None]:
+        """Hold one slot of `priority` around an awaited call."""
+        ticket = await self.acquire_async(priority)
+        try:
+            yield
+        finally:
+            self.release(priority, ticket)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Capacity, and per class: limit, in-flight, queue depth and wait times."""
+        with self._lock:
+            classes = {}
+            for cls in PRIORITY_CLASSES:
+                stats = self._stats[cls]
+                classes[cls] = {
+                    "limit": self.limits[cls],
+                    "in_flight": stats["in_flight"],
+                    "queued": len(self._queues[cls]),
+                    "admitted": stats["admitted"],
+                    "waited": stats["waited"],
+                    "avg_wait_s": round(stats["wait_s_total"] / stats["waited"], 3) if stats["waited"] else 0.0,
+                    "max_wait_s": round(stats["wait_s_max"], 3),
+                    "shared_polls": stats["shared_waited"],
+                }
+            stats = {
+                "max_in_flight": self.max_in_flight,
+                "interactive_reserve": self.interactive_reserve,
+                "in_flight": self._in_flight,
+                "classes": classes,
+                "shared": None,
+            }
+        if self.shared is not None:
+            try:
+                stats["shared"] = {"path": str(self.shared.path), **self.shared.get_stats()}
+            except sqlite3.Error as e:
+                stats["shared"] = {"path": str(self.shared.path), "error": str(e)}
+        return stats
+
+
+def schedule_openai_client(client: Any, priority: str, scheduler: Optional[LLMScheduler] = None) -> Any:
+    """
+    Patch an OpenAI / AsyncOpenAI client so its calls take a scheduler slot.
+    This modifies the client in-place; a client is scheduled only once, under
+    the class of its first caller.
+
+    Args:
+        client: OpenAI or AsyncOpenAI client (None is passed through)
+        priority: INTERACTIVE or BACKGROUND
+        scheduler: Scheduler to use (default: process-wide scheduler)
+
+    Returns:
+        Same client instance (modified in-place)
+    """
+    if client is None or getattr(client, "_llm_priority", None):
+        return client
+    scheduler = scheduler or get_llm_scheduler()
+    scheduler._check_class(priority)
+
+    def wrap(owner: Any, name: str) -> None:
+        original = getattr(owner, name, None)
+        if original is None:
+            return
+        if inspect.iscoroutinefunction(inspect.unwrap(original)):
+            @functools.wraps(original)
+            async def scheduled(*args, **kwargs):
+                async with scheduler.slot_async(priority):
+                    return await original(*args, **kwargs)
+        else:
+            @functools.wraps(original)
+            def scheduled(*args, **kwargs):
+                # Streams hold the slot until the request is accepted, not while reading
+                with scheduler.slot(priority):
+                    return original(*args, **kwargs)
+        setattr(owner, name, scheduled)
+
+    wrap(client.chat.completions, "create")
+    wrap(client.embeddings, "create")
+    client._llm_priority = priority
+    return client
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Get the process-wide LLM scheduler (limits from environment).
+
+    Returns:
+        LLMScheduler instance
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            max_in_flight = max(1, int(os.getenv("LLM_MAX_IN_FLIGHT", "16")))
+            interactive_reserve = min(max(0, int(os.getenv("LLM_INTERACTIVE_RESERVE", "4"))), max_in_flight - 1)
+            shared = None
+            slots_path = os.getenv("LLM_SHARED_SLOTS", str(DEFAULT_SLOTS_PATH))
+            if slots_path and slots_path.lower() not in ("off", "false", "0"):
+                try:
+                    shared = SharedSlots(
+                        Path(slots_path),
+                        max_in_flight,
+                        interactive_reserve,
+                        lease_seconds=float(os.getenv("LLM_SLOT_LEASE_SECONDS", "900")),
+                    )
+                except (OSError, sqlite3.Error) as e:
+                    logger.warning(
+                        "llm_shared_slots_unavailable",
+                        extra={"context": {"path": slots_path, "error": str(e)}},
+                    )
+            _scheduler = LLMScheduler(max_in_flight, interactive_reserve, shared=shared)
+            logger.info(
+                "llm_scheduler_initialized",
+                extra={"context": {"max_in_flight": _scheduler.max_in_flight,
+                                   "interactive_reserve": _scheduler.interactive_reserve,
+                                   "shared_slots": str(shared.path) if shared else None}},
+            )
+        return _scheduler
@@ -0,0 +1,351 @@
+"""
+Asyncio-native rate limiting for OpenAI API calls.
+
+`AsyncRateLimiter` keeps two token buckets, one for requests per minute and
+one for tokens per minute, refilled continuously. A call reserves one request
+plus its *estimated* tokens before it is sent and settles the reservation
+with the real usage from the response, so TPM accounting follows actual
+consumption instead of sleeping a fixed interval near the limit.
+
+Waiters are served first-come first-served: only the caller at the head of
+the queue sleeps until the buckets can cover it, the others wait for their
+turn. Nothing blocks the event loop and no lock is held while sleeping.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import random
+import time
+from typing import Any, Awaitable, Callable, Deque, Iterable, Optional, TypeVar
+
+from core_engine.logging import get_logger
+
+try:
+    from openai import APIError
+    # APIConnectionError / APITimeoutError subclass APIError
+    OPENAI_ERRORS: tuple = (APIError,)
+except ImportError:
+    OPENAI_ERRORS = ()
+
+# Failures without an HTTP status that are worth another try
+RETRYABLE_ERRORS = (asyncio.TimeoutError, TimeoutError, ConnectionError) + OPENAI_ERRORS
+
+T = TypeVar("T")
+
+# Rough tokens-per-character ratio for English text (OpenAI rule of thumb)
+CHARS_PER_TOKEN = 4
+
+logger = get_logger("core_engine.utils.rate_limiter_async")
+
+
+def estimate_tokens(texts: Iterable[str], completion_tokens: int = 0) -> int:
+    """
+    Estimate the tokens a request will be charged before sending it.
+
+    Args:
+        texts: Prompt / input texts
+        completion_tokens: Expected output tokens
+
+    Returns:
+        Estimated total tokens
+    """
+    return sum(len(t) for t in texts) // CHARS_PER_TOKEN + 1 + completion_tokens
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported in an OpenAI response's `usage`, if any."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    total = getattr(usage, "total_tokens", None)
+    if total is None:
+        total = (getattr(usage, "prompt_tokens", 0) or 0) + (getattr(usage, "completion_tokens", 0) or 0)
+    return total
+
+
+class TokenBucket:
+    """Continuously refilled bucket; the level may go negative to record debt."""
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self.level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.per_second)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        self._refill()
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.per_second
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Reservation:
+    """One admitted request; settle it with the tokens actually used."""
+
+    def __init__(self, limiter: "AsyncRateLimiter", estimated_tokens: int):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.settled = False
+
+    def settle(self, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the up-front charge: refund an overestimate or charge the
+        difference of an underestimate. `None` keeps the estimate.
+        """
+        if self.settled:
+            return
+        self.settled = True
+        if actual_tokens is not None:
+            self.limiter._adjust_tokens(actual_tokens - self.estimated_tokens)
+
+
+class AsyncRateLimiter:
+    """RPM + TPM token buckets with fair FIFO waiting and retry with backoff."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 5,
+        initial_delay: float = 1.0,
+        max_delay: float = 60.0,
+        exponential_base: float = 2.0,
+        jitter: bool = True,
+    ):
+        """
+        Initialize async rate limiter.
+
+        Args:
+            requests_per_minute: Optional RPM limit
+            tokens_per_minute: Optional TPM limit
+            max_retries: Maximum number of retries
+            initial_delay: Initial retry delay in seconds
+            max_delay: Maximum retry delay in seconds
+            exponential_base: Base for exponential backoff
+            jitter: Add random jitter to retry delays
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.exponential_base = exponential_base
+        self.jitter = jitter
+
+        self._requests = TokenBucket(requests_per_minute, requests_per_minute / 60) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60) if tokens_per_minute else None
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._refunded: Optional[asyncio.Event] = None
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = 0.0
+        if self._requests:
+            wait = max(wait, self._requests.wait_time(1))
+        if self._tokens:
+            wait = max(wait, self._tokens.wait_time(tokens))
+        return wait
+
+    def _take(self, tokens: int) -> None:
+        if self._requests:
+            self._requests.take(1)
+        if self._tokens:
+            self._tokens.take(tokens)
+
+    def _adjust_tokens(self, delta: int) -> None:
+        if not self._tokens or not delta:
+            return
+        if delta > 0:
+            self._tokens.take(delta)
+        else:
+            self._tokens.give(-delta)
+            # The head waiter may be admitted earlier than it computed
+            if self._refunded is not None:
+                self._refunded.set()
+
+    def _wake_next(self) -> None:
+        for fut in self._waiters:
+            if not fut.done():
+                fut.set_result(None)
+            break
+
+    async def acquire(self, estimated_tokens: int = 0) -> Reservation:
+        """
+        Wait until one request and `estimated_tokens` fit in the buckets, in
+        arrival order, and charge them.
+
+        Args:
+            estimated_tokens: Tokens the request is expected to use
+
+        Returns:
+            Reservation to settle with the actual usage
+        """
+        # A request larger than the whole bucket would never fit: charge a full bucket
+        if self.tokens_per_minute:
+            estimated_tokens = min(estimated_tokens, self.tokens_per_minute)
+
+        if not self._waiters and self._wait_time(estimated_tokens) == 0:
+            self._take(estimated_tokens)
+            return Reservation(self, estimated_tokens)
+
+        if self._refunded is None:
+            self._refunded = asyncio.Event()
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        if len(self._waiters) == 1:
+            fut.set_result(None)
+        try:
+            await fut  # our turn at the head of the queue
+            while True:
+                delay = self._wait_time(estimated_tokens)
+                if delay <= 0:
+                    break
+                self._refunded.clear()
+                try:
+                    await asyncio.wait_for(self._refunded.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._take(estimated_tokens)
+            return Reservation(self, estimated_tokens)
+        finally:
+            was_head = self._waiters and self._waiters[0] is fut
+            self._waiters.remove(fut)
+            if was_head:
+                self._wake_next()
+
+    def _calculate_delay(self, attempt: int, error: Exception) -> float:
+        delay = min(self.initial_delay * (self.exponential_base ** attempt), self.max_delay)
+        if self.jitter:
+            delay += delay * 0.25 * random.random()
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def retry_with_backoff(
+        self,
+        func: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        operation_name: str = "API call",
+        tokens_used: Callable[[T], Optional[int]] = usage_tokens,
+        on_retry: Optional[Callable[[int, Exception], None]] = None,
+    ) -> T:
+        """
+        Run an async API call under the limits, retrying with backoff.
+
+        Args:
+            func: Zero-argument coroutine function making the call
+            estimated_tokens: Tokens charged up front (see `estimate_tokens`)
+            operation_name: Name of operation for logging
+            tokens_used: Actual tokens from the result (default: `response.usage`)
+            on_retry: Optional callback on retry (attempt, error)
+
+        Returns:
+            Function result
+
+        Raises:
+            Last exception if all retries fail
+        """
+        for attempt in range(self.max_retries + 1):
+            reservation = await self.acquire(estimated_tokens)
+            try:
+                result = await func()
+            except Exception as e:
+                # Nothing was generated; give the estimate back
+                reservation.settle(0)
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    logger.error(
+                        "async_rate_limiter_failed",
+                        extra={"context": {"operation": operation_name, "attempts": attempt + 1, "error": str(e)}},
+                    )
+                    raise
+                delay = self._calculate_delay(attempt, e)
+                logger.warning(
+                    "async_rate_limiter_retry",
+                    extra={
+                        "context": {
+                            "operation": operation_name,
+                            "attempt": attempt + 1,
+                            "max_retries": self.max_retries,
+                            "delay_s": round(delay, 2),
+                            "rate_limited": _is_rate_limit(e),
+                            "error": str(e),
+                        }
+                    },
+                )
+                if on_retry:
+                    on_retry(attempt + 1, e)
+                await asyncio.sleep(delay)
+                continue
+            reservation.settle(tokens_used(result))
+            return result
+        raise RuntimeError(f"Failed {operation_name} for unknown reason")
+
+    def get_stats(self) -> dict:
+        """Current bucket levels and queue length."""
+        return {
+            "requests_available": round(self._requests.level, 1) if self._requests else None,
+            "tokens_available": round(self._tokens.level) if self._tokens else None,
+            "waiting": len(self._waiters),
+        }
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or "rate limit" in str(error).lower()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """
+    Rate limits, server errors, timeouts and connection failures. Anything
+    else (bad requests, or bugs such as a TypeError in the caller) fails at once.
+    """
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-suggested delay from a 429 response, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_async_rate_limiter(
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+) -> AsyncRateLimiter:
+    """
+    Get an async rate limiter with custom limits.
+
+    Args:
+        requests_per_minute: RPM limit (default: 500)
+        tokens_per_minute: TPM limit (default: 1,000,000)
+
+    Returns:
+        AsyncRateLimiter instance
+    """
+    return AsyncRateLimiter(
+        requests_per_minute=requests_per_minute or 500,
+        tokens_per_minute=tokens_per_minute or 1_000_000,
+    )
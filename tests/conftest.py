@@ -0,0 +1,48 @@
+"""
+Shared pytest setup: make `core_engine` and `backend` importable from the repo root,
+and fixtures used across test files (fake clock, coroutine runner, test vectors).
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class FakeClock:
+    """Stands in for `time.time`; tests move it forward by setting `now`."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze `time.time` at a FakeClock for the test."""
+    clock = FakeClock()
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def run():
+    """Run a coroutine to completion on a fresh event loop."""
+    return asyncio.run
+
+
+@pytest.fixture
+def vector():
+    """Deterministic float32 vectors: `vector(seed, dim=8)`."""
+    def make(seed, dim=8):
+        return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return make
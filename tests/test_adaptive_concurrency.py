@@ -0,0 +1,168 @@
+"""Tests for the AIMD in-flight window (core_engine.utils.adaptive_concurrency)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core_engine.utils.adaptive_concurrency import (
+    AdaptiveConcurrency,
+    get_concurrency_controller,
+    parse_reset_seconds,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+async def _call(controller, headers=None, error=None, delay=0.0):
+    async with controller.slot() as slot:
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        slot.observe_headers(headers)
+
+
+def test_window_bounds():
+    controller = AdaptiveConcurrency(max_window=10)
+    assert controller.limit == 5
+    assert AdaptiveConcurrency(max_window=4, min_window=2, initial_window=0).limit == 2
+    assert AdaptiveConcurrency(max_window=4, initial_window=9).limit == 4
+
+
+def test_in_flight_never_exceeds_limit_and_fifo(run):
+    async def scenario():
+        controller = AdaptiveConcurrency(max_window=2, initial_window=2, latency_tolerance=1000)
+        peak = 0
+        order = []
+
+        async def task(i):
+            nonlocal peak
+            async with controller.slot():
+                peak = max(peak, controller.in_flight)
+                order.append(i)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(task(i) for i in range(8)))
+        assert peak <= 2
+        assert order == list(range(8))
+        assert controller.in_flight == 0
+
+    run(scenario())
+
+
+def test_rate_limit_halves_once_per_cooldown(run):
+    async def scenario():
+        controller = AdaptiveConcurrency(max_window=16, initial_window=16)
+        for _ in range(3):
+            with pytest.raises(RateLimited):
+                await _call(controller, error=RateLimited("429"))
+        assert controller.limit == 8
+        assert controller.stats["rate_limited"] == 3
+        assert controller.stats["decreases"] == 1
+
+        with pytest.raises(ValueError):
+            await _call(controller, error=ValueError("bad json"))
+        assert controller.limit == 8
+
+    run(scenario())
+
+
+def test_low_remaining_fraction_shrinks_limit(run):
+    async def scenario():
+        controller = AdaptiveConcurrency(max_window=10, initial_window=10)
+        await _call(controller, headers={
+            "x-ratelimit-limit-requests": "5000",
+            "x-ratelimit-remaining-requests": "4000",
+            "x-ratelimit-limit-tokens": "1000000",
+            "x-ratelimit-remaining-tokens": "50000",
+        })
+        assert controller.limit == 9
+        assert controller.stats["decreases"] == 1
+
+    run(scenario())
+
+
+def test_remaining_requests_below_window_until_reset_shrinks_limit(run):
+    async def scenario():
+        controller = AdaptiveConcurrency(max_window=10, initial_window=10)
+        await _call(controller, headers={
+            "x-ratelimit-remaining-requests": "3",
+            "x-ratelimit-reset-requests": "20s",
+        })
+        assert controller.limit == 9
+
+    run(scenario())
+
+
+@pytest.mark.parametrize("headers", [
+    None,
+    {"x-ratelimit-remaining-requests": "3"},  # no reset time
+    {"x-ratelimit-remaining-requests": "500", "x-ratelimit-reset-requests": "20s"},
+    {"x-ratelimit-limit-requests": "5000", "x-ratelimit-remaining-requests": "4999"},
+])
+def test_healthy_headers_keep_limit(headers, run):
+    async def scenario():
+        controller = AdaptiveConcurrency(max_window=10, initial_window=10)
+        await _call(controller, headers=headers)
+        assert controller.limit == 10
+        assert controller.stats["decreases"] == 0
+
+    run(scenario())
+
+
+def test_window_grows_only_while_saturated(run):
+    async def scenario():
+        controller = AdaptiveConcurrency(max_window=10, initial_window=1, latency_tolerance=1000)
+        for _ in range(3):
+            await _call(controller)
+        assert controller.limit > 1
+        grown = controller.window
+
+        wide = AdaptiveConcurrency(max_window=10, initial_window=8, latency_tolerance=1000)
+        await _call(wide)  # 1 of 8 in flight: the window is not the bottleneck
+        assert wide.window == 8
+        assert grown <= controller.max_window
+
+    run(scenario())
+
+
+def test_parse_reset_seconds():
+    assert parse_reset_seconds("1s") == 1.0
+    assert parse_reset_seconds("6m0s") == 360.0
+    assert parse_reset_seconds("250ms") == 0.25
+    assert parse_reset_seconds("1h2m3.5s") == 3723.5
+    assert parse_reset_seconds("") is None
+    assert parse_reset_seconds(None) is None
+
+
+def test_registry_reuses_controller_and_applies_new_ceiling():
+    first = get_concurrency_controller("test_registry", max_window=20)
+    first.window = 18.0
+    second = get_concurrency_controller("test_registry", max_window=8)
+    assert second is first
+    assert second.max_window == 8
+    assert second.window == 8
+
+
+def test_embedding_calls_report_rate_limit_headers(run):
+    for module in ("openai", "qdrant_client", "langchain_core"):
+        pytest.importorskip(module)
+    from core_engine.embeddings.ingest_qdrant_async import _do_embed_batch
+    from core_engine.utils.rate_limiter_async import AsyncRateLimiter
+
+    class RawEmbeddings:
+        async def create(self, model, input):
+            response = SimpleNamespace(
+                data=[SimpleNamespace(embedding=[0.0]) for _ in input],
+                usage=SimpleNamespace(total_tokens=len(input)),
+            )
+            headers = {"x-ratelimit-remaining-requests": "1", "x-ratelimit-reset-requests": "30s"}
+            return SimpleNamespace(headers=headers, parse=lambda: response)
+
+    client = SimpleNamespace(embeddings=SimpleNamespace(with_raw_response=RawEmbeddings()))
+    controller = AdaptiveConcurrency(max_window=10, initial_window=10)
+    vectors = run(_do_embed_batch(client, "m", ["a", "b"], AsyncRateLimiter(), concurrency=controller))
+    assert vectors == [[0.0], [0.0]]
+    assert controller.limit == 9
@@ -0,0 +1,84 @@
+"""Tests for in-memory concept co-occurrence (core_engine.kg.co_occurrence)."""
+
+import itertools
+import random
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg.co_occurrence import SCIPY_AVAILABLE, compute_co_occurrences  # noqa: E402
+
+BACKENDS = [False] + ([True] if SCIPY_AVAILABLE else [])
+
+CONCEPTS = {
+    "a": ["e1", "e2", "e3"],
+    "b": ["e1", "e2", "e3", "e4"],
+    "c": ["e2", "e3"],
+    "d": ["e4", "e4"],  # one distinct episode: below min_episodes
+    "e": ["e1", "e5"],
+}
+
+
+def _naive(concept_episodes, min_episodes, min_co_occurrences):
+    eligible = {
+        cid: set(eps) for cid, eps in concept_episodes.items() if len(set(eps)) >= min_episodes
+    }
+    pairs = []
+    for a, b in itertools.combinations(sorted(eligible), 2):
+        shared = eligible[a] & eligible[b]
+        if len(shared) >= min_co_occurrences:
+            pairs.append((a, b, sorted(shared)))
+    pairs.sort(key=lambda p: (-len(p[2]), p[0], p[1]))
+    return pairs
+
+
+@pytest.mark.parametrize("use_scipy", BACKENDS)
+def test_pairs_and_order(use_scipy):
+    result = compute_co_occurrences(CONCEPTS, use_scipy=use_scipy)
+    assert result == [
+        ("a", "b", ["e1", "e2", "e3"]),
+        ("a", "c", ["e2", "e3"]),
+        ("b", "c", ["e2", "e3"]),
+    ]
+
+
+@pytest.mark.parametrize("use_scipy", BACKENDS)
+def test_limit_keeps_most_shared(use_scipy):
+    result = compute_co_occurrences(CONCEPTS, limit=2, use_scipy=use_scipy)
+    assert [(a, b) for a, b, _ in result] == [("a", "b"), ("a", "c")]
+
+
+@pytest.mark.parametrize("use_scipy", BACKENDS)
+def test_focus_returns_only_pairs_involving_focus(use_scipy):
+    result = compute_co_occurrences(CONCEPTS, min_co_occurrences=1, focus=["e"], use_scipy=use_scipy)
+    assert sorted((a, b) for a, b, _ in result) == [("a", "e"), ("b", "e")]
+    assert compute_co_occurrences(CONCEPTS, focus=["missing"], use_scipy=use_scipy) == []
+
+
+@pytest.mark.parametrize("use_scipy", BACKENDS)
+def test_matches_naive_pairwise_comparison(use_scipy):
+    rng = random.Random(7)
+    episodes = [f"ep{i}" for i in range(12)]
+    concept_episodes = {f"c{i:02d}": rng.sample(episodes, rng.randint(1, 6)) for i in range(40)}
+
+    expected = _naive(concept_episodes, 2, 2)
+    result = compute_co_occurrences(concept_episodes, use_scipy=use_scipy)
+    assert [(a, b, sorted(s)) for a, b, s in result] == expected
+
+    focus = ["c03", "c10", "c11"]
+    focused = compute_co_occurrences(concept_episodes, focus=focus, use_scipy=use_scipy)
+    assert sorted((a, b) for a, b, _ in focused) == sorted(
+        (a, b) for a, b, _ in expected if a in focus or b in focus
+    )
+
+
+def test_backends_agree():
+    if not SCIPY_AVAILABLE:
+        pytest.skip("scipy not installed")
+    rng = random.Random(11)
+    episodes = [f"ep{i}" for i in range(20)]
+    concept_episodes = {f"c{i}": rng.sample(episodes, rng.randint(2, 8)) for i in range(60)}
+    assert compute_co_occurrences(concept_episodes, use_scipy=True) == compute_co_occurrences(
+        concept_episodes, use_scipy=False
+    )
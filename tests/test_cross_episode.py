@@ -0,0 +1,181 @@
+"""Tests for incremental CROSS_EPISODE linking (core_engine.kg.cross_episode)."""
+
+import copy
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg.cross_episode import CrossEpisodeLinker  # noqa: E402
+
+
+class LinkGraph:
+    """
+    In-memory stand-in for the linker's Neo4j queries: concept episode
+    membership plus CROSS_EPISODE links keyed by sorted (source_id, target_id).
+    """
+
+    workspace_id = "ws"
+
+    def __init__(self, concepts):
+        self.concepts = {cid: list(episodes) for cid, episodes in concepts.items()}
+        self.links = {}
+        self.writes = 0
+
+    def execute_read(self, query, params):
+        if "UNION" in query:  # find_touched_concepts
+            episodes = set(params["episode_ids"])
+            ids = {cid for cid, eps in self.concepts.items() if episodes & set(eps)}
+            for pair, link in self.links.items():
+                if episodes & set(link["episode_ids"]):
+                    ids.update(pair)
+            return [{"id": cid} for cid in sorted(ids)]
+        if "r.co_occurrence_count as count" in query:  # _load_links
+            return [
+                {"source_id": a, "target_id": b, "count": link["count"]}
+                for (a, b), link in self.links.items()
+            ]
+        # _load_concept_episodes
+        records = []
+        for cid, eps in self.concepts.items():
+            if len(eps) < params["min_episodes"]:
+                continue
+            if params["concept_ids"] is not None and cid not in params["concept_ids"]:
+                continue
+            if params["episode_ids"] is not None and not set(eps) & set(params["episode_ids"]):
+                continue
+            records.append({"id": cid, "name": cid.upper(), "type": "Concept", "episode_ids": eps})
+        return records
+
+    def execute_write(self, query, params):
+        self.writes += 1
+        if "DELETE r" in query:
+            removed = [tuple(pair) for pair in params["pairs"] if tuple(pair) in self.links]
+            for pair in removed:
+                del self.links[pair]
+            return [{"removed": len(removed)}]
+        for row in params["rows"]:
+            self.links[(row["source_id"], row["target_id"])] = {
+                "count": row["co_occurrence_count"],
+                "episode_ids": row["shared_episode_ids"],
+            }
+        return [{"written": len(params["rows"])}]
+
+    def link_counts(self):
+        return {pair: link["count"] for pair, link in self.links.items()}
+
+
+CONCEPTS = {
+    "a": ["e1", "e2", "e3", "e4"],
+    "b": ["e1", "e2", "e3", "e4"],
+    "c": ["e1", "e2", "e3"],
+    "d": ["e2", "e3"],
+    "e": ["e5", "e6"],
+    "f": ["e5", "e6"],
+    "g": ["e6"],
+}
+
+
+def _link(graph, **kwargs):
+    kwargs.setdefault("min_confidence", 0.0)
+    return CrossEpisodeLinker(graph, workspace_id="ws").create_cross_episode_links(**kwargs)
+
+
+def _full_relink(graph, **kwargs):
+    """Links a from-scratch full relink of the same graph ends up with."""
+    fresh = LinkGraph(graph.concepts)
+    _link(fresh, **kwargs)
+    return fresh.link_counts()
+
+
+def test_full_relink_keeps_the_most_shared_pairs():
+    graph = LinkGraph(CONCEPTS)
+    result = _link(graph, max_links=3)
+    assert graph.link_counts() == {("a", "b"): 4, ("a", "c"): 3, ("b", "c"): 3}
+    assert result == {"created": 3, "skipped": 0, "removed": 0}
+
+    uncapped = LinkGraph(CONCEPTS)
+    _link(uncapped, max_links=None)
+    assert len(uncapped.links) == 7
+    assert uncapped.links[("e", "f")]["episode_ids"] == ["e5", "e6"]
+
+
+def test_incremental_relink_matches_full_relink():
+    graph = LinkGraph(CONCEPTS)
+    _link(graph, max_links=None)
+
+    # New episode: d and e now co-occur, and c/d gain a shared episode
+    for cid in ("c", "d", "e"):
+        graph.concepts[cid].append("e7")
+    result = _link(graph, episode_ids=["e7"], max_links=None)
+
+    assert graph.link_counts() == _full_relink(graph, max_links=None)
+    assert graph.link_counts()[("c", "d")] == 3
+    assert ("d", "e") not in graph.links  # one shared episode: below min_co_occurrences
+    assert result["removed"] == 0
+
+
+def test_removed_episode_drops_its_links():
+    graph = LinkGraph(CONCEPTS)
+    _link(graph, max_links=None)
+    for cid in ("e", "f", "g"):
+        graph.concepts[cid] = [ep for ep in graph.concepts[cid] if ep != "e6"]
+
+    result = _link(graph, episode_ids=["e6"], max_links=None)
+    assert ("e", "f") not in graph.links
+    assert result["removed"] == 1
+    assert graph.link_counts() == _full_relink(graph, max_links=None)
+
+
+def test_untouched_episodes_write_nothing():
+    graph = LinkGraph(CONCEPTS)
+    _link(graph, max_links=None)
+    writes = graph.writes
+    assert _link(graph, episode_ids=["e99"]) == {"created": 0, "skipped": 0, "removed": 0}
+    assert graph.writes == writes
+
+
+def test_incremental_update_respects_the_cap():
+    graph = LinkGraph(CONCEPTS)
+    _link(graph, max_links=3)
+
+    # e/f now share three episodes: tied with a/c and b/c, which win on ids
+    graph.concepts["e"].append("e8")
+    graph.concepts["f"].append("e8")
+    _link(graph, episode_ids=["e8"], max_links=3)
+
+    assert graph.link_counts() == {("a", "b"): 4, ("a", "c"): 3, ("b", "c"): 3}
+    assert graph.link_counts() == _full_relink(graph, max_links=3)
+
+    graph.concepts["e"].append("e9")
+    graph.concepts["f"].append("e9")
+    _link(graph, episode_ids=["e9"], max_links=3)
+    assert graph.link_counts() == {("a", "b"): 4, ("e", "f"): 4, ("a", "c"): 3}
+    assert graph.link_counts() == _full_relink(graph, max_links=3)
+
+
+def test_capped_out_pairs_come_back_through_a_full_relink(monkeypatch):
+    graph = LinkGraph(CONCEPTS)
+    graph.concepts["e"].append("e8")
+    graph.concepts["f"].append("e8")
+    _link(graph, max_links=3)
+    assert ("e", "f") not in graph.links  # capped out behind a/c and b/c
+    before = copy.deepcopy(graph.links)
+
+    calls = []
+    original = CrossEpisodeLinker.find_co_occurring_concepts
+
+    def spy(self, **kwargs):
+        calls.append(kwargs.get("concept_ids"))
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(CrossEpisodeLinker, "find_co_occurring_concepts", spy)
+
+    # c leaves e1-e3: a/c and b/c fall out, and the untouched e/f moves back into the top 3
+    graph.concepts["c"] = ["e9"]
+    _link(graph, episode_ids=["e1", "e2", "e3"], max_links=3)
+
+    assert calls[0] is not None and calls[-1] is None  # incremental first, then the full refill
+    assert graph.link_counts() == _full_relink(graph, max_links=3)
+    assert set(graph.links) == {("a", "b"), ("e", "f"), ("a", "d")}
+    assert set(before) - set(graph.links) == {("a", "c"), ("b", "c")}
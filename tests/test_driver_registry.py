@@ -0,0 +1,70 @@
+"""Tests for the shared Neo4j driver registry (core_engine.kg.driver_registry)."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg import driver_registry  # noqa: E402
+from core_engine.kg.driver_registry import DriverRegistry  # noqa: E402
+
+
+class SlowDriver:
+    """Driver whose connectivity check blocks until `ready` is set."""
+
+    created = []
+
+    def __init__(self, uri, ready):
+        self.uri = uri
+        self.ready = ready
+        self.closed = False
+        SlowDriver.created.append(self)
+
+    def verify_connectivity(self):
+        assert self.ready.wait(5)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    SlowDriver.created = []
+    gates = {}
+
+    def driver(uri, auth=None, **kwargs):
+        return SlowDriver(uri, gates.setdefault(uri, threading.Event()))
+
+    monkeypatch.setattr(driver_registry.GraphDatabase, "driver", driver)
+    return gates
+
+
+def test_slow_connect_does_not_block_the_registry(connect):
+    registry = DriverRegistry(pool_config={})
+    connect["bolt://slow"] = threading.Event()
+    connect["bolt://fast"] = threading.Event()
+    connect["bolt://fast"].set()
+
+    got = []
+    threads = [
+        threading.Thread(target=lambda: got.append(registry.get_driver("bolt://slow", "u", "p", "db")))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    while not SlowDriver.created:
+        time.sleep(0.01)
+
+    # While bolt://slow connects, other drivers and metrics are served
+    fast = registry.get_driver("bolt://fast", "u", "p", "db")
+    assert fast.uri == "bolt://fast"
+    assert len(registry.get_metrics()["drivers"]) == 1
+
+    connect["bolt://slow"].set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert got[0] is got[1]  # concurrent first requests share one connection attempt
+    assert [d.uri for d in SlowDriver.created] == ["bolt://slow", "bolt://fast"]
+    assert registry.get_driver("bolt://slow", "u", "p", "db") is got[0]
@@ -0,0 +1,130 @@
+"""Tests for the query embedding cache (core_engine.reasoning.embedding_cache)."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("qdrant_client")
+pytest.importorskip("neo4j")
+
+from core_engine.reasoning import embedding_cache as cache_module  # noqa: E402
+from core_engine.reasoning.embedding_cache import EmbeddingCache, get_embedding_cache  # noqa: E402
+
+DIM = 8
+
+
+def test_set_and_get_normalises_query_text(vector):
+    cache = EmbeddingCache(max_size=4, dimensions=DIM)
+    cache.set("  Deep Work ", vector(1))
+    assert cache.get("deep work") == pytest.approx(vector(1))
+    assert cache.get("shallow work") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert stats["disk"] is None
+
+
+def test_lru_eviction_reuses_rows(vector):
+    cache = EmbeddingCache(max_size=2, dimensions=DIM)
+    cache.set("a", vector(1))
+    cache.set("b", vector(2))
+    assert cache.get("a") is not None  # "b" is now least recently used
+    cache.set("c", vector(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == pytest.approx(vector(1))
+    assert cache.get("c") == pytest.approx(vector(3))
+    assert cache.stats()["size"] == 2
+
+
+def test_overwrite_keeps_one_entry(vector):
+    cache = EmbeddingCache(max_size=2, dimensions=DIM)
+    cache.set("a", vector(1))
+    cache.set("a", vector(2))
+    cache.set("b", vector(3))
+    assert cache.get("a") == pytest.approx(vector(2))
+    assert cache.get("b") == pytest.approx(vector(3))
+    assert cache.stats()["size"] == 2
+
+
+def test_expired_entries_are_dropped(clock, vector):
+    cache = EmbeddingCache(max_size=1, ttl_seconds=60, dimensions=DIM)
+    cache.set("a", vector(1))
+    clock.now += 60
+    assert cache.get("a") is not None
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+    cache.set("b", vector(2))  # the freed row is reused
+    assert cache.get("b") == pytest.approx(vector(2))
+
+
+def test_float16_arena(vector):
+    cache = EmbeddingCache(max_size=4, dimensions=DIM, dtype="float16")
+    cache.set("a", vector(1))
+    assert cache.get("a") == pytest.approx(vector(1), abs=1e-2)
+    assert cache.stats()["arena_bytes"] == 4 * DIM * 2
+    with pytest.raises(ValueError):
+        EmbeddingCache(dimensions=DIM, dtype="int8")
+
+
+def test_new_dimensions_reset_the_arena(vector):
+    cache = EmbeddingCache(max_size=4, dimensions=DIM)
+    cache.set("a", vector(1))
+    cache.set("b", [0.5] * (DIM * 2))
+    assert cache.dimensions == DIM * 2
+    assert cache.get("a") is None
+    assert cache.get("b") == pytest.approx([0.5] * (DIM * 2))
+
+
+def test_disk_tier_is_shared_and_survives_clear(tmp_path, vector):
+    writer = EmbeddingCache(max_size=4, dimensions=DIM, disk_path=tmp_path)
+    writer.set("Deep work", vector(1))
+
+    reader = EmbeddingCache(max_size=4, dimensions=DIM, disk_path=tmp_path)
+    assert reader.get("deep work") == pytest.approx(vector(1))
+    assert reader.get("deep work") == pytest.approx(vector(1))  # promoted to memory
+    stats = reader.stats()
+    assert (stats["disk_hits"], stats["hits"], stats["size"]) == (1, 1, 1)
+
+    reader.clear()
+    assert reader.stats()["size"] == 0
+    assert reader.get("deep work") == pytest.approx(vector(1))
+    assert reader.stats()["disk_hits"] == 1
+
+
+def test_concurrent_set_and_get():
+    cache = EmbeddingCache(max_size=16, dimensions=DIM)
+    errors = []
+
+    def worker(offset):
+        try:
+            for i in range(200):
+                key = f"q{(offset + i) % 32}"
+                cache.set(key, [float((offset + i) % 32)] * DIM)
+                found = cache.get(key)
+                # Another thread may have evicted or rewritten it, never with another key's vector
+                if found is not None and found != [float((offset + i) % 32)] * DIM:
+                    errors.append((key, found[0]))
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.stats()["size"] == 16
+
+
+def test_disk_tier_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_module, "_embedding_caches", {})
+    monkeypatch.delenv("EMBEDDING_CACHE_DISK", raising=False)
+    monkeypatch.setenv("EMBEDDING_CACHE_DISK_PATH", str(tmp_path))
+    assert get_embedding_cache(model="m-off").stats()["disk"] is None
+
+    monkeypatch.setenv("EMBEDDING_CACHE_DISK", "true")
+    assert get_embedding_cache(model="m-on").stats()["disk"] is not None
@@ -0,0 +1,111 @@
+"""Tests for the memory-mapped ingestion embedding store (core_engine.embeddings.embedding_store)."""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("qdrant_client")
+
+from core_engine.embeddings.embedding_store import (  # noqa: E402
+    EmbeddingStore,
+    content_hash,
+    embed_with_store,
+    embed_with_store_async,
+)
+
+DIM = 8
+
+
+@pytest.fixture
+def store(tmp_path):
+    return EmbeddingStore("text-embedding-3-large", DIM, root=tmp_path)
+
+
+def test_put_and_get(store, vector):
+    a, b = content_hash("a"), content_hash("b")
+    store.put_many([(a, vector(1)), (b, vector(2))])
+
+    found = store.get_many([a, b, content_hash("c")])
+    assert set(found) == {a, b}
+    np.testing.assert_array_equal(found[a], vector(1))
+    assert store.get_stats()["entries"] == 2
+    assert (store.hits, store.misses) == (2, 1)
+
+
+def test_existing_hash_is_not_overwritten(store, vector):
+    h = content_hash("a")
+    store.put_many([(h, vector(1))])
+    store.put_many([(h, vector(2)), (h, vector(3))])
+
+    np.testing.assert_array_equal(store.get_many([h])[h], vector(1))
+    assert store.get_stats()["entries"] == 1
+
+
+def test_wrong_dimensions_rolls_back(store, vector):
+    with pytest.raises(ValueError):
+        store.put_many([(content_hash("a"), np.zeros(DIM + 1))])
+    assert store.get_stats()["entries"] == 0
+    store.put_many([(content_hash("a"), vector(1))])
+    assert store.get_stats()["entries"] == 1
+
+
+def test_grows_past_initial_capacity(store, vector):
+    items = [(content_hash(str(i)), vector(i)) for i in range(1500)]
+    store.put_many(items[:700])
+    store.put_many(items[700:])
+
+    found = store.get_many([h for h, _ in items])
+    assert len(found) == 1500
+    np.testing.assert_array_equal(found[items[1499][0]], vector(1499))
+
+
+def test_second_instance_sees_rows_written_later(tmp_path, vector):
+    reader = EmbeddingStore("m", DIM, root=tmp_path)
+    writer = EmbeddingStore("m", DIM, root=tmp_path)
+    items = [(content_hash(str(i)), vector(i)) for i in range(1100)]
+    writer.put_many(items)
+
+    found = reader.get_many([items[-1][0]])
+    np.testing.assert_array_equal(found[items[-1][0]], vector(1099))
+
+
+def test_embed_with_store_only_embeds_unique_misses(store, vector):
+    calls = []
+
+    def embed_missing(texts):
+        calls.append(list(texts))
+        return [vector(len(t)).tolist() for t in texts]
+
+    first = embed_with_store(["aa", "b", "aa"], store, embed_missing)
+    second = embed_with_store(["b", "ccc"], store, embed_missing)
+
+    assert calls == [["aa", "b"], ["ccc"]]
+    assert first[0] == first[2]
+    np.testing.assert_allclose(second[0], first[1])
+    assert len(second) == 2
+
+
+def test_embed_with_store_async_keeps_store_io_off_the_loop(store, vector, run):
+    threads = []
+    get_many, put_many = store.get_many, store.put_many
+
+    def record(method):
+        def wrapper(*args, **kwargs):
+            threads.append(threading.get_ident())
+            return method(*args, **kwargs)
+        return wrapper
+
+    store.get_many, store.put_many = record(get_many), record(put_many)
+
+    async def embed_missing(texts):
+        threads.append(threading.get_ident())
+        return [vector(len(t)).tolist() for t in texts]
+
+    vectors = run(embed_with_store_async(["aa", "b"], store, embed_missing))
+
+    loop_thread = threads[1]
+    assert len(threads) == 3
+    assert threads[0] != loop_thread and threads[2] != loop_thread
+    assert len(vectors) == 2
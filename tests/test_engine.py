@@ -0,0 +1,207 @@
+"""Tests for the staged ingestion engine's run loop (core_engine.pipeline.engine)."""
+
+import threading
+
+import pytest
+
+for module in ("langchain_core", "neo4j", "openai", "qdrant_client"):
+    pytest.importorskip(module)
+
+from langchain_core.documents import Document  # noqa: E402
+
+from core_engine.pipeline import engine as engine_module  # noqa: E402
+from core_engine.pipeline.engine import (  # noqa: E402
+    IngestionCancelled,
+    StagedIngestionEngine,
+    StageError,
+)
+
+
+class Journal:
+    """In-memory batch journal with the interface of JobJournal."""
+
+    def __init__(self):
+        self.batches = {"kg": {}, "embed": {}}
+        self.totals = None
+
+    def completed(self, stage):
+        return dict(self.batches[stage])
+
+    def record(self, stage, batch_key, chunk_ids, output):
+        self.batches[stage][batch_key] = output
+
+    def set_totals(self, totals):
+        self.totals = totals
+
+
+class Stages:
+    """
+    Fake KG pipeline and embedding upsert. Each KG batch writes one concept
+    per chunk; `on_kg` / `on_embed` run before a batch is processed. KG items
+    whose position is in `failed_kg` report a failed extraction batch.
+    """
+
+    def __init__(self):
+        self.kg_batches = []
+        self.embed_batches = []
+        self.on_kg = None
+        self.on_embed = None
+        self.failed_kg = set()
+        self.pipelines_closed = 0
+
+    def pipeline(self, **kwargs):
+        stages = self
+
+        class Pipeline:
+            def process_chunks(self, chunks, on_batch=None):
+                if stages.on_kg:
+                    stages.on_kg(len(stages.kg_batches))
+                failed = len(stages.kg_batches) in stages.failed_kg
+                stages.kg_batches.append([c.metadata["chunk_index"] for c in chunks])
+                counts = {"concepts": len(chunks), "relationships": 0, "quotes": 0}
+                failed_batches = [{
+                    "batch": 1,
+                    "chunks": len(chunks),
+                    "episode_ids": sorted({c.metadata["episode_id"] for c in chunks}),
+                }] if failed else []
+                return {"extracted": counts, "written": counts, "failed_batches": failed_batches}
+
+            def close(self):
+                stages.pipelines_closed += 1
+
+        return Pipeline()
+
+    def upsert(self, client, qdrant, collection, embed_model, batch, **kwargs):
+        if self.on_embed:
+            self.on_embed(len(self.embed_batches))
+        self.embed_batches.append([c.metadata["chunk_index"] for c in batch])
+        return len(batch)
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    stages = Stages()
+    monkeypatch.setattr(engine_module, "KGExtractionPipeline", stages.pipeline)
+    monkeypatch.setattr(engine_module, "upsert_chunk_batch", stages.upsert)
+    monkeypatch.setattr(engine_module, "get_clients", lambda dim, collection: (None, None))
+    monkeypatch.setattr(engine_module, "get_rate_limiter", lambda **kwargs: None)
+    monkeypatch.setattr(engine_module, "get_embedding_store", lambda model, dim: None)
+    return stages
+
+
+def _engine():
+    # Two chunks per KG item and per embedding batch
+    return StagedIngestionEngine(workspace_id="ws", kg_batch_size=1, kg_batches_per_item=2, embed_batch_size=2)
+
+
+def _chunks(count=6):
+    return [
+        Document(page_content=f"chunk {i} " + "x" * 500, metadata={"episode_id": "ep", "chunk_index": i})
+        for i in range(count)
+    ]
+
+
+def test_run_writes_every_batch_and_journals_it(stages):
+    journal = Journal()
+    result = _engine().run(_chunks(), journal=journal)
+
+    assert result["written"]["concepts"] == 6
+    assert result["embedded"] == 6
+    assert sorted(stages.kg_batches) == [[0, 1], [2, 3], [4, 5]]
+    assert sorted(stages.embed_batches) == [[0, 1], [2, 3], [4, 5]]
+    assert journal.totals == {"kg": 3, "embed": 3}
+    assert len(journal.batches["kg"]) == len(journal.batches["embed"]) == 3
+    assert stages.pipelines_closed == 1
+
+
+def test_failed_extraction_batches_are_returned(stages):
+    stages.failed_kg = {1}
+    result = _engine().run(_chunks())
+
+    assert len(result["failed_batches"]) == 1
+    assert result["failed_episode_ids"] == ["ep"]
+    assert _engine().run(_chunks(2))["failed_episode_ids"] == []
+
+
+def test_window_with_failed_batches_is_not_journaled(stages):
+    stages.failed_kg = {0, 1, 2}
+    journal = Journal()
+    _engine().run(_chunks(), journal=journal)
+    assert journal.batches["kg"] == {}
+    assert len(journal.batches["embed"]) == 3
+
+    stages.failed_kg = set()
+    stages.kg_batches = []
+    result = _engine().run(_chunks(), journal=journal)
+    assert sorted(stages.kg_batches) == [[0, 1], [2, 3], [4, 5]]
+    assert len(journal.batches["kg"]) == 3
+    assert result["failed_episode_ids"] == []
+
+
+def test_rerun_skips_journaled_batches_and_counts_them(stages):
+    journal = Journal()
+    _engine().run(_chunks(), journal=journal)
+    stages.kg_batches, stages.embed_batches = [], []
+
+    result = _engine().run(_chunks(), journal=journal)
+    assert stages.kg_batches == stages.embed_batches == []
+    assert result["written"]["concepts"] == 6
+    assert result["embedded"] == 6
+
+    # Changed settings give new keys: nothing is skipped
+    other = StagedIngestionEngine(workspace_id="ws", kg_batch_size=1, kg_batches_per_item=2,
+                                  embed_batch_size=2, model="gpt-4o-mini")
+    other.run(_chunks(), journal=journal)
+    assert len(stages.kg_batches) == 3
+
+
+def test_stage_error_stops_the_run_and_resume_finishes_it(stages):
+    def fail_third(done):
+        if done == 2:
+            raise RuntimeError("neo4j unavailable")
+
+    stages.on_kg = fail_third
+    journal = Journal()
+    with pytest.raises(StageError, match="'kg' failed: neo4j unavailable") as excinfo:
+        _engine().run(_chunks(), journal=journal)
+    assert isinstance(excinfo.value.__cause__, RuntimeError)
+    assert len(journal.batches["kg"]) == 2
+    assert stages.pipelines_closed == 1
+
+    stages.on_kg = None
+    stages.kg_batches = []
+    result = _engine().run(_chunks(), journal=journal)
+    assert stages.kg_batches == [[4, 5]]
+    assert result["written"]["concepts"] == 6
+    assert result["embedded"] == 6
+
+
+def test_embed_error_is_raised_as_stage_error(stages):
+    def fail(done):
+        raise ValueError("bad vector")
+
+    stages.on_embed = fail
+    with pytest.raises(StageError, match="'embed' failed"):
+        _engine().run(_chunks())
+
+
+def test_cancel_stops_after_the_current_batch(stages):
+    cancel = threading.Event()
+    journal = Journal()
+
+    def cancel_on_second(done):
+        if done == 1:
+            cancel.set()
+
+    stages.on_kg = cancel_on_second
+    with pytest.raises(IngestionCancelled):
+        _engine().run(_chunks(), journal=journal, cancel_event=cancel)
+    # The batch in flight when the cancel arrived is finished and journaled
+    assert len(stages.kg_batches) == 2
+    assert len(journal.batches["kg"]) == 2
+
+    stages.on_kg = None
+    stages.kg_batches = []
+    result = _engine().run(_chunks(), journal=journal)
+    assert stages.kg_batches == [[4, 5]]
+    assert result["written"]["concepts"] == 6
@@ -0,0 +1,187 @@
+"""Tests for the per-chunk KG extraction cache (core_engine.kg.extraction_cache)."""
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("neo4j")
+
+from langchain_core.documents import Document  # noqa: E402
+
+from core_engine.kg.extraction_cache import (  # noqa: E402
+    ExtractionCache,
+    extraction_cache_key,
+    merge_extractions,
+    split_extraction,
+)
+
+MODEL = "gpt-4o"
+
+
+def _chunk(text, **metadata):
+    base = {"source_path": "ep.txt", "episode_id": "ep", "start_char": 0, "end_char": len(text)}
+    base.update(metadata)
+    return Document(page_content=text, metadata=base)
+
+
+def _output(*names_by_chunk):
+    """Extraction output with one concept and one quote per (chunk number, name)."""
+    data = {"concepts": [], "relationships": [], "quotes": []}
+    for number, name in names_by_chunk:
+        data["concepts"].append({"id": name, "name": name, "type": "Concept", "text_span": name,
+                                 "confidence": 0.9, "chunk": number})
+        data["quotes"].append({"text": f"about {name}", "confidence": 0.9, "chunk": number})
+    return data
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(db_path=tmp_path / "extraction.db")
+    yield cache
+    cache.close()
+
+
+def test_key_covers_every_prompt_input():
+    chunk = _chunk("some text", speaker="A", timestamp="00:01:00")
+    key = extraction_cache_key(chunk, MODEL)
+
+    assert extraction_cache_key(_chunk("some text", speaker="A", timestamp="00:01:00"), MODEL) == key
+    assert extraction_cache_key(_chunk("some text", speaker="B", timestamp="00:01:00"), MODEL) != key
+    assert extraction_cache_key(_chunk("some text", speaker="A", timestamp="00:02:00"), MODEL) != key
+    assert extraction_cache_key(_chunk("some text", speaker="A", timestamp="00:01:00", episode_id="x"), MODEL) != key
+    assert extraction_cache_key(chunk, "gpt-4o-mini") != key
+
+
+def test_key_ignores_workspace_root():
+    ws1 = _chunk("some text", source_path="/srv/data/workspaces/ws1/transcripts/ep.txt")
+    ws2 = _chunk("some text", source_path="/srv/data/workspaces/ws2/transcripts/ep.txt")
+
+    assert extraction_cache_key(ws1, MODEL) == extraction_cache_key(ws2, MODEL)
+    assert extraction_cache_key(_chunk("some text", source_path="/srv/other.txt"), MODEL) != extraction_cache_key(ws1, MODEL)
+
+
+def test_split_extraction_by_chunk_number():
+    parts = split_extraction(_output((1, "a"), (2, "b"), (2, "c")), 2)
+
+    assert [c["id"] for c in parts[0]["concepts"]] == ["a"]
+    assert [c["id"] for c in parts[1]["concepts"]] == ["b", "c"]
+    assert all("chunk" not in c for part in parts for c in part["concepts"])
+
+
+def test_split_extraction_copies_concepts_referenced_from_other_chunks():
+    data = _output((1, "a"), (2, "b"))
+    data["relationships"].append({"source_id": "b", "target_id": "a", "type": "ENABLES", "chunk": 2})
+    data["quotes"].append({"text": "a and b", "related_concepts": ["a", "unknown"], "chunk": 2})
+    parts = split_extraction(data, 2)
+
+    assert [c["id"] for c in parts[0]["concepts"]] == ["a"]
+    assert [c["id"] for c in parts[1]["concepts"]] == ["b", "a"]
+    assert [c["id"] for c in merge_extractions(parts)["concepts"]] == ["a", "b"]
+
+
+def test_shifted_batch_has_every_referenced_concept(cache):
+    a, b, c = _chunk("chunk a"), _chunk("chunk b"), _chunk("chunk c")
+    data = _output((1, "a"), (2, "b"))
+    data["relationships"].append({"source_id": "a", "target_id": "b", "type": "ENABLES", "chunk": 2})
+
+    keys, cached = cache.lookup_batch([a, b], MODEL)
+    cache.finish_batch(keys, cached, data, MODEL)
+
+    keys, cached = cache.lookup_batch([b, c], MODEL)
+    result = cache.finish_batch(keys, cached, _output((1, "c")), MODEL)
+    concept_ids = {concept["id"] for concept in result["concepts"]}
+    for rel in result["relationships"]:
+        assert {rel["source_id"], rel["target_id"]} <= concept_ids
+
+
+@pytest.mark.parametrize("number", [None, 0, 3, "1", True])
+def test_split_extraction_rejects_unattributed_items(number):
+    data = _output((1, "a"))
+    data["quotes"][0]["chunk"] = number
+    assert split_extraction(data, 2) is None
+
+
+def test_merge_keeps_first_concept_per_id():
+    merged = merge_extractions([
+        {"concepts": [{"id": "a", "name": "first"}], "relationships": [], "quotes": [{"text": "q1"}]},
+        {"concepts": [{"id": "a", "name": "second"}], "relationships": [], "quotes": [{"text": "q2"}]},
+    ])
+    assert [c["name"] for c in merged["concepts"]] == ["first"]
+    assert [q["text"] for q in merged["quotes"]] == ["q1", "q2"]
+
+
+def test_shifted_batch_reuses_cached_chunks(cache):
+    a, b, c = _chunk("chunk a"), _chunk("chunk b"), _chunk("chunk c")
+
+    keys, cached = cache.lookup_batch([a, b], MODEL)
+    assert cached == {}
+    cache.finish_batch(keys, cached, _output((1, "a"), (2, "b")), MODEL)
+
+    # Batch boundaries moved: b is reused, only c is pending
+    keys, cached = cache.lookup_batch([b, c], MODEL)
+    assert list(cached) == [keys[0]]
+    result = cache.finish_batch(keys, cached, _output((1, "c")), MODEL)
+
+    assert [concept["id"] for concept in result["concepts"]] == ["b", "c"]
+    assert cache.lookup_batch([a, b, c], MODEL)[1].keys() == set(keys) | {extraction_cache_key(a, MODEL)}
+
+
+def test_unattributed_output_is_returned_but_not_stored(cache):
+    a = _chunk("chunk a")
+    data = _output((1, "a"))
+    del data["concepts"][0]["chunk"]
+
+    keys, cached = cache.lookup_batch([a], MODEL)
+    result = cache.finish_batch(keys, cached, data, MODEL)
+
+    assert [c["id"] for c in result["concepts"]] == ["a"]
+    assert all("chunk" not in q for q in result["quotes"])
+    assert cache.get(keys[0]) is None
+
+
+def test_entries_persist_and_evict_least_recently_used(tmp_path):
+    path = tmp_path / "extraction.db"
+    cache = ExtractionCache(db_path=path, max_bytes=400)
+    payload = {"concepts": [], "relationships": [], "quotes": [{"text": "x" * 100}]}
+    cache.put_many({"k1": payload, "k2": payload}, MODEL)
+    cache.get("k1")  # k2 is now least recently used
+    cache.put("k3", payload, MODEL)
+
+    assert cache.get("k2") is None
+    assert cache.get("k1") == payload and cache.get("k3") == payload
+    assert cache.get_stats()["evictions"] >= 1
+    cache.close()
+
+    reopened = ExtractionCache(db_path=path, max_bytes=400)
+    assert reopened.get("k1") == payload
+    reopened.close()
+
+
+def test_size_cap_holds_across_processes_sharing_the_file(tmp_path):
+    path = tmp_path / "extraction.db"
+    payload = {"concepts": [], "relationships": [], "quotes": [{"text": "x" * 100}]}
+    first = ExtractionCache(db_path=path, max_bytes=400)
+    second = ExtractionCache(db_path=path, max_bytes=400)
+    for i in range(3):
+        first.put(f"a{i}", payload, MODEL)
+        second.put(f"b{i}", payload, MODEL)
+
+    assert first.get_stats()["total_bytes"] <= 400
+    assert second.get_stats()["total_bytes"] <= 400
+    first.close()
+    second.close()
+
+
+def test_cache_errors_are_a_miss_or_a_skipped_write(cache, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    a = _chunk("chunk a")
+    monkeypatch.setattr(cache, "get_many", locked)
+    keys, cached = cache.lookup_batch([a], MODEL)
+    assert cached == {}
+
+    monkeypatch.setattr(cache, "put_many", locked)
+    result = cache.finish_batch(keys, cached, _output((1, "a")), MODEL)
+    assert [c["id"] for c in result["concepts"]] == ["a"]
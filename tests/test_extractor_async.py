@@ -0,0 +1,220 @@
+"""Tests for the async KG extractor (core_engine.kg.extractor_async)."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("neo4j")
+pytest.importorskip("openai")
+
+from langchain_core.documents import Document  # noqa: E402
+
+from core_engine.kg import extractor_async  # noqa: E402
+from core_engine.kg.extractor_async import AsyncKGExtractor  # noqa: E402
+from core_engine.utils.adaptive_concurrency import AdaptiveConcurrency  # noqa: E402
+from core_engine.utils.rate_limiter_async import AsyncRateLimiter  # noqa: E402
+
+EMPTY = json.dumps({"concepts": [], "relationships": [], "quotes": []})
+
+
+class ScriptedCompletions:
+    """Plays back `answers` in order: a string is the message content, an exception is raised."""
+
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, BaseException):
+            raise answer
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=answer))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+@pytest.fixture
+def make_extractor(monkeypatch):
+    """Builds extractors without an OpenAI client, rate limits or cache."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    def build(**kwargs):
+        kwargs.setdefault("batch_size", 1)
+        return AsyncKGExtractor(
+            workspace_id="ws",
+            rate_limiter=AsyncRateLimiter(),
+            concurrency=AdaptiveConcurrency(max_window=4),
+            use_cache=False,
+            **kwargs,
+        )
+
+    return build
+
+
+@pytest.fixture
+def extractor(make_extractor, monkeypatch):
+    """Extractor answering from a script of completions; backoff delays are recorded, not slept."""
+    delays = []
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(extractor_async.asyncio, "sleep", no_sleep)
+
+    def build(answers):
+        extractor = make_extractor()
+        extractor.completions = ScriptedCompletions(answers)
+        extractor.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(with_raw_response=extractor.completions))
+        )
+        extractor.delays = delays
+        return extractor
+
+    return build
+
+
+def _chunks(count):
+    return [
+        Document(page_content=f"chunk {i}", metadata={"episode_id": "ep", "source_path": "ep.txt"})
+        for i in range(count)
+    ]
+
+
+def _extract(run, extractor):
+    return run(extractor._extract_batch_async(1, _chunks(1), 1))
+
+
+def test_bad_answers_and_server_errors_are_retried(extractor, run):
+    ex = extractor(["not json", json.dumps({"concepts": []}), ServerError("unavailable"), "", EMPTY])
+    assert _extract(run, ex) == ([], [], [])
+    assert ex.completions.calls == 5
+    assert ex.delays == [1.0, 2.0, 4.0, 8.0]
+
+
+def test_other_errors_fail_without_retry(extractor, run):
+    ex = extractor([TypeError("bug in the caller"), EMPTY])
+    with pytest.raises(TypeError):
+        _extract(run, ex)
+    assert ex.completions.calls == 1
+    assert ex.delays == []
+
+
+def test_retries_stop_after_max_retries(extractor, run):
+    ex = extractor(["not json"] * 6)
+    with pytest.raises(extractor_async.InvalidExtractionError):
+        _extract(run, ex)
+    assert ex.completions.calls == 6
+
+
+def _streaming(make_extractor, extract, **kwargs):
+    """Extractor whose batches are produced by `extract(batch_num)`."""
+    extractor = make_extractor(**kwargs)
+
+    async def extract_batch(batch_num, chunks, total_batches):
+        return await extract(batch_num)
+
+    extractor._extract_batch_async = extract_batch
+    return extractor
+
+
+async def _until(condition):
+    for _ in range(1000):
+        if condition():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition not reached")
+
+
+def test_stream_yields_batches_as_they_complete(make_extractor, run):
+    async def scenario():
+        gates = {n: asyncio.Event() for n in (1, 2, 3)}
+
+        async def extract(batch_num):
+            await gates[batch_num].wait()
+            concepts = [{"id": f"c{batch_num}", "confidence": 0.9}, {"id": "low", "confidence": 0.1}]
+            return concepts, [], [{"text": "q", "confidence": 0.7}]
+
+        extractor = _streaming(make_extractor, extract)
+        received = []
+
+        async def consume():
+            async for batch_num, extraction in extractor.stream_from_chunks(_chunks(3), num_workers=3):
+                received.append((batch_num, [c["id"] for c in extraction["concepts"]], len(extraction["quotes"])))
+
+        consumer = asyncio.ensure_future(consume())
+        for n in (3, 1, 2):
+            gates[n].set()
+            await _until(lambda: len(received) == [3, 1, 2].index(n) + 1)
+        await consumer
+        assert received == [(3, ["c3"], 1), (1, ["c1"], 1), (2, ["c2"], 1)]
+
+    run(scenario())
+
+
+def test_slow_consumer_pauses_the_workers(make_extractor, run):
+    async def scenario():
+        started = []
+
+        async def extract(batch_num):
+            started.append(batch_num)
+            return [], [], []
+
+        extractor = _streaming(make_extractor, extract)
+        stream = extractor.stream_from_chunks(_chunks(20), num_workers=2, queue_size=2)
+        first = await stream.__anext__()
+        for _ in range(50):
+            await asyncio.sleep(0)
+
+        # Consumer holds one result; the queue holds two and each worker one more
+        assert len(started) == 1 + 2 + 2
+        rest = [batch_num async for batch_num, _ in stream]
+        assert sorted([first[0]] + rest) == list(range(1, 21))
+
+    run(scenario())
+
+
+def test_failed_batch_yields_empty_extraction(make_extractor, run):
+    async def scenario():
+        async def extract(batch_num):
+            if batch_num == 2:
+                raise RuntimeError("bad batch")
+            return [{"id": f"c{batch_num}", "confidence": 1.0}], [], []
+
+        extractor = _streaming(make_extractor, extract)
+        results = dict([item async for item in extractor.stream_from_chunks(_chunks(3), num_workers=1)])
+        assert results[2] == {"concepts": [], "relationships": [], "quotes": []}
+        assert [c["id"] for c in results[1]["concepts"] + results[3]["concepts"]] == ["c1", "c3"]
+
+    run(scenario())
+
+
+def test_consumer_stopping_early_cancels_the_pool(make_extractor, run):
+    async def scenario():
+        started = []
+
+        async def extract(batch_num):
+            started.append(batch_num)
+            return [], [], []
+
+        extractor = _streaming(make_extractor, extract)
+        stream = extractor.stream_from_chunks(_chunks(50), num_workers=2, queue_size=2)
+        async for _ in stream:
+            break
+        await stream.aclose()
+        count = len(started)
+        for _ in range(50):
+            await asyncio.sleep(0)
+        assert len(started) == count < 50
+        assert [t for t in asyncio.all_tasks() if t is not asyncio.current_task()] == []
+
+    run(scenario())
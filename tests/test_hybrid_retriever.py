@@ -0,0 +1,144 @@
+"""Tests for vector-search filters (core_engine.reasoning.hybrid_retriever)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+for module in ("langchain_core", "neo4j", "openai", "qdrant_client"):
+    pytest.importorskip(module)
+
+from core_engine.embeddings.collection_catalog import CollectionCatalog  # noqa: E402
+from core_engine.embeddings.ingest_qdrant import timestamp_to_seconds  # noqa: E402
+from core_engine.logging import get_logger  # noqa: E402
+from core_engine.reasoning.hybrid_retriever import (  # noqa: E402
+    HybridRetriever,
+    RetrievalFilters,
+    entity_filter_tokens,
+    matches_entity_tokens,
+)
+
+POINTS = [
+    {"workspace_id": "ws", "episode_id": "002_JERROD_CARMICHAEL", "speaker": "Jerrod Carmichael"},
+    {"workspace_id": "ws", "episode_id": "007_RICK_RUBIN", "speaker": "Rick Rubin"},
+    {"workspace_id": "other", "episode_id": "099_JERROD_LIVE", "speaker": "Jerrod"},
+    {"workspace_id": "shows", "episode_id": "010_THE_MARTIN_SHOW", "speaker": "Steve Martin"},
+    {"workspace_id": "shows", "episode_id": "011_STATE-OF-A-NATION", "speaker": "Ann Lee"},
+]
+
+
+class FacetClient:
+    """Answers `facet` from POINTS, honouring a workspace_id filter."""
+
+    def __init__(self):
+        self.calls = []
+
+    def facet(self, collection_name, key, facet_filter=None, limit=10, exact=False):
+        self.calls.append({"key": key, "facet_filter": facet_filter, "limit": limit, "exact": exact})
+        workspace = None
+        if facet_filter is not None:
+            (condition,) = facet_filter.must
+            assert condition.key == "workspace_id"
+            workspace = condition.match.value
+        values = sorted({p[key] for p in POINTS if workspace is None or p["workspace_id"] == workspace})
+        return SimpleNamespace(hits=[SimpleNamespace(value=v, count=1) for v in values[:limit]])
+
+
+def _retriever(client=None, workspace_id="ws"):
+    retriever = HybridRetriever.__new__(HybridRetriever)
+    retriever.workspace_id = workspace_id
+    retriever.qdrant_client = client
+    retriever.qdrant_collection = "chunks"
+    retriever.collections = CollectionCatalog(client)
+    retriever.logger = get_logger(__name__)
+    return retriever
+
+
+def _conditions(conditions):
+    return {condition.key: condition for condition in conditions or []}
+
+
+def test_build_filter_without_restrictions_is_workspace_only():
+    query_filter = _retriever()._build_filter(None)
+    must = _conditions(query_filter.must)
+    assert set(must) == {"workspace_id"}
+    assert must["workspace_id"].match.value == "ws"
+    assert not query_filter.should
+    assert not _retriever()._build_filter(RetrievalFilters()).should
+
+
+def test_build_filter_episodes_and_speakers_are_alternatives():
+    filters = RetrievalFilters(episode_ids=["e1", "e2"], speakers=["Rick Rubin"])
+    query_filter = _retriever()._build_filter(filters)
+    assert set(_conditions(query_filter.must)) == {"workspace_id"}
+    should = _conditions(query_filter.should)
+    assert list(should["episode_id"].match.any) == ["e1", "e2"]
+    assert list(should["speaker"].match.any) == ["Rick Rubin"]
+
+
+@pytest.mark.parametrize("start, end", [(60.0, 300.0), (60.0, None), (None, 300.0)])
+def test_build_filter_time_range_is_required(start, end):
+    filters = RetrievalFilters(speakers=["Rick Rubin"], start_seconds=start, end_seconds=end)
+    query_filter = _retriever()._build_filter(filters)
+    time_range = _conditions(query_filter.must)["start_seconds"].range
+    assert (time_range.gte, time_range.lte) == (start, end)
+    assert set(_conditions(query_filter.should)) == {"speaker"}
+
+
+def test_resolve_entity_filters_only_sees_own_workspace():
+    client = FacetClient()
+    filters = _retriever(client).resolve_entity_filters(["Jerrod"])
+    assert filters.episode_ids == ["002_JERROD_CARMICHAEL"]
+    assert filters.speakers == ["Jerrod Carmichael"]
+    assert all(call["facet_filter"] is not None and call["exact"] for call in client.calls)
+
+
+@pytest.mark.parametrize("entities", [["The Daily Stoic"], ["of", "a"], ["Art"], ["An"]])
+def test_resolve_entity_filters_ignores_stop_words_and_partial_words(entities):
+    assert _retriever(FacetClient(), workspace_id="shows").resolve_entity_filters(entities) is None
+
+
+def test_resolve_entity_filters_matches_whole_words():
+    retriever = _retriever(FacetClient(), workspace_id="shows")
+    filters = retriever.resolve_entity_filters(["Steve Martin"])
+    assert filters.episode_ids == ["010_THE_MARTIN_SHOW"]
+    assert filters.speakers == ["Steve Martin"]
+    assert retriever.resolve_entity_filters(["nation"]).episode_ids == ["011_STATE-OF-A-NATION"]
+
+
+def test_entity_tokens_match_whole_words_only():
+    tokens = entity_filter_tokens(["The Daily Stoic", "Art"])
+    assert tokens == {"daily", "stoic", "art"}
+    assert not matches_entity_tokens("010_THE_MARTIN_SHOW", tokens)
+    assert matches_entity_tokens("012_DAILY-STOIC", tokens)
+    assert not matches_entity_tokens(None, tokens)
+
+
+def test_resolve_entity_filters_no_match_or_no_facet_api():
+    assert _retriever(FacetClient()).resolve_entity_filters(["Nobody"]) is None
+    assert _retriever(FacetClient()).resolve_entity_filters([" "]) is None
+    assert _retriever(SimpleNamespace()).resolve_entity_filters(["Jerrod"]) is None
+
+
+def test_payload_values_are_cached_per_workspace():
+    client = FacetClient()
+    catalog = CollectionCatalog(client)
+    assert catalog.payload_values("chunks", "speaker", "ws") == ["Jerrod Carmichael", "Rick Rubin"]
+    assert catalog.payload_values("chunks", "speaker", "other") == ["Jerrod"]
+    assert catalog.payload_values("chunks", "speaker", "ws") == ["Jerrod Carmichael", "Rick Rubin"]
+    assert len(client.calls) == 2
+
+
+@pytest.mark.parametrize("timestamp, seconds", [
+    ("01:02:03", 3723.0),
+    ("00:00:07.5", 7.5),
+    ("12:34", 754.0),
+    ("05:06.25", 306.25),
+    ("[00:01:00]", 60.0),
+    ("", None),
+    (None, None),
+    ("90", None),
+    ("1:2:3:4", None),
+    ("ab:cd", None),
+])
+def test_timestamp_to_seconds(timestamp, seconds):
+    assert timestamp_to_seconds(timestamp) == seconds
@@ -0,0 +1,191 @@
+"""Tests for the background ingestion job (backend.app.services.ingestion_service)."""
+
+import pytest
+
+for module in ("langchain_core", "neo4j", "openai", "qdrant_client"):
+    pytest.importorskip(module)
+
+from backend.app.database.job_db import JobDB  # noqa: E402
+from backend.app.services import ingestion_service  # noqa: E402
+from core_engine.ingestion import IngestionManifest, filename_to_episode_id  # noqa: E402
+from core_engine.kg.schema import EntityMigrationRequired  # noqa: E402
+
+TEXT = "Some words spoken on the show. " * 5
+
+
+class FakeEngine:
+    """Records which files each run ingests instead of extracting/embedding them."""
+
+    runs = []
+    removed = []
+    failed = []  # episode ids reported as having failed extraction batches
+
+    def __init__(self, **kwargs):
+        pass
+
+    def fingerprint(self):
+        return "fp"
+
+    def remove_episodes(self, episode_ids):
+        FakeEngine.removed.append(sorted(episode_ids))
+
+    def load_and_chunk(self, transcripts_dir, paths=None):
+        FakeEngine.runs.append(sorted(p.name for p in paths))
+        return list(paths), list(paths)
+
+    def run(self, chunks, journal=None, cancel_event=None, progress=None):
+        return {
+            "written": {"concepts": len(chunks), "relationships": 0, "quotes": 0},
+            "embedded": len(chunks),
+            "failed_episode_ids": list(FakeEngine.failed),
+        }
+
+
+class FakeLinker:
+    """Records the episodes it links; raises `fail` while it is set."""
+
+    calls = []
+    fail = None
+
+    def __init__(self, client, workspace_id=None):
+        pass
+
+    def create_cross_episode_links(self, episode_ids=None, **kwargs):
+        FakeLinker.calls.append(sorted(episode_ids) if episode_ids is not None else None)
+        if FakeLinker.fail is not None:
+            raise FakeLinker.fail
+        return {"created": 1}
+
+
+class FakeClient:
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    FakeEngine.runs, FakeEngine.removed, FakeEngine.failed = [], [], []
+    FakeLinker.calls, FakeLinker.fail = [], None
+    job_db = JobDB(db_path=tmp_path / "jobs.db")
+    monkeypatch.setattr(ingestion_service, "ROOT", tmp_path)
+    monkeypatch.setattr(ingestion_service, "JobDB", lambda: job_db)
+    monkeypatch.setattr(ingestion_service, "StagedIngestionEngine", FakeEngine)
+    monkeypatch.setattr(ingestion_service, "CrossEpisodeLinker", FakeLinker)
+    monkeypatch.setattr(ingestion_service, "get_neo4j_client", lambda workspace_id=None: FakeClient())
+    monkeypatch.setattr(ingestion_service, "initialize_schema", lambda client: None)
+    monkeypatch.setattr(ingestion_service, "check_entity_schema", lambda client: None)
+
+    transcripts = tmp_path / "data" / "workspaces" / "ws" / "transcripts"
+    transcripts.mkdir(parents=True)
+    counter = iter(range(1000))
+
+    def run_job(job_id=None, **kwargs):
+        job_id = job_id or f"job{next(counter)}"
+        if job_db.get_job(job_id) is None:
+            job_db.create_job(job_id, "ws", "processing")
+        ingestion_service.process_transcripts_background(job_id, "ws", "upload", **kwargs)
+        return job_db.get_job(job_id)
+
+    return transcripts, run_job
+
+
+def _manifest(transcripts):
+    return IngestionManifest.for_transcripts_dir(transcripts, workspace_id="ws")
+
+
+def test_failed_linking_leaves_files_to_ingest_again(service):
+    transcripts, run_job = service
+    (transcripts / "001 ALPHA.txt").write_text(TEXT)
+    (transcripts / "002 BETA.txt").write_text(TEXT)
+
+    FakeLinker.fail = RuntimeError("neo4j unavailable")
+    assert run_job()["status"] == "failed"
+    assert _manifest(transcripts).entries == {}
+
+    FakeLinker.fail = None
+    assert run_job()["status"] == "completed"
+    assert FakeEngine.runs == [["001 ALPHA.txt", "002 BETA.txt"]] * 2
+    assert len(_manifest(transcripts).entries) == 2
+
+    job = run_job()
+    assert job["status"] == "completed"
+    assert job["results"]["unchanged_files"] == 2
+    assert len(FakeLinker.calls) == 2  # up to date: nothing re-linked
+
+
+def test_removed_episode_is_relinked_after_failed_run(service):
+    transcripts, run_job = service
+    (transcripts / "001 ALPHA.txt").write_text(TEXT)
+    (transcripts / "002 BETA.txt").write_text(TEXT)
+    assert run_job()["status"] == "completed"
+    (removed,) = [ep for ep in _manifest(transcripts).entries if "BETA" in ep.upper()]
+
+    (transcripts / "002 BETA.txt").unlink()
+    FakeLinker.fail = RuntimeError("neo4j unavailable")
+    assert run_job()["status"] == "failed"
+    assert removed in _manifest(transcripts).entries
+
+    FakeLinker.fail = None
+    assert run_job()["status"] == "completed"
+    assert FakeLinker.calls[-1] == [removed]
+    assert removed not in _manifest(transcripts).entries
+
+
+def test_unmigrated_graph_fails_before_any_write(service, monkeypatch):
+    transcripts, run_job = service
+    (transcripts / "001 ALPHA.txt").write_text(TEXT)
+    assert run_job()["status"] == "completed"
+    (transcripts / "001 ALPHA.txt").write_text(TEXT + "edited")
+
+    def unmigrated(client):
+        raise EntityMigrationRequired("run python -m core_engine.kg.migrate_entities")
+
+    monkeypatch.setattr(ingestion_service, "check_entity_schema", unmigrated)
+    job = run_job(clear_existing=True)
+    assert job["status"] == "failed"
+    assert "core_engine.kg.migrate_entities" in job["error"]
+    assert FakeEngine.removed == []
+    assert len(FakeEngine.runs) == 1
+
+
+def test_file_with_failed_batches_is_ingested_again(service):
+    transcripts, run_job = service
+    (transcripts / "001 ALPHA.txt").write_text(TEXT)
+    (transcripts / "002 BETA.txt").write_text(TEXT)
+    FakeEngine.failed = [filename_to_episode_id(transcripts / "001 ALPHA.txt")]
+
+    job = run_job()
+    assert job["status"] == "completed"
+    assert job["results"]["failed_files"] == 1
+    assert list(_manifest(transcripts).entries) == [filename_to_episode_id(transcripts / "002 BETA.txt")]
+
+    FakeEngine.failed = []
+    assert run_job()["status"] == "completed"
+    assert FakeEngine.runs[-1] == ["001 ALPHA.txt"]
+    assert len(_manifest(transcripts).entries) == 2
+
+
+class WorkerKilled(BaseException):
+    """Escapes the job's error handling, like a worker dying mid-step."""
+
+
+def test_job_stopped_while_linking_resumes_at_linking(service):
+    transcripts, run_job = service
+    (transcripts / "001 ALPHA.txt").write_text(TEXT)
+    assert run_job()["status"] == "completed"
+    (transcripts / "002 BETA.txt").write_text(TEXT)
+
+    FakeLinker.fail = WorkerKilled()
+    with pytest.raises(WorkerKilled):
+        run_job(job_id="resumable")
+    assert len(FakeEngine.runs) == 2
+
+    FakeLinker.fail = None
+    job = run_job(job_id="resumable", resume=True)
+    assert job["status"] == "completed"
+    assert len(FakeEngine.runs) == 2  # batches were written before the stop: not loaded again
+    assert FakeLinker.calls[-1] == FakeLinker.calls[-2] == [
+        ep for ep in _manifest(transcripts).entries if "BETA" in ep.upper()
+    ]
+    assert job["results"]["concepts"] == 1
+    assert job["results"]["total_files"] == 1
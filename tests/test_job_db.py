@@ -0,0 +1,115 @@
+"""Tests for the JobDB job queue: claims, leases and lease-guarded updates."""
+
+import pytest
+
+from backend.app.database.job_db import JobDB
+
+
+@pytest.fixture
+def job_db(tmp_path):
+    return JobDB(db_path=tmp_path / "jobs.db")
+
+
+def test_claim_order_priority_then_age(job_db):
+    job_db.create_job("old", "ws1", "processing")
+    job_db.create_job("new", "ws2", "processing")
+    job_db.create_job("urgent", "ws3", "processing", priority=5)
+
+    claimed = [job_db.claim_job("w", lease_seconds=60, max_per_workspace=1)["job_id"] for _ in range(3)]
+    assert claimed == ["urgent", "old", "new"]
+    assert job_db.claim_job("w", lease_seconds=60) is None
+
+
+def test_claim_sets_lease_and_skips_busy_workspace(job_db):
+    job_db.create_job("a", "ws", "processing")
+    job_db.create_job("b", "ws", "processing")
+
+    job = job_db.claim_job("w1", lease_seconds=60, max_per_workspace=1)
+    assert job["job_id"] == "a"
+    assert job["status"] == "processing"
+    assert job["lease_owner"] == "w1"
+    assert job["reclaimed"] is False
+    assert job_db.claim_job("w2", lease_seconds=60, max_per_workspace=1) is None
+    assert job_db.claim_job("w2", lease_seconds=60, max_per_workspace=2)["job_id"] == "b"
+
+
+def test_claim_filters_job_types(job_db):
+    job_db.create_job("a", "ws", "export")
+    assert job_db.claim_job("w", lease_seconds=60, job_types=("processing",)) is None
+    assert job_db.claim_job("w", lease_seconds=60, job_types=("export",))["job_id"] == "a"
+
+
+def test_expired_lease_is_reclaimed(job_db):
+    job_db.create_job("a", "ws", "processing")
+    job_db.claim_job("w1", lease_seconds=-1)  # lease already expired: worker died
+
+    job = job_db.claim_job("w2", lease_seconds=60)
+    assert job["job_id"] == "a"
+    assert job["reclaimed"] is True
+    assert job["attempts"] == 2
+    assert job["lease_owner"] == "w2"
+    assert not job_db.renew_lease("a", "w1", 60)
+    assert job_db.renew_lease("a", "w2", 60)
+
+
+def test_release_lets_another_worker_resume(job_db):
+    job_db.create_job("a", "ws", "processing")
+    job_db.claim_job("w1", lease_seconds=60)
+    assert job_db.claim_job("w2", lease_seconds=60) is None
+
+    job_db.release_job("a", "w1")
+    assert job_db.claim_job("w2", lease_seconds=60)["reclaimed"] is True
+
+
+def test_terminal_update_requires_current_lease(job_db):
+    job_db.create_job("a", "ws", "processing")
+    job_db.claim_job("w1", lease_seconds=-1)
+    job_db.claim_job("w2", lease_seconds=60)
+
+    # The first worker lost its lease and must not overwrite the job
+    assert not job_db.update_job("a", status="failed", error="zombie", lease_owner="w1")
+    job = job_db.get_job("a")
+    assert job["status"] == "processing"
+    assert job["error"] is None
+
+    assert job_db.update_job("a", status="completed", progress=100, results={"n": 1}, lease_owner="w2")
+    job = job_db.get_job("a")
+    assert job["status"] == "completed"
+    assert job["results"] == {"n": 1}
+    assert job["lease_owner"] is None
+    assert not job_db.renew_lease("a", "w2", 60)
+
+
+def test_cancel_pending_and_orphaned_jobs(job_db):
+    job_db.create_job("pending", "ws1", "processing")
+    assert job_db.request_cancel("pending") == "cancelled"
+    assert job_db.claim_job("w", lease_seconds=60) is None
+
+    job_db.create_job("running", "ws2", "processing")
+    job_db.claim_job("w1", lease_seconds=-1)
+    assert job_db.request_cancel("running") == "processing"
+    assert job_db.is_cancel_requested("running")
+
+    # Its worker is gone: the next claim finishes the cancellation instead of resuming it
+    assert job_db.claim_job("w2", lease_seconds=60) is None
+    assert job_db.get_job("running")["status"] == "cancelled"
+    assert job_db.request_cancel("missing") is None
+
+
+def test_job_that_keeps_losing_its_worker_is_failed(job_db):
+    job_db.create_job("a", "ws", "processing")
+    for attempt in range(1, 4):
+        job = job_db.claim_job(f"w{attempt}", lease_seconds=-1, max_attempts=3)
+        assert (job["job_id"], job["attempts"]) == ("a", attempt)
+
+    # Third worker died too: the job is given up instead of claimed a fourth time
+    assert job_db.claim_job("w4", lease_seconds=60, max_attempts=3) is None
+    job = job_db.get_job("a")
+    assert job["status"] == "failed"
+    assert "3 attempts" in job["error"]
+    assert job["lease_owner"] is None
+
+    job_db.create_job("b", "ws", "processing")
+    job_db.claim_job("w1", lease_seconds=60, max_attempts=1)
+    assert job_db.claim_job("w2", lease_seconds=60, max_attempts=1) is None
+    assert job_db.get_job("b")["status"] == "processing"  # live lease: not failed
@@ -0,0 +1,212 @@
+"""Tests for LLM priority classes (core_engine.utils.llm_scheduler)."""
+
+import asyncio
+import socket
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core_engine.utils import llm_scheduler as scheduler_module
+from core_engine.utils.llm_scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    LLMScheduler,
+    SharedSlots,
+    schedule_openai_client,
+)
+
+
+@pytest.fixture
+def slots_path(tmp_path):
+    return tmp_path / "llm_slots.db"
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "SHARED_POLL_MIN_S", 0.01)
+    monkeypatch.setattr(scheduler_module, "SHARED_POLL_MAX_S", 0.02)
+
+
+def test_background_never_takes_the_reserve():
+    scheduler = LLMScheduler(max_in_flight=3, interactive_reserve=1)
+    scheduler.acquire(BACKGROUND)
+    scheduler.acquire(BACKGROUND)
+    assert not scheduler._try_take(BACKGROUND)
+    scheduler.acquire(INTERACTIVE)  # reserve slot
+    stats = scheduler.get_stats()
+    assert stats["in_flight"] == 3
+    assert stats["classes"][BACKGROUND]["in_flight"] == 2
+    assert stats["shared"] is None
+
+
+def test_freed_slot_goes_to_interactive_waiter_first(run):
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=1, interactive_reserve=0)
+        await scheduler.acquire_async(BACKGROUND)
+        order = []
+
+        async def call(priority):
+            async with scheduler.slot_async(priority):
+                order.append(priority)
+
+        background = asyncio.ensure_future(call(BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(call(INTERACTIVE))
+        await asyncio.sleep(0)
+        assert scheduler.get_stats()["classes"][BACKGROUND]["queued"] == 1
+        assert scheduler.get_stats()["classes"][INTERACTIVE]["queued"] == 1
+
+        scheduler.release(BACKGROUND)
+        await asyncio.gather(background, interactive)
+        assert order == [INTERACTIVE, BACKGROUND]
+        assert scheduler.get_stats()["in_flight"] == 0
+
+    run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue(run):
+    async def scenario():
+        scheduler = LLMScheduler(max_in_flight=1, interactive_reserve=0)
+        await scheduler.acquire_async(INTERACTIVE)
+        waiter = asyncio.ensure_future(scheduler.acquire_async(BACKGROUND))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.get_stats()["classes"][BACKGROUND]["queued"] == 0
+        scheduler.release(INTERACTIVE)
+        assert scheduler.get_stats()["in_flight"] == 0
+
+    run(scenario())
+
+
+def test_unknown_class_is_rejected():
+    with pytest.raises(ValueError):
+        LLMScheduler().acquire("bulk")
+
+
+def test_shared_cap_holds_across_schedulers(slots_path):
+    # Two schedulers on one file stand in for the API and a worker process
+    api = LLMScheduler(2, 1, shared=SharedSlots(slots_path, 2, 1))
+    worker = LLMScheduler(2, 1, shared=SharedSlots(slots_path, 2, 1))
+
+    ticket = worker.acquire(BACKGROUND)
+    assert ticket is not None
+    assert worker.shared.try_take(BACKGROUND)[0] is False  # background cap is 1 across both
+
+    interactive_ticket = api.acquire(INTERACTIVE)
+    shared = api.get_stats()["shared"]
+    assert shared["in_flight"] == 2
+    assert shared["background_in_flight"] == 1
+
+    worker.release(BACKGROUND, ticket)
+    api.release(INTERACTIVE, interactive_ticket)
+    assert api.get_stats()["shared"]["in_flight"] == 0
+
+
+def test_background_waits_while_another_process_has_interactive_demand(slots_path):
+    api = LLMScheduler(2, 0, shared=SharedSlots(slots_path, 2, 0))
+    worker = LLMScheduler(2, 0, shared=SharedSlots(slots_path, 2, 0))
+    held = [api.acquire(INTERACTIVE), worker.acquire(BACKGROUND)]
+
+    admitted = []
+    interactive = threading.Thread(target=lambda: admitted.append((INTERACTIVE, api.acquire(INTERACTIVE))))
+    interactive.start()
+    deadline = time.time() + 5
+    while api.get_stats()["shared"]["interactive_waiting"] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+
+    background = threading.Thread(target=lambda: admitted.append((BACKGROUND, worker.acquire(BACKGROUND))))
+    background.start()
+    time.sleep(0.05)
+    worker.release(BACKGROUND, held.pop())  # frees one slot: the interactive waiter gets it
+    interactive.join(timeout=5)
+    time.sleep(0.05)
+    assert [priority for priority, _ in admitted] == [INTERACTIVE]
+
+    api.release(INTERACTIVE, held.pop())
+    background.join(timeout=5)
+    assert [priority for priority, _ in admitted] == [INTERACTIVE, BACKGROUND]
+    for priority, ticket in admitted:
+        (api if priority == INTERACTIVE else worker).release(priority, ticket)
+    assert api.get_stats()["shared"]["in_flight"] == 0
+
+
+def test_expired_and_dead_owner_rows_are_reclaimed(slots_path):
+    slots = SharedSlots(slots_path, 1, 0, lease_seconds=0.05)
+    assert slots.try_take(INTERACTIVE)[0]
+    assert not slots.try_take(INTERACTIVE)[0]
+    time.sleep(0.1)
+    granted, row_id = slots.try_take(INTERACTIVE)
+    assert granted
+
+    slots.give_back(row_id)
+    conn = sqlite3.connect(slots_path)
+    conn.execute(
+        "INSERT INTO llm_slots (owner, priority, state, expires_at) VALUES (?, ?, 'running', ?)",
+        (f"{socket.gethostname()}:999999999", BACKGROUND, time.time() + 600),
+    )
+    conn.commit()
+    conn.close()
+    assert slots.try_take(INTERACTIVE)[0]
+
+
+def test_async_shared_slot_and_cancellation(slots_path, run):
+    async def scenario():
+        scheduler = LLMScheduler(1, 0, shared=SharedSlots(slots_path, 1, 0))
+        other = LLMScheduler(1, 0, shared=SharedSlots(slots_path, 1, 0))
+        ticket = other.acquire(INTERACTIVE)
+
+        waiter = asyncio.ensure_future(scheduler.acquire_async(BACKGROUND))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0.05)
+        assert scheduler.get_stats()["in_flight"] == 0
+
+        other.release(INTERACTIVE, ticket)
+        async with scheduler.slot_async(BACKGROUND):
+            assert scheduler.get_stats()["shared"]["in_flight"] == 1
+        assert scheduler.get_stats()["shared"]["in_flight"] == 0
+        assert scheduler.get_stats()["shared"]["background_waiting"] == 0
+
+    run(scenario())
+
+
+def test_broken_slot_table_fails_open(slots_path):
+    slots = SharedSlots(slots_path, 1, 0)
+    scheduler = LLMScheduler(1, 0, shared=slots)
+    slots_path.unlink()
+    slots_path.mkdir()  # sqlite can no longer open it
+    with scheduler.slot(INTERACTIVE):
+        assert scheduler.get_stats()["in_flight"] == 1
+    assert scheduler.get_stats()["in_flight"] == 0
+
+
+def test_schedule_openai_client_wraps_sync_and_async_calls(run):
+    scheduler = LLMScheduler(max_in_flight=2, interactive_reserve=1)
+    seen = []
+
+    def create(**kwargs):
+        seen.append(scheduler.get_stats()["classes"][BACKGROUND]["in_flight"])
+        return "ok"
+
+    async def acreate(**kwargs):
+        seen.append(scheduler.get_stats()["classes"][BACKGROUND]["in_flight"])
+        return "ok"
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+        embeddings=SimpleNamespace(create=acreate),
+    )
+    assert schedule_openai_client(client, BACKGROUND, scheduler) is client
+    assert schedule_openai_client(client, INTERACTIVE, scheduler) is client  # first class wins
+    assert client.chat.completions.create(model="m") == "ok"
+    assert run(client.embeddings.create(model="m")) == "ok"
+    assert seen == [1, 1]
+    assert scheduler.get_stats()["in_flight"] == 0
@@ -0,0 +1,103 @@
+"""Tests for the incremental re-ingestion manifest (core_engine.ingestion.manifest)."""
+
+import os
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from core_engine.ingestion.manifest import IngestionManifest  # noqa: E402
+
+FINGERPRINT = "fp-1"
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def transcripts(tmp_path):
+    directory = tmp_path / "transcripts"
+    directory.mkdir()
+    _write(directory / "001 FIRST.txt", "first episode transcript")
+    _write(directory / "002 SECOND.txt", "second episode transcript")
+    return directory
+
+
+def _ingest_all(manifest, transcripts):
+    diff = manifest.diff(transcripts, FINGERPRINT)
+    for path in diff.to_process:
+        manifest.record(path, FINGERPRINT, content_hash=diff.hashes.get(str(path)))
+    manifest.save()
+    return diff
+
+
+def test_first_diff_marks_everything_new(transcripts):
+    manifest = IngestionManifest.for_transcripts_dir(transcripts)
+    diff = manifest.diff(transcripts, FINGERPRINT)
+
+    assert sorted(p.name for p in diff.new) == ["001 FIRST.txt", "002 SECOND.txt"]
+    assert diff.changed == [] and diff.unchanged == [] and diff.removed == []
+    assert set(diff.hashes) == {str(p) for p in diff.new}
+
+
+def test_recorded_files_are_unchanged(transcripts):
+    _ingest_all(IngestionManifest.for_transcripts_dir(transcripts), transcripts)
+
+    diff = IngestionManifest.for_transcripts_dir(transcripts).diff(transcripts, FINGERPRINT)
+    assert diff.to_process == []
+    assert len(diff.unchanged) == 2
+
+
+def test_edited_and_deleted_episodes(transcripts):
+    _ingest_all(IngestionManifest.for_transcripts_dir(transcripts), transcripts)
+
+    _write(transcripts / "001 FIRST.txt", "first episode transcript, edited")
+    (transcripts / "002 SECOND.txt").unlink()
+    _write(transcripts / "003 THIRD.txt", "third episode transcript")
+
+    diff = IngestionManifest.for_transcripts_dir(transcripts).diff(transcripts, FINGERPRINT)
+    assert [p.name for p in diff.new] == ["003 THIRD.txt"]
+    assert [p.name for p in diff.changed] == ["001 FIRST.txt"]
+    assert diff.removed == ["002_SECOND"]
+    assert sorted(diff.stale_episode_ids) == ["001_FIRST", "002_SECOND"]
+    assert sorted(diff.touched_episode_ids) == ["001_FIRST", "002_SECOND", "003_THIRD"]
+
+
+def test_touched_but_identical_file_is_unchanged(transcripts):
+    _ingest_all(IngestionManifest.for_transcripts_dir(transcripts), transcripts)
+
+    path = transcripts / "001 FIRST.txt"
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 60))
+
+    diff = IngestionManifest.for_transcripts_dir(transcripts).diff(transcripts, FINGERPRINT)
+    assert diff.to_process == []
+    assert len(diff.unchanged) == 2
+
+
+def test_fingerprint_change_reprocesses_everything(transcripts):
+    _ingest_all(IngestionManifest.for_transcripts_dir(transcripts), transcripts)
+
+    diff = IngestionManifest.for_transcripts_dir(transcripts).diff(transcripts, "fp-2")
+    assert len(diff.changed) == 2
+    assert diff.unchanged == []
+
+
+def test_all_transcripts_deleted_reports_removed(transcripts):
+    _ingest_all(IngestionManifest.for_transcripts_dir(transcripts), transcripts)
+    for path in transcripts.iterdir():
+        path.unlink()
+
+    diff = IngestionManifest.for_transcripts_dir(transcripts).diff(transcripts, FINGERPRINT)
+    assert diff.to_process == [] and diff.unchanged == []
+    assert sorted(diff.removed) == ["001_FIRST", "002_SECOND"]
+
+
+def test_corrupt_manifest_means_full_reingest(transcripts):
+    manifest = IngestionManifest.for_transcripts_dir(transcripts)
+    manifest.path.write_text("{not json", encoding="utf-8")
+
+    diff = IngestionManifest.for_transcripts_dir(transcripts).diff(transcripts, FINGERPRINT)
+    assert len(diff.new) == 2
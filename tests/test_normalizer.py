@@ -0,0 +1,96 @@
+"""Tests for batched id resolution in the entity normalizer (core_engine.kg.normalizer)."""
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg.normalizer import EntityNormalizer  # noqa: E402
+
+
+class EntityGraph:
+    """Existing :Entity nodes (id -> labels); records which kind of read each query was."""
+
+    workspace_id = "ws"
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.reads = []
+
+    def execute_read(self, query, params):
+        if "count(c) as count" in query:
+            self.reads.append("count")
+            return [{"count": len(self.nodes)}]
+        if "UNWIND $ids" in query:
+            self.reads.append(("unwind", len(params["ids"])))
+            return [
+                {"id": i, "labels": ["Entity", *self.nodes[i]]} for i in params["ids"] if i in self.nodes
+            ]
+        if "LIMIT 1" in query:
+            self.reads.append("single")
+            return [{"id": params["id"]}] if params["id"] in self.nodes else []
+        self.reads.append("preload")
+        return [{"id": i, "labels": ["Entity", *labels]} for i, labels in self.nodes.items()]
+
+
+NODES = {"meditation": ["Practice"], "deep_work": ["Concept"], "rick_rubin": ["Person"]}
+
+
+def _extraction():
+    return {
+        "concepts": [
+            {"name": "Deep  Work", "type": "Concept"},
+            {"name": "Meditation", "type": "Concept"},  # exists, but as a Practice
+            {"name": "Flow State", "type": "CognitiveState"},
+        ],
+        "relationships": [
+            {"source_id": "Deep Work", "target_id": "Flow State", "type": "ENABLES"},
+            {"source_id": "Rick Rubin", "target_id": "Meditation", "type": "RELATES_TO"},
+        ],
+        "quotes": [{"text": "q"}],
+    }
+
+
+def _assert_resolved(result):
+    by_id = {c["id"]: c for c in result["concepts"]}
+    assert by_id["deep_work"]["is_existing"] is True
+    assert by_id["deep_work"]["name"] == "Deep Work"
+    assert by_id["meditation"]["is_existing"] is False  # label-specific match
+    assert by_id["flow_state"]["is_existing"] is False
+    assert [(r["source_id"], r["target_id"]) for r in result["relationships"]] == [
+        ("deep_work", "flow_state"),
+        ("rick_rubin", "meditation"),
+    ]
+    assert result["quotes"] == [{"text": "q"}]
+
+
+@pytest.mark.parametrize("preload_max_ids", [100, 0, 2])
+def test_batch_resolves_against_existing_entities(preload_max_ids):
+    graph = EntityGraph(dict(NODES))
+    normalizer = EntityNormalizer(graph, workspace_id="ws", preload_max_ids=preload_max_ids, lookup_batch_size=2)
+    _assert_resolved(normalizer.normalize_extraction(_extraction()))
+    assert "single" not in graph.reads  # no per-concept round trips
+
+    if preload_max_ids >= len(NODES):
+        assert graph.reads == ["count", "preload"]
+    else:
+        # 4 distinct ids (deep_work, meditation, flow_state, rick_rubin), 2 per query
+        unwinds = [r for r in graph.reads if r != "count"]
+        assert unwinds == [("unwind", 2), ("unwind", 2)]
+
+
+@pytest.mark.parametrize("preload_max_ids", [100, 0])
+def test_later_batches_see_ids_from_earlier_ones_without_queries(preload_max_ids):
+    graph = EntityGraph(dict(NODES))
+    normalizer = EntityNormalizer(graph, workspace_id="ws", preload_max_ids=preload_max_ids)
+    normalizer.normalize_extraction(_extraction())
+    reads = len(graph.reads)
+
+    second = normalizer.normalize_extraction({
+        "concepts": [{"name": "Flow State", "type": "CognitiveState"}],
+        "relationships": [{"source_id": "flow state", "target_id": "deep work", "type": "ENABLES"}],
+    })
+    assert second["concepts"][0]["is_existing"] is True  # written by the first batch
+    assert (second["relationships"][0]["source_id"], second["relationships"][0]["target_id"]) == (
+        "flow_state", "deep_work",
+    )
+    assert len(graph.reads) == reads
@@ -0,0 +1,109 @@
+"""Tests for live ingestion progress (core_engine.pipeline.progress)."""
+
+import threading
+
+import pytest
+
+for module in ("langchain_core", "neo4j", "openai", "qdrant_client"):
+    pytest.importorskip(module)
+
+from core_engine.metrics.cost_tracker import calculate_cost  # noqa: E402
+from core_engine.pipeline.progress import STAGE_WEIGHTS, IngestionProgress  # noqa: E402
+
+
+def test_fraction_weights_stages(clock):
+    progress = IngestionProgress()
+    for stage in STAGE_WEIGHTS:
+        progress.set_total(stage, 10)
+    assert progress.fraction() == 0.0
+
+    progress.add("extract", 5)
+    assert progress.fraction() == pytest.approx(0.3)
+    progress.add("extract", 5)
+    progress.add("write", 10)
+    assert progress.fraction() == pytest.approx(0.8)
+
+
+def test_stage_without_total_counts_as_done(clock):
+    progress = IngestionProgress()
+    progress.set_total("extract", 4)
+    progress.add("extract", 2)
+    assert progress.fraction() == pytest.approx(0.6 * 0.5 + 0.2 + 0.2)
+
+
+def test_skipped_chunks_count_as_done_but_not_toward_rate(clock):
+    progress = IngestionProgress()
+    progress.set_total("extract", 100, skipped=60)
+    clock.now += 10
+    progress.add("extract", 20)
+
+    extract = progress.snapshot()["stages"]["extract"]
+    assert extract["chunks_done"] == 80
+    assert extract["chunks_per_sec"] == 2.0
+    assert extract["eta_s"] == 10.0  # 20 remaining at 2 chunks/sec
+
+
+def test_eta_is_slowest_stage_and_unknown_before_first_batch(clock):
+    progress = IngestionProgress()
+    progress.set_total("extract", 40)
+    progress.set_total("embed", 40)
+    clock.now += 10
+    progress.add("extract", 20)  # 2/sec, 20 left -> 10s
+    assert progress.snapshot()["eta_s"] is None  # embed has work but no rate yet
+
+    progress.add("embed", 10)  # 1/sec, 30 left -> 30s
+    snapshot = progress.snapshot()
+    assert snapshot["eta_s"] == 30.0
+    assert snapshot["chunks_per_sec"] == 2.0
+
+
+def test_counters_and_usage_accumulate(clock):
+    progress = IngestionProgress()
+    progress.add("write", 3, concepts=4, quotes=1)
+    progress.add("write", 2, concepts=1, quotes=None)
+    progress.add_usage("gpt-4o", 1000, 200)
+    progress.add_usage("gpt-4o", 500)
+
+    snapshot = progress.snapshot()
+    assert snapshot["stages"]["write"]["batches_done"] == 2
+    assert snapshot["stages"]["write"]["concepts"] == 5
+    assert snapshot["stages"]["write"]["quotes"] == 1
+    assert snapshot["usage"]["gpt-4o"] == {"calls": 2, "input_tokens": 1500, "output_tokens": 200}
+    expected = calculate_cost("gpt-4o", 1000, 200) + calculate_cost("gpt-4o", 500)
+    assert snapshot["cost_usd"] == pytest.approx(expected, abs=1e-4)
+
+
+def test_flush_is_rate_limited(clock):
+    flushed = []
+    progress = IngestionProgress(on_flush=flushed.append, flush_interval=2.0)
+    progress.add("extract", 1)
+    progress.add("extract", 1)
+    assert len(flushed) == 1
+
+    clock.now += 2.5
+    progress.add("extract", 1)
+    assert len(flushed) == 2
+    assert flushed[-1]["stages"]["extract"]["chunks_done"] == 3
+
+    progress.set_phase("linking")  # forced
+    assert len(flushed) == 3
+    assert flushed[-1]["phase"] == "linking"
+
+
+def test_concurrent_adds_are_not_lost(clock):
+    progress = IngestionProgress(on_flush=lambda snapshot: None)
+
+    def worker():
+        for _ in range(500):
+            progress.add("embed", 1, embedded=2)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    embed = progress.snapshot()["stages"]["embed"]
+    assert embed["chunks_done"] == 4000
+    assert embed["batches_done"] == 4000
+    assert embed["embedded"] == 8000
@@ -0,0 +1,156 @@
+"""Tests for the asyncio token-bucket rate limiter (core_engine.utils.rate_limiter_async)."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from core_engine.utils.rate_limiter_async import (
+    AsyncRateLimiter,
+    _is_retryable,
+    estimate_tokens,
+    retry_after_seconds,
+    usage_tokens,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def test_estimate_and_usage_tokens():
+    assert estimate_tokens(["a" * 40, "b" * 8], completion_tokens=5) == 12 + 1 + 5
+    assert usage_tokens(SimpleNamespace(usage=SimpleNamespace(total_tokens=42))) == 42
+    usage = SimpleNamespace(total_tokens=None, prompt_tokens=10, completion_tokens=3)
+    assert usage_tokens(SimpleNamespace(usage=usage)) == 13
+    assert usage_tokens(SimpleNamespace()) is None
+
+
+def test_settle_refunds_and_charges_difference(run):
+    async def scenario():
+        limiter = AsyncRateLimiter(tokens_per_minute=1000)
+        reservation = await limiter.acquire(300)
+        assert limiter._tokens.level == pytest.approx(700, abs=1)
+        reservation.settle(100)
+        assert limiter._tokens.level == pytest.approx(900, abs=1)
+        reservation.settle(1000)  # settles once only
+        assert limiter._tokens.level == pytest.approx(900, abs=1)
+
+        other = await limiter.acquire(100)
+        other.settle(400)
+        assert limiter._tokens.level == pytest.approx(500, abs=1)
+
+    run(scenario())
+
+
+def test_oversized_request_is_capped_to_bucket(run):
+    async def scenario():
+        limiter = AsyncRateLimiter(tokens_per_minute=100)
+        reservation = await limiter.acquire(10_000)
+        assert reservation.estimated_tokens == 100
+
+    run(scenario())
+
+
+def test_waiters_are_admitted_in_arrival_order(run):
+    async def scenario():
+        limiter = AsyncRateLimiter(requests_per_minute=6000)  # 100 requests/sec refill
+        limiter._requests.level = 0
+        admitted = []
+
+        async def call(i):
+            await limiter.acquire()
+            admitted.append(i)
+
+        await asyncio.wait_for(asyncio.gather(*(call(i) for i in range(6))), timeout=5)
+        assert admitted == list(range(6))
+        assert limiter.get_stats()["waiting"] == 0
+
+    run(scenario())
+
+
+def test_refund_wakes_head_waiter_early(run):
+    async def scenario():
+        limiter = AsyncRateLimiter(tokens_per_minute=60)  # 1 token/sec refill
+        first = await limiter.acquire(60)
+        waiter = asyncio.ensure_future(limiter.acquire(30))  # would wait ~30s
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        first.settle(10)  # 50 tokens refunded
+        await asyncio.wait_for(waiter, timeout=1)
+
+    run(scenario())
+
+
+def test_is_retryable():
+    assert _is_retryable(StatusError(429))
+    assert _is_retryable(StatusError(503))
+    assert not _is_retryable(StatusError(400))
+    assert _is_retryable(asyncio.TimeoutError())
+    assert _is_retryable(ConnectionResetError())
+    assert not _is_retryable(TypeError("bad argument"))
+    assert not _is_retryable(KeyError("choices"))
+
+
+def test_openai_connection_errors_are_retryable():
+    openai = pytest.importorskip("openai")
+    assert _is_retryable(openai.APITimeoutError(request=None))
+    assert _is_retryable(openai.APIConnectionError(request=None))
+
+
+def test_retry_after_header():
+    assert retry_after_seconds(StatusError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(StatusError(429, {"retry-after": "soon"})) is None
+    assert retry_after_seconds(ValueError()) is None
+    limiter = AsyncRateLimiter(initial_delay=0.1, jitter=False)
+    assert limiter._calculate_delay(0, StatusError(429, {"retry-after": "3"})) == 3.0
+
+
+def _flaky(errors, result="ok"):
+    calls = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return func, calls
+
+
+def test_retry_with_backoff_retries_transient_errors(run):
+    limiter = AsyncRateLimiter(initial_delay=0.001, jitter=False)
+    func, calls = _flaky([StatusError(429), ConnectionError("reset")])
+    retries = []
+    result = run(limiter.retry_with_backoff(func, on_retry=lambda attempt, e: retries.append(attempt)))
+    assert result == "ok"
+    assert len(calls) == 3
+    assert retries == [1, 2]
+
+
+@pytest.mark.parametrize("error", [TypeError("bug"), StatusError(400)])
+def test_retry_with_backoff_fails_fast_on_other_errors(error, run):
+    limiter = AsyncRateLimiter(initial_delay=0.001, jitter=False)
+    func, calls = _flaky([error])
+    with pytest.raises(type(error)):
+        run(limiter.retry_with_backoff(func))
+    assert len(calls) == 1
+
+
+def test_retry_with_backoff_gives_up_after_max_retries(run):
+    limiter = AsyncRateLimiter(max_retries=2, initial_delay=0.001, jitter=False)
+    func, calls = _flaky([StatusError(500)] * 5)
+    with pytest.raises(StatusError):
+        run(limiter.retry_with_backoff(func))
+    assert len(calls) == 3
+
+
+def test_failed_call_returns_its_estimate(run):
+    limiter = AsyncRateLimiter(tokens_per_minute=1000, max_retries=0)
+    func, _ = _flaky([StatusError(400)])
+    with pytest.raises(StatusError):
+        run(limiter.retry_with_backoff(func, estimated_tokens=500))
+    assert limiter._tokens.level == pytest.approx(1000, abs=1)
@@ -0,0 +1,138 @@
+"""Tests for MMR selection in the reranker (core_engine.reasoning.reranker)."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("neo4j")
+pytest.importorskip("openai")
+
+from core_engine.reasoning import embedding_cache  # noqa: E402
+from core_engine.reasoning.reranker import Reranker  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_embedding_cache(monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_embedding_caches", {})
+    monkeypatch.delenv("EMBEDDING_CACHE_DISK", raising=False)
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings; records every request."""
+
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.requests = []
+
+    def create(self, model, input):
+        self.requests.append(list(input))
+        data = [SimpleNamespace(embedding=self.vector(text)) for text in input]
+        return SimpleNamespace(data=data)
+
+    def vector(self, text):
+        rng = np.random.default_rng(sum(map(ord, text)))
+        return rng.standard_normal(self.dim).tolist()
+
+
+def _reranker(lambda_param=0.5, embeddings=None):
+    client = SimpleNamespace(embeddings=embeddings or FakeEmbeddings())
+    return Reranker(strategy="mmr", lambda_param=lambda_param, openai_client=client)
+
+
+def _reference_mmr(query, docs, lambda_param):
+    """Straightforward MMR: cosine similarities recomputed at every step."""
+    def cosine(a, b):
+        na, nb = np.linalg.norm(a), np.linalg.norm(b)
+        return 0.0 if na == 0 or nb == 0 else float(a @ b / (na * nb))
+
+    remaining = list(range(len(docs)))
+    selected = []
+    while remaining:
+        def score(i):
+            relevance = cosine(docs[i], query)
+            if not selected:
+                return relevance
+            redundancy = max(cosine(docs[i], docs[j]) for j in selected)
+            return lambda_param * relevance - (1 - lambda_param) * redundancy
+        best = max(remaining, key=score)
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+@pytest.mark.parametrize("lambda_param", [0.0, 0.3, 0.5, 0.7, 1.0])
+@pytest.mark.parametrize("seed", range(5))
+def test_mmr_select_matches_reference(lambda_param, seed):
+    rng = np.random.default_rng(seed)
+    query = rng.standard_normal(16)
+    docs = rng.standard_normal((12, 16)) * rng.uniform(0.5, 3.0, size=(12, 1))  # unnormalised rows
+    selected, scores = _reranker(lambda_param)._mmr_select(query, docs)
+    assert selected == _reference_mmr(query, docs, lambda_param)
+    assert sorted(selected) == list(range(12))
+    assert len(scores) == 12
+
+
+def test_mmr_select_demotes_near_duplicates():
+    query = np.array([1.0, 0.0, 0.0])
+    docs = np.array([
+        [1.0, 0.10, 0.0],   # most relevant
+        [1.0, 0.11, 0.0],   # near duplicate of the first
+        [0.6, 0.0, 0.8],    # less relevant but different
+    ])
+    selected, scores = _reranker(lambda_param=0.5)._mmr_select(query, docs)
+    assert selected == [0, 2, 1]
+    assert scores[0] == pytest.approx(docs[0] @ query / np.linalg.norm(docs[0]))
+
+    by_relevance, _ = _reranker(lambda_param=1.0)._mmr_select(query, docs)
+    assert by_relevance == [0, 1, 2]
+
+
+def test_mmr_select_handles_zero_vectors_and_single_result():
+    query = np.array([1.0, 0.0])
+    selected, scores = _reranker()._mmr_select(query, np.array([[0.0, 0.0], [1.0, 1.0]]))
+    assert selected == [1, 0]
+    assert all(np.isfinite(scores))
+
+    assert _reranker()._mmr_select(query, np.array([[2.0, 0.0]]))[0] == [0]
+    selected, scores = _reranker()._mmr_select(np.zeros(2), np.array([[1.0, 0.0], [0.0, 1.0]]))
+    assert sorted(selected) == [0, 1]
+    assert all(np.isfinite(scores))
+
+
+def test_mmr_embeddings_reuse_search_vectors():
+    embeddings = FakeEmbeddings(dim=4)
+    reranker = _reranker(embeddings=embeddings)
+    results = [
+        {"text": "a", "vector": [1.0, 0.0, 0.0, 0.0]},
+        {"text": "b"},
+        {"text": "c", "vector": [0.0, 1.0]},  # other model: re-embedded
+    ]
+    query_vector, matrix = reranker._get_mmr_embeddings("q", results)
+
+    assert embeddings.requests == [["q", "b"], ["c"]]
+    assert matrix.shape == (3, 4)
+    np.testing.assert_allclose(matrix[0], [1.0, 0.0, 0.0, 0.0])
+    np.testing.assert_allclose(matrix[1], embeddings.vector("b"), rtol=1e-6)
+    np.testing.assert_allclose(matrix[2], embeddings.vector("c"), rtol=1e-6)
+    np.testing.assert_allclose(query_vector, embeddings.vector("q"), rtol=1e-6)
+
+
+def test_mmr_query_vector_comes_from_the_embedding_cache():
+    embeddings = FakeEmbeddings(dim=4)
+    reranker = _reranker(embeddings=embeddings)
+    searched = [1.0, 0.0, 0.0, 0.0]
+    reranker.embedding_cache.set("q", searched)  # embedded by the search
+
+    query_vector, matrix = reranker._get_mmr_embeddings("q", [{"text": "a", "vector": [0.0, 1.0, 0.0, 0.0]}])
+    assert embeddings.requests == []
+    np.testing.assert_allclose(query_vector, searched)
+
+    query_vector, _ = reranker._get_mmr_embeddings("q", [{"text": "b"}])
+    assert embeddings.requests == [["b"]]
+    np.testing.assert_allclose(query_vector, searched)
+
+    # A query the search did not embed is embedded once, then cached
+    reranker._get_mmr_embeddings("other", [{"text": "b"}])
+    reranker._get_mmr_embeddings("other", [{"text": "b"}])
+    assert embeddings.requests == [["b"], ["other", "b"], ["b"]]
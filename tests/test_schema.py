@@ -0,0 +1,50 @@
+"""Tests for schema initialization on graphs from before :Entity (core_engine.kg.schema)."""
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg.schema import EntityMigrationRequired, SchemaManager  # noqa: E402
+
+
+class SchemaClient:
+    """Records writes; answers SHOW CONSTRAINTS with `legacy_constraints`."""
+
+    workspace_id = "ws"
+
+    def __init__(self, legacy_constraints=0, fail_reads=False):
+        self.legacy_constraints = legacy_constraints
+        self.fail_reads = fail_reads
+        self.writes = []
+
+    def execute_read(self, query, params=None):
+        if self.fail_reads:
+            raise RuntimeError("neo4j unavailable")
+        if query.startswith("SHOW CONSTRAINTS"):
+            return [{"count": self.legacy_constraints}]
+        return []
+
+    def execute_write(self, query, params=None):
+        self.writes.append(query)
+        return []
+
+
+def test_legacy_graph_refuses_schema_initialization():
+    client = SchemaClient(legacy_constraints=3)
+    manager = SchemaManager(client)
+    assert manager.needs_entity_migration()
+
+    with pytest.raises(EntityMigrationRequired, match="core_engine.kg.migrate_entities"):
+        manager.initialize_schema()
+    assert client.writes == []
+
+    client = SchemaClient()
+    SchemaManager(client).initialize_schema()
+    assert any("FOR (n:Entity)" in q for q in client.writes)
+
+
+def test_constraint_listing_errors_are_raised():
+    manager = SchemaManager(SchemaClient(fail_reads=True))
+    with pytest.raises(RuntimeError):
+        manager.needs_entity_migration()
+    assert not SchemaManager(SchemaClient()).needs_entity_migration()
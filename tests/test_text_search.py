@@ -0,0 +1,131 @@
+"""Tests for full-text lookup helpers (core_engine.kg.text_search) and the queries built on them."""
+
+import asyncio
+import re
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg.text_search import (  # noqa: E402
+    CONCEPT_TEXT_INDEX,
+    contains_match,
+    fulltext_match,
+    fulltext_query,
+    is_missing_index_error,
+)
+
+CLAUSE = re.compile(r"^(OPTIONAL MATCH|MATCH|CALL|WITH|WHERE|RETURN|ORDER BY|LIMIT|UNWIND)\b")
+
+
+def assert_conditions_follow_where(query):
+    """Every `AND ...` line must continue a WHERE clause, not a WITH/MATCH."""
+    last = None
+    for line in (line.strip() for line in query.splitlines()):
+        if not line:
+            continue
+        if line.startswith("AND "):
+            assert last == "WHERE", f"AND after {last}:\n{query}"
+            continue
+        match = CLAUSE.match(line)
+        if match:
+            last = match.group(1)
+
+
+class RecordingClient:
+    """Records queries; optionally fails full-text lookups as if the index were missing."""
+
+    def __init__(self, missing_index=False):
+        self.missing_index = missing_index
+        self.queries = []
+
+    def execute_read(self, query, params=None):
+        self.queries.append(query)
+        if self.missing_index and "db.index.fulltext" in query:
+            raise RuntimeError("There is no such fulltext schema index: concept_text")
+        return []
+
+
+def test_fulltext_query_single_and_phrase():
+    assert fulltext_query(["Creativity"]) == "(creativity^2 OR creativity*)"
+    assert fulltext_query(["deep work"]) == '("deep work"^2 OR (deep* AND work*))'
+
+
+def test_fulltext_query_drops_punctuation_and_duplicates():
+    assert fulltext_query(["!!!", ""]) == ""
+    assert fulltext_query(["focus", "Focus!"]) == "(focus^2 OR focus*)"
+    assert fulltext_query(["a+b"]) == "(\"a b\"^2 OR (a* AND b*))"
+
+
+@pytest.mark.parametrize("match", [fulltext_match(CONCEPT_TEXT_INDEX), contains_match()])
+def test_match_forms_accept_appended_conditions(match):
+    assert_conditions_follow_where(match + "\n  AND $concept_type IN labels(c)\nRETURN c")
+
+
+def test_contains_match_label_and_fields():
+    query = contains_match("q", fields=("text",), label="Quote")
+    assert "MATCH (q:Quote)" in query
+    assert "toLower(q.text) CONTAINS term" in query
+    assert "WITH q, 1.0 AS score" in query
+
+
+def test_is_missing_index_error():
+    assert is_missing_index_error(RuntimeError("There is no such fulltext schema index: quote_text"))
+    assert not is_missing_index_error(RuntimeError("connection reset"))
+
+
+def _theme_extractor(client):
+    from core_engine.script_generation.theme_extractor import ThemeExtractor
+
+    extractor = ThemeExtractor.__new__(ThemeExtractor)
+    extractor.workspace_id = "ws"
+    extractor.client = client
+    return extractor
+
+
+class NoRagRetriever:
+    """Stands in for the vector-search fallback so no OpenAI/Qdrant client is built."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def retrieve(self, query, top_k=10):
+        return []
+
+
+@pytest.mark.parametrize("theme", ["creativity", "!!!"])
+@pytest.mark.parametrize("missing_index", [False, True])
+def test_theme_extractor_queries(monkeypatch, theme, missing_index):
+    client = RecordingClient(missing_index=missing_index)
+    extractor = _theme_extractor(client)
+    from core_engine.reasoning import hybrid_retriever
+    monkeypatch.setattr(hybrid_retriever, "HybridRetriever", NoRagRetriever)
+    extractor._extract_theme_concepts(theme, episodes=["e1"])
+    extractor._extract_theme_quotes(theme, episodes=["e1"])
+    assert client.queries
+    if theme == "!!!" or missing_index:
+        assert any("CONTAINS term" in q for q in client.queries)
+    for query in client.queries:
+        assert_conditions_follow_where(query)
+
+
+class AsyncRecordingClient(RecordingClient):
+    async def execute_read(self, query, params=None):
+        return RecordingClient.execute_read(self, query, params)
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.parametrize("theme", ["creativity", "!!!", None])
+@pytest.mark.parametrize("missing_index", [False, True])
+def test_graph_concepts_route_queries(monkeypatch, theme, missing_index):
+    pytest.importorskip("fastapi")
+    from backend.app.api.routes import graph
+
+    client = AsyncRecordingClient(missing_index=missing_index)
+    monkeypatch.setattr(graph, "get_async_neo4j_client", lambda workspace_id: client)
+    asyncio.run(graph.get_concepts(theme=theme, concept_type="Concept", x_workspace_id="ws", limit=5))
+    assert client.queries
+    for query in client.queries:
+        assert_conditions_follow_where(query)
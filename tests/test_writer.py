@@ -0,0 +1,139 @@
+"""Tests for the bulk (UNWIND) write path of the KG writer (core_engine.kg.writer)."""
+
+import pytest
+
+pytest.importorskip("neo4j")
+
+from core_engine.kg.writer import KGWriter  # noqa: E402
+
+
+class UnwindClient:
+    """
+    Answers UNWIND statements the way Neo4j would for a graph holding `entities`.
+
+    Relationship statements return the idx of rows whose endpoints exist;
+    a statement containing any row in `fail_ids` raises.
+    """
+
+    def __init__(self, entities=(), fail_ids=()):
+        self.entities = set(entities)
+        self.fail_ids = set(fail_ids)
+        self.calls = []
+
+    def execute_write(self, query, params=None):
+        rows = params["rows"]
+        self.calls.append((query, rows))
+        if any(row.get("source_id") in self.fail_ids or row.get("id") in self.fail_ids for row in rows):
+            raise RuntimeError("transient failure")
+        if "MERGE (source)-[r:" in query:
+            return [
+                {"idx": row["idx"]}
+                for row in rows
+                if row["source_id"] in self.entities and row["target_id"] in self.entities
+            ]
+        if "MERGE (c:Entity" in query:
+            self.entities.update(row["id"] for row in rows)
+            return [{"written": len(rows), "type_conflicts": []}]
+        return []
+
+    def execute_write_batch(self, queries):
+        for query, params in queries:
+            self.calls.append((query, [params]))
+        return [[] for _ in queries]
+
+    def statements(self, marker):
+        return [(query, rows) for query, rows in self.calls if marker in query]
+
+
+def _concept(concept_id, concept_type="Concept"):
+    return {"id": concept_id, "name": concept_id, "type": concept_type, "episode_id": "ep", "confidence": 0.9}
+
+
+def _rel(source, target, rel_type="ENABLES"):
+    return {"source_id": source, "target_id": target, "type": rel_type, "episode_id": "ep"}
+
+
+def test_concepts_one_unwind_per_label_in_slices():
+    client = UnwindClient()
+    writer = KGWriter(client, workspace_id="ws", bulk_batch_sizes={"concepts": 2})
+    concepts = [_concept(f"c{i}") for i in range(3)] + [_concept("meditation", "Practice")]
+
+    assert writer.write_concepts(concepts) == 4
+    statements = client.statements("MERGE (c:Entity")
+    assert [len(rows) for _, rows in statements] == [2, 1, 1]
+    assert all("c:Concept" in query for query, _ in statements[:2])
+    assert "c:Practice" in statements[2][0]
+    assert statements[0][1][0]["episode_id"] == "ep"
+    assert writer.write_stats["concepts:Concept"]["rows"] == 3
+
+
+def test_relationships_group_by_type_and_count_matched_rows():
+    client = UnwindClient(entities={"a", "b", "c"})
+    writer = KGWriter(client, workspace_id="ws")
+    relationships = [_rel("a", "b"), _rel("b", "c", "CAUSES"), _rel("a", "missing"), {"source_id": "a", "type": "CAUSES"}]
+
+    assert writer.write_relationships(relationships) == 2
+    statements = client.statements("MERGE (source)-[r:")
+    assert sorted(query.split("MERGE (source)-[r:")[1].split("]")[0] for query, _ in statements) == ["CAUSES", "ENABLES"]
+    assert sum(len(rows) for _, rows in statements) == 3  # the row without a target is dropped
+    assert all("MATCH (source:Entity" in query for query, _ in statements)
+
+
+def test_failed_relationship_slice_does_not_stop_the_others():
+    client = UnwindClient(entities={"a", "b", "c", "d"}, fail_ids={"c"})
+    writer = KGWriter(client, workspace_id="ws", bulk_batch_sizes={"relationships": 1})
+    relationships = [_rel("a", "b"), _rel("c", "d"), _rel("b", "d")]
+
+    assert writer.write_relationships(relationships) == 2
+    assert len(client.statements("MERGE (source)-[r:")) == 3
+    stats = writer.write_stats["relationships:ENABLES"]
+    assert (stats["rows"], stats["failed_rows"]) == (3, 1)
+
+
+def test_failed_concept_slice_is_raised():
+    client = UnwindClient(fail_ids={"bad"})
+    writer = KGWriter(client, workspace_id="ws")
+    with pytest.raises(RuntimeError):
+        writer.write_concepts([_concept("bad")])
+
+
+def test_quotes_link_to_every_entity_type_and_speaker():
+    client = UnwindClient()
+    writer = KGWriter(client, workspace_id="ws")
+    quotes = [
+        {"text": "Sit every morning.", "speaker": "Rick", "episode_id": "ep", "start_char": 10,
+         "related_concepts": ["meditation", "rick_rubin"]},
+        {"text": "No speaker here.", "episode_id": "ep", "start_char": 99},
+    ]
+
+    assert writer.write_quotes(quotes) == 2
+    (_, quote_rows), = client.statements("MERGE (q:Quote")
+    assert [row["id"] for row in quote_rows] == ["quote_ep_10", "quote_ep_99"]
+
+    (about_query, about_rows), = client.statements(":ABOUT")
+    assert "MATCH (c:Entity" in about_query
+    assert about_rows == [
+        {"quote_id": "quote_ep_10", "concept_id": "meditation"},
+        {"quote_id": "quote_ep_10", "concept_id": "rick_rubin"},
+    ]
+    (_, said_rows), = client.statements(":SAID")
+    assert said_rows == [{"quote_id": "quote_ep_10", "speaker": "Rick"}]
+
+
+def test_per_row_quote_links_match_every_entity_type():
+    client = UnwindClient()
+    writer = KGWriter(client, workspace_id="ws", bulk=False)
+    writer.write_quotes([{"text": "q", "episode_id": "ep", "related_concepts": ["meditation"]}])
+    (about_query, _), = client.statements(":ABOUT")
+    assert "MATCH (c:Entity" in about_query
+
+
+def test_write_extraction_bulk_counts():
+    client = UnwindClient()
+    writer = KGWriter(client, workspace_id="ws")
+    counts = writer.write_extraction({
+        "concepts": [_concept("a"), _concept("b", "Outcome")],
+        "relationships": [_rel("a", "b"), _rel("a", "zzz")],
+        "quotes": [{"text": "q", "episode_id": "ep", "related_concepts": ["b"]}],
+    })
+    assert counts == {"concepts": 2, "relationships": 1, "quotes": 1}